@@ -5,6 +5,8 @@ from dotenv import load_dotenv
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import numpy as np
+from bulk_loader import BulkLoader
+from user_neighbors import refresh as refresh_user_neighbors
 
 # .env 파일 로드
 load_dotenv()
@@ -56,12 +58,8 @@ CREATE TABLE IF NOT EXISTS user_embeddings (
 );
 """
 
-# INSERT 쿼리 정의
-insert_sql = """
-INSERT INTO user_behavior (user_id, age, income, gender, spending_score, visit_count)
-VALUES (%s, %s, %s, %s, %s, %s)
-ON CONFLICT (user_id) DO NOTHING;
-"""
+# 대량 적재 설정 (COPY 바이너리, 청크마다 커밋)
+CHUNK_ROWS = 5000
 
 # 3단계: 테이블 생성 및 데이터 적재
 print("\n3단계: 테이블 생성 및 PostgreSQL에 데이터 적재 중...")
@@ -79,41 +77,26 @@ try:
     # user_behavior 테이블 생성
     cur.execute(create_table_sql)
     print("✅ user_behavior 테이블이 생성되었습니다.")
-    
-    # 데이터 삽입 카운터
-    success_count = 0
-    fail_count = 0
-    
-    # DataFrame의 각 행을 순회하며 INSERT 실행
-    for index, row in df.iterrows():
-        try:
-            # 각 행의 데이터를 튜플로 변환
-            data = (
-                str(row['user_id']),
-                int(row['age']),
-                int(row['income']),
-                str(row['gender']),
-                int(row['spending_score']),
-                int(row['visit_count'])
-            )
-            
-            # INSERT 쿼리 실행
-            cur.execute(insert_sql, data)
-            success_count += 1
-            
-            # 100개마다 진행상황 출력
-            if (index + 1) % 100 == 0:
-                print(f"진행중... {index + 1}/{len(df)} 레코드 처리 완료")
-                
-        except Exception as row_error:
-            print(f"❌ 행 {index} 처리 실패: {row_error}")
-            fail_count += 1
-    
-    # 모든 변경사항 커밋
-    conn.commit()
-    print(f"✅ 성공적으로 {success_count}개 레코드가 'user_behavior' 테이블에 적재되었습니다.")
-    if fail_count > 0:
-        print(f"⚠️  {fail_count}개 레코드 적재 실패")
+    conn.commit()  # 테이블 생성은 먼저 확정 (적재기는 청크마다 커밋/롤백)
+    
+    # DataFrame 행을 COPY로 청크 단위 적재 (기존 행은 건너뜀 - ON CONFLICT DO NOTHING)
+    loader = BulkLoader(conn, chunk_rows=CHUNK_ROWS)
+    behavior_rows = zip(
+        df['user_id'].astype(str),
+        df['age'].astype(int),
+        df['income'].astype(int),
+        df['gender'].astype(str),
+        df['spending_score'].astype(int),
+        df['visit_count'].astype(int)
+    )
+    report = loader.load("user_behavior", behavior_rows, on_conflict="(user_id) DO NOTHING")
+    
+    print(f"✅ 성공적으로 {report['rows_loaded']}개 레코드가 'user_behavior' 테이블에 적재되었습니다. "
+          f"({report['rows_per_sec']} rows/sec)")
+    for failure in report['failed_chunks']:
+        print(f"❌ 행 {failure['first_row']}~{failure['last_row']} 적재 실패: {failure['error']}")
+    if report['rows_failed'] > 0:
+        print(f"⚠️  {report['rows_failed']}개 레코드 적재 실패")
     
     # 4단계: PostgreSQL에서 AI 분석에 필요한 필드 추출
     print("\n4단계: PostgreSQL에서 AI 분석에 필요한 필드 추출 중...")
@@ -160,31 +143,18 @@ try:
     
     # 임베딩 데이터를 user_embeddings 테이블에 저장
     print("\n임베딩 데이터를 user_embeddings 테이블에 저장 중...")
-    embedding_insert_count = 0
-    embedding_fail_count = 0
-    
-    for uid, vec in zip(df_extracted['user_id'], df_extracted['embedding']):
-        try:
-            cur.execute("""
-                INSERT INTO user_embeddings (user_id, embedding)
-                VALUES (%s, %s)
-                ON CONFLICT (user_id) DO UPDATE SET embedding = EXCLUDED.embedding;
-            """, (uid, vec))
-            embedding_insert_count += 1
-            
-            # 100개마다 진행상황 출력
-            if embedding_insert_count % 100 == 0:
-                print(f"임베딩 저장 진행중... {embedding_insert_count}/{len(df_extracted)} 완료")
-                
-        except Exception as e:
-            print(f"❌ 임베딩 저장 실패 (user_id: {uid}): {e}")
-            embedding_fail_count += 1
-    
-    # 임베딩 저장 커밋
-    conn.commit()
-    print(f"✅ 성공적으로 {embedding_insert_count}개 사용자 임베딩이 저장되었습니다.")
-    if embedding_fail_count > 0:
-        print(f"⚠️  {embedding_fail_count}개 임베딩 저장 실패")
+    embedding_report = loader.load(
+        "user_embeddings",
+        zip(df_extracted['user_id'], X_pca),
+        on_conflict="(user_id) DO UPDATE SET embedding = EXCLUDED.embedding"
+    )
+    
+    print(f"✅ 성공적으로 {embedding_report['rows_loaded']}개 사용자 임베딩이 저장되었습니다. "
+          f"({embedding_report['rows_per_sec']} rows/sec)")
+    for failure in embedding_report['failed_chunks']:
+        print(f"❌ 임베딩 행 {failure['first_row']}~{failure['last_row']} 저장 실패: {failure['error']}")
+    if embedding_report['rows_failed'] > 0:
+        print(f"⚠️  {embedding_report['rows_failed']}개 임베딩 저장 실패")
     
     # 최종 결과 확인
     print("\n=== 최종 결과 확인 ===")
@@ -249,6 +219,12 @@ try:
         print(f"User ID: {row[0]}, Cosine Similarity: {row[3]:.4f}, Cosine Distance: {row[2]:.4f}")
 
     
+    # 6단계: 추천 API용 이웃 테이블 갱신 (임베딩을 다시 계산했으므로 전체 재계산 후 교체)
+    print("\n6단계: 사용자 이웃 테이블(user_neighbors) 갱신 중...")
+    neighbor_report = refresh_user_neighbors(conn)
+    print(f"✅ 사용자 {neighbor_report['users']}명의 이웃 {neighbor_report['rows']}건 저장 "
+          f"(계산 {neighbor_report['compute_seconds']}초, 저장 {neighbor_report['write_seconds']}초)")
+    
     # 커서 및 연결 종료
     cur.close()
 
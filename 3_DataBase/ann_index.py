@@ -0,0 +1,639 @@
+"""
+인프로세스 HNSW 근사 최근접 이웃(ANN) 인덱스 - LISTEN/NOTIFY로 Postgres와 동기화
+
+수백만 건의 설계안 벡터를 쿼리마다 Postgres에서 검색하지 않고, 애플리케이션 프로세스 안의
+hnswlib 인덱스로 1ms 이하에 후보 id를 찾은 뒤 제목/본문만 `WHERE id = ANY(...)` 한 번으로 가져옵니다.
+Postgres는 계속 원본(source of truth)이고, 인덱스는 변경 로그를 따라가는 복제본입니다.
+
+동기화 방식:
+1. install_change_log: 변경 로그 테이블 + 문장 단위 트리거(INSERT / UPDATE / DELETE) 설치
+   - 트리거는 변경된 id를 {table}_ann_changes에 기록하고 pg_notify('{table}_ann', ...) 발생
+   - 문장 단위 트리거(전이 테이블)라서 COPY로 100만 행을 넣어도 NOTIFY는 한 번
+2. 리스너 스레드가 LISTEN으로 알림을 받으면 seq > last_seq 인 로그를 읽고,
+   id별 최신 벡터를 DB에서 다시 읽어 인덱스에 반영 (같은 변경을 여러 번 적용해도 결과 동일)
+3. 커밋 순서가 seq 순서와 다를 수 있으므로 seq 공백(gap)은 gap_timeout 동안 기다렸다가 건너뜀
+4. 인덱스 + 메타(last_seq)를 주기적으로 디스크에 저장 → 재시작시 로그의 나머지만 따라잡음
+   (로그가 정리되어 따라잡을 수 없으면 DB 전체로 다시 생성)
+
+사용 예시:
+    ann = HnswIndex(db_pool, "design_doc", vector_column="embedding_vector")
+    ann.load()                       # 디스크에서 열기 (없으면 DB로 생성) + 밀린 변경 반영
+    await ann.start()                # LISTEN 리스너 + 주기 저장 시작
+    hits = await ann.search(vector, k=10)        # [(id, distance), ...]
+
+실행 예시 (변경 로그/트리거 설치, 인덱스 재생성):
+python ann_index.py --install --table design_doc --column embedding_vector
+python ann_index.py --rebuild --table design_doc --column embedding_vector
+
+환경변수 (기본값):
+    ANN_INDEX_DIR              인덱스 저장 폴더 (3_DataBase/.cache/ann_index)
+    ANN_SPACE                  cosine, l2, ip (cosine)
+    HNSW_M / HNSW_EF_CONSTRUCTION   생성 파라미터 (16 / 64, vector_index.py와 공유)
+    ANN_EF_SEARCH              검색시 후보 목록 크기 (64)
+    ANN_SAVE_INTERVAL          변경이 있을 때 디스크 저장 주기, 초 (60)
+    ANN_CHANGE_LOG_RETENTION   prune_change_log 보관 기간, 일 (7)
+
+hnswlib는 인덱스를 만들거나 열 때 불러옵니다 (SEARCH_ENGINE=hnsw가 아니면 설치하지 않아도 됨).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import select
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import psycopg2
+
+from vector_index import index_settings_from_env
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "ann_index"
+)
+
+# hnswlib 공간 → 같은 값을 내는 pgvector 거리 함수 이름
+SPACE_DISTANCES = {"cosine": "cosine", "l2": "l2", "ip": "inner_product"}
+
+
+def change_log_table(table):
+    return f"{table}_ann_changes"
+
+
+def change_channel(table):
+    return f"{table}_ann"
+
+
+def install_change_log(conn, table, id_column="id", vector_column="embedding", replace=False):
+    """
+    변경 로그 테이블과 문장 단위 트리거 설치 (여러 번 실행해도 안전)
+
+    UPDATE는 벡터가 실제로 바뀐 행만 기록 (제목/본문만 바뀐 경우 인덱스 갱신 불필요)
+
+    Args:
+        replace: False이면 트리거 3개가 이미 있을 때 아무것도 하지 않음 (서버 시작시 사용)
+
+    Returns:
+        bool: 새로 설치했으면 True
+    """
+    log_table = change_log_table(table)
+    function = f"{table}_ann_change_notify"
+    with conn.cursor() as cur:
+        if not replace:
+            cur.execute("""
+                SELECT COUNT(*) FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid
+                WHERE c.relname = %s AND t.tgname = ANY(%s);
+            """, (table, [f"{table}_ann_{event}" for event in ("insert", "update", "delete")]))
+            if cur.fetchone()[0] == 3:
+                conn.commit()
+                return False
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {log_table} (
+                seq BIGSERIAL PRIMARY KEY,
+                op TEXT NOT NULL,
+                row_id BIGINT NOT NULL,
+                changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            );
+        """)
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {log_table}_changed_at_idx ON {log_table} (changed_at);")
+        cur.execute(f"""
+            CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO {log_table} (op, row_id) SELECT 'INSERT', {id_column} FROM new_rows;
+                ELSIF TG_OP = 'UPDATE' THEN
+                    INSERT INTO {log_table} (op, row_id)
+                    SELECT 'UPDATE', n.{id_column}
+                    FROM new_rows n JOIN old_rows o ON o.{id_column} = n.{id_column}
+                    WHERE n.{vector_column} IS DISTINCT FROM o.{vector_column};
+                ELSE
+                    INSERT INTO {log_table} (op, row_id) SELECT 'DELETE', {id_column} FROM old_rows;
+                END IF;
+                IF FOUND THEN
+                    PERFORM pg_notify('{change_channel(table)}', TG_OP);
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+        """)
+        triggers = {
+            "insert": "AFTER INSERT ON {t} REFERENCING NEW TABLE AS new_rows",
+            "update": "AFTER UPDATE ON {t} REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows",
+            "delete": "AFTER DELETE ON {t} REFERENCING OLD TABLE AS old_rows",
+        }
+        for event, clause in triggers.items():
+            trigger = f"{table}_ann_{event}"
+            cur.execute(f"DROP TRIGGER IF EXISTS {trigger} ON {table};")
+            cur.execute(f"CREATE TRIGGER {trigger} {clause.format(t=table)} "
+                        f"FOR EACH STATEMENT EXECUTE FUNCTION {function}();")
+    conn.commit()
+    logger.info(f"[{table}] ANN 변경 로그 / 트리거 설치 완료 - 채널: {change_channel(table)}")
+    return True
+
+
+def prune_change_log(conn, table, retention_days=None):
+    """보관 기간이 지난 변경 로그 삭제 (이보다 오래 꺼져 있던 복제본은 DB 전체로 다시 생성)"""
+    retention_days = retention_days or int(os.getenv("ANN_CHANGE_LOG_RETENTION", 7))
+    with conn.cursor() as cur:
+        cur.execute(f"DELETE FROM {change_log_table(table)} WHERE changed_at < now() - %s * interval '1 day';",
+                    (retention_days,))
+        deleted = cur.rowcount
+    conn.commit()
+    return deleted
+
+
+class _ResizeGate:
+    """
+    검색(여러 스레드 동시) ↔ 인덱스 크기 조정(단독) 배타 제어
+
+    hnswlib는 knn_query와 add_items / mark_deleted를 동시에 호출해도 안전하지만
+    resize_index 도중의 검색은 안전하지 않음 → 크기 조정만 모든 검색이 끝나길 기다렸다가 실행
+    (크기 조정을 기다리는 동안 새 검색은 대기 → 크기 조정이 굶지 않음)
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._searching = 0
+        self._resizing = False
+
+    @contextmanager
+    def searching(self):
+        with self._cond:
+            while self._resizing:
+                self._cond.wait()
+            self._searching += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._searching -= 1
+                if not self._searching:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def resizing(self):
+        with self._cond:
+            while self._resizing:
+                self._cond.wait()
+            self._resizing = True
+            while self._searching:
+                self._cond.wait()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._resizing = False
+                self._cond.notify_all()
+
+
+class HnswIndex:
+    """
+    hnswlib 인덱스 + 변경 로그 추적 (LISTEN/NOTIFY)
+
+    Args:
+        db_pool: PooledDB (부트스트랩 / 변경 반영용, 리스너는 db_pool.db_config로 별도 연결)
+        table / id_column / vector_column: 대상 테이블과 컬럼
+        space: cosine, l2, ip
+        dim: 벡터 차원
+        m / ef_construction: HNSW 생성 파라미터 (None이면 HNSW_M / HNSW_EF_CONSTRUCTION)
+        ef_search: 검색시 후보 목록 크기 (k보다 작으면 hnswlib가 k로 올려서 검색)
+        index_dir: 인덱스 저장 폴더
+        save_interval: 변경이 있을 때 디스크 저장 주기 (초)
+        gap_timeout: seq 공백을 기다리는 최대 시간 (초) - 이후에는 롤백된 것으로 보고 건너뜀
+        on_change: 변경을 인덱스에 반영한 직후 호출할 함수 (예: 검색 결과 캐시 세대 증가)
+    """
+
+    mode = "hnsw_memory"
+    exact = False
+
+    def __init__(self, db_pool, table, id_column="id", vector_column="embedding", space=None, dim=384,
+                 m=None, ef_construction=None, ef_search=None, index_dir=None, save_interval=None,
+                 gap_timeout=60.0, fetch_size=5000, on_change=None):
+        settings = index_settings_from_env()
+        self.db_pool = db_pool
+        self.table = table
+        self.id_column = id_column
+        self.vector_column = vector_column
+        self.space = space or os.getenv("ANN_SPACE", "cosine")
+        if self.space not in SPACE_DISTANCES:
+            raise ValueError(f"지원하지 않는 공간입니다: {self.space} (지원: {', '.join(SPACE_DISTANCES)})")
+        self.dim = dim
+        self.m = m or settings["m"]
+        self.ef_construction = ef_construction or settings["ef_construction"]
+        self.ef_search = ef_search or int(os.getenv("ANN_EF_SEARCH", 64))
+        self.index_dir = index_dir or os.getenv("ANN_INDEX_DIR", DEFAULT_INDEX_DIR)
+        self.save_interval = save_interval if save_interval is not None else float(os.getenv("ANN_SAVE_INTERVAL", 60))
+        self.gap_timeout = gap_timeout
+        self.fetch_size = fetch_size
+        self.on_change = on_change
+        self.name = f"hnsw-{table}"
+        self.distance_functions = (SPACE_DISTANCES[self.space],)
+
+        self._index = None
+        self._labels = set()           # 삭제되지 않은 id
+        self._lock = threading.Lock()  # 인덱스 변경 / 크기 조정 / 저장 보호 (검색은 잠그지 않음)
+        self._resize_gate = _ResizeGate()  # 크기 조정 중에만 검색 대기
+        self._sync_lock = threading.Lock()
+        self._last_seq = 0             # 이 seq까지는 모두 반영(또는 공백으로 건너뜀)
+        self._applied_above = set()    # last_seq 이후에 이미 반영한 seq (공백 뒤쪽)
+        self._gaps = {}                # 공백 seq → 처음 발견한 시각
+        self._dirty = 0
+        self._last_saved = time.monotonic()
+        self._stop = threading.Event()
+        self._listener = None
+
+        # 메트릭
+        self._changes_applied = 0
+        self._gaps_skipped = 0
+        self._syncs = 0
+        self._notifications = 0
+        self._last_sync_ms = 0.0
+        self._queries = 0
+
+    # ---------- 파일 ----------
+
+    @property
+    def _base_path(self):
+        return os.path.join(self.index_dir, f"{self.table}.{self.vector_column}.{self.space}")
+
+    def save(self):
+        """인덱스 + 살아있는 id + 메타(last_seq)를 디스크에 저장 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        with self._lock:
+            self._index.save_index(self._base_path + ".bin.tmp")
+            with open(self._base_path + ".labels.npy.tmp", "wb") as f:
+                np.save(f, np.fromiter(self._labels, dtype=np.int64, count=len(self._labels)))
+            meta = {
+                "table": self.table,
+                "column": self.vector_column,
+                "space": self.space,
+                "dim": self.dim,
+                "m": self.m,
+                "ef_construction": self.ef_construction,
+                "last_seq": self._last_seq,
+                "count": len(self._labels),
+                "saved_at": time.time(),
+            }
+            dirty = self._dirty
+        os.replace(self._base_path + ".bin.tmp", self._base_path + ".bin")
+        os.replace(self._base_path + ".labels.npy.tmp", self._base_path + ".labels.npy")
+        # 메타는 마지막에 교체 - 중간에 중단되어도 last_seq가 인덱스보다 앞서지 않음
+        with open(self._base_path + ".meta.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(self._base_path + ".meta.json.tmp", self._base_path + ".meta.json")
+        with self._lock:
+            self._dirty -= dirty
+        self._last_saved = time.monotonic()
+        logger.info(f"[{self.name}] 인덱스 저장 - {meta['count']}개, last_seq={meta['last_seq']}")
+
+    def _open_saved(self):
+        """저장된 인덱스 열기 (없거나 설정이 다르면 False)"""
+        meta_path = self._base_path + ".meta.json"
+        if not os.path.exists(meta_path):
+            return False
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if (meta["dim"], meta["m"], meta["ef_construction"]) != (self.dim, self.m, self.ef_construction):
+            logger.info(f"[{self.name}] 저장된 인덱스 설정이 달라 다시 생성합니다: {meta}")
+            return False
+        import hnswlib
+
+        index = hnswlib.Index(space=self.space, dim=self.dim)
+        index.load_index(self._base_path + ".bin", max_elements=max(1, meta["count"]))
+        index.set_ef(self.ef_search)
+        self._index = index
+        self._labels = set(np.load(self._base_path + ".labels.npy").tolist())
+        self._last_seq = meta["last_seq"]
+        return True
+
+    # ---------- 부트스트랩 ----------
+
+    def _new_index(self, capacity):
+        import hnswlib
+
+        index = hnswlib.Index(space=self.space, dim=self.dim)
+        index.init_index(max_elements=max(1, capacity), M=self.m, ef_construction=self.ef_construction)
+        index.set_ef(self.ef_search)
+        return index
+
+    def _ensure_capacity(self, extra):
+        """추가할 개수만큼 여유가 없으면 1.5배씩 크기 조정 (self._lock 안에서 호출)"""
+        needed = self._index.get_current_count() + extra
+        capacity = self._index.get_max_elements()
+        if needed > capacity:
+            with self._resize_gate.resizing():
+                self._index.resize_index(max(needed, int(capacity * 1.5)))
+
+    def rebuild(self):
+        """DB 전체로 인덱스를 새로 생성 후 저장"""
+        started = time.perf_counter()
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                # 로그 위치를 먼저 읽음 - 스캔 도중 커밋된 변경은 이후 동기화에서 다시 반영(멱등)
+                cur.execute(f"SELECT COALESCE(MAX(seq), 0) FROM {change_log_table(self.table)};")
+                start_seq = cur.fetchone()[0]
+                cur.execute(f"SELECT COUNT(*) FROM {self.table} WHERE {self.vector_column} IS NOT NULL;")
+                row_count = cur.fetchone()[0]
+            conn.commit()
+
+            index = self._new_index(row_count)
+            labels = set()
+            # 서버 측 커서로 fetch_size씩 읽어 배치 단위로 추가 (add_items는 내부적으로 멀티스레드)
+            with conn.cursor(name=f"{self.name}_bootstrap") as cur:
+                cur.itersize = self.fetch_size
+                cur.execute(f"SELECT {self.id_column}, {self.vector_column}::real[] FROM {self.table} "
+                            f"WHERE {self.vector_column} IS NOT NULL;")
+                while True:
+                    rows = cur.fetchmany(self.fetch_size)
+                    if not rows:
+                        break
+                    ids = np.asarray([row[0] for row in rows], dtype=np.int64)
+                    if index.get_current_count() + len(ids) > index.get_max_elements():
+                        index.resize_index(int((index.get_current_count() + len(ids)) * 1.5))
+                    index.add_items(np.asarray([row[1] for row in rows], dtype=np.float32), ids)
+                    labels.update(ids.tolist())
+            conn.commit()
+
+        with self._lock:
+            self._index = index
+            self._labels = labels
+            # 스캔 시작 시점에 진행 중이던 트랜잭션(더 작은 seq)도 다시 보도록 약간 앞에서부터 따라잡음
+            self._last_seq = max(0, start_seq - 1000)
+            self._applied_above.clear()
+            self._gaps.clear()
+            self._dirty = 1
+        logger.info(f"[{self.name}] HNSW 인덱스 생성 - {len(labels)}개, M={self.m}, "
+                    f"ef_construction={self.ef_construction}, {time.perf_counter() - started:.2f}초")
+        self.sync()
+        self.save()
+
+    def _log_is_behind(self):
+        """저장된 last_seq 이후 로그가 이미 정리되었는지 확인 (정리되었으면 따라잡을 수 없음)"""
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT MIN(seq) FROM {change_log_table(self.table)};")
+                min_seq = cur.fetchone()[0]
+            conn.commit()
+        return min_seq is not None and min_seq > self._last_seq + 1
+
+    def load(self):
+        """디스크의 인덱스를 열고 밀린 변경만 반영 (없거나 따라잡을 수 없으면 DB 전체로 생성)"""
+        if self._open_saved() and not self._log_is_behind():
+            applied = self.sync()
+            logger.info(f"[{self.name}] 저장된 인덱스 사용 - {len(self._labels)}개, 밀린 변경 {applied}건 반영")
+        else:
+            self.rebuild()
+
+    # ---------- 변경 로그 동기화 ----------
+
+    def _apply(self, changes):
+        """변경 로그 한 묶음 반영 - id별 마지막 작업 기준으로 최신 벡터를 다시 읽어 추가/갱신/삭제"""
+        final_ops = {}
+        for _, op, row_id in changes:
+            final_ops[row_id] = op
+        upsert_ids = [row_id for row_id, op in final_ops.items() if op != "DELETE"]
+        vectors = {}
+        if upsert_ids:
+            with self.db_pool.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT {self.id_column}, {self.vector_column}::real[] FROM {self.table} "
+                                f"WHERE {self.id_column} = ANY(%s) AND {self.vector_column} IS NOT NULL;",
+                                (upsert_ids,))
+                    vectors = dict(cur.fetchall())
+                conn.commit()
+        # 다시 읽었을 때 없는 행(그 사이 삭제 / 벡터 NULL)은 삭제로 처리
+        delete_ids = [row_id for row_id in final_ops if row_id not in vectors]
+
+        with self._lock:
+            if vectors:
+                ids = np.asarray(list(vectors), dtype=np.int64)
+                self._ensure_capacity(len(ids))
+                # 이미 있는 id는 벡터 갱신, 삭제 표시된 id는 표시 해제 후 갱신
+                self._index.add_items(np.asarray(list(vectors.values()), dtype=np.float32), ids)
+                self._labels.update(ids.tolist())
+            for row_id in delete_ids:
+                if row_id in self._labels:
+                    self._index.mark_deleted(row_id)
+                    self._labels.discard(row_id)
+
+    def _advance(self):
+        """반영한 seq가 연속되는 만큼 last_seq 전진 (공백은 gap_timeout이 지나면 건너뜀)"""
+        now = time.monotonic()
+        highest = max(self._applied_above, default=self._last_seq)
+        while self._last_seq < highest:
+            expected = self._last_seq + 1
+            if expected in self._applied_above:
+                self._applied_above.discard(expected)
+            else:
+                first_seen = self._gaps.setdefault(expected, now)
+                if now - first_seen < self.gap_timeout:
+                    break
+                # 롤백된 트랜잭션의 seq로 보고 건너뜀
+                self._gaps.pop(expected)
+                self._gaps_skipped += 1
+            self._last_seq = expected
+
+    def sync(self):
+        """
+        seq > last_seq 인 변경 로그를 모두 반영 (블로킹 함수)
+
+        Returns:
+            int: 새로 반영한 로그 수
+        """
+        with self._sync_lock:
+            started = time.perf_counter()
+            applied = 0
+            after = self._last_seq
+            while True:
+                with self.db_pool.connection() as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(f"SELECT seq, op, row_id FROM {change_log_table(self.table)} "
+                                    f"WHERE seq > %s ORDER BY seq LIMIT %s;", (after, self.fetch_size))
+                        rows = cur.fetchall()
+                    conn.commit()
+                if not rows:
+                    break
+                after = rows[-1][0]
+                changes = [row for row in rows if row[0] not in self._applied_above]
+                if changes:
+                    self._apply(changes)
+                    self._applied_above.update(row[0] for row in changes)
+                    applied += len(changes)
+                if len(rows) < self.fetch_size:
+                    break
+            with self._lock:
+                self._advance()
+                self._dirty += applied
+            self._syncs += 1
+            self._changes_applied += applied
+            self._last_sync_ms = (time.perf_counter() - started) * 1000
+            if applied:
+                logger.info(f"[{self.name}] 변경 {applied}건 반영 (last_seq={self._last_seq})")
+        if applied and self.on_change:
+            # 인덱스에 반영된 뒤에 알림 → 알림 이후의 검색은 새 행을 봄
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error(f"[{self.name}] 변경 알림 처리 실패: {e}")
+        return applied
+
+    def _listen_loop(self):
+        """LISTEN 전용 연결로 알림을 기다리다가 알림이 오면 sync (연결이 끊기면 재연결 후 따라잡기)"""
+        channel = change_channel(self.table)
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.db_pool.db_config)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {channel};")
+                self.sync()  # 연결이 끊겨 있던 동안의 변경 따라잡기
+                while not self._stop.is_set():
+                    # 알림이 없어도 1초마다 깨어나 공백 만료 확인 / 주기 저장
+                    if select.select([conn], [], [], 1.0) != ([], [], []):
+                        conn.poll()
+                        if conn.notifies:
+                            self._notifications += len(conn.notifies)
+                            conn.notifies.clear()
+                            self.sync()
+                    elif self._gaps:
+                        self.sync()
+                    if self._dirty and time.monotonic() - self._last_saved >= self.save_interval:
+                        self.save()
+            except Exception as e:
+                logger.warning(f"[{self.name}] LISTEN 연결 오류 (5초 후 재연결): {e}")
+                self._stop.wait(5)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    async def start(self):
+        """리스너 스레드 시작 (이벤트 루프 안에서 호출해도 블로킹하지 않음)"""
+        if self._listener is None:
+            self._stop.clear()
+            self._listener = threading.Thread(target=self._listen_loop, name=f"{self.name}-listen", daemon=True)
+            self._listener.start()
+
+    async def stop(self):
+        """리스너 종료 후 변경이 남아 있으면 저장"""
+        if self._listener is not None:
+            self._stop.set()
+            await asyncio.get_running_loop().run_in_executor(None, self._listener.join)
+            self._listener = None
+        if self._dirty:
+            await asyncio.get_running_loop().run_in_executor(None, self.save)
+
+    # ---------- 검색 ----------
+
+    def search_many(self, queries, k, distance_function=None, max_distance=None):
+        """
+        쿼리 여러 개를 한 번에 검색 (블로킹 함수)
+
+        Returns:
+            list: 쿼리별 [(id, distance), ...] - distance는 pgvector 연산자와 같은 값
+        """
+        if distance_function not in (None,) + self.distance_functions:
+            raise ValueError(f"이 인덱스는 {self.distance_functions[0]} 거리만 지원합니다 (요청: {distance_function})")
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        index = self._index  # rebuild가 인덱스를 교체해도 이 검색은 같은 인덱스를 사용
+        k = min(k, len(self._labels))
+        if k < 1:
+            return [[] for _ in range(len(queries))]
+        # 변경 반영(add_items / mark_deleted)과 동시에 검색 - 크기 조정 중에만 대기
+        # ef는 set_ef로 한 번만 설정 (k가 더 크면 hnswlib가 max(ef, k)로 검색)
+        with self._resize_gate.searching():
+            labels, distances = index.knn_query(queries, k=k)
+        self._queries += len(queries)
+
+        # hnswlib 거리 → pgvector 거리 (l2: 제곱 거리 → 거리, ip: 1 - 내적 → -내적)
+        if self.space == "l2":
+            distances = np.sqrt(np.maximum(distances, 0.0))
+        elif self.space == "ip":
+            distances = distances - 1.0
+        results = []
+        for row_labels, row_distances in zip(labels, distances):
+            hits = [(int(label), float(distance)) for label, distance in zip(row_labels, row_distances)]
+            if max_distance is not None:
+                hits = [hit for hit in hits if hit[1] <= max_distance]
+            results.append(hits)
+        return results
+
+    async def search(self, vector, k=10, distance_function=None, max_distance=None):
+        """쿼리 하나 검색 → [(id, distance), ...] (잠금 대기가 이벤트 루프를 막지 않도록 스레드 풀에서 실행)"""
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(None, self.search_many, [vector], k, distance_function, max_distance)
+        return results[0]
+
+    @property
+    def row_count(self):
+        return len(self._labels)
+
+    def get_metrics(self):
+        """인덱스 크기, 동기화 위치 / 지연, 알림 / 반영 / 공백 건너뜀 횟수"""
+        return {
+            "engine": "hnsw",
+            "table": self.table,
+            "space": self.space,
+            "rows": len(self._labels),
+            "capacity": self._index.get_max_elements() if self._index else 0,
+            "m": self.m,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "last_seq": self._last_seq,
+            "pending_gaps": len(self._gaps),
+            "gaps_skipped": self._gaps_skipped,
+            "notifications": self._notifications,
+            "syncs": self._syncs,
+            "changes_applied": self._changes_applied,
+            "last_sync_ms": round(self._last_sync_ms, 3),
+            "unsaved_changes": self._dirty,
+            "queries": self._queries,
+            "listening": self._listener is not None and self._listener.is_alive(),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from dotenv import load_dotenv
+
+    from db_pool import PooledDB
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="인프로세스 HNSW 인덱스 관리 (변경 로그 설치 / 재생성 / 로그 정리)")
+    parser.add_argument("--table", default="design_doc")
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--column", default="embedding_vector")
+    parser.add_argument("--space", choices=list(SPACE_DISTANCES), default=None)
+    parser.add_argument("--install", action="store_true", help="변경 로그 테이블 + 트리거 설치")
+    parser.add_argument("--rebuild", action="store_true", help="DB 전체로 인덱스를 다시 생성해 저장")
+    parser.add_argument("--prune", action="store_true", help="보관 기간이 지난 변경 로그 삭제")
+    args = parser.parse_args()
+
+    pool = PooledDB({
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": int(os.getenv("DB_PORT", 5432)),
+        "dbname": os.getenv("DB_NAME", "postgres"),
+        "user": os.getenv("DB_USER", "postgres"),
+        "password": os.getenv("DB_PASSWORD"),
+    }, name="ann")
+    pool.open()
+    try:
+        if args.install:
+            with pool.connection() as connection:
+                install_change_log(connection, args.table, args.id_column, args.column)
+        if args.prune:
+            with pool.connection() as connection:
+                print(f"변경 로그 {prune_change_log(connection, args.table)}건 삭제")
+        if args.rebuild:
+            ann = HnswIndex(pool, args.table, id_column=args.id_column, vector_column=args.column, space=args.space)
+            ann.rebuild()
+            print(ann.get_metrics())
+    finally:
+        pool.close()
@@ -5,14 +5,28 @@ FastAPI 기반 설계안 등록 및 유사도 검색 API 서버 (코사인 인
 uvicorn api_index_cosine:app --reload
 """
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import time
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-import psycopg2
-from sentence_transformers import SentenceTransformer
 import os
 from dotenv import load_dotenv
 import logging
+from micro_batcher import MicroBatcher, QueueFullError
+from embedding_cache import EmbeddingCache
+from inference_executor import InferenceExecutor, InferenceUnavailableError
+from onnx_embedding import cache_model_name
+from db_pool import PooledDB, PoolTimeoutError
+from async_db import AsyncVectorDB, to_vector
+from vector_search import RecallTracker, build_search_sql, build_similar_by_id_sql, search_settings, DISTANCE_OPERATORS
+from exact_search import ExactSearchEngine
+from ann_index import HnswIndex, install_change_log
+from search_cache import SearchCache
+from registration_queue import RegistrationQueue
+from bulk_register import BulkInputError, read_designs_request, validate_items, embed_rows, insert_grouped, build_results, QUEUE_LIMIT as BULK_QUEUE_LIMIT
 
 # 환경변수 로드
 load_dotenv()
@@ -46,8 +60,47 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD")
 }
 
-# AI 모델 전역 변수
+# 검색/등록 쿼리 드라이버 (asyncpg: 이벤트 루프에서 직접 await, psycopg2: 스레드 풀에서 실행)
+DB_DRIVER = os.getenv("DB_DRIVER", "asyncpg")
+
+# 검색 엔진 (pgvector: DB에서 검색, memory: mmap 스냅샷 + 행렬곱 정확 검색,
+#            hnsw: LISTEN/NOTIFY로 동기화하는 인프로세스 HNSW - memory / hnsw는 id로 본문만 DB 조회)
+SEARCH_ENGINE = os.getenv("SEARCH_ENGINE", "pgvector")
+
+# 임베딩 마이크로 배칭 설정 (동시 요청을 모아 encode 한 번으로 처리)
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", 32))        # 배치당 최대 요청 수
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", 5))  # 요청 수집 대기 시간 (ms)
+
+# 추론 실행기 설정 (encode를 이벤트 루프 밖의 스레드/프로세스 풀에서 실행)
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "thread")                # thread 또는 process
+INFERENCE_MAX_WORKERS = int(os.getenv("INFERENCE_MAX_WORKERS", 2))    # 동시 encode 작업 수
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", 256))      # 대기 요청 상한 (초과시 429)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")            # torch, onnx, onnx-int8
+
+# 원시 벡터 검색 설정 (/search/vector, /search/vector/accurate)
+EMBEDDING_DIMENSION = 384                                                   # 임베딩 벡터 차원
+MAX_SEARCH_LIMIT = int(os.getenv("MAX_SEARCH_LIMIT", 1000))                # 요청당 최대 결과 수
+ACCURATE_IVFFLAT_PROBES = int(os.getenv("ACCURATE_IVFFLAT_PROBES", 10))    # 정확도 우선 모드 ivfflat.probes
+ACCURATE_HNSW_EF_SEARCH = int(os.getenv("ACCURATE_HNSW_EF_SEARCH", 200))   # 정확도 우선 모드 hnsw.ef_search
+RECALL_SAMPLE_RATE = float(os.getenv("RECALL_SAMPLE_RATE", 0.05))          # 정확 검색과 비교할 요청 비율
+
+# 임베딩 모델 이름 (캐시 키에도 사용)
+MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+
+# AI 모델 전역 변수 (embedding_model은 encode()를 제공하는 추론 실행기)
 embedding_model = None
+embedding_batcher = None
+embedding_cache = None
+
+# 데이터베이스 커넥션 풀 (startup에서 생성, 모든 엔드포인트가 공유)
+db_pool = None
+async_db = None   # DB_DRIVER=asyncpg일 때 검색/등록에 사용하는 비동기 풀
+search_engine = None   # SEARCH_ENGINE=memory / hnsw일 때 사용하는 인메모리 검색 엔진
+search_cache = None    # 검색어 → 임베딩, 검색 조건 → 결과 캐시 (SEARCH_CACHE=off이면 None)
+register_queue = None  # 비동기 등록(mode=async) 작업 큐와 배치 워커
+
+# 설정(거리 함수, probes, ef_search)별 재현율 추정 및 지연시간 통계
+recall_tracker = RecallTracker(sample_rate=RECALL_SAMPLE_RATE)
 
 # ========== 요청/응답 모델 ==========
 # Pydantic BaseModel을 상속받아 API 요청과 응답의 데이터 구조를 정의
@@ -65,6 +118,20 @@ class DesignResponse(BaseModel):
     design_id: int = None           # 등록된 설계안의 데이터베이스 ID
     embedding_dimension: int = None  # 생성된 임베딩 벡터의 차원 수 (384차원)
 
+class BulkRowResult(BaseModel):
+    """일괄 등록 행별 결과"""
+    index: int                       # 입력 행 번호 (0부터)
+    design_id: int = None            # 저장된 설계안 ID (성공시)
+    error: str = None                # 오류 메시지 (실패시)
+
+class BulkRegisterResponse(BaseModel):
+    """일괄 등록 응답 데이터 모델"""
+    success: bool                    # 한 건 이상 저장되었는지 여부
+    total: int                       # 입력 행 수
+    inserted: int                    # 저장된 행 수
+    failed: int                      # 실패한 행 수
+    results: list[BulkRowResult]     # 행별 결과 (입력 순서)
+
 class VectorSearchRequest(BaseModel):
     """벡터 유사도 검색 요청 데이터 모델"""
     query_text: str                     # 검색할 텍스트 (AI가 벡터로 변환)
@@ -78,6 +145,15 @@ class VectorSearchResponse(BaseModel):
     results: list = []     # 검색 결과 리스트 (각 항목: id, title, description, cosine_distance, similarity_score)
     total_found: int = 0   # 찾은 결과의 총 개수
 
+class RawVectorSearchRequest(BaseModel):
+    """원시 벡터 검색 요청 데이터 모델 (streamlit_index.py에서 사용)"""
+    query_vector: list                  # 검색할 384차원 벡터
+    limit: int = 10                     # 반환할 검색 결과 개수
+    distance_function: str = "l2"       # 거리 함수 (l2, cosine, inner_product)
+    probes: int = None                  # ivfflat.probes (None이면 모드 기본값)
+    ef_search: int = None               # hnsw.ef_search (None이면 모드 기본값)
+    measure_recall: bool = False        # True이면 정확 검색과 비교해 이번 요청의 재현율 측정
+
 # ========== 서버 시작 이벤트 ==========
 # FastAPI 서버가 시작될 때 자동으로 실행되는 이벤트 핸들러
 # AI 모델 로딩과 데이터베이스 연결 테스트를 수행
@@ -85,42 +161,150 @@ class VectorSearchResponse(BaseModel):
 @app.on_event("startup")
 async def startup_event():
     """서버 시작시 초기화 작업 수행"""
-    global embedding_model
+    global embedding_model, embedding_batcher, embedding_cache, db_pool, async_db, search_engine, search_cache, register_queue
     try:
-        # 1. AI 임베딩 모델 로딩 (한국어 지원 다국어 모델)
+        # 1. AI 임베딩 모델 로딩 (한국어 지원 다국어 모델) 및 영구 임베딩 캐시 열기
         logger.info("AI 임베딩 모델 로딩 중...")
-        embedding_model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+        embedding_model = InferenceExecutor(
+            MODEL_NAME, mode=INFERENCE_MODE, max_workers=INFERENCE_MAX_WORKERS, backend=EMBEDDING_BACKEND
+        )
+        embedding_model.start()
+        embedding_cache = EmbeddingCache(cache_model_name(MODEL_NAME, EMBEDDING_BACKEND))
         logger.info("AI 임베딩 모델 로딩 완료!")
         
-        # 2. 데이터베이스 연결 테스트 (연결 가능 여부 확인)
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.close()
-        logger.info("데이터베이스 연결 성공!")
+        # 2. 임베딩 마이크로 배처 시작
+        embedding_batcher = MicroBatcher(
+            create_embeddings,
+            max_batch_size=EMBED_BATCH_MAX_SIZE,
+            max_wait_ms=EMBED_BATCH_MAX_WAIT_MS,
+            name="embedding",
+            max_queue_size=INFERENCE_MAX_QUEUE,
+            max_concurrent_batches=INFERENCE_MAX_WORKERS
+        )
+        await embedding_batcher.start()
+        
+        # 3. 데이터베이스 커넥션 풀 생성 (최소 연결 수만큼 미리 연결 → 연결 가능 여부도 확인)
+        db_pool = PooledDB.from_env(DB_CONFIG, name="design_doc")
+        db_pool.open()
+        if DB_DRIVER == "asyncpg":
+            async_db = AsyncVectorDB.from_env(DB_CONFIG, name="design_doc")
+            await async_db.open()
+        logger.info(f"데이터베이스 연결 성공! (검색/등록 드라이버: {DB_DRIVER})")
+        
+        # 4. 인메모리 검색 엔진 (스냅샷/인덱스 열기와 따라잡기는 블로킹 작업이므로 스레드 풀에서 실행)
+        if SEARCH_ENGINE == "memory":
+            search_engine = ExactSearchEngine(db_pool, "design_doc", vector_column="embedding_vector",
+                                              on_change=bump_search_generation)
+        elif SEARCH_ENGINE == "hnsw":
+            search_engine = HnswIndex(db_pool, "design_doc", vector_column="embedding_vector", dim=EMBEDDING_DIMENSION,
+                                      on_change=bump_search_generation)
+            await run_in_threadpool(install_ann_change_log)
+        if search_engine:
+            await run_in_threadpool(search_engine.load)
+            await search_engine.start()
+        logger.info(f"검색 엔진: {SEARCH_ENGINE}")
+        
+        # 5. 검색 결과 캐시 (새 설계안이 검색에 반영될 때 쓰기 세대 증가로 무효화)
+        search_cache = SearchCache.from_env(f"design_doc:{cache_model_name(MODEL_NAME, EMBEDDING_BACKEND)}")
+        if search_cache:
+            logger.info(f"검색 결과 캐시: {search_cache.backend}")
+        
+        # 6. 비동기 등록 큐 워커 (배치당 encode 한 번 + COPY 한 번, 저장 후 검색 캐시 무효화)
+        register_queue = RegistrationQueue(
+            db_pool, create_embeddings, "design_doc",
+            after_store=lambda design_ids: bump_search_generation_after_commit()
+        )
+        await register_queue.start()
         
     except Exception as e:
         logger.error(f"서버 시작 실패: {e}")
         raise e
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료시 배처 워커와 커넥션 풀 정리"""
+    if register_queue:
+        await register_queue.stop()
+    if search_engine:
+        await search_engine.stop()
+    if embedding_batcher:
+        await embedding_batcher.stop()
+    if embedding_model:
+        embedding_model.shutdown()
+    if embedding_cache:
+        embedding_cache.log_stats()
+        embedding_cache.close()
+    if async_db:
+        await async_db.close()
+    if db_pool:
+        db_pool.close()
+
 # ========== 유틸리티 함수 ==========
 # 핵심 비즈니스 로직을 처리하는 헬퍼 함수들
 
-def create_embedding(text: str):
-    """텍스트를 384차원 임베딩 벡터로 변환
+def create_embeddings(texts: list):
+    """여러 텍스트를 한 번의 encode 호출로 변환 (마이크로 배처의 배치 함수)
+    
+    이미 임베딩한 적 있는 텍스트는 캐시에서 바로 가져오고, 나머지만 모델로 인코딩
     
     Args:
-        text (str): 변환할 텍스트 (설계안 설명 또는 검색 쿼리)
+        texts (list): 변환할 텍스트 리스트
     
     Returns:
-        list: 384차원 실수 리스트 (임베딩 벡터) 또는 None (실패시)
+        list: 입력 순서와 같은 384차원 벡터 리스트
+    """
+    embeddings = embedding_cache.encode(embedding_model, texts)
+    return embeddings.tolist()
+
+async def embed_text(text: str):
+    """마이크로 배처를 통해 텍스트 하나를 임베딩 (동시 요청은 자동으로 묶어서 처리)
+    
+    대기 큐가 가득 차면 HTTP 429, 추론 실행기를 사용할 수 없으면 HTTP 503을 반환
+    
+    Returns:
+        list: 384차원 임베딩 벡터 또는 None (실패시)
     """
     try:
-        # SentenceTransformer 모델을 사용하여 텍스트를 벡터로 변환
-        embedding = embedding_model.encode(text)
-        return embedding.tolist()  # numpy 배열을 Python 리스트로 변환
+        return await embedding_batcher.submit(text)
+    except QueueFullError as e:
+        logger.warning(f"임베딩 요청 거절 (백프레셔): {e}")
+        raise HTTPException(status_code=429, detail="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                            headers={"Retry-After": "1"})
+    except InferenceUnavailableError as e:
+        logger.error(f"추론 실행기 사용 불가: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"임베딩 생성 실패: {e}")
         return None
 
+async def run_db(func, *args):
+    """DB 함수 실행 - 코루틴은 바로 await, 블로킹 함수는 스레드 풀에서 실행 (커넥션 대기 초과시 HTTP 503)"""
+    try:
+        if asyncio.iscoroutinefunction(func):
+            return await func(*args)
+        return await run_in_threadpool(func, *args)
+    except PoolTimeoutError as e:
+        logger.warning(f"DB 커넥션 대기 시간 초과: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+def bump_search_generation():
+    """검색 결과 캐시의 쓰기 세대 증가 (저장 후 호출 - 이전 검색 결과 전체 무효화)"""
+    if search_cache:
+        try:
+            search_cache.bump()
+        except Exception as e:
+            logger.error(f"검색 캐시 세대 증가 실패: {e}")
+
+def bump_search_generation_after_commit():
+    """설계안 저장 커밋 후 호출 - pgvector 검색일 때만 바로 세대 증가
+    
+    인메모리 엔진(memory / hnsw)은 커밋 직후에도 아직 새 행을 모르므로, 여기서 세대를 올리면
+    새 세대 키에 새 행이 빠진 결과가 TTL 동안 남습니다. 이 경우 엔진이 변경을 반영한 뒤
+    on_change로 세대를 올립니다.
+    """
+    if search_engine is None:
+        bump_search_generation()
+
 def insert_design_to_db(title: str, description: str, embedding: list):
     """설계안과 임베딩을 데이터베이스에 저장
     
@@ -132,39 +316,287 @@ def insert_design_to_db(title: str, description: str, embedding: list):
     Returns:
         int: 저장된 설계안의 ID 또는 None (실패시)
     """
-    conn = None
     try:
-        # PostgreSQL 연결 생성
-        conn = psycopg2.connect(**DB_CONFIG)
+        # 커넥션 풀에서 연결 체크아웃 (오류 발생시 풀이 롤백 후 회수)
+        with db_pool.connection() as conn:
+            cur = conn.cursor()
+            
+            # design_doc 테이블에 데이터 삽입
+            # content 컬럼에 description 저장, embedding_vector 컬럼에 벡터 저장
+            insert_sql = """
+            INSERT INTO design_doc (title, content, embedding_vector) 
+            VALUES (%s, %s, %s)
+            RETURNING id;
+            """
+            
+            cur.execute(insert_sql, (title, description, embedding))
+            design_id = cur.fetchone()[0]  # 생성된 ID 반환
+            
+            # 트랜잭션 커밋 (데이터 확정 저장)
+            conn.commit()
+            cur.close()
+        bump_search_generation_after_commit()
+        
+        logger.info(f"설계안 저장 성공 - ID: {design_id}")
+        return design_id
+        
+    except PoolTimeoutError:
+        raise  # 풀 대기 초과는 호출자에서 503으로 처리
+    except Exception as e:
+        logger.error(f"데이터베이스 저장 실패: {e}")
+        return None
+
+def insert_designs_to_db(rows: list):
+    """여러 설계안을 그룹 트랜잭션으로 저장 (행마다 SAVEPOINT - 잘못된 행만 롤백)
+    
+    Args:
+        rows (list): (행 번호, title, description, embedding) 튜플 리스트
+    
+    Returns:
+        dict: 행 번호 → ("id", 설계안 ID) 또는 ("error", 오류 메시지)
+    """
+    with db_pool.connection() as conn:
+        stored = insert_grouped(conn, "design_doc", ("title", "content", "embedding_vector"), rows, EMBEDDING_DIMENSION)
+    if any(kind == "id" for kind, _ in stored.values()):
+        bump_search_generation_after_commit()
+    return stored
+
+def search_designs_in_db(query_embedding: list, distance_threshold: float, limit: int):
+    """코사인 거리 기준으로 유사한 설계안 조회 (블로킹 함수 - 스레드 풀에서 호출)
+    
+    Args:
+        query_embedding (list): 검색할 384차원 벡터
+        distance_threshold (float): 코사인 거리 임계값
+        limit (int): 반환할 결과 개수
+    
+    Returns:
+        list: (id, title, content, cosine_distance) 튜플 리스트
+    """
+    with db_pool.connection() as conn:
         cur = conn.cursor()
         
-        # design_doc 테이블에 데이터 삽입
-        # content 컬럼에 description 저장, embedding_vector 컬럼에 벡터 저장
-        insert_sql = """
-        INSERT INTO design_doc (title, content, embedding_vector) 
-        VALUES (%s, %s, %s)
-        RETURNING id;
+        # pgvector 코사인 거리 검색 쿼리
+        # <=> : 코사인 거리 연산자 (0에 가까울수록 유사)
+        # WHERE 절: 거리 임계값으로 결과 필터링
+        # ORDER BY: 거리 기준 오름차순 정렬 (가장 유사한 것부터)
+        # LIMIT: 반환할 결과 개수 제한
+        search_sql = """
+        SELECT id, title, content, 
+               (embedding_vector <=> %s::vector) AS cosine_distance
+        FROM design_doc
+        WHERE (embedding_vector <=> %s::vector) <= %s
+        ORDER BY embedding_vector <=> %s::vector
+        LIMIT %s;
         """
         
-        cur.execute(insert_sql, (title, description, embedding))
-        design_id = cur.fetchone()[0]  # 생성된 ID 반환
+        cur.execute(search_sql, (
+            query_embedding,           # 검색할 벡터
+            query_embedding,           # WHERE 절용 벡터 (동일)
+            distance_threshold,        # 거리 임계값
+            query_embedding,           # ORDER BY 절용 벡터 (동일)
+            limit                      # 결과 개수 제한
+        ))
+        results = cur.fetchall()
         
-        # 트랜잭션 커밋 (데이터 확정 저장)
-        conn.commit()
         cur.close()
-        conn.close()
-        
+        return results
+
+async def insert_design_async(title: str, description: str, embedding: list):
+    """insert_design_to_db의 asyncpg 버전 (이벤트 루프에서 직접 await)"""
+    try:
+        design_id = await async_db.fetchval(
+            "INSERT INTO design_doc (title, content, embedding_vector) VALUES ($1, $2, $3) RETURNING id;",
+            title, description, to_vector(embedding)
+        )
+        await run_in_threadpool(bump_search_generation_after_commit)
         logger.info(f"설계안 저장 성공 - ID: {design_id}")
         return design_id
-        
+    except PoolTimeoutError:
+        raise  # 풀 대기 초과는 호출자에서 503으로 처리
     except Exception as e:
-        # 오류 발생시 롤백 처리
-        if conn:
-            conn.rollback()
-            conn.close()
         logger.error(f"데이터베이스 저장 실패: {e}")
         return None
 
+async def search_designs_async(query_embedding: list, distance_threshold: float, limit: int):
+    """search_designs_in_db의 asyncpg 버전 (같은 쿼리, $n 파라미터 사용)"""
+    return await async_db.fetch(
+        """
+        SELECT id, title, content, 
+               (embedding_vector <=> $1) AS cosine_distance
+        FROM design_doc
+        WHERE (embedding_vector <=> $1) <= $2
+        ORDER BY embedding_vector <=> $1
+        LIMIT $3;
+        """,
+        to_vector(query_embedding), distance_threshold, limit
+    )
+
+def fetch_database_stats():
+    """design_doc 레코드 수와 인덱스 목록 조회 (블로킹 함수 - 스레드 풀에서 호출)
+    
+    Returns:
+        tuple: (총 레코드 수, [(인덱스명, 인덱스 정의), ...])
+    """
+    with db_pool.connection() as conn:
+        cur = conn.cursor()
+        
+        # design_doc 테이블의 전체 레코드 개수 조회
+        cur.execute("SELECT COUNT(*) FROM design_doc;")
+        total_designs = cur.fetchone()[0]
+        
+        # design_doc 테이블에 생성된 모든 인덱스 정보 조회
+        # pg_indexes 시스템 테이블에서 인덱스명과 정의 가져오기
+        cur.execute("""
+        SELECT indexname, indexdef 
+        FROM pg_indexes 
+        WHERE tablename = 'design_doc';
+        """)
+        indexes = cur.fetchall()
+        
+        cur.close()
+    return total_designs, indexes
+
+def raw_vector_search_in_db(query_vector: list, limit: int, distance_function: str,
+                            probes: int = None, ef_search: int = None, exact: bool = False):
+    """원시 벡터로 최근접 이웃 검색 (블로킹 함수 - 스레드 풀에서 호출)
+    
+    Args:
+        query_vector (list): 검색할 384차원 벡터
+        limit (int): 반환할 결과 개수
+        distance_function (str): l2, cosine, inner_product
+        probes / ef_search (int): 이번 트랜잭션에만 적용할 인덱스 파라미터 (SET LOCAL)
+        exact (bool): True이면 인덱스를 사용하지 않는 정확 검색 (재현율 측정용)
+    
+    Returns:
+        list: (id, title, content, distance) 튜플 리스트
+    """
+    search_sql = build_search_sql(
+        "design_doc", "id", ["title", "content"], "embedding_vector", distance_function,
+        placeholder="%s::vector"
+    )
+    with db_pool.connection() as conn:
+        cur = conn.cursor()
+        # SET LOCAL과 같은 효과 - 트랜잭션이 끝나면 설정이 원래대로 돌아감
+        for name, value in search_settings(probes, ef_search, exact):
+            cur.execute("SELECT set_config(%s, %s, true);", (name, value))
+        cur.execute(search_sql, (query_vector, query_vector, limit))
+        results = cur.fetchall()
+        cur.close()
+        conn.commit()
+        return results
+
+async def raw_vector_search_async(query_vector: list, limit: int, distance_function: str,
+                                  probes: int = None, ef_search: int = None, exact: bool = False):
+    """raw_vector_search_in_db의 asyncpg 버전 (설정과 검색을 같은 트랜잭션에서 실행)"""
+    search_sql = build_search_sql(
+        "design_doc", "id", ["title", "content"], "embedding_vector", distance_function,
+        placeholder="$1", limit_placeholder="$2"
+    )
+    async with async_db.acquire() as conn:
+        async with conn.transaction():
+            for name, value in search_settings(probes, ef_search, exact):
+                await conn.execute("SELECT set_config($1, $2, true);", name, value)
+            return await conn.fetch(search_sql, to_vector(query_vector), limit)
+
+def similar_by_id_in_db(design_id: int, limit: int, distance_function: str,
+                        exclude_self: bool = True, max_distance: float = None):
+    """저장된 설계안의 벡터로 유사 설계안 검색 - 임베딩 재생성 / 벡터 전송 없이 SQL 한 번 (블로킹 함수)
+    
+    Returns:
+        tuple: ((id, title, content, distance) 튜플 리스트, 기준 설계안 존재 여부)
+    """
+    search_sql = build_similar_by_id_sql(
+        "design_doc", "id", ["title", "content"], "embedding_vector", distance_function,
+        exclude_self=exclude_self, with_max_distance=max_distance is not None
+    )
+    with db_pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute(search_sql, {"source_id": design_id, "max_distance": max_distance, "limit": limit})
+        results = cur.fetchall()
+        exists = True
+        if not results:
+            # 결과가 없을 때만 기준 행 존재 여부 확인 (404와 빈 결과 구분)
+            cur.execute("SELECT EXISTS (SELECT 1 FROM design_doc WHERE id = %s AND embedding_vector IS NOT NULL);", (design_id,))
+            exists = cur.fetchone()[0]
+        cur.close()
+        conn.commit()
+    return results, exists
+
+async def similar_by_id_async(design_id: int, limit: int, distance_function: str,
+                              exclude_self: bool = True, max_distance: float = None):
+    """similar_by_id_in_db의 asyncpg 버전"""
+    search_sql = build_similar_by_id_sql(
+        "design_doc", "id", ["title", "content"], "embedding_vector", distance_function,
+        exclude_self=exclude_self, with_max_distance=max_distance is not None,
+        id_placeholder="$1", limit_placeholder="$2", max_distance_placeholder="$3"
+    )
+    args = [design_id, limit] + ([max_distance] if max_distance is not None else [])
+    async with async_db.acquire() as conn:
+        results = await conn.fetch(search_sql, *args)
+        exists = True
+        if not results:
+            exists = await conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM design_doc WHERE id = $1 AND embedding_vector IS NOT NULL);", design_id
+            )
+    return [tuple(row) for row in results], exists
+
+def install_ann_change_log():
+    """HNSW 복제본용 변경 로그 테이블 / 트리거 설치 (이미 있으면 그대로 사용)"""
+    with db_pool.connection() as conn:
+        install_change_log(conn, "design_doc", "id", "embedding_vector")
+
+def fetch_designs_by_ids(ids: list):
+    """id 목록으로 설계안 제목/내용 조회 - 한 번의 왕복 (블로킹 함수 - 스레드 풀에서 호출)
+    
+    Returns:
+        dict: id → (id, title, content)
+    """
+    with db_pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT id, title, content FROM design_doc WHERE id = ANY(%s);", (list(ids),))
+        rows = cur.fetchall()
+        cur.close()
+    return {row[0]: row for row in rows}
+
+async def fetch_designs_by_ids_async(ids: list):
+    """fetch_designs_by_ids의 asyncpg 버전"""
+    rows = await async_db.fetch("SELECT id, title, content FROM design_doc WHERE id = ANY($1::int[]);", list(ids))
+    return {row[0]: tuple(row) for row in rows}
+
+async def memory_search(query_vector: list, limit: int, distance_function: str, max_distance: float = None):
+    """인메모리 엔진으로 id를 찾은 뒤 본문만 DB에서 조회 (SEARCH_ENGINE=memory / hnsw)
+    
+    Returns:
+        list: (id, title, content, distance) 튜플 리스트 - DB 검색 결과와 같은 형태
+              (스냅샷 이후 삭제된 행은 제외)
+    """
+    hits = await search_engine.search(query_vector, limit, distance_function, max_distance)
+    if not hits:
+        return []
+    rows = await run_db(fetch_designs_by_ids_async if async_db else fetch_designs_by_ids, [hit[0] for hit in hits])
+    return [(row_id, rows[row_id][1], rows[row_id][2], distance) for row_id, distance in hits if row_id in rows]
+
+def fetch_sample_vector(record_id: int):
+    """design_doc 레코드의 제목과 임베딩 벡터 조회 (블로킹 함수 - 스레드 풀에서 호출)"""
+    with db_pool.connection() as conn:
+        cur = conn.cursor()
+        # vector → real[] 변환으로 드라이버 설정 없이 파이썬 리스트로 받음
+        cur.execute("SELECT id, title, embedding_vector::real[] FROM design_doc WHERE id = %s;", (record_id,))
+        row = cur.fetchone()
+        cur.close()
+        return row
+
+def check_db_connection():
+    """데이터베이스 연결 테스트 (블로킹 함수 - 스레드 풀에서 호출)"""
+    try:
+        with db_pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("SELECT 1;")
+            cur.close()
+        return "connected"
+    except Exception:
+        return "disconnected"
+
 # ========== API 엔드포인트 ==========
 # 클라이언트 요청을 처리하는 REST API 엔드포인트들
 
@@ -180,32 +612,50 @@ async def root():
 @app.get("/health")
 async def health_check():
     """헬스 체크 엔드포인트 - 서버와 데이터베이스 연결 상태 확인"""
-    try:
-        # 데이터베이스 연결 테스트
-        conn = psycopg2.connect(**DB_CONFIG)
-        conn.close()
-        db_status = "connected"
-    except:
-        db_status = "disconnected"
+    # 데이터베이스 연결 테스트 (스레드 풀에서 실행 → 추론이 밀려도 헬스 체크는 즉시 응답)
+    db_status = await run_in_threadpool(check_db_connection)
+    
+    # 데이터 건수와 인덱스 목록 (streamlit_index.py 사이드바 표시용)
+    config_info = None
+    if db_status == "connected":
+        try:
+            total_designs, indexes = await run_db(fetch_database_stats)
+            config_info = {
+                "data_count": total_designs,
+                "indexes": [{"name": idx[0], "definition": idx[1]} for idx in indexes],
+                "db_driver": DB_DRIVER,
+                "search_engine": SEARCH_ENGINE
+            }
+        except Exception as e:
+            logger.warning(f"헬스 체크 통계 조회 실패: {e}")
     
     return {
         "status": "healthy" if embedding_model and db_status == "connected" else "unhealthy",
         "model_status": "loaded" if embedding_model else "not_loaded",
-        "database": db_status
+        "database": db_status,
+        "config_info": config_info
     }
 
 @app.post("/register_design", response_model=DesignResponse)
-async def register_design(request: DesignRequest):
+async def register_design(request: DesignRequest, mode: str = "sync"):
     """설계안 등록 API
     
-    기능 흐름:
+    기능 흐름 (mode=sync, 기본값):
     1. 입력 데이터 검증 (제목, 설명 필수)
     2. AI 모델로 설명 텍스트를 384차원 벡터로 변환
     3. 설계안 정보와 임베딩 벡터를 PostgreSQL에 저장
     4. 저장 결과 반환 (ID, 벡터 차원 정보 포함)
+    
+    mode=async:
+    - 제목과 설명만 작업 테이블에 저장하고 HTTP 202와 작업 id를 바로 반환 (모델 호출 없음)
+    - 백그라운드 워커가 작업을 배치로 임베딩 / 저장
+    - 진행 상태는 GET /register_design/{job_id}로 조회
     """
     try:
-        logger.info(f"설계안 등록 요청 - Title: {request.title}")
+        logger.info(f"설계안 등록 요청 - Title: {request.title}, mode: {mode}")
+        
+        if mode not in ("sync", "async"):
+            raise HTTPException(status_code=400, detail=f"지원하지 않는 등록 모드입니다: {mode} (지원: sync, async)")
         
         # 1. AI 모델 로딩 상태 확인
         if embedding_model is None:
@@ -215,13 +665,26 @@ async def register_design(request: DesignRequest):
         if not request.title.strip() or not request.description.strip():
             raise HTTPException(status_code=400, detail="제목과 설명은 필수 입력 항목입니다.")
         
+        # 비동기 모드: 작업만 저장하고 바로 응답
+        if mode == "async":
+            job_id = await run_db(register_queue.enqueue, request.title, request.description)
+            register_queue.notify()
+            return JSONResponse(status_code=202, content={
+                "success": True,
+                "message": "설계안 등록 작업이 접수되었습니다.",
+                "job_id": job_id,
+                "status": "pending",
+                "status_url": f"/register_design/{job_id}"
+            })
+        
         # 3. AI 임베딩 생성 (설명 텍스트 → 384차원 벡터)
-        embedding = create_embedding(request.description)
+        embedding = await embed_text(request.description)
         if embedding is None:
             raise HTTPException(status_code=500, detail="임베딩 생성에 실패했습니다.")
         
         # 4. 데이터베이스에 저장 (트랜잭션 처리)
-        design_id = insert_design_to_db(request.title, request.description, embedding)
+        insert_fn = insert_design_async if async_db else insert_design_to_db
+        design_id = await run_db(insert_fn, request.title, request.description, embedding)
         if design_id is None:
             raise HTTPException(status_code=500, detail="데이터베이스 저장에 실패했습니다.")
         
@@ -239,6 +702,73 @@ async def register_design(request: DesignRequest):
         logger.error(f"예상치 못한 오류: {e}")
         raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
 
+@app.post("/register_designs", response_model=BulkRegisterResponse)
+async def register_designs(request: Request):
+    """설계안 일괄 등록 API
+    
+    입력 (Content-Type별):
+    - application/json: [{"title", "description"}, ...] 또는 {"designs": [...]}
+    - multipart/form-data: file 필드에 sample_designs_500.csv 형태의 CSV (title, description 컬럼)
+    - text/csv: 본문 전체가 CSV
+    
+    기능 흐름:
+    1. 빈 제목 / 설명 행은 행 오류로 기록
+    2. 나머지 행을 REGISTER_BULK_EMBED_BATCH_SIZE행씩 마이크로 배처로 임베딩 (단건 요청과 같은 큐 / 실행기)
+       - 큐에 자리가 없으면 HTTP 429 (REGISTER_BULK_QUEUE_LIMIT까지만 채워 단건 요청 자리를 남김)
+    3. REGISTER_BULK_GROUP_SIZE행마다 트랜잭션 하나, 행마다 SAVEPOINT → 잘못된 행만 롤백
+    4. 입력 순서대로 행별 설계안 ID 또는 오류 반환
+    """
+    if embedding_model is None:
+        raise HTTPException(status_code=500, detail="AI 임베딩 모델이 로드되지 않았습니다.")
+    
+    try:
+        items = await read_designs_request(request)
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"설계안 일괄 등록 요청 - {len(items)}건")
+    
+    try:
+        valid, errors = validate_items(items)
+        rows, embed_errors = await embed_rows(
+            items, valid, lambda texts: embedding_batcher.submit_many(texts, queue_limit=BULK_QUEUE_LIMIT)
+        )
+        errors.update(embed_errors)
+        stored = await run_db(insert_designs_to_db, rows) if rows else {}
+    except HTTPException:
+        raise
+    except QueueFullError as e:
+        logger.warning(f"일괄 등록 거절 (백프레셔): {e}")
+        raise HTTPException(status_code=429, detail="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                            headers={"Retry-After": "1"})
+    except Exception as e:
+        logger.error(f"일괄 등록 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"서버 내부 오류: {str(e)}")
+    
+    results = build_results(len(items), errors, stored)
+    inserted = sum(1 for row in results if row["design_id"] is not None)
+    logger.info(f"설계안 일괄 등록 완료 - 저장 {inserted}건, 실패 {len(items) - inserted}건")
+    return BulkRegisterResponse(
+        success=inserted > 0,
+        total=len(items),
+        inserted=inserted,
+        failed=len(items) - inserted,
+        results=results
+    )
+
+@app.get("/register_design/{job_id}")
+async def get_register_job(job_id: int):
+    """비동기 등록 작업 상태 조회 API
+    
+    반환 정보:
+    - status: pending(대기), processing(처리 중), done(완료), failed(최대 시도 횟수 초과)
+    - design_id: 완료된 경우 저장된 설계안 ID
+    - attempts, error: 시도 횟수와 마지막 오류 메시지
+    """
+    job = await run_db(register_queue.get_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"등록 작업을 찾을 수 없습니다: {job_id}")
+    return job
+
 @app.post("/search_similar_designs", response_model=VectorSearchResponse)
 async def search_similar_designs(request: VectorSearchRequest):
     """유사한 설계안 검색 API (코사인 유사도 기반)
@@ -261,42 +791,40 @@ async def search_similar_designs(request: VectorSearchRequest):
         if not request.query_text.strip():
             raise HTTPException(status_code=400, detail="검색할 텍스트를 입력해주세요.")
         
-        # 3. 검색 텍스트를 AI로 벡터 변환
-        query_embedding = create_embedding(request.query_text)
+        # 3. 검색 텍스트를 AI로 벡터 변환 (같은 검색어는 캐시에서 바로 사용)
+        query_embedding = await run_in_threadpool(search_cache.get_embedding, request.query_text) if search_cache else None
         if query_embedding is None:
-            raise HTTPException(status_code=500, detail="검색 텍스트의 임베딩 생성에 실패했습니다.")
+            query_embedding = await embed_text(request.query_text)
+            if query_embedding is None:
+                raise HTTPException(status_code=500, detail="검색 텍스트의 임베딩 생성에 실패했습니다.")
+            if search_cache:
+                await run_in_threadpool(search_cache.put_embedding, request.query_text, query_embedding)
         
-        # 4. 데이터베이스에서 유사한 벡터 검색
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
+        # 4. 결과 캐시 확인 (검색 전에 읽은 쓰기 세대를 키에 포함 → 검색 도중 저장되면 자동으로 무효)
+        cache_key = None
+        cached = None
+        if search_cache:
+            generation = await run_in_threadpool(search_cache.generation)
+            cache_key = search_cache.result_key(
+                query_embedding, request.limit, request.distance_threshold, f"cosine:{SEARCH_ENGINE}", generation
+            )
+            cached = await run_in_threadpool(search_cache.get_results, cache_key)
         
-        # pgvector 코사인 거리 검색 쿼리
-        # <=> : 코사인 거리 연산자 (0에 가까울수록 유사)
-        # WHERE 절: 거리 임계값으로 결과 필터링
-        # ORDER BY: 거리 기준 오름차순 정렬 (가장 유사한 것부터)
-        # LIMIT: 반환할 결과 개수 제한
-        search_sql = """
-        SELECT id, title, content, 
-               (embedding_vector <=> %s::vector) AS cosine_distance
-        FROM design_doc
-        WHERE (embedding_vector <=> %s::vector) <= %s
-        ORDER BY embedding_vector <=> %s::vector
-        LIMIT %s;
-        """
+        # 5. 유사한 벡터 검색 (인메모리 엔진 또는 DB - asyncpg는 직접 await, psycopg2는 스레드 풀에서 실행)
+        if cached is not None:
+            # 캐시 적중: 본문만 id로 조회 (그 사이 삭제된 설계안은 제외)
+            rows = await run_db(fetch_designs_by_ids_async if async_db else fetch_designs_by_ids, [hit[0] for hit in cached]) if cached else {}
+            results = [(row_id, rows[row_id][1], rows[row_id][2], distance) for row_id, distance in cached if row_id in rows]
+        elif search_engine:
+            results = await memory_search(query_embedding, request.limit, "cosine", request.distance_threshold)
+        else:
+            results = await run_db(
+                search_designs_async if async_db else search_designs_in_db, query_embedding, request.distance_threshold, request.limit
+            )
+        if cache_key and cached is None:
+            await run_in_threadpool(search_cache.put_results, cache_key, [(row[0], row[3]) for row in results])
         
-        cur.execute(search_sql, (
-            query_embedding,           # 검색할 벡터
-            query_embedding,           # WHERE 절용 벡터 (동일)
-            request.distance_threshold, # 거리 임계값
-            query_embedding,           # ORDER BY 절용 벡터 (동일)
-            request.limit              # 결과 개수 제한
-        ))
-        results = cur.fetchall()
-        
-        cur.close()
-        conn.close()
-        
-        # 5. 결과 데이터 가공 및 응답 생성
+        # 6. 결과 데이터 가공 및 응답 생성
         formatted_results = []
         for row in results:
             # 코사인 거리를 유사도 점수로 변환
@@ -324,6 +852,234 @@ async def search_similar_designs(request: VectorSearchRequest):
         logger.error(f"검색 오류: {e}")
         raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
 
+async def run_vector_search(request: RawVectorSearchRequest, accurate: bool):
+    """원시 벡터 검색 공통 처리 (입력 검증 → 검색 → 재현율 표본 측정 → search_info 생성)"""
+    # 1. 입력 데이터 유효성 검증
+    if request.distance_function not in DISTANCE_OPERATORS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"distance_function은 {', '.join(DISTANCE_OPERATORS)} 중 하나여야 합니다."
+        )
+    if len(request.query_vector) != EMBEDDING_DIMENSION:
+        raise HTTPException(
+            status_code=400,
+            detail=f"query_vector는 {EMBEDDING_DIMENSION}차원이어야 합니다. (입력: {len(request.query_vector)}차원)"
+        )
+    if not 1 <= request.limit <= MAX_SEARCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit은 1~{MAX_SEARCH_LIMIT} 사이여야 합니다.")
+    
+    search_fn = raw_vector_search_async if async_db else raw_vector_search_in_db
+    
+    # 2. 인메모리 엔진 (memory: 항상 정확 검색, hnsw: 일부 요청만 DB 정확 검색과 비교해 재현율 측정)
+    if search_engine:
+        if request.distance_function not in search_engine.distance_functions:
+            raise HTTPException(
+                status_code=400,
+                detail=f"현재 검색 엔진({SEARCH_ENGINE})은 {', '.join(search_engine.distance_functions)} 거리만 지원합니다."
+            )
+        started = time.perf_counter()
+        rows = await memory_search(request.query_vector, request.limit, request.distance_function)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        recall_tracker.record_request(request.distance_function, elapsed_ms, request.limit, len(rows))
+        
+        ef_search = getattr(search_engine, "ef_search", None)
+        key = recall_tracker.key(request.distance_function, None, ef_search)
+        measured_recall = None
+        if not search_engine.exact and recall_tracker.should_sample(force=request.measure_recall):
+            exact_rows = await run_db(
+                search_fn, request.query_vector, request.limit, request.distance_function, None, None, True
+            )
+            measured_recall = recall_tracker.recall_at_k([row[0] for row in rows], [row[0] for row in exact_rows])
+            recall_tracker.record_recall(key, measured_recall)
+        if search_engine.exact:
+            estimated_recall = 1.0
+        elif measured_recall is not None:
+            estimated_recall = round(measured_recall, 4)
+        else:
+            estimated_recall = recall_tracker.estimated_recall(key)
+        
+        search_info = {
+            "mode": search_engine.mode,
+            "distance_function": request.distance_function,
+            "requested_limit": request.limit,
+            "actual_returned": len(rows),
+            "accuracy_rate": f"{len(rows) / request.limit * 100:.0f}%",
+            "probes": None,
+            "ef_search": ef_search,
+            "elapsed_ms": round(elapsed_ms, 3),
+            "estimated_recall": estimated_recall,
+            "recall_measured": measured_recall is not None
+        }
+        return [
+            {"id": row[0], "title": row[1], "content": row[2], "distance": float(row[3]), "search_info": search_info}
+            for row in rows
+        ]
+    
+    # 3. 요청별 인덱스 파라미터 결정 (요청값 > 모드 기본값, 기본 모드는 서버 설정 그대로 사용)
+    probes = request.probes if request.probes is not None else (ACCURATE_IVFFLAT_PROBES if accurate else None)
+    ef_search = request.ef_search if request.ef_search is not None else (ACCURATE_HNSW_EF_SEARCH if accurate else None)
+    
+    # 4. 근사(인덱스) 검색
+    started = time.perf_counter()
+    rows = await run_db(search_fn, request.query_vector, request.limit, request.distance_function, probes, ef_search)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    recall_tracker.record_request(request.distance_function, elapsed_ms, request.limit, len(rows))
+    
+    # 5. 일부 요청(또는 measure_recall=True)은 정확 검색과 비교해 recall@k 측정
+    key = recall_tracker.key(request.distance_function, probes, ef_search)
+    measured_recall = None
+    if recall_tracker.should_sample(force=request.measure_recall):
+        exact_rows = await run_db(
+            search_fn, request.query_vector, request.limit, request.distance_function, None, None, True
+        )
+        measured_recall = recall_tracker.recall_at_k([row[0] for row in rows], [row[0] for row in exact_rows])
+        recall_tracker.record_recall(key, measured_recall)
+    
+    # 6. 응답 생성 (streamlit_index.py는 첫 결과의 search_info를 표시)
+    search_info = {
+        "mode": "accurate" if accurate else "fast",
+        "distance_function": request.distance_function,
+        "requested_limit": request.limit,
+        "actual_returned": len(rows),
+        "accuracy_rate": f"{len(rows) / request.limit * 100:.0f}%",
+        "probes": probes if probes is not None else "server_default",
+        "ef_search": ef_search if ef_search is not None else "server_default",
+        "elapsed_ms": round(elapsed_ms, 3),
+        "estimated_recall": round(measured_recall, 4) if measured_recall is not None else recall_tracker.estimated_recall(key),
+        "recall_measured": measured_recall is not None
+    }
+    return [
+        {
+            "id": row[0],
+            "title": row[1],
+            "content": row[2],
+            "distance": float(row[3]),
+            "search_info": search_info
+        }
+        for row in rows
+    ]
+
+@app.post("/search/vector")
+async def search_vector(request: RawVectorSearchRequest):
+    """원시 벡터 검색 API (기본 모드 - 속도 우선)
+    
+    - distance_function: l2(<->), cosine(<=>), inner_product(<#>)
+    - probes / ef_search를 지정하면 이번 요청에만 적용 (SET LOCAL)
+    - 각 결과에 search_info 포함 (요청/반환 개수, 소요 시간, 추정 재현율)
+    """
+    try:
+        return await run_vector_search(request, accurate=False)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"벡터 검색 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"벡터 검색 중 오류가 발생했습니다: {str(e)}")
+
+@app.post("/search/vector/accurate")
+async def search_vector_accurate(request: RawVectorSearchRequest):
+    """원시 벡터 검색 API (정확도 우선 모드)
+    
+    probes / ef_search를 지정하지 않으면 ACCURATE_IVFFLAT_PROBES, ACCURATE_HNSW_EF_SEARCH 사용
+    (더 많은 클러스터 / 후보를 탐색하므로 느리지만 재현율이 높음)
+    """
+    try:
+        return await run_vector_search(request, accurate=True)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"정확도 우선 벡터 검색 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"벡터 검색 중 오류가 발생했습니다: {str(e)}")
+
+@app.get("/designs/{design_id}/similar", response_model=VectorSearchResponse)
+async def get_similar_designs(design_id: int, limit: int = 10, distance_function: str = "cosine",
+                              exclude_self: bool = True, max_distance: float = None):
+    """저장된 설계안과 비슷한 설계안 검색 API ("이것과 비슷한 설계안")
+    
+    저장된 임베딩을 SQL 안에서 그대로 사용하므로 모델 추론이 없고 벡터가 클라이언트로 오가지 않음
+    - exclude_self: 기준 설계안을 결과에서 제외 (기본값 True)
+    - max_distance: 거리 상한 (None이면 제한 없음)
+    """
+    if distance_function not in DISTANCE_OPERATORS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"distance_function은 {', '.join(DISTANCE_OPERATORS)} 중 하나여야 합니다."
+        )
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit은 1~{MAX_SEARCH_LIMIT} 사이여야 합니다.")
+    
+    try:
+        results, exists = await run_db(
+            similar_by_id_async if async_db else similar_by_id_in_db,
+            design_id, limit, distance_function, exclude_self, max_distance
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"id 기준 유사 설계안 검색 오류: {e}")
+        raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
+    if not exists:
+        raise HTTPException(status_code=404, detail=f"ID {design_id} 설계안(임베딩)을 찾을 수 없습니다.")
+    
+    formatted_results = []
+    for row in results:
+        item = {"id": row[0], "title": row[1], "description": row[2], "distance": float(row[3])}
+        if distance_function == "cosine":
+            item["similarity_score"] = round(1 - float(row[3]), 4)
+        formatted_results.append(item)
+    return VectorSearchResponse(
+        success=True,
+        message=f"ID {design_id}와 유사한 설계안 {len(results)}개를 찾았습니다.",
+        results=formatted_results,
+        total_found=len(results)
+    )
+
+@app.get("/test/sample-vector")
+async def get_sample_vector(record_id: int = 1):
+    """테스트용 샘플 벡터 조회 API (저장된 설계안의 임베딩을 검색 입력으로 사용)"""
+    row = await run_db(fetch_sample_vector, record_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"ID {record_id} 설계안을 찾을 수 없습니다.")
+    return {
+        "id": row[0],
+        "title": row[1],
+        "vector": list(row[2]),
+        "dimension": len(row[2])
+    }
+
+@app.get("/info/performance")
+async def get_performance_info():
+    """검색 성능 정보 조회 API
+    
+    실제 요청에서 누적한 거리 함수별 지연시간 p50/p95/p99, 평균 반환 비율,
+    설정(probes / ef_search)별 추정 재현율과 사용 권장사항 반환
+    """
+    comparison = {
+        "l2_distance": recall_tracker.summary("l2"),
+        "cosine_distance": recall_tracker.summary("cosine"),
+        "inner_product": recall_tracker.summary("inner_product")
+    }
+    
+    recommendations = [
+        "기본 모드는 서버 기본값(ivfflat.probes=1, hnsw.ef_search=40)으로 가장 빠르게 검색합니다.",
+        f"정확도 우선 모드는 probes={ACCURATE_IVFFLAT_PROBES}, ef_search={ACCURATE_HNSW_EF_SEARCH}로 검색합니다.",
+        "요청마다 probes / ef_search를 지정해 속도와 정확도를 조절할 수 있습니다.",
+        "measure_recall=true로 요청하면 정확 검색과 비교한 재현율을 바로 확인할 수 있습니다."
+    ]
+    for name, stats in comparison.items():
+        if stats["avg_return_rate"] is not None and stats["avg_return_rate"] < 1:
+            recommendations.append(
+                f"{name}: 요청 개수보다 적게 반환되는 경우가 있습니다 (평균 {stats['avg_return_rate'] * 100:.0f}%) "
+                "- probes를 늘리거나 정확도 우선 모드를 사용하세요."
+            )
+    
+    return {
+        "test_results": {
+            "source": f"실제 요청 누적 통계 (재현율 표본 비율 {RECALL_SAMPLE_RATE * 100:.0f}%)",
+            "performance_comparison": comparison
+        },
+        "usage_recommendations": recommendations
+    }
+
 @app.get("/database_stats")
 async def get_database_stats():
     """데이터베이스 통계 정보 조회 API
@@ -335,24 +1091,7 @@ async def get_database_stats():
     - 생성된 인덱스 목록 (코사인, L2 거리 인덱스 등)
     """
     try:
-        conn = psycopg2.connect(**DB_CONFIG)
-        cur = conn.cursor()
-        
-        # design_doc 테이블의 전체 레코드 개수 조회
-        cur.execute("SELECT COUNT(*) FROM design_doc;")
-        total_designs = cur.fetchone()[0]
-        
-        # design_doc 테이블에 생성된 모든 인덱스 정보 조회
-        # pg_indexes 시스템 테이블에서 인덱스명과 정의 가져오기
-        cur.execute("""
-        SELECT indexname, indexdef 
-        FROM pg_indexes 
-        WHERE tablename = 'design_doc';
-        """)
-        indexes = cur.fetchall()
-        
-        cur.close()
-        conn.close()
+        total_designs, indexes = await run_db(fetch_database_stats)
         
         return {
             "total_designs": total_designs,                # 총 설계안 개수
@@ -361,10 +1100,79 @@ async def get_database_stats():
             "indexes": [{"name": idx[0], "definition": idx[1]} for idx in indexes]  # 인덱스 목록
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"통계 조회 오류: {e}")
         raise HTTPException(status_code=500, detail=f"통계 조회 중 오류: {str(e)}")
 
+@app.get("/metrics/embedding")
+async def get_embedding_metrics():
+    """임베딩 마이크로 배처 메트릭 조회 API
+    
+    반환 정보:
+    - 처리량 (items/sec), 평균 배치 크기
+    - 큐 대기시간 p50/p95/p99 (배치 대기 창 크기 조정용)
+    - 임베딩 캐시 적중/미스 카운터
+    """
+    if embedding_batcher is None:
+        raise HTTPException(status_code=503, detail="임베딩 배처가 시작되지 않았습니다.")
+    metrics = embedding_batcher.get_metrics()
+    metrics["executor"] = embedding_model.get_metrics()
+    metrics["cache"] = embedding_cache.stats()
+    return metrics
+
+@app.get("/metrics/db")
+async def get_db_metrics():
+    """데이터베이스 커넥션 풀 메트릭 조회 API
+    
+    반환 정보:
+    - 풀 크기 (최소/최대, 열린 연결 수, 사용 중인 연결 수)
+    - 체크아웃 횟수, 대기 시간 p50/p95/p99, 대기 시간 초과 횟수
+    - 최대 수명 초과로 교체된 연결 수, 헬스 체크 실패로 폐기된 연결 수
+    - async: asyncpg 풀 메트릭 (DB_DRIVER=asyncpg일 때)
+    """
+    if db_pool is None:
+        raise HTTPException(status_code=503, detail="커넥션 풀이 생성되지 않았습니다.")
+    metrics = db_pool.get_metrics()
+    metrics["async"] = async_db.get_metrics() if async_db else None
+    return metrics
+
+@app.get("/metrics/search")
+async def get_search_engine_metrics():
+    """인메모리 검색 엔진 메트릭 조회 API (SEARCH_ENGINE=memory / hnsw일 때)
+    
+    반환 정보:
+    - memory: 전체 / 스냅샷 / 추가분 행 수, last_seen_id, 증분 갱신 횟수, 쿼리 배처 메트릭
+    - hnsw: 인덱스 크기, 동기화 위치(last_seq), 알림 / 반영 횟수, 저장되지 않은 변경 수
+    """
+    if search_engine is None:
+        raise HTTPException(status_code=404, detail=f"인메모리 검색 엔진을 사용하지 않습니다 (SEARCH_ENGINE={SEARCH_ENGINE}).")
+    return search_engine.get_metrics()
+
+@app.get("/metrics/cache")
+async def get_search_cache_metrics():
+    """검색 결과 캐시 메트릭 조회 API
+    
+    반환 정보:
+    - 저장소(memory / redis), 현재 쓰기 세대
+    - 임베딩 / 결과 단계별 적중, 미스, 적중률
+    - memory 저장소: 항목 수, eviction / 만료 횟수
+    """
+    if search_cache is None:
+        raise HTTPException(status_code=404, detail="검색 결과 캐시를 사용하지 않습니다 (SEARCH_CACHE=off).")
+    return await run_in_threadpool(search_cache.get_metrics)
+
+@app.get("/metrics/register")
+async def get_register_queue_metrics():
+    """비동기 등록 큐 메트릭 조회 API
+    
+    반환 정보:
+    - 처리한 배치 수, 저장 건수, 평균 배치 크기, 마지막 배치 처리 시간
+    - 실패 배치 수, 워커 실행 여부
+    """
+    return register_queue.get_metrics()
+
 # ========== 서버 실행 설정 ==========
 # 개발 환경에서 직접 실행할 때 사용되는 설정
 # 실제 배포시에는 외부에서 uvicorn 명령어로 실행
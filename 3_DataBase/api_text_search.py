@@ -42,16 +42,13 @@ def get_embedding(text: str) -> List[float]:
     try:
         conn = psycopg2.connect(**DB_CONFIG)
         with conn.cursor() as cur:
-            cur.execute("SELECT embedding_vector FROM design_doc WHERE id = 1;")
+            # vector → real[] 변환으로 파이썬 float 리스트로 받음 (문자열 파싱 / eval 불필요)
+            cur.execute("SELECT embedding_vector::real[] FROM design_doc WHERE id = 1;")
             result = cur.fetchone()
         conn.close()
         
         if result:
-            # PostgreSQL 벡터를 리스트로 변환
-            vector_str = str(result[0])
-            # '[1,2,3]' 형태를 리스트로 변환
-            vector_list = eval(vector_str) if vector_str.startswith('[') else list(result[0])
-            return vector_list
+            return list(result[0])
         else:
             return [0.0] * 384
     except:
@@ -12,14 +12,16 @@ uvicorn app:app --reload
 """
 
 # FastAPI 프레임워크 및 관련 모듈 - 웹 API 서버 구축을 위한 라이브러리
-from fastapi import FastAPI, HTTPException  # FastAPI 메인 클래스와 HTTP 예외 처리
+from fastapi import FastAPI, HTTPException, Request  # FastAPI 메인 클래스와 HTTP 예외 처리, 원본 요청 객체
+from fastapi.concurrency import run_in_threadpool  # 블로킹 함수를 스레드 풀에서 실행
 from fastapi.middleware.cors import CORSMiddleware  # Cross-Origin Resource Sharing 허용을 위한 미들웨어
 # 데이터 검증을 위한 Pydantic 모델 - API 요청/응답 데이터 구조 정의
 from pydantic import BaseModel  # 데이터 유효성 검증 및 직렬화
 # PostgreSQL 연결을 위한 psycopg2 - 데이터베이스 어댑터
 import psycopg2  # PostgreSQL 데이터베이스 연결 및 쿼리 실행
-# AI 임베딩 모델을 위한 sentence-transformers - 텍스트를 벡터로 변환
-from sentence_transformers import SentenceTransformer  # 다국어 문장 임베딩 모델
+# AI 임베딩 추론 실행기 - encode를 이벤트 루프 밖의 스레드/프로세스 풀에서 실행
+from inference_executor import InferenceExecutor, InferenceUnavailableError  # 모델은 워커마다 한 번만 로드
+from onnx_embedding import cache_model_name  # 백엔드별 캐시 키 구분
 # 환경변수 처리 - 보안을 위한 설정값 관리
 import os  # 운영체제 환경변수 접근
 from dotenv import load_dotenv  # .env 파일에서 환경변수 로드
@@ -27,6 +29,13 @@ from dotenv import load_dotenv  # .env 파일에서 환경변수 로드
 import asyncio  # 비동기 프로그래밍 지원
 # 로깅 - 애플리케이션 실행 로그 기록
 import logging  # 디버깅 및 모니터링을 위한 로그
+# 동시 임베딩 요청 배칭 - 여러 요청을 encode 한 번으로 처리
+from micro_batcher import MicroBatcher, QueueFullError  # 마이크로 배칭 유틸리티, 큐 초과 예외
+# 영구 임베딩 캐시 - 이미 임베딩한 텍스트는 모델 추론 생략
+from embedding_cache import EmbeddingCache  # 메모리 LRU + SQLite 캐시
+# 저장된 행 기준 유사 검색 SQL - 모델 추론 없이 DB 안에서 처리
+from vector_search import build_similar_by_id_sql, DISTANCE_OPERATORS  # 거리 함수 → pgvector 연산자
+from bulk_register import BulkInputError, read_designs_request, validate_items, embed_rows, insert_grouped, build_results, QUEUE_LIMIT as BULK_QUEUE_LIMIT  # 일괄 등록 도우미
 
 # .env 파일에서 환경변수 로드 - 데이터베이스 접속 정보 등 보안 설정
 load_dotenv()
@@ -60,8 +69,24 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD")  # 비밀번호 (환경변수에서만 읽기)
 }
 
+# 임베딩 마이크로 배칭 설정 - 짧은 대기 창 동안 들어온 요청을 모아서 한 번에 인코딩
+EMBED_BATCH_MAX_SIZE = int(os.getenv("EMBED_BATCH_MAX_SIZE", 32))  # 배치당 최대 요청 수
+EMBED_BATCH_MAX_WAIT_MS = float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", 5))  # 요청 수집 대기 시간 (밀리초)
+
+# 추론 실행기 설정 - 무거운 encode 연산이 다른 요청(/health 등)을 막지 않도록 분리
+INFERENCE_MODE = os.getenv("INFERENCE_MODE", "thread")  # thread(모델 공유) 또는 process(워커별 모델)
+INFERENCE_MAX_WORKERS = int(os.getenv("INFERENCE_MAX_WORKERS", 2))  # 동시에 실행할 encode 작업 수
+INFERENCE_MAX_QUEUE = int(os.getenv("INFERENCE_MAX_QUEUE", 256))  # 대기 요청 상한 (초과시 HTTP 429)
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # torch, onnx(ONNX Runtime), onnx-int8(양자화)
+
+# 임베딩 모델 이름 - 모델 로딩과 캐시 키에 함께 사용
+MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+
 # AI 임베딩 모델 전역 변수 (서버 시작시 한 번만 로드) - 메모리 효율성을 위한 싱글톤 패턴
+# SentenceTransformer와 같은 encode()를 제공하는 추론 실행기를 저장
 embedding_model = None
+embedding_batcher = None  # 마이크로 배처 (서버 시작시 생성)
+embedding_cache = None  # 영구 임베딩 캐시 (서버 시작시 생성)
 
 # 요청 데이터 모델 정의 (Pydantic) - API로 받을 데이터 구조 정의
 class DesignRequest(BaseModel):
@@ -86,36 +111,98 @@ class DesignResponse(BaseModel):
     design_id: int = None  # 생성된 설계안 ID (성공시) - 데이터베이스 자동 생성 ID
     embedding_dimension: int = None  # 임베딩 차원 (성공시) - 벡터 크기 정보 (384차원)
 
+# 일괄 등록 응답 모델 - 입력 순서대로 행별 결과
+class BulkRowResult(BaseModel):
+    """일괄 등록 행별 결과"""
+    index: int  # 입력 행 번호 (0부터)
+    design_id: int = None  # 저장된 설계안 ID (성공시)
+    error: str = None  # 오류 메시지 (실패시)
+
+class BulkRegisterResponse(BaseModel):
+    """일괄 등록 응답 데이터 모델"""
+    success: bool  # 한 건 이상 저장되었는지 여부
+    total: int  # 입력 행 수
+    inserted: int  # 저장된 행 수
+    failed: int  # 실패한 행 수
+    results: list[BulkRowResult]  # 행별 결과
+
 @app.on_event("startup")  # FastAPI 서버 시작 이벤트 핸들러 - 서버 실행 시 한 번만 실행
 async def startup_event():
-    """서버 시작시 실행되는 이벤트 - AI 모델 로딩"""
-    global embedding_model  # 전역 변수 수정을 위한 global 선언
+    """서버 시작시 실행되는 이벤트 - AI 모델 로딩 및 마이크로 배처 시작"""
+    global embedding_model, embedding_batcher, embedding_cache  # 전역 변수 수정을 위한 global 선언
     try:
         logger.info("AI 임베딩 모델 로딩 중...")  # 로딩 시작 로그
         # 한국어 지원 다국어 임베딩 모델 로드 - 384차원 벡터 생성 모델
-        embedding_model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+        embedding_model = InferenceExecutor(
+            MODEL_NAME,
+            mode=INFERENCE_MODE,  # 스레드 풀 또는 프로세스 풀
+            max_workers=INFERENCE_MAX_WORKERS,  # 동시성 상한
+            backend=EMBEDDING_BACKEND  # CPU 노드에서는 onnx / onnx-int8 권장
+        )
+        embedding_model.start()  # 풀 생성 및 워커별 모델 로드
+        embedding_cache = EmbeddingCache(cache_model_name(MODEL_NAME, EMBEDDING_BACKEND))  # 디스크 캐시 열기 (재시작 후에도 유지)
         logger.info("AI 임베딩 모델 로딩 완료!")  # 로딩 완료 로그
+        
+        # 마이크로 배처 시작 - 동시 요청을 모아서 encode(list) 한 번으로 처리
+        embedding_batcher = MicroBatcher(
+            create_embeddings,  # 배치 함수 (텍스트 리스트 → 벡터 리스트)
+            max_batch_size=EMBED_BATCH_MAX_SIZE,
+            max_wait_ms=EMBED_BATCH_MAX_WAIT_MS,
+            name="embedding",
+            max_queue_size=INFERENCE_MAX_QUEUE,  # 대기 큐 상한 - 초과 요청은 즉시 거절
+            max_concurrent_batches=INFERENCE_MAX_WORKERS  # 워커 수만큼 배치 동시 실행
+        )
+        await embedding_batcher.start()
     except Exception as e:
         logger.error(f"AI 모델 로딩 실패: {e}")  # 오류 로그 기록
         raise e  # 서버 시작 실패로 예외 재발생
 
-def create_embedding(text: str):
+@app.on_event("shutdown")  # FastAPI 서버 종료 이벤트 핸들러
+async def shutdown_event():
+    """서버 종료시 실행되는 이벤트 - 배처 워커 정리"""
+    if embedding_batcher:
+        await embedding_batcher.stop()  # 대기 중인 요청 취소 및 워커 종료
+    if embedding_model:
+        embedding_model.shutdown()  # 추론 풀 종료
+    if embedding_cache:
+        embedding_cache.log_stats()  # 캐시 적중/미스 통계 기록
+        embedding_cache.close()  # SQLite 연결 종료
+
+def create_embeddings(texts: list):
     """
-    텍스트를 384차원 임베딩 벡터로 변환
-    - 입력된 텍스트를 AI 모델을 통해 수치형 벡터로 변환
-    - 의미적으로 유사한 텍스트는 유사한 벡터값을 가짐
+    여러 텍스트를 한 번의 encode 호출로 임베딩 (마이크로 배처의 배치 함수)
+    - 요청마다 encode를 호출하는 것보다 모델 호출 오버헤드가 크게 줄어듦
     
     Args:
-        text: 임베딩할 텍스트 - 설계안 설명 등
+        texts: 임베딩할 텍스트 리스트
         
     Returns:
-        list: 384개 실수로 구성된 임베딩 벡터 - 벡터 유사도 검색 가능
+        list: 입력 순서와 동일한 384차원 벡터 리스트
+    """
+    embeddings = embedding_cache.encode(embedding_model, texts)  # 캐시 미스만 배치 단위 인코딩
+    return embeddings.tolist()  # numpy 배열 → Python 리스트
+
+async def embed_text(text: str):
+    """
+    마이크로 배처를 통해 텍스트 하나를 임베딩
+    - 배치 함수는 스레드 풀에서 실행되므로 이벤트 루프를 블로킹하지 않음
+    - 대기 큐가 가득 차면 HTTP 429, 추론 실행기를 쓸 수 없으면 HTTP 503 (백프레셔)
+    
+    Returns:
+        list: 384차원 임베딩 벡터 (실패시 None)
     """
     try:
-        # AI 모델로 텍스트 인코딩 - 자연어를 수치형 벡터로 변환
-        embedding = embedding_model.encode(text)
-        # numpy 배열을 Python 리스트로 변환 - JSON 직렬화 가능한 형태로 변환
-        return embedding.tolist()
+        return await embedding_batcher.submit(text)  # 배치에 합류 후 자신의 결과만 수신
+    except QueueFullError as e:
+        logger.warning(f"임베딩 요청 거절 (백프레셔): {e}")  # 과부하 로그
+        raise HTTPException(
+            status_code=429,  # Too Many Requests
+            detail="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "1"}  # 1초 후 재시도 권장
+        )
+    except InferenceUnavailableError as e:
+        logger.error(f"추론 실행기 사용 불가: {e}")  # 워커 비정상 종료, 시간 초과 등
+        raise HTTPException(status_code=503, detail=str(e))  # Service Unavailable
     except Exception as e:
         logger.error(f"임베딩 생성 실패: {e}")  # 오류 로그 기록
         return None  # 실패시 None 반환
@@ -170,6 +257,50 @@ def insert_design_to_db(title: str, description: str, embedding: list):
         logger.error(f"데이터베이스 저장 실패: {e}")  # 오류 로그
         return None  # 실패시 None 반환
 
+def insert_designs_to_db(rows: list):
+    """
+    여러 설계안을 그룹 트랜잭션으로 저장 (블로킹 함수 - 스레드 풀에서 호출)
+    - 행마다 SAVEPOINT를 두므로 잘못된 행은 그 행만 롤백되고 나머지는 저장됨
+    
+    Args:
+        rows: (행 번호, title, description, embedding) 튜플 리스트
+        
+    Returns:
+        dict: 행 번호 → ("id", 설계안 ID) 또는 ("error", 오류 메시지)
+    """
+    conn = psycopg2.connect(**DB_CONFIG)  # 요청 하나에 연결 하나 (그룹마다 커밋)
+    try:
+        return insert_grouped(conn, "design", ("title", "description", "embedding"), rows, 384)
+    finally:
+        conn.close()  # 연결 종료
+
+def find_similar_by_id(design_id: int, limit: int, distance_function: str,
+                       exclude_self: bool = True, max_distance: float = None):
+    """
+    저장된 설계안의 임베딩으로 유사 설계안 검색 (블로킹 함수 - 스레드 풀에서 호출)
+    - 기준 벡터를 SQL 안의 서브쿼리로 읽으므로 임베딩 재생성 / 벡터 전송이 없음
+    
+    Returns:
+        tuple: ((id, title, description, distance) 튜플 리스트, 기준 설계안 존재 여부)
+    """
+    search_sql = build_similar_by_id_sql(
+        "design", "id", ["title", "description"], "embedding", distance_function,
+        exclude_self=exclude_self, with_max_distance=max_distance is not None
+    )
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        cur = conn.cursor()
+        cur.execute(search_sql, {"source_id": design_id, "max_distance": max_distance, "limit": limit})
+        results = cur.fetchall()
+        exists = True
+        if not results:  # 결과가 없을 때만 기준 설계안 존재 여부 확인 (404와 빈 결과 구분)
+            cur.execute("SELECT EXISTS (SELECT 1 FROM design WHERE id = %s AND embedding IS NOT NULL);", (design_id,))
+            exists = cur.fetchone()[0]
+        cur.close()
+        return results, exists
+    finally:
+        conn.close()  # 연결 종료
+
 @app.get("/")  # HTTP GET 메서드로 루트 경로 처리
 async def root():
     """루트 엔드포인트 - API 상태 확인"""
@@ -218,7 +349,7 @@ async def register_design(request: DesignRequest):
         
         # 1. AI 임베딩 생성 - 설계안 설명을 384차원 벡터로 변환
         logger.info("AI 임베딩 생성 중...")
-        embedding = create_embedding(request.description)
+        embedding = await embed_text(request.description)  # 마이크로 배처 경유
         
         if embedding is None:
             raise HTTPException(
@@ -228,7 +359,8 @@ async def register_design(request: DesignRequest):
         
         # 2. 데이터베이스에 저장 - 트랜잭션으로 안전한 저장
         logger.info("데이터베이스 저장 중...")
-        design_id = insert_design_to_db(
+        design_id = await run_in_threadpool(  # 블로킹 DB 호출은 스레드 풀에서 실행
+            insert_design_to_db,
             request.title, 
             request.description, 
             embedding
@@ -258,6 +390,105 @@ async def register_design(request: DesignRequest):
             detail=f"서버 내부 오류가 발생했습니다: {str(e)}"
         )
 
+@app.post("/register_designs", response_model=BulkRegisterResponse)  # 여러 설계안 일괄 등록
+async def register_designs(request: Request):
+    """
+    설계안 일괄 등록 API
+    
+    입력 (Content-Type별):
+    - application/json: [{"title", "description"}, ...] 또는 {"designs": [...]}
+    - multipart/form-data: file 필드에 sample_designs_500.csv 형태의 CSV (title, description 컬럼)
+    - text/csv: 본문 전체가 CSV
+    
+    처리 흐름:
+    1. 빈 제목 / 설명 행은 행 오류로 기록
+    2. 나머지 행을 배치 단위로 임베딩 - 단건 요청과 같은 마이크로 배처 / 대기 큐 사용 (자리가 없으면 HTTP 429)
+    3. 그룹 트랜잭션 + 행 단위 SAVEPOINT로 저장 - 잘못된 행 하나가 그룹 전체를 롤백하지 않음
+    4. 입력 순서대로 행별 설계안 ID 또는 오류 반환
+    """
+    if embedding_model is None:
+        raise HTTPException(status_code=500, detail="AI 임베딩 모델이 로드되지 않았습니다.")
+    
+    try:
+        items = await read_designs_request(request)  # JSON 배열 또는 CSV → (title, description) 리스트
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=str(e))  # Bad Request
+    logger.info(f"설계안 일괄 등록 요청 - {len(items)}건")
+    
+    try:
+        valid, errors = validate_items(items)  # 필수 입력 확인
+        rows, embed_errors = await embed_rows(  # 배치 단위 임베딩 - 큐 상한을 남겨 단건 요청이 막히지 않게 함
+            items, valid, lambda texts: embedding_batcher.submit_many(texts, queue_limit=BULK_QUEUE_LIMIT)
+        )
+        errors.update(embed_errors)
+        stored = await run_in_threadpool(insert_designs_to_db, rows) if rows else {}
+    except QueueFullError as e:
+        logger.warning(f"일괄 등록 거절 (백프레셔): {e}")  # 과부하 로그
+        raise HTTPException(
+            status_code=429,  # Too Many Requests
+            detail="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            headers={"Retry-After": "1"}  # 1초 후 재시도 권장
+        )
+    except Exception as e:
+        logger.error(f"일괄 등록 실패: {e}")  # 예외 로그 기록
+        raise HTTPException(status_code=500, detail=f"서버 내부 오류가 발생했습니다: {str(e)}")
+    
+    results = build_results(len(items), errors, stored)
+    inserted = sum(1 for row in results if row["design_id"] is not None)
+    logger.info(f"설계안 일괄 등록 완료 - 저장 {inserted}건, 실패 {len(items) - inserted}건")
+    return BulkRegisterResponse(
+        success=inserted > 0,
+        total=len(items),
+        inserted=inserted,
+        failed=len(items) - inserted,
+        results=results
+    )
+
+@app.get("/designs/{design_id}/similar")  # 저장된 설계안 기준 유사 설계안 조회
+async def get_similar_designs(design_id: int, limit: int = 10, distance_function: str = "cosine",
+                              exclude_self: bool = True, max_distance: float = None):
+    """
+    "이것과 비슷한 설계안" API - 등록된 설계안의 임베딩을 그대로 사용 (모델 추론 없음)
+    - exclude_self: 기준 설계안을 결과에서 제외
+    - max_distance: 거리 상한 (None이면 제한 없음)
+    """
+    if distance_function not in DISTANCE_OPERATORS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"distance_function은 {', '.join(DISTANCE_OPERATORS)} 중 하나여야 합니다."
+        )
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit은 1 이상이어야 합니다.")
+    
+    try:
+        results, exists = await run_in_threadpool(  # 블로킹 DB 호출은 스레드 풀에서 실행
+            find_similar_by_id, design_id, limit, distance_function, exclude_self, max_distance
+        )
+    except Exception as e:
+        logger.error(f"유사 설계안 조회 실패: {e}")
+        raise HTTPException(status_code=500, detail=f"검색 중 오류가 발생했습니다: {str(e)}")
+    if not exists:
+        raise HTTPException(status_code=404, detail=f"ID {design_id} 설계안(임베딩)을 찾을 수 없습니다.")
+    
+    return {
+        "design_id": design_id,
+        "distance_function": distance_function,
+        "results": [
+            {"id": row[0], "title": row[1], "description": row[2], "distance": float(row[3])}
+            for row in results
+        ]
+    }
+
+@app.get("/metrics/embedding")  # 임베딩 배처 메트릭 조회
+async def get_embedding_metrics():
+    """임베딩 메트릭 - 처리량, 평균 배치 크기, 큐 대기시간 p50/p95/p99, 캐시 적중률"""
+    if embedding_batcher is None:
+        raise HTTPException(status_code=503, detail="임베딩 배처가 시작되지 않았습니다.")
+    metrics = embedding_batcher.get_metrics()
+    metrics["executor"] = embedding_model.get_metrics()  # 추론 실행기 모드 및 호출 통계
+    metrics["cache"] = embedding_cache.stats()  # 캐시 적중/미스 카운터
+    return metrics
+
 if __name__ == "__main__":
     # 개발용 서버 실행 (실제로는 uvicorn 명령어 사용 권장)
     # 운영환경에서는 'uvicorn app:app --host 0.0.0.0 --port 8000' 명령어 사용
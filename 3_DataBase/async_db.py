@@ -0,0 +1,193 @@
+"""
+asyncpg 기반 비동기 pgvector 데이터베이스 레이어
+
+주요 기능:
+1. asyncpg 커넥션 풀 - 쿼리를 await로 실행하므로 워커 하나가 수백 개의 검색을 동시에 처리
+   (psycopg2 + 스레드 풀 방식은 스레드 수만큼만 동시에 쿼리 가능)
+2. 연결마다 pgvector 코덱 등록 → vector 컬럼을 numpy 배열로 주고받음 (문자열 변환 불필요)
+3. 커넥션 대기 시간 초과시 PoolTimeoutError (db_pool과 같은 예외 → API에서 HTTP 503)
+4. 커넥션 대기 / 쿼리 시간 메트릭
+
+사용 예시:
+    async_db = AsyncVectorDB.from_env(DB_CONFIG, name="design_doc")
+    await async_db.open()
+    rows = await async_db.fetch(
+        "SELECT id, title FROM design_doc ORDER BY embedding_vector <=> $1 LIMIT $2",
+        to_vector(embedding), 10
+    )
+
+환경변수:
+    DB_DRIVER             검색/등록 쿼리 드라이버 (asyncpg 또는 psycopg2, 기본값: asyncpg)
+    ASYNC_DB_POOL_MIN     최소 커넥션 수 (기본값: 1)
+    ASYNC_DB_POOL_MAX     최대 커넥션 수 (기본값: 20)
+    DB_POOL_TIMEOUT       커넥션 대기 최대 시간, 초 (기본값: 5, db_pool과 공유)
+
+설치 요구사항:
+pip install asyncpg pgvector
+(open()에서 불러오므로 DB_DRIVER=psycopg2로만 실행하면 설치하지 않아도 됨)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+import numpy as np
+
+from db_pool import PoolTimeoutError
+from micro_batcher import _percentile
+
+logger = logging.getLogger(__name__)
+
+
+def to_vector(embedding):
+    """임베딩(list 또는 numpy 배열)을 pgvector 코덱이 받는 float32 배열로 변환"""
+    return np.asarray(embedding, dtype=np.float32)
+
+
+class AsyncVectorDB:
+    """
+    pgvector 코덱이 등록된 asyncpg 커넥션 풀
+
+    Args:
+        db_config: psycopg2 형식 접속 정보 (dbname 또는 database 키 모두 허용)
+        min_size: 최소 커넥션 수
+        max_size: 최대 커넥션 수 (동시에 실행 가능한 쿼리 수)
+        timeout: 커넥션 대기 최대 시간 (초)
+        command_timeout: 쿼리 한 번의 최대 실행 시간 (초)
+        name: 로그/메트릭에 표시할 이름
+    """
+
+    def __init__(self, db_config, min_size=1, max_size=20, timeout=5.0, command_timeout=30.0, name="db"):
+        self.db_config = db_config
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.command_timeout = command_timeout
+        self.name = name
+        self._pool = None
+
+        # 메트릭
+        self._queries = 0
+        self._timeouts = 0
+        self._wait_ms = deque(maxlen=1000)
+        self._query_ms = deque(maxlen=1000)
+
+    @classmethod
+    def from_env(cls, db_config, name="db"):
+        """환경변수(ASYNC_DB_POOL_*)에서 풀 설정을 읽어 생성"""
+        return cls(
+            db_config,
+            min_size=int(os.getenv("ASYNC_DB_POOL_MIN", 1)),
+            max_size=int(os.getenv("ASYNC_DB_POOL_MAX", 20)),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", 5)),
+            name=name,
+        )
+
+    def _connect_kwargs(self):
+        """psycopg2 형식 설정을 asyncpg.create_pool 인자로 변환"""
+        config = self.db_config
+        return {
+            "host": config.get("host"),
+            "port": int(config.get("port") or 5432),
+            "database": config.get("dbname") or config.get("database"),
+            "user": config.get("user"),
+            "password": config.get("password"),
+        }
+
+    @staticmethod
+    async def _init_connection(conn):
+        """새 연결마다 pgvector 코덱 등록"""
+        from pgvector.asyncpg import register_vector
+
+        await register_vector(conn)
+
+    async def open(self):
+        """풀 생성 (이벤트 루프 안에서 호출)"""
+        if self._pool is not None:
+            return
+        import asyncpg
+
+        self._pool = await asyncpg.create_pool(
+            min_size=self.min_size,
+            max_size=self.max_size,
+            command_timeout=self.command_timeout,
+            init=self._init_connection,
+            **self._connect_kwargs(),
+        )
+        logger.info(f"[{self.name}] asyncpg 커넥션 풀 생성 - min={self.min_size}, max={self.max_size}")
+
+    async def close(self):
+        """풀의 모든 연결 종료"""
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+            logger.info(f"[{self.name}] asyncpg 커넥션 풀 종료")
+
+    @asynccontextmanager
+    async def acquire(self):
+        """커넥션 체크아웃 (timeout 초과시 PoolTimeoutError)"""
+        if self._pool is None:
+            raise RuntimeError(f"[{self.name}] asyncpg 커넥션 풀이 열려 있지 않습니다.")
+        started = time.perf_counter()
+        try:
+            conn = await self._pool.acquire(timeout=self.timeout)
+        except asyncio.TimeoutError as e:
+            self._timeouts += 1
+            raise PoolTimeoutError(f"[{self.name}] {self.timeout}초 안에 DB 커넥션을 얻지 못했습니다.") from e
+        self._wait_ms.append((time.perf_counter() - started) * 1000)
+        try:
+            yield conn
+        finally:
+            await self._pool.release(conn)
+
+    async def _run(self, method, query, *args):
+        """커넥션을 빌려 쿼리 한 번 실행 (쿼리 시간 기록)"""
+        async with self.acquire() as conn:
+            started = time.perf_counter()
+            result = await getattr(conn, method)(query, *args)
+            self._query_ms.append((time.perf_counter() - started) * 1000)
+            self._queries += 1
+            return result
+
+    async def fetch(self, query, *args):
+        """여러 행 조회 (asyncpg.Record 리스트)"""
+        return await self._run("fetch", query, *args)
+
+    async def fetchrow(self, query, *args):
+        """한 행 조회 (없으면 None)"""
+        return await self._run("fetchrow", query, *args)
+
+    async def fetchval(self, query, *args):
+        """첫 행의 첫 컬럼 값 조회"""
+        return await self._run("fetchval", query, *args)
+
+    async def execute(self, query, *args):
+        """결과가 없는 쿼리 실행 (상태 문자열 반환)"""
+        return await self._run("execute", query, *args)
+
+    def get_metrics(self):
+        """풀 크기, 커넥션 대기 시간, 쿼리 시간 반환"""
+        waits = list(self._wait_ms)
+        queries = list(self._query_ms)
+        return {
+            "name": self.name,
+            "driver": "asyncpg",
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "open_connections": self._pool.get_size() if self._pool else 0,
+            "idle_connections": self._pool.get_idle_size() if self._pool else 0,
+            "queries": self._queries,
+            "timeouts": self._timeouts,
+            "wait_ms": {
+                "p50": round(_percentile(waits, 50), 3),
+                "p95": round(_percentile(waits, 95), 3),
+                "p99": round(_percentile(waits, 99), 3),
+            },
+            "query_ms": {
+                "p50": round(_percentile(queries, 50), 3),
+                "p99": round(_percentile(queries, 99), 3),
+            },
+        }
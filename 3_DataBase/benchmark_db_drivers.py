@@ -0,0 +1,170 @@
+"""
+벡터 검색 DB 드라이버 비교 벤치마크 (psycopg2 + 스레드 풀 vs asyncpg)
+
+측정 방식:
+- 동시 클라이언트 수(기본 1 / 32 / 256)마다 각 클라이언트가 검색 쿼리를 N번 연속 실행
+- sync : 현재 구현과 같은 방식 - PooledDB(psycopg2) 쿼리를 스레드 풀에서 실행
+         (스레드 수는 FastAPI run_in_threadpool 기본값과 같은 40개)
+- async: AsyncVectorDB(asyncpg) 쿼리를 이벤트 루프에서 직접 await
+- 쿼리 벡터는 테이블에 저장된 실제 임베딩을 무작위로 샘플링 (임베딩 모델 불필요)
+
+출력 항목: 초당 쿼리 수(QPS), 지연시간 p50 / p99 (ms), 오류 수
+
+실행 방법:
+python benchmark_db_drivers.py
+python benchmark_db_drivers.py --table issues --column embedding --concurrency 1 32 256 --output benchmark_db.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from dotenv import load_dotenv
+
+from async_db import AsyncVectorDB, to_vector
+from db_pool import PooledDB
+
+load_dotenv()
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", 5432)),
+    "dbname": os.getenv("DB_NAME", "postgres"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD")
+}
+
+# FastAPI(anyio) run_in_threadpool의 기본 스레드 수
+DEFAULT_THREADPOOL_SIZE = 40
+
+
+async def sample_query_vectors(async_db, table, column, count):
+    """테이블에 저장된 임베딩을 무작위로 샘플링해 쿼리 벡터로 사용"""
+    rows = await async_db.fetch(
+        f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL ORDER BY random() LIMIT $1;", count
+    )
+    if not rows:
+        raise RuntimeError(f"{table}.{column}에 임베딩이 없습니다.")
+    return [np.asarray(row[0], dtype=np.float32) for row in rows]
+
+
+async def run_clients(concurrency, requests_per_client, query_once, vectors):
+    """동시 클라이언트 concurrency개가 각각 requests_per_client번 검색 실행"""
+    latencies = []
+    errors = 0
+
+    async def client(client_id):
+        nonlocal errors
+        for i in range(requests_per_client):
+            vector = vectors[(client_id * requests_per_client + i) % len(vectors)]
+            started = time.perf_counter()
+            try:
+                await query_once(vector)
+                latencies.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "queries": len(latencies),
+        "errors": errors,
+        "qps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3) if latencies else 0.0,
+        "latency_p99_ms": round(float(np.percentile(latencies, 99)), 3) if latencies else 0.0,
+    }
+
+
+async def main_async(args):
+    sync_sql = (
+        f"SELECT id, ({args.column} <=> %s::vector) AS distance FROM {args.table} "
+        f"ORDER BY {args.column} <=> %s::vector LIMIT %s;"
+    )
+    async_sql = (
+        f"SELECT id, ({args.column} <=> $1) AS distance FROM {args.table} "
+        f"ORDER BY {args.column} <=> $1 LIMIT $2;"
+    )
+
+    # 두 드라이버 모두 같은 최대 커넥션 수로 비교
+    db_pool = PooledDB(DB_CONFIG, minconn=1, maxconn=args.pool_size, timeout=60, name="bench-sync")
+    async_db = AsyncVectorDB(DB_CONFIG, min_size=1, max_size=args.pool_size, timeout=60, name="bench-async")
+    db_pool.open()
+    await async_db.open()
+    threads = ThreadPoolExecutor(max_workers=args.threads, thread_name_prefix="bench")
+    loop = asyncio.get_running_loop()
+
+    def sync_search(vector):
+        with db_pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute(sync_sql, (vector.tolist(), vector.tolist(), args.limit))
+            rows = cur.fetchall()
+            cur.close()
+            return rows
+
+    async def sync_query(vector):
+        return await loop.run_in_executor(threads, sync_search, vector)
+
+    async def async_query(vector):
+        return await async_db.fetch(async_sql, to_vector(vector), args.limit)
+
+    try:
+        vectors = await sample_query_vectors(async_db, args.table, args.column, args.sample_vectors)
+        print(f"쿼리 벡터 {len(vectors)}개 샘플링 완료 ({args.table}.{args.column})")
+
+        # 연결 생성/캐시 워밍업
+        for vector in vectors[:5]:
+            await sync_query(vector)
+            await async_query(vector)
+
+        results = []
+        print("\n" + "=" * 78)
+        print(f"{'driver':<8}{'clients':>9}{'queries':>10}{'errors':>8}{'QPS':>12}{'p50 ms':>12}{'p99 ms':>12}")
+        print("-" * 78)
+        for concurrency in args.concurrency:
+            for driver, query_once in (("sync", sync_query), ("async", async_query)):
+                row = await run_clients(concurrency, args.requests_per_client, query_once, vectors)
+                row["driver"] = driver
+                results.append(row)
+                print(f"{driver:<8}{concurrency:>9}{row['queries']:>10}{row['errors']:>8}{row['qps']:>12.1f}"
+                      f"{row['latency_p50_ms']:>12.2f}{row['latency_p99_ms']:>12.2f}")
+        print("=" * 78)
+    finally:
+        threads.shutdown(wait=True)
+        await async_db.close()
+        db_pool.close()
+
+    if args.output:
+        summary = {
+            "table": args.table,
+            "column": args.column,
+            "pool_size": args.pool_size,
+            "threads": args.threads,
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="psycopg2(스레드 풀) vs asyncpg 벡터 검색 벤치마크")
+    parser.add_argument("--table", default="design_doc")
+    parser.add_argument("--column", default="embedding_vector")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 32, 256])
+    parser.add_argument("--requests-per-client", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=10, help="검색 결과 개수 (LIMIT)")
+    parser.add_argument("--pool-size", type=int, default=20, help="두 드라이버의 최대 커넥션 수")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADPOOL_SIZE, help="sync 방식 스레드 수")
+    parser.add_argument("--sample-vectors", type=int, default=200)
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+임베딩 백엔드 비교 벤치마크 (PyTorch vs ONNX Runtime vs ONNX int8)
+
+측정 항목 (데이터셋 × 백엔드별):
+1. 처리량: 전체 텍스트를 배치 인코딩했을 때 초당 문장 수
+2. 지연시간: 문장 1개씩 인코딩했을 때 p50 / p99 (ms)
+3. 메모리: 모델 로딩 + 인코딩 후 프로세스 RSS (MB)
+4. 정확도: torch 벡터와의 코사인 유사도 (평균 / 최소)
+
+각 백엔드는 별도 프로세스에서 실행하므로 RSS가 서로 섞이지 않습니다.
+
+실행 방법:
+python benchmark_embedding_backends.py
+python benchmark_embedding_backends.py --backends torch onnx-int8 --output benchmark_backends.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from onnx_embedding import SUPPORTED_BACKENDS, load_encoder
+
+MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_DESIGNS_CSV = os.path.join(BASE_DIR, "file", "sample_designs_500.csv")
+DEFAULT_ISSUES_CSV = os.path.join(BASE_DIR, "practice_githubIssue", "github_issues_large.csv")
+
+
+def current_rss_mb():
+    """현재 프로세스 RSS (MB) - psutil이 없으면 /proc 또는 최대 RSS로 대체"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        pass
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    # macOS는 bytes, Linux는 KB 단위
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss / 1024 / 1024 if sys.platform == "darwin" else max_rss / 1024
+
+
+def load_datasets(designs_csv, issues_csv, limit=None):
+    """벤치마크용 텍스트 로드 (설계안: description, 이슈: title + description)"""
+    designs = pd.read_csv(designs_csv)
+    issues = pd.read_csv(issues_csv).dropna(subset=["title", "description"])
+    datasets = {
+        "designs": designs["description"].astype(str).str.strip().tolist(),
+        "issues": (issues["title"].astype(str).str.strip() + " " + issues["description"].astype(str).str.strip()).tolist(),
+    }
+    if limit:
+        datasets = {name: texts[:limit] for name, texts in datasets.items()}
+    return datasets
+
+
+def run_backend(backend, datasets, batch_size, latency_samples):
+    """백엔드 하나를 측정 (별도 프로세스에서 실행)"""
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    encoder = load_encoder(MODEL_NAME, backend)
+    load_seconds = time.perf_counter() - started
+
+    results = {}
+    for name, texts in datasets.items():
+        encoder.encode(texts[:batch_size], batch_size=batch_size)  # 워밍업
+
+        started = time.perf_counter()
+        embeddings = np.asarray(encoder.encode(texts, batch_size=batch_size), dtype=np.float32)
+        elapsed = time.perf_counter() - started
+
+        latencies = []
+        for text in texts[:latency_samples]:
+            t0 = time.perf_counter()
+            encoder.encode([text])
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+        results[name] = {
+            "count": len(texts),
+            "throughput_per_sec": round(len(texts) / elapsed, 2),
+            "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "latency_p99_ms": round(float(np.percentile(latencies, 99)), 3),
+            "embeddings": embeddings,
+        }
+
+    return {
+        "backend": backend,
+        "load_seconds": round(load_seconds, 2),
+        "rss_mb": round(current_rss_mb(), 1),
+        "rss_delta_mb": round(current_rss_mb() - rss_before, 1),
+        "datasets": results,
+    }
+
+
+def cosine_agreement(reference, candidate):
+    """행별 코사인 유사도 (평균, 최소)"""
+    ref = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    cand = candidate / np.linalg.norm(candidate, axis=1, keepdims=True)
+    cosine = (ref * cand).sum(axis=1)
+    return round(float(cosine.mean()), 6), round(float(cosine.min()), 6)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 백엔드 비교 벤치마크")
+    parser.add_argument("--backends", nargs="+", default=list(SUPPORTED_BACKENDS), choices=SUPPORTED_BACKENDS)
+    parser.add_argument("--designs-csv", default=DEFAULT_DESIGNS_CSV)
+    parser.add_argument("--issues-csv", default=DEFAULT_ISSUES_CSV)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--latency-samples", type=int, default=200, help="단건 지연시간 측정에 사용할 문장 수")
+    parser.add_argument("--limit", type=int, default=None, help="데이터셋별 최대 문장 수")
+    parser.add_argument("--output", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    datasets = load_datasets(args.designs_csv, args.issues_csv, args.limit)
+    print("데이터셋: " + ", ".join(f"{name} {len(texts)}건" for name, texts in datasets.items()))
+
+    # torch 결과를 코사인 비교 기준으로 사용하므로 항상 먼저 측정
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+
+    reports = {}
+    for backend in backends:
+        print(f"\n▶ {backend} 측정 중...")
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            reports[backend] = pool.submit(
+                run_backend, backend, datasets, args.batch_size, args.latency_samples
+            ).result()
+
+    # 결과 표 출력
+    print("\n" + "=" * 100)
+    print(f"{'dataset':<10}{'backend':<12}{'texts/s':>10}{'p50 ms':>10}{'p99 ms':>10}"
+          f"{'RSS MB':>10}{'load s':>9}{'cos mean':>11}{'cos min':>11}")
+    print("-" * 100)
+
+    summary = {"model": MODEL_NAME, "batch_size": args.batch_size, "results": []}
+    for name in datasets:
+        reference = reports["torch"]["datasets"][name]["embeddings"]
+        for backend in backends:
+            report = reports[backend]
+            stats = report["datasets"][name]
+            cos_mean, cos_min = cosine_agreement(reference, stats["embeddings"])
+            row = {
+                "dataset": name,
+                "backend": backend,
+                "count": stats["count"],
+                "throughput_per_sec": stats["throughput_per_sec"],
+                "latency_p50_ms": stats["latency_p50_ms"],
+                "latency_p99_ms": stats["latency_p99_ms"],
+                "rss_mb": report["rss_mb"],
+                "load_seconds": report["load_seconds"],
+                "cosine_mean": cos_mean,
+                "cosine_min": cos_min,
+            }
+            summary["results"].append(row)
+            print(f"{name:<10}{backend:<12}{row['throughput_per_sec']:>10.1f}{row['latency_p50_ms']:>10.2f}"
+                  f"{row['latency_p99_ms']:>10.2f}{row['rss_mb']:>10.1f}{row['load_seconds']:>9.1f}"
+                  f"{cos_mean:>11.4f}{cos_min:>11.4f}")
+    print("=" * 100)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,435 @@
+"""
+COPY ... FROM STDIN (binary) 기반 대량 적재기
+
+주요 기능:
+1. 행을 청크(chunk_rows) 단위로 바이너리 COPY 포맷으로 인코딩해 스트리밍 → 메모리 사용량 일정
+2. vector 컬럼은 pgvector 바이너리 포맷(int16 차원 + int16 예약 + float4 배열)으로 전송
+   (문자열 '[0.1,0.2,...]' 변환/파싱 비용 없음)
+3. 청크마다 커밋 - 실패한 청크만 롤백하고 행 범위와 오류 메시지를 리포트
+4. on_conflict 지정시 임시 스테이징 테이블에 COPY 후 INSERT ... ON CONFLICT 로 병합
+5. 적재 결과: 적재/실패 행 수, 소요 시간, 초당 행 수(rows/sec)
+6. swap_table: 별도 테이블에 다시 만든 결과를 한 트랜잭션에서 원래 이름으로 교체
+7. parse_vector_texts: CSV의 '[0.1, 0.2, ...]' 문자열 컬럼을 행 단위 split 없이 float32 행렬로 파싱
+
+지원 테이블 (TABLE_SPECS):
+design, design_doc, issues, user_behavior, user_embeddings
+
+사용 예시:
+    loader = BulkLoader(conn, chunk_rows=5000)
+    report = loader.load("issues", rows, columns=["title", "description", "embedding"])
+    # rows: (title, description, embedding) 튜플 또는 컬럼명 → 값 딕셔너리의 iterable
+
+기존 적재 방식과 처리량 비교 (임시 테이블 사용, 기존 데이터에는 영향 없음):
+python bulk_loader.py --benchmark --rows 20000
+"""
+
+import io
+import logging
+import struct
+import time
+import warnings
+from itertools import islice
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 바이너리 COPY 헤더: 시그니처 11바이트 + flags(int32) + 헤더 확장 길이(int32)
+COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+COPY_HEADER = COPY_SIGNATURE + struct.pack(">ii", 0, 0)
+COPY_TRAILER = struct.pack(">h", -1)
+
+# 테이블별 적재 가능 컬럼과 바이너리 타입 (id, created_at 등 기본값 컬럼은 제외)
+TABLE_SPECS = {
+    "design": [("title", "text"), ("description", "text"), ("embedding", "vector")],
+    "design_doc": [("title", "text"), ("content", "text"), ("embedding_vector", "vector")],
+    "issues": [("issue_id", "text"), ("title", "text"), ("description", "text"),
+               ("tags", "text"), ("embedding", "vector")],
+    "user_behavior": [("user_id", "text"), ("age", "int4"), ("income", "int4"), ("gender", "text"),
+                      ("spending_score", "int4"), ("visit_count", "int4")],
+    "user_embeddings": [("user_id", "text"), ("embedding", "vector")],
+}
+
+
+class BulkLoadError(Exception):
+    """청크 적재 실패 (stop_on_error=True일 때 발생)"""
+
+
+def _encode_text(value):
+    return str(value).encode("utf-8")
+
+
+def _encode_int4(value):
+    return struct.pack(">i", int(value))
+
+
+def _encode_int8(value):
+    return struct.pack(">q", int(value))
+
+
+def _encode_float4(value):
+    return struct.pack(">f", float(value))
+
+
+def _encode_float8(value):
+    return struct.pack(">d", float(value))
+
+
+def _encode_vector(value):
+    # pgvector vector_recv 포맷: int16 차원, int16 예약(0), float4 * 차원 (빅엔디언)
+    array = np.asarray(value, dtype=">f4").ravel()
+    return struct.pack(">hh", array.shape[0], 0) + array.tobytes()
+
+
+ENCODERS = {
+    "text": _encode_text,
+    "int4": _encode_int4,
+    "int8": _encode_int8,
+    "float4": _encode_float4,
+    "float8": _encode_float8,
+    "vector": _encode_vector,
+}
+
+
+def _is_null(value):
+    """NULL로 보낼 값인지 확인 (None, NaN)"""
+    if value is None:
+        return True
+    return isinstance(value, float) and value != value
+
+
+def parse_vector_texts(texts, dimension):
+    """
+    '[0.1, 0.2, ...]' 형태 문자열 목록 → float32 행렬 (벡터화 파싱)
+
+    1. 괄호 제거와 쉼표 개수(= 차원 - 1) 계산은 numpy 문자열 연산으로 한 번에 처리
+    2. 차원이 맞는 행만 쉼표로 이어 np.fromstring 한 번으로 파싱 (행마다 split / float 변환 없음)
+    3. 숫자가 아닌 값이 섞여 한 번에 파싱되지 않으면 그때만 행 단위로 파싱해 오류 행을 찾음
+    4. NaN / inf가 있는 행은 오류로 기록
+
+    Args:
+        texts: 벡터 문자열 목록 (pandas 컬럼의 to_numpy() 등)
+        dimension: 기대하는 차원
+    Returns:
+        tuple: (행렬 (행 수, dimension) float32 - 오류 행은 0, 유효 행 bool 배열, {행 번호: 오류 메시지})
+    """
+    bodies = np.char.strip(np.asarray(texts).astype(str), "[] \t\r\n")
+    counts = np.where(np.char.str_len(bodies) > 0, np.char.count(bodies, ",") + 1, 0)
+    matrix = np.zeros((len(bodies), dimension), dtype=np.float32)
+    valid = counts == dimension
+    errors = {int(i): f"차원 불일치: {counts[i]} (필요: {dimension})" for i in np.flatnonzero(~valid)}
+
+    rows = np.flatnonzero(valid)
+    if len(rows):
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("error")  # 중간에 파싱이 멈추면 DeprecationWarning → 예외로 처리
+                values = np.fromstring(",".join(bodies[rows]), dtype=np.float32, sep=",")
+            if values.size != len(rows) * dimension:
+                raise ValueError(f"파싱된 값 {values.size}개 (필요: {len(rows) * dimension}개)")
+            matrix[rows] = values.reshape(len(rows), dimension)
+        except (ValueError, DeprecationWarning):
+            for i in rows:
+                try:
+                    matrix[i] = [float(x) for x in bodies[i].split(",")]
+                except ValueError as e:
+                    valid[i] = False
+                    errors[int(i)] = f"숫자가 아닌 값: {e}"
+
+    not_finite = valid & ~np.isfinite(matrix).all(axis=1)
+    for i in np.flatnonzero(not_finite):
+        errors[int(i)] = "NaN 또는 inf 값 포함"
+    valid &= ~not_finite
+    matrix[~valid] = 0.0
+    return matrix, valid, errors
+
+
+def encode_copy_chunk(rows, types):
+    """
+    행 목록을 바이너리 COPY 스트림(헤더 + 튜플 + 트레일러)으로 인코딩
+
+    Args:
+        rows: 값 튜플 목록 (컬럼 순서 = types 순서)
+        types: 컬럼별 바이너리 타입 이름 목록
+
+    Returns:
+        io.BytesIO: copy_expert에 바로 넘길 수 있는 버퍼
+    """
+    encoders = [ENCODERS[t] for t in types]
+    field_count = struct.pack(">h", len(types))
+    buf = io.BytesIO()
+    buf.write(COPY_HEADER)
+    for offset, row in enumerate(rows):
+        if len(row) != len(encoders):
+            raise ValueError(f"청크 내 {offset}번째 행: 컬럼 {len(encoders)}개가 필요하지만 {len(row)}개입니다.")
+        buf.write(field_count)
+        for value, encode in zip(row, encoders):
+            if _is_null(value):
+                buf.write(struct.pack(">i", -1))
+                continue
+            try:
+                data = encode(value)
+            except (TypeError, ValueError) as e:
+                raise ValueError(f"청크 내 {offset}번째 행 값 변환 실패 ({value!r}): {e}") from e
+            buf.write(struct.pack(">i", len(data)))
+            buf.write(data)
+    buf.write(COPY_TRAILER)
+    buf.seek(0)
+    return buf
+
+
+class BulkLoader:
+    """
+    바이너리 COPY로 행을 청크 단위로 적재하는 적재기
+
+    Args:
+        conn: psycopg2 연결 (청크마다 commit/rollback 수행)
+        chunk_rows: 청크당 행 수 (메모리 사용량 = 청크 크기에 비례)
+        stop_on_error: True이면 첫 실패 청크에서 BulkLoadError 발생, False이면 리포트 후 계속 진행
+    """
+
+    def __init__(self, conn, chunk_rows=5000, stop_on_error=False):
+        if chunk_rows < 1:
+            raise ValueError("chunk_rows는 1 이상이어야 합니다.")
+        self.conn = conn
+        self.chunk_rows = chunk_rows
+        self.stop_on_error = stop_on_error
+
+    @staticmethod
+    def resolve_columns(table, columns=None):
+        """
+        테이블 스펙에서 (컬럼명, 타입) 목록 조회 (columns 지정시 해당 컬럼만 순서대로)
+
+        columns에 (컬럼명, 타입) 튜플을 넘기면 스펙에 없는 테이블에도 그대로 사용
+        """
+        if columns and all(isinstance(c, tuple) for c in columns):
+            return list(columns)
+        if table not in TABLE_SPECS:
+            raise ValueError(f"지원하지 않는 테이블입니다: {table} (지원: {', '.join(TABLE_SPECS)})")
+        spec = dict(TABLE_SPECS[table])
+        if columns is None:
+            return list(TABLE_SPECS[table])
+        unknown = [c for c in columns if c not in spec]
+        if unknown:
+            raise ValueError(f"{table} 테이블에 없는 컬럼입니다: {unknown}")
+        return [(c, spec[c]) for c in columns]
+
+    def _copy_chunk(self, cur, table, column_names, types, rows, on_conflict):
+        """청크 하나를 COPY (on_conflict가 있으면 스테이징 테이블을 거쳐 병합)"""
+        buf = encode_copy_chunk(rows, types)
+        column_sql = ", ".join(column_names)
+        if on_conflict is None:
+            cur.copy_expert(f"COPY {table} ({column_sql}) FROM STDIN WITH (FORMAT binary)", buf)
+            return len(rows)
+
+        # COPY는 ON CONFLICT를 지원하지 않으므로 임시 테이블에 적재 후 INSERT ... SELECT
+        stage = f"_bulk_stage_{table}"
+        cur.execute(f"CREATE TEMP TABLE IF NOT EXISTS {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS;")
+        cur.copy_expert(f"COPY {stage} ({column_sql}) FROM STDIN WITH (FORMAT binary)", buf)
+        cur.execute(
+            f"INSERT INTO {table} ({column_sql}) SELECT {column_sql} FROM {stage} ON CONFLICT {on_conflict};"
+        )
+        return cur.rowcount
+
+    def load(self, table, rows, columns=None, on_conflict=None):
+        """
+        행 iterable을 청크 단위로 적재
+
+        Args:
+            table: 대상 테이블 (TABLE_SPECS의 키)
+            rows: 값 튜플 또는 딕셔너리의 iterable (제너레이터 가능 - 청크 단위로만 읽음)
+            columns: 적재할 컬럼명 목록 (None이면 스펙 전체, (컬럼명, 타입) 튜플 목록도 가능)
+            on_conflict: 충돌 처리 절, 예) "(user_id) DO NOTHING"
+
+        Returns:
+            dict: table, rows_loaded, rows_failed, chunks, failed_chunks, seconds, rows_per_sec
+        """
+        resolved = self.resolve_columns(table, columns)
+        column_names = [name for name, _ in resolved]
+        types = [t for _, t in resolved]
+
+        report = {
+            "table": table,
+            "rows_loaded": 0,
+            "rows_failed": 0,
+            "chunks": 0,
+            "failed_chunks": [],
+        }
+        started = time.perf_counter()
+        iterator = iter(rows)
+        row_offset = 0
+
+        with self.conn.cursor() as cur:
+            while True:
+                chunk = list(islice(iterator, self.chunk_rows))
+                if not chunk:
+                    break
+                if isinstance(chunk[0], dict):
+                    chunk = [tuple(row.get(name) for name in column_names) for row in chunk]
+
+                chunk_index = report["chunks"]
+                first_row, last_row = row_offset, row_offset + len(chunk) - 1
+                row_offset += len(chunk)
+                report["chunks"] += 1
+                try:
+                    loaded = self._copy_chunk(cur, table, column_names, types, chunk, on_conflict)
+                    self.conn.commit()
+                    report["rows_loaded"] += loaded
+                    logger.info(f"[{table}] 청크 {chunk_index} 적재 완료 - 행 {first_row}~{last_row} ({loaded}건)")
+                except Exception as e:
+                    self.conn.rollback()
+                    report["rows_failed"] += len(chunk)
+                    failure = {"chunk": chunk_index, "first_row": first_row, "last_row": last_row, "error": str(e).strip()}
+                    report["failed_chunks"].append(failure)
+                    logger.error(f"[{table}] 청크 {chunk_index} 적재 실패 - 행 {first_row}~{last_row}: {failure['error']}")
+                    if self.stop_on_error:
+                        raise BulkLoadError(f"{table} 청크 {chunk_index} (행 {first_row}~{last_row}) 적재 실패: {e}") from e
+
+        report["seconds"] = round(time.perf_counter() - started, 3)
+        report["rows_per_sec"] = round(report["rows_loaded"] / report["seconds"], 1) if report["seconds"] else 0.0
+        logger.info(
+            f"[{table}] 적재 완료 - {report['rows_loaded']}건 성공, {report['rows_failed']}건 실패, "
+            f"{report['seconds']}초 ({report['rows_per_sec']} rows/sec)"
+        )
+        return report
+
+
+def swap_table(conn, table, staging):
+    """
+    미리 채운 staging 테이블을 table 이름으로 교체 (한 트랜잭션 - 조회는 항상 이전 또는 새 테이블 전체를 봄)
+
+    기본키 인덱스 이름도 {table}_pkey로 맞춰 다음 교체에서 이름이 충돌하지 않게 함
+    실패하면 롤백하고 예외를 다시 발생
+    """
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s) IS NOT NULL;", (table,))
+            if cur.fetchone()[0]:
+                cur.execute(f"LOCK TABLE {table} IN ACCESS EXCLUSIVE MODE;")
+                cur.execute(f"DROP TABLE {table};")
+            cur.execute(f"ALTER TABLE {staging} RENAME TO {table};")
+            cur.execute(f"ALTER INDEX IF EXISTS {staging}_pkey RENAME TO {table}_pkey;")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    logger.info(f"[{table}] {staging} 테이블로 교체 완료")
+
+
+# ---------- 기존 적재 방식과 처리량 비교 ----------
+
+def benchmark(conn, rows=20000, dim=384, chunk_rows=5000, slow_rows=2000):
+    """
+    임시 테이블에 같은 합성 데이터를 적재하며 방식별 rows/sec 비교
+
+    - row_commit      : 행마다 INSERT + COMMIT (AIEmbeddingProcessor 방식)
+    - row_insert      : 행마다 INSERT, 마지막에 한 번 COMMIT (IssueEmbeddingProcessor / CSVtoSQL 방식)
+    - executemany     : cursor.executemany
+    - execute_values  : psycopg2.extras.execute_values (GitHubIssueProcessor 방식)
+    - copy_binary     : BulkLoader
+
+    행 단위 방식은 오래 걸리므로 slow_rows개만 측정해 rows/sec로 환산
+    """
+    from psycopg2.extras import execute_values
+
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((rows, dim)).astype(np.float32)
+    data = [(f"title {i}", f"description {i}", vectors[i]) for i in range(rows)]
+    insert_sql = "INSERT INTO {table} (title, description, embedding) VALUES (%s, %s, %s::vector)"
+
+    def as_params(subset):
+        return [(title, description, vector.tolist()) for title, description, vector in subset]
+
+    def row_commit(cur, table, subset):
+        for params in as_params(subset):
+            cur.execute(insert_sql.format(table=table), params)
+            conn.commit()
+
+    def row_insert(cur, table, subset):
+        for params in as_params(subset):
+            cur.execute(insert_sql.format(table=table), params)
+        conn.commit()
+
+    def executemany(cur, table, subset):
+        cur.executemany(insert_sql.format(table=table), as_params(subset))
+        conn.commit()
+
+    def execute_values_(cur, table, subset):
+        execute_values(cur, f"INSERT INTO {table} (title, description, embedding) VALUES %s",
+                       as_params(subset), template="(%s, %s, %s::vector)", page_size=100)
+        conn.commit()
+
+    methods = [
+        ("row_commit", row_commit, slow_rows),
+        ("row_insert", row_insert, slow_rows),
+        ("executemany", executemany, slow_rows),
+        ("execute_values", execute_values_, rows),
+        ("copy_binary", None, rows),
+    ]
+
+    results = []
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+        conn.commit()
+        for name, method, count in methods:
+            table = f"bulk_bench_{name}"
+            # 세션 종료시 삭제되는 임시 테이블 (design 테이블과 같은 컬럼 구성)
+            cur.execute(f"DROP TABLE IF EXISTS {table};")
+            cur.execute(f"CREATE TEMP TABLE {table} (id SERIAL PRIMARY KEY, title TEXT, description TEXT, embedding vector({dim}));")
+            conn.commit()
+
+            subset = data[:count]
+            started = time.perf_counter()
+            if method is None:
+                # 임시 테이블은 design 테이블과 컬럼 구성이 같으므로 design 스펙 사용
+                loader = BulkLoader(conn, chunk_rows=chunk_rows, stop_on_error=True)
+                loader.load(table, subset, columns=TABLE_SPECS["design"])
+            else:
+                method(cur, table, subset)
+            elapsed = time.perf_counter() - started
+            results.append({"method": name, "rows": count, "seconds": round(elapsed, 3),
+                            "rows_per_sec": round(count / elapsed, 1)})
+
+    baseline = next(r["rows_per_sec"] for r in results if r["method"] == "row_commit")
+    print("\n" + "=" * 64)
+    print(f"{'method':<16}{'rows':>8}{'seconds':>10}{'rows/sec':>14}{'vs row_commit':>16}")
+    print("-" * 64)
+    for r in results:
+        print(f"{r['method']:<16}{r['rows']:>8}{r['seconds']:>10.2f}{r['rows_per_sec']:>14.1f}"
+              f"{r['rows_per_sec'] / baseline:>15.1f}x")
+    print("=" * 64)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    import psycopg2
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING)
+
+    parser = argparse.ArgumentParser(description="바이너리 COPY 적재기 처리량 비교")
+    parser.add_argument("--benchmark", action="store_true", help="기존 적재 방식과 rows/sec 비교")
+    parser.add_argument("--rows", type=int, default=20000, help="COPY / execute_values 측정 행 수")
+    parser.add_argument("--slow-rows", type=int, default=2000, help="행 단위 방식 측정 행 수")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--chunk-rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    if not args.benchmark:
+        parser.print_help()
+    else:
+        connection = psycopg2.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            port=int(os.getenv("DB_PORT", 5432)),
+            dbname=os.getenv("DB_NAME", "postgres"),
+            user=os.getenv("DB_USER", "postgres"),
+            password=os.getenv("DB_PASSWORD"),
+        )
+        try:
+            benchmark(connection, rows=args.rows, dim=args.dim, chunk_rows=args.chunk_rows, slow_rows=args.slow_rows)
+        finally:
+            connection.close()
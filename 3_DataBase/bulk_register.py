@@ -0,0 +1,233 @@
+"""
+설계안 일괄 등록 (그룹 트랜잭션 + 행 단위 SAVEPOINT)
+
+/register_designs 엔드포인트(app.py, api_index_cosine.py)가 공유하는 도우미입니다.
+
+처리 흐름:
+1. 입력 정리: JSON 배열 또는 sample_designs_500.csv 형태의 CSV(title, description 컬럼)
+   - 제목 / 설명이 비어 있는 행은 임베딩 전에 행 오류로 기록
+2. 임베딩: 유효한 행의 설명을 REGISTER_BULK_EMBED_BATCH_SIZE개씩 마이크로 배처에 넣어 변환
+3. 저장: REGISTER_BULK_GROUP_SIZE개 행마다 트랜잭션 하나
+   - 행마다 SAVEPOINT → INSERT → RELEASE
+   - 잘못된 행(임베딩 차원 불일치, DB 제약 위반 등)은 그 SAVEPOINT까지만 롤백하고 오류를 기록
+     → 한 행 때문에 그룹 전체가 롤백되지 않음
+   - 그룹 끝에서 COMMIT 한 번
+4. 응답: 입력 순서대로 행별 설계안 id 또는 오류 메시지
+
+CSV의 embedding 컬럼은 사용하지 않습니다 (항상 서버의 모델로 임베딩).
+
+임베딩은 마이크로 배처(submit_many)를 거치므로 단건 요청과 같은 큐 / 추론 실행기를 공유합니다.
+큐에 자리가 없으면 요청 전체를 HTTP 429로 거절합니다 (저장 전이므로 일부만 등록되지 않음).
+
+환경변수 (기본값):
+    REGISTER_BULK_MAX_ROWS          요청당 최대 행 수 (5000)
+    REGISTER_BULK_EMBED_BATCH_SIZE  encode 호출당 행 수 (64)
+    REGISTER_BULK_GROUP_SIZE        트랜잭션당 행 수 (500)
+    REGISTER_BULK_QUEUE_LIMIT       일괄 등록이 채울 수 있는 임베딩 대기 큐 길이 (128, 나머지는 단건 요청용)
+"""
+
+import csv
+import io
+import logging
+import os
+
+import psycopg2
+
+from micro_batcher import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+MAX_ROWS = int(os.getenv("REGISTER_BULK_MAX_ROWS", 5000))
+EMBED_BATCH_SIZE = int(os.getenv("REGISTER_BULK_EMBED_BATCH_SIZE", 64))
+GROUP_SIZE = int(os.getenv("REGISTER_BULK_GROUP_SIZE", 500))
+QUEUE_LIMIT = int(os.getenv("REGISTER_BULK_QUEUE_LIMIT", 128))
+
+REQUIRED_CSV_COLUMNS = ("title", "description")
+
+
+class BulkInputError(ValueError):
+    """요청 전체를 처리할 수 없는 입력 (CSV 형식 오류, 행 수 초과 등) - 호출자는 HTTP 400으로 변환"""
+
+
+def parse_designs_csv(data):
+    """
+    업로드된 CSV → [(title, description)]
+
+    Args:
+        data: CSV 바이트 또는 문자열 (UTF-8, BOM 허용)
+    Raises:
+        BulkInputError: 인코딩 오류, 필수 컬럼 누락, 행 수 초과
+    """
+    if isinstance(data, bytes):
+        try:
+            data = data.decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            raise BulkInputError(f"CSV는 UTF-8 인코딩이어야 합니다: {e}")
+    reader = csv.DictReader(io.StringIO(data))
+    missing = [column for column in REQUIRED_CSV_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise BulkInputError(f"CSV에 필수 컬럼이 없습니다: {', '.join(missing)} (필요: title, description)")
+    items = [(row.get("title") or "", row.get("description") or "") for row in reader]
+    check_row_count(items)
+    return items
+
+
+def parse_design_items(payload):
+    """
+    JSON 본문 → [(title, description)]
+
+    Args:
+        payload: [{"title", "description"}, ...] 또는 {"designs": [...]}
+    Raises:
+        BulkInputError: 배열이 아님, 행 수 초과
+    """
+    if isinstance(payload, dict):
+        payload = payload.get("designs")
+    if not isinstance(payload, list):
+        raise BulkInputError("설계안 배열 또는 {\"designs\": [...]} 형식이어야 합니다.")
+    items = []
+    for item in payload:
+        item = item if isinstance(item, dict) else {}
+        title, description = item.get("title"), item.get("description")
+        items.append((title if isinstance(title, str) else "", description if isinstance(description, str) else ""))
+    check_row_count(items)
+    return items
+
+
+async def read_designs_request(request):
+    """
+    요청 본문 종류별 파싱 (FastAPI Request)
+    - multipart/form-data: file 필드의 CSV
+    - text/csv: 본문 전체가 CSV
+    - 그 외: JSON (parse_design_items)
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise BulkInputError("CSV 파일을 file 필드로 업로드하세요.")
+        return parse_designs_csv(await upload.read())
+    if content_type.startswith("text/csv"):
+        return parse_designs_csv(await request.body())
+    try:
+        payload = await request.json()
+    except ValueError as e:
+        raise BulkInputError(f"JSON 본문을 해석할 수 없습니다: {e}")
+    return parse_design_items(payload)
+
+
+def check_row_count(items):
+    if not items:
+        raise BulkInputError("등록할 설계안이 없습니다.")
+    if len(items) > MAX_ROWS:
+        raise BulkInputError(f"요청당 최대 {MAX_ROWS}건까지 등록할 수 있습니다 (요청: {len(items)}건).")
+
+
+def validate_items(items):
+    """
+    빈 제목 / 설명 확인
+
+    Returns:
+        tuple: (임베딩할 행 번호 목록, {행 번호: 오류 메시지})
+    """
+    valid, errors = [], {}
+    for index, (title, description) in enumerate(items):
+        if not title.strip() or not description.strip():
+            errors[index] = "제목과 설명은 필수 입력 항목입니다."
+        else:
+            valid.append(index)
+    return valid, errors
+
+
+async def embed_rows(items, indices, encode_batch, batch_size=EMBED_BATCH_SIZE):
+    """
+    유효한 행의 설명을 batch_size개씩 임베딩
+
+    Args:
+        encode_batch: 설명 리스트 → 벡터 리스트 코루틴 함수 (예: embedding_batcher.submit_many)
+    Returns:
+        tuple: ([(행 번호, title, description, embedding)], {행 번호: 오류 메시지})
+            - encode 호출이 실패하면 그 배치의 행만 오류로 기록
+    Raises:
+        QueueFullError: 임베딩 대기 큐에 자리가 없음 (과부하 - 호출자는 HTTP 429로 변환)
+    """
+    rows, errors = [], {}
+    for start in range(0, len(indices), batch_size):
+        chunk = indices[start:start + batch_size]
+        try:
+            vectors = await encode_batch([items[index][1] for index in chunk])
+        except QueueFullError:
+            raise
+        except Exception as e:
+            logger.error(f"일괄 등록 임베딩 실패 ({len(chunk)}건): {e}")
+            errors.update({index: f"임베딩 생성 실패: {e}" for index in chunk})
+            continue
+        rows.extend((index, items[index][0], items[index][1], vector) for index, vector in zip(chunk, vectors))
+    return rows, errors
+
+
+def insert_grouped(conn, table, columns, rows, dimension, group_size=GROUP_SIZE):
+    """
+    행을 group_size개씩 트랜잭션으로 저장 (행 단위 SAVEPOINT)
+
+    Args:
+        conn: psycopg2 연결 (autocommit 아님)
+        table: 대상 테이블 (id SERIAL 기본키)
+        columns: (제목 컬럼, 설명 컬럼, 벡터 컬럼)
+        rows: [(행 번호, title, description, embedding)]
+        dimension: 기대하는 임베딩 차원
+    Returns:
+        dict: 행 번호 → ("id", 설계안 id) 또는 ("error", 오류 메시지)
+    """
+    insert_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES (%s, %s, %s) RETURNING id;"
+    results = {}
+    for start in range(0, len(rows), group_size):
+        group = rows[start:start + group_size]
+        group_results = {}
+        try:
+            with conn.cursor() as cur:
+                for index, title, description, embedding in group:
+                    if embedding is None or len(embedding) != dimension:
+                        size = len(embedding) if embedding is not None else 0
+                        group_results[index] = ("error", f"유효하지 않은 임베딩 차원: {size} (필요: {dimension})")
+                        continue
+                    cur.execute("SAVEPOINT register_row;")
+                    try:
+                        cur.execute(insert_sql, (title, description, embedding))
+                        group_results[index] = ("id", cur.fetchone()[0])
+                        cur.execute("RELEASE SAVEPOINT register_row;")
+                    except psycopg2.Error as e:
+                        if conn.closed:
+                            raise
+                        cur.execute("ROLLBACK TO SAVEPOINT register_row;")
+                        group_results[index] = ("error", (e.pgerror or str(e)).strip())
+            conn.commit()
+        except psycopg2.Error as e:
+            # 연결 끊김 / 커밋 실패: 이 그룹은 롤백, 이전 그룹은 이미 커밋됨 → 남은 행 모두 오류로 기록
+            logger.error(f"일괄 등록 그룹 저장 실패 ({start}번째 행부터): {e}")
+            if not conn.closed:
+                conn.rollback()
+            for index, *_ in rows[start:]:
+                results[index] = ("error", f"그룹 트랜잭션 실패: {str(e).strip()}")
+            break
+        results.update(group_results)
+    return results
+
+
+def build_results(count, errors, stored):
+    """
+    입력 순서대로 행별 결과 목록
+
+    Returns:
+        list: {"index", "design_id", "error"} 딕셔너리
+    """
+    results = []
+    for index in range(count):
+        if index in errors:
+            results.append({"index": index, "design_id": None, "error": errors[index]})
+            continue
+        kind, value = stored.get(index, ("error", "저장되지 않았습니다."))
+        results.append({"index": index, "design_id": value if kind == "id" else None,
+                        "error": value if kind == "error" else None})
+    return results
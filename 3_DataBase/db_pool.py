@@ -0,0 +1,242 @@
+"""
+PostgreSQL 커넥션 풀 (psycopg2 ThreadedConnectionPool 확장)
+
+주요 기능:
+1. 최소/최대 커넥션 수 설정 - 요청마다 TCP 연결 + 인증을 반복하지 않음
+2. 풀이 가득 차면 timeout까지 대기 (대기 시간 메트릭 기록, 초과시 PoolTimeoutError)
+3. 체크아웃 시 헬스 체크 - 닫힌 연결은 폐기, 오래 쉬던 연결은 SELECT 1로 확인
+4. 최대 수명(max_lifetime)을 넘긴 연결은 새 연결로 교체 (서버 재시작/방화벽 타임아웃 대비)
+5. 반납 시 열린 트랜잭션은 자동 롤백
+
+사용 예시:
+    db_pool = PooledDB.from_env(DB_CONFIG, name="design")
+    db_pool.open()
+    with db_pool.connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1;")
+
+환경변수:
+    DB_POOL_MIN            최소 커넥션 수 (기본값: 1)
+    DB_POOL_MAX            최대 커넥션 수 (기본값: 10)
+    DB_POOL_TIMEOUT        체크아웃 최대 대기 시간, 초 (기본값: 5)
+    DB_POOL_MAX_LIFETIME   커넥션 최대 수명, 초 (기본값: 1800)
+    DB_POOL_IDLE_CHECK     이 시간(초) 이상 쉬었던 연결만 SELECT 1로 확인 (기본값: 30)
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+from psycopg2.pool import ThreadedConnectionPool
+
+from micro_batcher import _percentile
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(Exception):
+    """timeout 안에 커넥션을 얻지 못했을 때 발생 (API에서는 HTTP 503으로 변환)"""
+
+
+class PooledDB:
+    """
+    헬스 체크와 최대 수명 관리를 추가한 스레드 안전 커넥션 풀
+
+    Args:
+        db_config: psycopg2.connect에 전달할 접속 정보 딕셔너리
+        minconn: 최소 커넥션 수
+        maxconn: 최대 커넥션 수
+        timeout: 체크아웃 최대 대기 시간 (초)
+        max_lifetime: 커넥션 최대 수명 (초)
+        idle_check: 이 시간(초) 이상 사용되지 않은 연결은 체크아웃 시 SELECT 1로 확인
+        name: 로그/메트릭에 표시할 이름
+    """
+
+    def __init__(self, db_config, minconn=1, maxconn=10, timeout=5.0, max_lifetime=1800.0,
+                 idle_check=30.0, name="db"):
+        self.db_config = db_config
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.idle_check = idle_check
+        self.name = name
+
+        self._pool = None
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._created_at = {}   # id(conn) → 생성 시각
+        self._last_used = {}    # id(conn) → 마지막 반납 시각
+
+        # 메트릭
+        self._checkouts = 0
+        self._timeouts = 0
+        self._in_use = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._wait_ms = deque(maxlen=1000)
+        self._hold_ms = deque(maxlen=1000)
+
+    @classmethod
+    def from_env(cls, db_config, name="db"):
+        """환경변수(DB_POOL_*)에서 풀 설정을 읽어 생성"""
+        return cls(
+            db_config,
+            minconn=int(os.getenv("DB_POOL_MIN", 1)),
+            maxconn=int(os.getenv("DB_POOL_MAX", 10)),
+            timeout=float(os.getenv("DB_POOL_TIMEOUT", 5)),
+            max_lifetime=float(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+            idle_check=float(os.getenv("DB_POOL_IDLE_CHECK", 30)),
+            name=name,
+        )
+
+    def open(self):
+        """풀 생성 (minconn개 연결을 미리 생성)"""
+        if self._pool is not None:
+            return
+        self._pool = ThreadedConnectionPool(self.minconn, self.maxconn, **self.db_config)
+        logger.info(f"[{self.name}] 커넥션 풀 생성 - min={self.minconn}, max={self.maxconn}")
+
+    def close(self):
+        """풀의 모든 연결 종료"""
+        if self._pool is not None:
+            self._pool.closeall()
+            self._pool = None
+            logger.info(f"[{self.name}] 커넥션 풀 종료")
+
+    # ---------- 체크아웃 / 반납 ----------
+
+    def _is_usable(self, conn):
+        """체크아웃 시 헬스 체크 - 사용 가능한 연결이면 True"""
+        if conn.closed:
+            return False
+        if conn.info.transaction_status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            return False
+        idle = time.time() - self._last_used.get(id(conn), 0)
+        if idle < self.idle_check:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        """연결을 닫고 풀에서 제거"""
+        self._created_at.pop(id(conn), None)
+        self._last_used.pop(id(conn), None)
+        try:
+            self._pool.putconn(conn, close=True)
+        except Exception:
+            pass
+
+    def getconn(self):
+        """커넥션 체크아웃 (헬스 체크 + 최대 수명 확인 포함)"""
+        if self._pool is None:
+            raise RuntimeError(f"[{self.name}] 커넥션 풀이 열려 있지 않습니다.")
+
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.timeout):
+            self._timeouts += 1
+            raise PoolTimeoutError(f"[{self.name}] {self.timeout}초 안에 DB 커넥션을 얻지 못했습니다.")
+
+        try:
+            while True:
+                conn = self._pool.getconn()
+                created_at = self._created_at.setdefault(id(conn), time.time())
+                if time.time() - created_at > self.max_lifetime:
+                    self._recycled += 1
+                    self._discard(conn)
+                    continue
+                if not self._is_usable(conn):
+                    self._discarded += 1
+                    self._discard(conn)
+                    continue
+                break
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._wait_ms.append((time.perf_counter() - started) * 1000)
+        conn._pool_checkout_at = time.perf_counter()
+        return conn
+
+    def putconn(self, conn):
+        """커넥션 반납 (열린 트랜잭션은 롤백, 깨진 연결은 폐기)"""
+        try:
+            with self._lock:
+                self._in_use -= 1
+                checkout_at = getattr(conn, "_pool_checkout_at", None)
+                if checkout_at is not None:
+                    self._hold_ms.append((time.perf_counter() - checkout_at) * 1000)
+
+            if conn.closed:
+                self._discarded += 1
+                self._discard(conn)
+                return
+            if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    self._discarded += 1
+                    self._discard(conn)
+                    return
+            self._last_used[id(conn)] = time.time()
+            self._pool.putconn(conn)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """with 문으로 사용하는 체크아웃 (예외 발생시 롤백 후 반납)"""
+        conn = self.getconn()
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    pass
+            raise
+        finally:
+            self.putconn(conn)
+
+    # ---------- 메트릭 ----------
+
+    def get_metrics(self):
+        """풀 크기, 체크아웃 대기 시간, 교체/폐기 횟수 반환"""
+        with self._lock:
+            waits = list(self._wait_ms)
+            holds = list(self._hold_ms)
+            return {
+                "name": self.name,
+                "min_size": self.minconn,
+                "max_size": self.maxconn,
+                "open_connections": len(self._created_at),
+                "in_use": self._in_use,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "recycled_max_lifetime": self._recycled,
+                "discarded_unhealthy": self._discarded,
+                "wait_ms": {
+                    "p50": round(_percentile(waits, 50), 3),
+                    "p95": round(_percentile(waits, 95), 3),
+                    "p99": round(_percentile(waits, 99), 3),
+                    "max": round(max(waits), 3) if waits else 0.0,
+                },
+                "hold_ms": {
+                    "p50": round(_percentile(holds, 50), 3),
+                    "p99": round(_percentile(holds, 99), 3),
+                },
+            }
@@ -0,0 +1,249 @@
+"""
+콘텐츠 주소 기반(Content-addressed) 영구 임베딩 캐시
+
+주요 기능:
+1. 캐시 키 = sha256(모델명 + 정규화 여부 + 텍스트) → 같은 텍스트는 다시 임베딩하지 않음
+2. 메모리 LRU(1차) + SQLite 디스크 저장소(2차) 2단 구조
+3. 디스크 저장소는 최대 항목 수를 넘으면 오래 사용되지 않은 항목부터 삭제 (LRU 근사)
+4. 한 번의 호출 안에서 중복된 텍스트도 한 번만 인코딩
+5. 메모리/디스크 적중(hit), 미스(miss) 카운터 제공
+
+사용 예시:
+    cache = EmbeddingCache("sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2")
+    embeddings = cache.encode(model, texts, batch_size=32)   # numpy 배열 (n, 384)
+    print(cache.stats())
+
+환경변수:
+    EMBEDDING_CACHE_PATH         SQLite 파일 경로 (기본값: 3_DataBase/.cache/embedding_cache.sqlite3)
+    EMBEDDING_CACHE_MEMORY_SIZE  메모리 LRU 최대 항목 수 (기본값: 10000)
+    EMBEDDING_CACHE_MAX_ENTRIES  디스크 최대 항목 수 (기본값: 500000)
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".cache", "embedding_cache.sqlite3"
+)
+
+
+class EmbeddingCache:
+    """
+    메모리 LRU + SQLite 디스크 저장소로 구성된 임베딩 캐시
+
+    Args:
+        model_name: 임베딩 모델 이름 (캐시 키에 포함)
+        normalize: encode 시 normalize_embeddings 사용 여부 (캐시 키에 포함)
+        path: SQLite 파일 경로 (None이면 환경변수 또는 기본 경로)
+        memory_size: 메모리 LRU 최대 항목 수
+        max_disk_entries: 디스크 저장소 최대 항목 수 (초과시 eviction)
+    """
+
+    def __init__(self, model_name, normalize=False, path=None, memory_size=None, max_disk_entries=None):
+        self.model_name = model_name
+        self.normalize = normalize
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.memory_size = memory_size or int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", 10000))
+        self.max_disk_entries = max_disk_entries or int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 500000))
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        # 적중/미스 카운터
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        # FastAPI 스레드 풀에서도 사용하므로 check_same_thread=False + 락으로 보호
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn.execute("PRAGMA synchronous=NORMAL;")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_access REAL NOT NULL
+            );
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access);")
+        self._conn.commit()
+
+    def make_key(self, text):
+        """(모델명, 정규화 여부, 텍스트 해시)로 캐시 키 생성"""
+        raw = f"{self.model_name}\x1f{int(bool(self.normalize))}\x1f{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ---------- 메모리 LRU ----------
+
+    def _memory_get(self, key):
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+        return vector
+
+    def _memory_put(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    # ---------- 조회 / 저장 ----------
+
+    def get_many(self, texts):
+        """텍스트 리스트에 대한 캐시 조회 (없는 항목은 None)"""
+        keys = [self.make_key(text) for text in texts]
+        results = [None] * len(texts)
+        disk_lookup = {}
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._memory_get(key)
+                if vector is not None:
+                    results[i] = vector
+                    self.memory_hits += 1
+                else:
+                    disk_lookup.setdefault(key, []).append(i)
+
+            if disk_lookup:
+                found = self._disk_get(list(disk_lookup.keys()))
+                for key, positions in disk_lookup.items():
+                    vector = found.get(key)
+                    if vector is None:
+                        self.misses += len(positions)
+                        continue
+                    self.disk_hits += len(positions)
+                    self._memory_put(key, vector)
+                    for i in positions:
+                        results[i] = vector
+        return results
+
+    def put_many(self, texts, vectors):
+        """텍스트-벡터 쌍을 메모리와 디스크에 저장"""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.make_key(text)
+                vector = np.asarray(vector, dtype=np.float32)
+                self._memory_put(key, vector)
+                rows.append((key, int(vector.shape[0]), vector.tobytes(), now))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_access) VALUES (?, ?, ?, ?);",
+                rows
+            )
+            self._conn.commit()
+            self._evict_if_needed()
+
+    def _disk_get(self, keys):
+        """디스크 저장소 조회 (SQLite 변수 개수 제한을 고려해 500개씩 나눠 조회)"""
+        found = {}
+        now = time.time()
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders});", chunk
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        if found:
+            # LRU eviction을 위해 마지막 사용 시각 갱신
+            self._conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE key = ?;",
+                [(now, key) for key in found]
+            )
+            self._conn.commit()
+        return found
+
+    def _evict_if_needed(self):
+        """디스크 항목 수가 상한을 넘으면 오래된 항목부터 삭제 (상한의 90%까지)"""
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings;").fetchone()[0]
+        if count <= self.max_disk_entries:
+            return
+        to_delete = count - int(self.max_disk_entries * 0.9)
+        self._conn.execute("""
+            DELETE FROM embeddings WHERE key IN (
+                SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?
+            );
+        """, (to_delete,))
+        self._conn.commit()
+        self.evictions += to_delete
+        logger.info(f"임베딩 캐시 eviction: {to_delete}개 항목 삭제")
+
+    # ---------- 모델 연동 ----------
+
+    def encode(self, model, texts, batch_size=32, **encode_kwargs):
+        """
+        캐시를 거쳐 텍스트를 임베딩 (SentenceTransformer.encode 대체)
+
+        - 캐시에 있는 텍스트는 모델 추론을 건너뜀
+        - 미스 난 텍스트는 중복 제거 후 한 번에 인코딩하여 캐시에 저장
+
+        Returns:
+            numpy.ndarray: (len(texts), dim) float32 배열
+        """
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        cached = self.get_many(texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, cached) if vector is None))
+
+        if missing:
+            new_vectors = model.encode(
+                missing,
+                batch_size=batch_size,
+                normalize_embeddings=self.normalize,
+                **encode_kwargs
+            )
+            new_vectors = np.asarray(new_vectors, dtype=np.float32)
+            self.put_many(missing, new_vectors)
+            computed = dict(zip(missing, new_vectors))
+            cached = [vector if vector is not None else computed[text] for text, vector in zip(texts, cached)]
+
+        return np.vstack(cached)
+
+    # ---------- 통계 ----------
+
+    def stats(self):
+        """적중/미스 카운터 및 적중률 반환"""
+        total = self.memory_hits + self.disk_hits + self.misses
+        with self._lock:
+            disk_entries = self._conn.execute("SELECT COUNT(*) FROM embeddings;").fetchone()[0]
+        return {
+            "model_name": self.model_name,
+            "normalize": self.normalize,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "memory_entries": len(self._memory),
+            "disk_entries": disk_entries,
+            "path": self.path,
+        }
+
+    def log_stats(self):
+        """캐시 통계를 로그로 출력"""
+        s = self.stats()
+        logger.info(
+            f"임베딩 캐시 - 메모리 적중: {s['memory_hits']}, 디스크 적중: {s['disk_hits']}, "
+            f"미스: {s['misses']}, 적중률: {s['hit_ratio'] * 100:.1f}%"
+        )
+
+    def close(self):
+        """SQLite 연결 종료"""
+        with self._lock:
+            self._conn.close()
@@ -37,7 +37,7 @@ import pandas as pd
 from sentence_transformers import SentenceTransformer
 # JSON 데이터 처리를 위한 라이브러리 (사용하지 않지만 임포트됨)
 import json
-# 수치 연산을 위한 NumPy 라이브러리 (사용하지 않지만 임포트됨)
+# 수치 연산을 위한 NumPy 라이브러리 (--trust-csv 모드의 벡터 검증 / 모델 대조)
 import numpy as np
 # 정규 표현식 처리를 위한 re 라이브러리 (사용하지 않지만 임포트됨)
 import re
@@ -45,6 +45,18 @@ import re
 import os
 # .env 파일에서 환경변수를 로드하기 위한 python-dotenv 라이브러리
 from dotenv import load_dotenv
+# 이미 임베딩한 텍스트를 재사용하기 위한 영구 임베딩 캐시 (메모리 LRU + SQLite)
+from embedding_cache import EmbeddingCache
+# 바이너리 COPY 대량 적재기 (--bulk, --trust-csv 모드에서 사용) / CSV 벡터 문자열 벡터화 파서
+from bulk_loader import BulkLoader, parse_vector_texts
+# 처리 시간 측정 (--trust-csv 모드의 파싱 / 검증 / 적재 시간)
+import time
+# 실행 옵션(--bulk, --limit, --checkpoint, --resume, --trust-csv) 파싱용
+import argparse
+# 행 내용 해시(content_hash)와 CSV 파일 지문 계산용
+import hashlib
+# 여러 행을 INSERT 한 번으로 저장 (--checkpoint / --resume 모드)
+from psycopg2.extras import execute_values
 
 # .env 파일에서 환경변수를 시스템 환경변수로 로드
 # 이 함수는 .env 파일의 KEY=VALUE 형태를 읽어 os.getenv()로 접근 가능하게 함
@@ -65,6 +77,38 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD")
 }
 
+# 사용할 임베딩 모델 이름 (모델 로딩과 캐시 키에 함께 사용)
+MODEL_NAME = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+
+# 설계안 CSV 경로 (DESIGN_CSV_PATH 환경변수로 변경 가능)
+CSV_PATH = os.getenv("DESIGN_CSV_PATH", '/Users/ichangmin/MyDrive/SKALA/SKALA/3_DataBase/file/sample_designs_500.csv')
+
+# 재개 가능 적재 모드: 트랜잭션(배치)당 행 수 - 배치가 커밋될 때마다 체크포인트도 함께 커밋됨
+INGEST_BATCH_ROWS = int(os.getenv("INGEST_BATCH_ROWS", 256))
+
+# 행 내용 해시: 제목과 설명을 구분자(\x1f)로 이어 SHA-256 (아래 SQL 백필과 같은 규칙)
+CONTENT_HASH_SQL = "encode(sha256(convert_to(title || chr(31) || description, 'UTF8')), 'hex')"
+
+
+# 미리 계산된 임베딩 적재 모드 (--trust-csv): 기대 차원, 모델 대조 표본 수, 허용 코사인 오차
+EMBEDDING_DIM = 384
+TRUST_VERIFY_SAMPLE = int(os.getenv("TRUST_VERIFY_SAMPLE", 0))        # 0이면 모델 대조 생략 (추론 없음)
+TRUST_COSINE_TOLERANCE = float(os.getenv("TRUST_COSINE_TOLERANCE", 0.01))  # 코사인 유사도 ≥ 1 - 허용 오차
+
+
+def content_hash(title, description):
+    """설계안 행의 자연키 - 같은 제목/설명은 같은 해시 (design.content_hash UNIQUE)"""
+    return hashlib.sha256(f"{title}\x1f{description}".encode("utf-8")).hexdigest()
+
+
+def file_fingerprint(path):
+    """CSV 파일 지문 (크기 + SHA-256) - 파일이 바뀌면 체크포인트를 이어 쓰지 않음"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return f"{os.path.getsize(path)}:{digest.hexdigest()}"
+
 class AIEmbeddingProcessor:
     """
     AI 임베딩과 PostgreSQL 트랜잭션을 처리하는 메인 클래스
@@ -76,14 +120,26 @@ class AIEmbeddingProcessor:
     4. 에러 발생시 자동 재시도 및 폴백 처리
     """
     
-    def __init__(self):
+    def __init__(self, load_model=True):
+        # load_model=False: 모델 없이 시작 (--trust-csv 모드처럼 추론이 필요 없을 때) - 필요하면 ensure_model()
+        self.model = None
+        if load_model:
+            self.ensure_model()
+        # 영구 임베딩 캐시 열기 - 같은 description은 재실행해도 다시 임베딩하지 않음
+        self.cache = EmbeddingCache(MODEL_NAME)
+    
+    def ensure_model(self):
+        """임베딩 모델이 아직 없으면 로드"""
+        if self.model is not None:
+            return self.model
         # 한국어 지원 임베딩 모델 로드 (첫 실행시 자동 다운로드됨)
         # 384차원 벡터 생성, 다국어 지원 모델 사용
         print("임베딩 모델을 로딩 중입니다...")  # 사용자에게 로딩 시작 알림
         # sentence-transformers 라이브러리로 사전 훈련된 다국어 임베딩 모델 로드
         # 'paraphrase-multilingual-MiniLM-L12-v2': 한국어 포함 104개 언어 지원 모델
-        self.model = SentenceTransformer('sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+        self.model = SentenceTransformer(MODEL_NAME)
         print("모델 로딩 완료!")  # 사용자에게 로딩 완료 알림
+        return self.model
         
     def create_database_table(self):
         """
@@ -93,6 +149,7 @@ class AIEmbeddingProcessor:
         - pgvector 확장 활성화 (벡터 데이터 타입 지원)
         - design 테이블 생성 (id, title, description, embedding, created_at)
         - embedding 컬럼은 384차원 vector 타입으로 정의
+        - content_hash 컬럼 / UNIQUE 인덱스 / 체크포인트 테이블 준비 (ensure_ingest_tables)
         """
         try:
             # psycopg2를 사용하여 PostgreSQL 데이터베이스에 연결 시도
@@ -115,6 +172,8 @@ class AIEmbeddingProcessor:
             """
             # 테이블 생성 쿼리 실행
             cur.execute(create_table_sql)
+            # 모든 적재 모드가 content_hash로 중복을 막도록 컬럼과 UNIQUE 인덱스 준비
+            self.ensure_ingest_tables(conn)
             
             # 트랜잭션 커밋 (변경사항을 데이터베이스에 영구 저장)
             conn.commit()
@@ -141,6 +200,7 @@ class AIEmbeddingProcessor:
         - 유효한 경우: INSERT 후 COMMIT
         - 실패한 경우: 자동 ROLLBACK
         - 각 설계안마다 독립적인 트랜잭션 처리
+        - 같은 content_hash가 이미 있으면 저장하지 않고 기존 ID 반환 (다시 실행해도 중복 없음)
         """
         conn = None  # 연결 객체 초기화 (finally 블록에서 안전하게 닫기 위함)
         try:
@@ -155,17 +215,30 @@ class AIEmbeddingProcessor:
                 raise ValueError(f"유효하지 않은 임베딩: 차원={len(embedding) if embedding else 0}")
             
             # INSERT 쿼리 정의 (RETURNING id로 생성된 ID 반환받음)
+            # content_hash가 이미 있으면 DO NOTHING → 반환 행 없음
             insert_sql = """
-            INSERT INTO design (title, description, embedding) 
-            VALUES (%s, %s, %s)
+            INSERT INTO design (title, description, embedding, content_hash) 
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (content_hash) DO NOTHING
             RETURNING id;
             """
             
             # 매개변수화된 쿼리 실행 (SQL 인젝션 방지)
             # %s는 psycopg2가 안전하게 값을 바인딩함
-            cur.execute(insert_sql, (title, description, embedding))
+            row_hash = content_hash(title, description)
+            cur.execute(insert_sql, (title, description, embedding, row_hash))
             # INSERT 결과로 반환된 ID 값 가져오기
-            design_id = cur.fetchone()[0]
+            row = cur.fetchone()
+            if row is None:
+                # 이미 저장된 설계안 - 기존 ID 조회
+                cur.execute("SELECT id FROM design WHERE content_hash = %s;", (row_hash,))
+                design_id = cur.fetchone()[0]
+                conn.commit()
+                cur.close()
+                conn.close()
+                print(f"⏭️ 이미 저장됨: 설계안 '{title}' (ID: {design_id})")
+                return design_id
+            design_id = row[0]
             
             # 트랜잭션 커밋 (데이터를 영구 저장)
             conn.commit()
@@ -190,16 +263,17 @@ class AIEmbeddingProcessor:
         AI 모델을 사용하여 텍스트를 384차원 임베딩 벡터로 변환
         
         처리 과정:
-        1. sentence-transformers 모델로 텍스트 인코딩
-        2. numpy array를 Python list로 변환
-        3. 384차원 벡터 반환
+        1. 임베딩 캐시 조회 (있으면 모델 추론 생략)
+        2. 캐시에 없으면 sentence-transformers 모델로 텍스트 인코딩 후 캐시에 저장
+        3. numpy array를 Python list로 변환
+        4. 384차원 벡터 반환
         
         사용 모델: paraphrase-multilingual-MiniLM-L12-v2 (한국어 지원)
         """
         try:
-            # sentence-transformers 모델을 사용하여 텍스트를 벡터로 인코딩
+            # 캐시를 거쳐 sentence-transformers 모델로 텍스트를 벡터로 인코딩
             # 입력: 문자열 텍스트, 출력: 384차원 numpy 배열
-            embedding = self.model.encode(text)
+            embedding = self.cache.encode(self.model, [text])[0]
             
             # numpy array를 Python list로 변환 (JSON 직렬화 가능하게 만듦)
             # PostgreSQL에 저장하기 위해서는 list 형태여야 함
@@ -223,8 +297,8 @@ class AIEmbeddingProcessor:
         """
         try:
             # pandas 라이브러리를 사용하여 CSV 파일을 DataFrame으로 읽기
-            # 절대 경로로 파일 위치 지정
-            df = pd.read_csv('/Users/ichangmin/MyDrive/SKALA/SKALA/3_DataBase/file/sample_designs_500.csv')
+            # 파일 위치는 CSV_PATH (기본값: 절대 경로, DESIGN_CSV_PATH로 변경 가능)
+            df = pd.read_csv(CSV_PATH)
             # 성공 메시지와 함께 로드된 데이터의 행 개수 출력
             print(f"CSV 파일 로딩 완료 - 총 {len(df)}개 행")
             return df  # DataFrame 객체 반환
@@ -324,6 +398,379 @@ class AIEmbeddingProcessor:
         print(f"❌ 실패: {fail_count}개")    # 실패한 설계안 개수
         # 성공률 계산 및 출력 (소수점 첫째자리까지)
         print(f"📊 성공률: {success_count/total_count*100:.1f}%")
+        
+        # 임베딩 캐시 적중/미스 통계 출력 (재실행시 대부분 적중해야 정상)
+        cache_stats = self.cache.stats()
+        print(f"🗂️ 임베딩 캐시: 적중 {cache_stats['memory_hits'] + cache_stats['disk_hits']}개, "
+              f"미스 {cache_stats['misses']}개 (적중률 {cache_stats['hit_ratio']*100:.1f}%)")
+
+    def bulk_save_all_designs(self, limit=None, chunk_rows=5000):
+        """
+        대량 적재 모드 - 임베딩을 배치로 생성한 뒤 COPY(바이너리)로 청크 단위 저장
+        
+        process_and_save_all_designs와 달리 행마다 연결/커밋하지 않으므로 수십만 건도 빠르게 적재
+        (청크 단위 트랜잭션: 실패한 청크만 롤백되고 행 범위가 리포트됨)
+        content_hash ON CONFLICT DO NOTHING으로 다시 실행해도 중복 저장되지 않음
+        
+        Args:
+            limit: 처리할 데이터 개수 제한 (None이면 전체 처리)
+            chunk_rows: COPY 청크당 행 수
+        """
+        # CSV 로드 및 테이블 생성 (기존 방식과 동일)
+        df = self.load_csv_data()
+        if df is None or not self.create_database_table():
+            return
+        
+        # 처리 대상 선택 후 제목/설명 정리
+        df = df.head(limit) if limit else df
+        titles = df['title'].astype(str).str.strip().tolist()
+        descriptions = df['description'].astype(str).str.strip().tolist()
+        print(f"\n=== {len(df)}개 설계안 대량 적재 시작 ===")
+        
+        # 1. 임베딩 일괄 생성 (캐시 적중분은 모델 호출 생략)
+        embeddings = self.cache.encode(self.model, descriptions, batch_size=64, show_progress_bar=True)
+        
+        # 2. COPY 바이너리로 design 테이블에 청크 단위 적재
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            loader = BulkLoader(conn, chunk_rows=chunk_rows)
+            rows = (
+                (title, description, embedding, content_hash(title, description))
+                for title, description, embedding in zip(titles, descriptions, embeddings)
+            )
+            report = loader.load(
+                "design", rows,
+                columns=[("title", "text"), ("description", "text"), ("embedding", "vector"), ("content_hash", "text")],
+                on_conflict="(content_hash) DO NOTHING"
+            )
+        finally:
+            conn.close()
+        
+        # 3. 결과 출력 (실패 청크는 행 범위와 오류 메시지 표시)
+        for failure in report['failed_chunks']:
+            print(f"❌ 행 {failure['first_row']}~{failure['last_row']} 적재 실패: {failure['error']}")
+        skipped = len(titles) - report['rows_loaded'] - report['rows_failed']
+        print("\n=== 대량 적재 완료 ===")
+        print(f"✅ 성공: {report['rows_loaded']}개, ⏭️ 이미 저장됨: {skipped}개, ❌ 실패: {report['rows_failed']}개")
+        print(f"⚡ 처리량: {report['rows_per_sec']} rows/sec ({report['seconds']}초)")
+
+    def ensure_ingest_tables(self, conn):
+        """
+        중복 방지 / 재개 가능 적재에 필요한 컬럼 / 인덱스 / 체크포인트 테이블 준비 (create_database_table에서 호출)
+        
+        - design.content_hash: 행 내용 해시 (TEXT, UNIQUE) → ON CONFLICT DO NOTHING으로 중복 저장 방지
+          (CHAR(64)로 만든 기존 컬럼은 TEXT로 변환 - bpchar 컬럼은 text[] 비교(= ANY)에서 인덱스를 타지 못함)
+        - 기존 행은 SQL로 해시를 채움 (이미 중복 저장된 행은 가장 작은 id 한 행만 해시를 갖고 나머지는 NULL)
+        - design_ingest_checkpoint: 파일별 마지막 처리 위치 + 파일 지문
+        """
+        cur = conn.cursor()
+        cur.execute("ALTER TABLE design ADD COLUMN IF NOT EXISTS content_hash TEXT;")
+        cur.execute("""
+            SELECT data_type FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'design' AND column_name = 'content_hash';
+        """)
+        if cur.fetchone()[0] == 'character':
+            cur.execute("ALTER TABLE design ALTER COLUMN content_hash TYPE TEXT;")
+            print("🔑 content_hash 컬럼을 CHAR(64) → TEXT로 변환")
+        cur.execute(f"""
+            UPDATE design d SET content_hash = h.content_hash
+            FROM (
+                SELECT id, content_hash, row_number() OVER (PARTITION BY content_hash ORDER BY id) AS rn
+                FROM (SELECT id, {CONTENT_HASH_SQL} AS content_hash FROM design WHERE content_hash IS NULL) hashed
+                WHERE NOT EXISTS (SELECT 1 FROM design x WHERE x.content_hash = hashed.content_hash)
+            ) h
+            WHERE d.id = h.id AND h.rn = 1 AND d.content_hash IS NULL;
+        """)
+        if cur.rowcount:
+            print(f"🔑 기존 설계안 {cur.rowcount}개에 content_hash 채움")
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS design_content_hash_key ON design (content_hash);")
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS design_ingest_checkpoint (
+                source TEXT PRIMARY KEY,          -- CSV 파일 이름
+                fingerprint TEXT NOT NULL,        -- 파일 크기 + SHA-256
+                last_offset INTEGER NOT NULL,     -- 처리가 끝난 행 수 (다음 시작 위치)
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+        """)
+        conn.commit()
+        cur.close()
+    
+    def read_checkpoint(self, conn, source, fingerprint):
+        """체크포인트의 다음 시작 위치 (없거나 파일 지문이 다르면 0)"""
+        cur = conn.cursor()
+        cur.execute("SELECT fingerprint, last_offset FROM design_ingest_checkpoint WHERE source = %s;", (source,))
+        row = cur.fetchone()
+        conn.commit()
+        cur.close()
+        if row is None:
+            print("📍 체크포인트 없음 - 처음부터 시작")
+            return 0
+        if row[0] != fingerprint:
+            print("⚠️ CSV 파일이 체크포인트 이후 바뀌었습니다 - 처음부터 다시 확인 (이미 저장된 행은 해시로 건너뜀)")
+            return 0
+        print(f"📍 체크포인트에서 재개 - {row[1]}번째 행부터")
+        return row[1]
+    
+    def save_batch_with_checkpoint(self, conn, rows, source, fingerprint, next_offset):
+        """
+        배치 저장과 체크포인트 갱신을 한 트랜잭션으로 처리
+        - 커밋 전에 중단되면 배치와 체크포인트가 함께 롤백 → 재실행시 같은 배치부터 다시 처리
+        
+        Returns:
+            int: 실제로 저장된 행 수 (이미 있던 해시는 ON CONFLICT DO NOTHING으로 건너뜀)
+        """
+        cur = conn.cursor()
+        inserted = []
+        if rows:
+            inserted = execute_values(
+                cur,
+                """
+                INSERT INTO design (title, description, embedding, content_hash) VALUES %s
+                ON CONFLICT (content_hash) DO NOTHING
+                RETURNING id;
+                """,
+                rows,
+                page_size=len(rows),
+                fetch=True
+            )
+        cur.execute("""
+            INSERT INTO design_ingest_checkpoint (source, fingerprint, last_offset, updated_at)
+            VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+            ON CONFLICT (source) DO UPDATE
+            SET fingerprint = EXCLUDED.fingerprint, last_offset = EXCLUDED.last_offset, updated_at = EXCLUDED.updated_at;
+        """, (source, fingerprint, next_offset))
+        conn.commit()
+        cur.close()
+        return len(inserted)
+    
+    def existing_hashes(self, conn, hashes):
+        """이미 design에 저장된 해시 집합 (임베딩 생략 대상)"""
+        if not hashes:
+            return set()
+        cur = conn.cursor()
+        cur.execute("SELECT content_hash FROM design WHERE content_hash = ANY(%s);", (list(hashes),))
+        found = {row[0] for row in cur.fetchall()}
+        conn.commit()
+        cur.close()
+        return found
+    
+    def resumable_save_all_designs(self, limit=None, resume=False, batch_rows=INGEST_BATCH_ROWS):
+        """
+        재개 가능(체크포인트) + 멱등 적재 모드
+        
+        process_and_save_all_designs는 중간에 죽으면 처음부터 다시 실행해야 하고, design 테이블에
+        자연키가 없어 이미 저장한 행이 중복 저장됩니다. 이 모드는:
+        1. 행마다 content_hash(제목 + 설명 SHA-256)를 계산하고 UNIQUE 인덱스 + ON CONFLICT DO NOTHING으로 저장
+        2. batch_rows개 행마다 트랜잭션 하나 - 배치 저장과 체크포인트(다음 시작 위치 + 파일 지문)를 함께 커밋
+        3. --resume이면 체크포인트 위치부터 시작 (파일 지문이 다르면 처음부터)
+        4. 이미 DB에 있는 해시는 임베딩하지 않음 (체크포인트 없이 다시 실행해도 모델 호출 없음)
+        5. 마지막에 CSV와 DB를 대조하는 리포트 출력
+        
+        Args:
+            limit: 처리할 데이터 개수 제한 (None이면 전체 처리)
+            resume: True면 체크포인트에서 재개
+            batch_rows: 트랜잭션(배치)당 행 수
+        """
+        df = self.load_csv_data()
+        if df is None or not self.create_database_table():
+            return
+        
+        df = df.head(limit) if limit else df
+        titles = df['title'].astype(str).str.strip().tolist()
+        descriptions = df['description'].astype(str).str.strip().tolist()
+        hashes = [content_hash(t, d) for t, d in zip(titles, descriptions)]
+        total_count = len(df)
+        source = os.path.basename(CSV_PATH)
+        fingerprint = file_fingerprint(CSV_PATH)
+        
+        stats = {"inserted": 0, "already_present": 0, "invalid": 0, "failed": 0}
+        invalid_rows = []
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            start = self.read_checkpoint(conn, source, fingerprint) if resume else 0
+            start = min(start, total_count)
+            print(f"\n=== 재개 가능 적재: {start}~{total_count - 1}번째 행 (배치 {batch_rows}행) ===")
+            
+            for batch_start in range(start, total_count, batch_rows):
+                batch_end = min(batch_start + batch_rows, total_count)
+                try:
+                    # 1. 빈 행 제외, 이미 저장된 해시와 배치 내 중복은 임베딩 생략
+                    present = self.existing_hashes(conn, set(hashes[batch_start:batch_end]))
+                    todo, seen = [], set()
+                    for i in range(batch_start, batch_end):
+                        if not titles[i] or not descriptions[i]:
+                            invalid_rows.append(i)
+                            stats["invalid"] += 1
+                        elif hashes[i] in present or hashes[i] in seen:
+                            stats["already_present"] += 1
+                        else:
+                            seen.add(hashes[i])
+                            todo.append(i)
+                    
+                    # 2. 남은 행만 배치 임베딩 (캐시 적중분은 모델 호출 생략)
+                    rows = []
+                    if todo:
+                        embeddings = self.cache.encode(self.model, [descriptions[i] for i in todo], batch_size=64)
+                        rows = [
+                            (titles[i], descriptions[i], embedding.tolist(), hashes[i])
+                            for i, embedding in zip(todo, embeddings)
+                        ]
+                    
+                    # 3. 저장 + 체크포인트 (한 트랜잭션)
+                    inserted = self.save_batch_with_checkpoint(conn, rows, source, fingerprint, batch_end)
+                    stats["inserted"] += inserted
+                    stats["already_present"] += len(rows) - inserted  # 다른 실행이 먼저 저장한 행
+                    print(f"✅ COMMIT: {batch_start}~{batch_end - 1}번째 행 - 저장 {inserted}개 (체크포인트 {batch_end})")
+                except Exception as e:
+                    # 배치 실패: 롤백 후 중단 → 체크포인트는 마지막으로 커밋된 배치 끝에 남음
+                    conn.rollback()
+                    stats["failed"] = total_count - batch_start
+                    print(f"❌ ROLLBACK: {batch_start}~{batch_end - 1}번째 행 저장 실패 - {e}")
+                    print(f"🔁 --resume으로 다시 실행하면 {batch_start}번째 행부터 이어서 처리합니다.")
+                    break
+            
+            self.print_reconciliation_report(conn, hashes, start, stats, invalid_rows)
+        finally:
+            conn.close()
+    
+    def print_reconciliation_report(self, conn, hashes, start, stats, invalid_rows):
+        """
+        CSV ↔ DB 대조 리포트
+        - CSV 전체(limit 범위)의 고유 해시 중 design에 있는 수 / 없는 행 번호
+        - 이번 실행의 저장 / 건너뜀 / 빈 행 / 실패 수
+        """
+        cur = conn.cursor()
+        unique_hashes = set(hashes)
+        present = set()
+        hash_list = list(unique_hashes)
+        for i in range(0, len(hash_list), 10000):  # ANY 배열 크기 제한
+            cur.execute("SELECT content_hash FROM design WHERE content_hash = ANY(%s);", (hash_list[i:i + 10000],))
+            present.update(row[0] for row in cur.fetchall())
+        cur.execute("SELECT COUNT(*), COUNT(*) FILTER (WHERE content_hash IS NULL) FROM design;")
+        table_rows, unhashed_rows = cur.fetchone()
+        conn.commit()
+        cur.close()
+        
+        invalid = set(invalid_rows)
+        missing_rows = [i for i, h in enumerate(hashes) if h not in present and i not in invalid]
+        
+        print("\n=== 적재 대조 리포트 ===")
+        print(f"📄 CSV 행: {len(hashes)}개 (고유 내용 {len(unique_hashes)}개, 파일 내 중복 {len(hashes) - len(unique_hashes)}개)")
+        print(f"▶️ 이번 실행 시작 위치: {start}번째 행")
+        print(f"✅ 이번 실행 저장: {stats['inserted']}개")
+        print(f"⏭️ 이미 저장됨 (임베딩 생략): {stats['already_present']}개")
+        print(f"⚠️ 빈 제목/설명: {stats['invalid']}개" + (f" (행 {invalid_rows[:10]})" if invalid_rows else ""))
+        print(f"❌ 미처리 (실패 배치부터): {stats['failed']}개")
+        print(f"🗄️ DB에 있는 CSV 고유 내용: {len(present)}/{len(unique_hashes)}")
+        if missing_rows:
+            print(f"🔍 DB에 없는 CSV 행: {len(missing_rows)}개 (처음 10개: {missing_rows[:10]})")
+        else:
+            print("🔍 CSV의 모든 유효한 행이 DB에 있습니다.")
+        print(f"📊 design 테이블: 전체 {table_rows}개, content_hash 없는 행 {unhashed_rows}개 (이전 실행의 중복 저장분)")
+
+    def spot_check_embeddings(self, descriptions, matrix, candidates, sample_size, tolerance):
+        """
+        CSV 임베딩 일부를 현재 모델 출력과 대조 (코사인 유사도)
+        
+        Returns:
+            tuple: (통과 여부, [(행 번호, 코사인 유사도)] 허용 오차를 벗어난 행)
+        """
+        rng = np.random.default_rng(0)  # 재실행해도 같은 표본 (결과 비교 가능)
+        sample = np.sort(rng.choice(candidates, size=min(sample_size, len(candidates)), replace=False))
+        print(f"🔬 모델 대조: 표본 {len(sample)}개 (허용 코사인 유사도 ≥ {1 - tolerance:.4f})")
+        
+        model_vectors = np.asarray(
+            self.cache.encode(self.ensure_model(), [descriptions[i] for i in sample], batch_size=64), dtype=np.float32
+        )
+        csv_vectors = matrix[sample]
+        norms = np.linalg.norm(csv_vectors, axis=1) * np.linalg.norm(model_vectors, axis=1)
+        similarities = np.einsum("ij,ij->i", csv_vectors, model_vectors) / np.where(norms > 0, norms, 1.0)
+        similarities[norms == 0] = 0.0  # 영벡터는 비교 불가 → 불일치
+        
+        print(f"   코사인 유사도 최소 {similarities.min():.4f}, 평균 {similarities.mean():.4f}")
+        mismatches = [(int(i), float(sim)) for i, sim in zip(sample, similarities) if sim < 1 - tolerance]
+        return not mismatches, mismatches
+    
+    def trusted_save_all_designs(self, limit=None, verify_sample=TRUST_VERIFY_SAMPLE,
+                                 tolerance=TRUST_COSINE_TOLERANCE, chunk_rows=5000):
+        """
+        신뢰 + 검증(trust-and-verify) 모드 - CSV의 embedding 컬럼을 그대로 적재 (모델 추론 생략)
+        
+        벡터를 상위 파이프라인에서 이미 계산한 경우 사용합니다.
+        1. embedding 문자열 컬럼을 벡터화 파서(parse_vector_texts)로 한 번에 float32 행렬로 변환
+        2. 차원(384) / 유한값 검증 - 통과하지 못한 행과 빈 제목/설명 행은 제외하고 리포트
+        3. verify_sample > 0이면 표본을 현재 모델로 임베딩해 코사인 유사도 대조
+           - 허용 오차를 벗어난 행이 있으면 적재하지 않고 중단 (다른 모델 / 버전으로 만든 벡터 방지)
+        4. COPY 바이너리로 적재 - content_hash ON CONFLICT DO NOTHING (다시 실행해도 중복 없음)
+        
+        Args:
+            limit: 처리할 데이터 개수 제한 (None이면 전체 처리)
+            verify_sample: 모델과 대조할 표본 수 (0이면 대조 생략)
+            tolerance: 허용 코사인 오차 (유사도 ≥ 1 - tolerance)
+            chunk_rows: COPY 청크당 행 수
+        """
+        df = self.load_csv_data()
+        if df is None or not self.create_database_table():
+            return
+        if 'embedding' not in df.columns:
+            print("❌ CSV에 embedding 컬럼이 없습니다 - 기본 모드 또는 --bulk 모드를 사용하세요.")
+            return
+        
+        df = df.head(limit) if limit else df
+        titles = df['title'].astype(str).str.strip().tolist()
+        descriptions = df['description'].astype(str).str.strip().tolist()
+        print(f"\n=== {len(df)}개 설계안 임베딩 검증 및 적재 시작 (모델 추론 생략) ===")
+        
+        # 1~2. 벡터화 파싱 + 차원 / 유한값 검증
+        started = time.perf_counter()
+        matrix, valid, errors = parse_vector_texts(df['embedding'].to_numpy(), EMBEDDING_DIM)
+        parse_seconds = time.perf_counter() - started
+        for i, (title, description) in enumerate(zip(titles, descriptions)):
+            if valid[i] and (not title or not description):
+                valid[i] = False
+                errors[i] = "빈 제목/설명"
+        candidates = np.flatnonzero(valid)
+        print(f"🧮 파싱: {len(df)}개 행 {parse_seconds * 1000:.1f}ms - 유효 {len(candidates)}개, 제외 {len(errors)}개")
+        for i in sorted(errors)[:10]:
+            print(f"   ⚠️ {i}번째 행 제외: {errors[i]}")
+        if not len(candidates):
+            print("❌ 적재할 유효한 행이 없습니다.")
+            return
+        
+        # 3. 모델 대조 (선택)
+        if verify_sample > 0:
+            passed, mismatches = self.spot_check_embeddings(descriptions, matrix, candidates, verify_sample, tolerance)
+            if not passed:
+                print(f"❌ 모델 대조 실패: 표본 중 {len(mismatches)}개가 허용 오차를 벗어났습니다 - 적재하지 않습니다.")
+                for i, similarity in mismatches[:10]:
+                    print(f"   {i}번째 행: 코사인 유사도 {similarity:.4f}")
+                print("   CSV 임베딩이 다른 모델 / 버전으로 만들어졌는지 확인하세요.")
+                return
+            print("✅ 모델 대조 통과")
+        
+        # 4. COPY 적재 (content_hash 중복은 건너뜀)
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            loader = BulkLoader(conn, chunk_rows=chunk_rows)
+            rows = (
+                (titles[i], descriptions[i], matrix[i], content_hash(titles[i], descriptions[i]))
+                for i in candidates
+            )
+            report = loader.load(
+                "design", rows,
+                columns=[("title", "text"), ("description", "text"), ("embedding", "vector"), ("content_hash", "text")],
+                on_conflict="(content_hash) DO NOTHING"
+            )
+        finally:
+            conn.close()
+        
+        for failure in report['failed_chunks']:
+            print(f"❌ 유효 행 {failure['first_row']}~{failure['last_row']}번째 적재 실패: {failure['error']}")
+        skipped = len(candidates) - report['rows_loaded'] - report['rows_failed']
+        print("\n=== 임베딩 검증 적재 완료 ===")
+        print(f"✅ 적재: {report['rows_loaded']}개, ⏭️ 이미 저장됨: {skipped}개, "
+              f"❌ 적재 실패: {report['rows_failed']}개, ⚠️ 검증 제외: {len(errors)}개")
+        print(f"⚡ 파싱 {parse_seconds:.3f}초, 적재 {report['seconds']}초 ({report['rows_per_sec']} rows/sec)")
 
 def main():
     """
@@ -354,13 +801,41 @@ def main():
         print("  - DB Password: ❌ 설정되지 않음")
     print()
     
+    # 실행 옵션: --bulk 지정시 COPY 대량 적재 모드, --limit으로 처리 개수 제한
+    parser = argparse.ArgumentParser(description="AI 임베딩 + PostgreSQL 트랜잭션 시스템")
+    parser.add_argument("--bulk", action="store_true", help="COPY 바이너리 대량 적재 모드")
+    parser.add_argument("--limit", type=int, default=None, help="처리할 설계안 개수")
+    parser.add_argument("--checkpoint", action="store_true",
+                        help="재개 가능 적재 모드 (content_hash 중복 방지 + 배치별 체크포인트, 처음부터 시작)")
+    parser.add_argument("--resume", action="store_true",
+                        help="재개 가능 적재 모드로 마지막 체크포인트부터 이어서 처리")
+    parser.add_argument("--batch-rows", type=int, default=INGEST_BATCH_ROWS,
+                        help="재개 가능 적재 모드의 트랜잭션당 행 수")
+    parser.add_argument("--trust-csv", action="store_true",
+                        help="CSV의 embedding 컬럼을 검증 후 그대로 적재 (모델 추론 생략)")
+    parser.add_argument("--verify-sample", type=int, default=TRUST_VERIFY_SAMPLE,
+                        help="--trust-csv: 현재 모델과 대조할 표본 수 (0이면 대조 생략)")
+    parser.add_argument("--cosine-tolerance", type=float, default=TRUST_COSINE_TOLERANCE,
+                        help="--trust-csv: 허용 코사인 오차 (유사도 >= 1 - 오차)")
+    args = parser.parse_args()
+    
     # AIEmbeddingProcessor 클래스의 인스턴스 생성
-    # 이때 __init__ 메서드가 호출되어 AI 모델이 로딩됨
-    processor = AIEmbeddingProcessor()
+    # 이때 __init__ 메서드가 호출되어 AI 모델이 로딩됨 (--trust-csv는 표본 대조가 있을 때만 로딩)
+    processor = AIEmbeddingProcessor(load_model=not args.trust_csv or args.verify_sample > 0)
     
     # 모든 설계안 처리 및 DB 저장 메서드 호출 (전체 500개 처리)
-    # limit 매개변수 제거로 전체 데이터 처리
-    processor.process_and_save_all_designs()
+    # --bulk: 배치 임베딩 + COPY 적재, 기본: 설계안마다 개별 트랜잭션 (COMMIT/ROLLBACK 실습)
+    # --checkpoint / --resume: 중단 후 재실행해도 중복 저장 / 재임베딩 없이 이어서 처리
+    # --trust-csv: 상위 파이프라인이 계산한 벡터를 검증 후 적재
+    if args.trust_csv:
+        processor.trusted_save_all_designs(limit=args.limit, verify_sample=args.verify_sample,
+                                           tolerance=args.cosine_tolerance)
+    elif args.checkpoint or args.resume:
+        processor.resumable_save_all_designs(limit=args.limit, resume=args.resume, batch_rows=args.batch_rows)
+    elif args.bulk:
+        processor.bulk_save_all_designs(limit=args.limit)
+    else:
+        processor.process_and_save_all_designs(limit=args.limit)
     
     # 전체 프로세스 완료 메시지 출력
     print("\n🎉 전체 프로세스 완료!")
@@ -2,26 +2,32 @@ import pandas as pd
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import psycopg2
-from psycopg2.extras import execute_values
 import os
 from dotenv import load_dotenv
 import logging
+from embedding_cache import EmbeddingCache
+from bulk_loader import BulkLoader
+from vector_index import build_vector_index, drop_vector_indexes, index_settings_from_env
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
 class GitHubIssueProcessor:
     def __init__(self):
         load_dotenv()
         self.model = None
+        self.cache = None
         self.conn = None
         
     def load_embedding_model(self):
         """임베딩 모델 로드"""
         try:
             logger.info("임베딩 모델 로딩 중...")
-            self.model = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
+            self.model = SentenceTransformer(MODEL_NAME)
+            self.cache = EmbeddingCache(MODEL_NAME)
             logger.info("임베딩 모델 로딩 완료")
         except Exception as e:
             logger.error(f"모델 로딩 실패: {e}")
@@ -78,17 +84,16 @@ class GitHubIssueProcessor:
             # 제목과 설명을 결합하여 임베딩 생성
             combined_text = df['title'] + ' ' + df['description']
             
-            # 배치 처리로 임베딩 생성 (메모리 효율성)
+            # 캐시에 없는 텍스트만 배치 처리로 임베딩 생성 (메모리 효율성)
             batch_size = 32
-            embeddings = []
-            
-            for i in range(0, len(combined_text), batch_size):
-                batch = combined_text[i:i+batch_size].tolist()
-                batch_embeddings = self.model.encode(batch, show_progress_bar=True)
-                embeddings.extend(batch_embeddings)
+            embeddings = self.cache.encode(
+                self.model, combined_text.tolist(),
+                batch_size=batch_size, show_progress_bar=True
+            )
             
-            df['embedding'] = embeddings
+            df['embedding'] = list(embeddings)
             logger.info(f"임베딩 생성 완료: {len(embeddings)}개")
+            self.cache.log_stats()
             
             return df
             
@@ -118,11 +123,8 @@ class GitHubIssueProcessor:
                 );
                 """)
                 
-                # 벡터 유사도 검색을 위한 인덱스 생성
-                cur.execute("""
-                CREATE INDEX ON issues 
-                USING ivfflat (embedding vector_cosine_ops);
-                """)
+                # 벡터 인덱스는 적재가 끝난 뒤 build_index에서 생성
+                # (빈 테이블에 ivfflat을 만들면 centroid가 데이터 없이 학습되어 재현율이 떨어짐)
                 
                 self.conn.commit()
                 logger.info("데이터베이스 테이블 설정 완료")
@@ -133,41 +135,44 @@ class GitHubIssueProcessor:
             raise
     
     def save_to_database(self, df):
-        """데이터베이스에 이슈 데이터 저장"""
-        try:
-            logger.info("데이터베이스에 데이터 저장 중...")
-            
-            with self.conn.cursor() as cur:
-                # 데이터 준비
-                data_to_insert = []
-                for _, row in df.iterrows():
-                    data_to_insert.append((
-                        row.get('issue_id', ''),
-                        row['title'],
-                        row['description'],
-                        row.get('tags', ''),
-                        row['embedding'].tolist()  # 벡터를 리스트로 변환
-                    ))
-                
-                # 배치 삽입
-                execute_values(
-                    cur,
-                    """
-                    INSERT INTO issues (issue_id, title, description, tags, embedding)
-                    VALUES %s
-                    """,
-                    data_to_insert,
-                    template=None,
-                    page_size=100
-                )
-                
-                self.conn.commit()
-                logger.info(f"데이터베이스에 {len(data_to_insert)}개 레코드 저장 완료")
-                
-        except Exception as e:
-            logger.error(f"데이터베이스 저장 실패: {e}")
-            self.conn.rollback()
-            raise
+        """데이터베이스에 이슈 데이터 저장 (바이너리 COPY로 청크 단위 적재)"""
+        logger.info("데이터베이스에 데이터 저장 중...")
+        
+        # 데이터 준비 (제너레이터 - 적재기가 청크 단위로만 읽음)
+        rows = (
+            (
+                row.get('issue_id', ''),
+                row['title'],
+                row['description'],
+                row.get('tags', ''),
+                row['embedding']  # numpy 배열 그대로 전달 (pgvector 바이너리 포맷으로 인코딩)
+            )
+            for _, row in df.iterrows()
+        )
+        
+        loader = BulkLoader(self.conn, chunk_rows=5000)
+        report = loader.load("issues", rows)
+        
+        if report['failed_chunks']:
+            raise RuntimeError(f"데이터베이스 저장 실패 - {report['rows_failed']}개 레코드 (청크 {len(report['failed_chunks'])}개)")
+        logger.info(f"데이터베이스에 {report['rows_loaded']}개 레코드 저장 완료 ({report['rows_per_sec']} rows/sec)")
+    
+    def build_index(self):
+        """적재 완료 후 행 수에 맞는 벡터 인덱스 생성 (설정은 VECTOR_INDEX_METHOD, HNSW_* 환경변수)"""
+        settings = index_settings_from_env()
+        # 같은 컬럼에 남아 있는 이전 벡터 인덱스는 제거 후 새로 생성
+        drop_vector_indexes(self.conn, "issues", "embedding")
+        result = build_vector_index(
+            self.conn, "issues", "embedding",
+            method=settings["method"],
+            distance="cosine",
+            m=settings["m"],
+            ef_construction=settings["ef_construction"],
+            maintenance_work_mem=settings["maintenance_work_mem"]
+        )
+        logger.info(f"벡터 인덱스 생성 완료 - {result['index_name']} {result['params']}, "
+                    f"{result['build_seconds']}초, {result['size']}")
+        return result
     
     def process_issues(self, csv_file_path):
         """전체 이슈 처리 파이프라인"""
@@ -190,6 +195,9 @@ class GitHubIssueProcessor:
             # 6. 데이터베이스 저장
             self.save_to_database(df)
             
+            # 7. 적재 완료 후 벡터 인덱스 생성 (load-then-index)
+            self.build_index()
+            
             logger.info("이슈 처리 파이프라인 완료!")
             
             return df
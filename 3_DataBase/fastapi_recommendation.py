@@ -1,9 +1,12 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-import psycopg2
 import os
 from dotenv import load_dotenv
 from typing import List, Dict
+from db_pool import PooledDB, PoolTimeoutError
+from user_neighbors import ensure_table, recommend, METRICS
+from user_spatial_index import UserSpatialIndex, UnknownUserError
 
 # 환경변수 로드
 load_dotenv()
@@ -19,11 +22,28 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD')
 }
 
+# 커넥션 풀 (요청마다 새로 연결하지 않고 재사용, 설정은 DB_POOL_* 환경변수)
+db_pool = PooledDB.from_env(DB_CONFIG, name="recommendation")
+
+# 추천 엔진 (kdtree: 인프로세스 KD-tree, table: user_neighbors 사전 계산 테이블)
+RECOMMEND_ENGINE = os.getenv('RECOMMEND_ENGINE', 'kdtree')
+user_index = UserSpatialIndex(db_pool) if RECOMMEND_ENGINE == 'kdtree' else None
+
 # 요청/응답 모델
 class RecommendRequest(BaseModel):
     user_id: str
     limit: int = 5
 
+class RadiusRequest(BaseModel):
+    user_id: str
+    metric: str = "euclidean"     # euclidean (L2 거리) 또는 cosine (코사인 거리)
+    radius: float                 # 이 거리 이내 사용자
+    limit: int = None             # None이면 반경 안 전체
+
+class BatchRecommendRequest(BaseModel):
+    metric: str = "euclidean"
+    limit: int = 5
+
 class SimilarUser(BaseModel):
     user_id: str
     similarity: float
@@ -33,60 +53,92 @@ class SimilarUser(BaseModel):
     spending_score: int
     visit_count: int
 
+@app.on_event("startup")
+def startup():
+    db_pool.open()
+    # 이웃 테이블이 아직 없으면 빈 테이블 생성 (계산 전에는 실시간 검색으로 응답)
+    with db_pool.connection() as conn:
+        ensure_table(conn)
+    # 전체 사용자 KD-tree 적재 + 임베딩 변경 감지 스레드 시작
+    if user_index:
+        user_index.start()
+
+@app.on_event("shutdown")
+def shutdown():
+    if user_index:
+        user_index.stop()
+    db_pool.close()
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    # 커넥션 풀이 가득 차서 대기 시간을 넘긴 경우 → 잠시 후 재시도 안내
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
 def get_db():
-    return psycopg2.connect(**DB_CONFIG)
+    # with get_db() as conn: 형태로 사용 (블록이 끝나면 풀에 반납)
+    return db_pool.connection()
 
 @app.get("/")
 def root():
     return {"message": "User Recommendation API"}
 
+@app.get("/metrics/db")
+def db_metrics():
+    return db_pool.get_metrics()
+
+def to_similar_users(rows):
+    return [SimilarUser(
+        user_id=row[0], similarity=float(row[1]), age=row[2],
+        income=row[3], gender=row[4], spending_score=row[5], visit_count=row[6]
+    ) for row in rows]
+
+def recommend_users(user_id, metric, limit):
+    # KD-tree 스냅샷 우선, 스냅샷 이후 추가된 사용자는 user_neighbors / 실시간 검색
+    if user_index:
+        try:
+            return user_index.recommend(user_id, metric, limit)
+        except UnknownUserError:
+            pass
+    with get_db() as conn:
+        rows, _ = recommend(conn, user_id, metric, limit)
+        return rows
+
+def check_metric(metric):
+    if metric not in METRICS:
+        raise HTTPException(status_code=400, detail=f"metric은 {', '.join(METRICS)} 중 하나여야 합니다.")
+
 @app.post("/recommend/euclidean", response_model=List[SimilarUser])
 def recommend_euclidean(request: RecommendRequest):
-    conn = get_db()
-    try:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT u1.user_id,
-                   1 / (1 + (u1.embedding <-> u2.embedding)) AS similarity,
-                   ub.age, ub.income, ub.gender, ub.spending_score, ub.visit_count
-            FROM user_embeddings u1, user_embeddings u2
-            JOIN user_behavior ub ON u1.user_id = ub.user_id
-            WHERE u2.user_id = %s AND u1.user_id != %s
-            ORDER BY u1.embedding <-> u2.embedding
-            LIMIT %s;
-        """, (request.user_id, request.user_id, request.limit))
-        
-        results = cur.fetchall()
-        return [SimilarUser(
-            user_id=row[0], similarity=float(row[1]), age=row[2],
-            income=row[3], gender=row[4], spending_score=row[5], visit_count=row[6]
-        ) for row in results]
-    finally:
-        conn.close()
+    return to_similar_users(recommend_users(request.user_id, "euclidean", request.limit))
 
 @app.post("/recommend/cosine", response_model=List[SimilarUser])
 def recommend_cosine(request: RecommendRequest):
-    conn = get_db()
+    return to_similar_users(recommend_users(request.user_id, "cosine", request.limit))
+
+@app.post("/recommend/radius", response_model=List[SimilarUser])
+def recommend_radius(request: RadiusRequest):
+    # 거리 radius 이내 사용자 (가까운 순) - KD-tree 반경 질의
+    check_metric(request.metric)
+    if user_index is None:
+        raise HTTPException(status_code=503, detail="반경 검색은 RECOMMEND_ENGINE=kdtree에서만 지원합니다.")
     try:
-        cur = conn.cursor()
-        cur.execute("""
-            SELECT u1.user_id,
-                   1 - (u1.embedding <=> u2.embedding) AS similarity,
-                   ub.age, ub.income, ub.gender, ub.spending_score, ub.visit_count
-            FROM user_embeddings u1, user_embeddings u2
-            JOIN user_behavior ub ON u1.user_id = ub.user_id
-            WHERE u2.user_id = %s AND u1.user_id != %s
-            ORDER BY u1.embedding <=> u2.embedding
-            LIMIT %s;
-        """, (request.user_id, request.user_id, request.limit))
-        
-        results = cur.fetchall()
-        return [SimilarUser(
-            user_id=row[0], similarity=float(row[1]), age=row[2],
-            income=row[3], gender=row[4], spending_score=row[5], visit_count=row[6]
-        ) for row in results]
-    finally:
-        conn.close()
+        rows = user_index.within(request.user_id, request.metric, request.radius, request.limit)
+    except UnknownUserError:
+        raise HTTPException(status_code=404, detail=f"사용자 {request.user_id}를 찾을 수 없습니다.")
+    return to_similar_users(rows)
+
+@app.post("/recommend/batch", response_model=Dict[str, List[SimilarUser]])
+def recommend_batch(request: BatchRecommendRequest):
+    # 전체 사용자의 추천 결과를 트리 질의 한 번으로 계산
+    check_metric(request.metric)
+    if user_index is None:
+        raise HTTPException(status_code=503, detail="일괄 검색은 RECOMMEND_ENGINE=kdtree에서만 지원합니다.")
+    results = user_index.recommend_all(request.metric, request.limit)
+    return {user_id: to_similar_users(rows) for user_id, rows in results.items()}
+
+@app.get("/metrics/recommend")
+def recommend_metrics():
+    return {"engine": RECOMMEND_ENGINE, "index": user_index.get_metrics() if user_index else None}
 
 if __name__ == "__main__":
     import uvicorn
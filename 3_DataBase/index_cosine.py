@@ -24,7 +24,7 @@ def main():
     print(f"📍 API 서버: http://{api_host}:{api_port}")
     print(f"📚 API 문서: http://{api_host}:{api_port}/docs")
     print(f"🔍 데이터베이스: {db_host}:{db_port}/{db_name}")
-    print(f"🎯 최적화: lists=10, L2 거리 권장")
+    print("🎯 최적화: lists=행 수/1000 (100만 행 초과시 sqrt), L2 거리 권장 - vector_index.py 참고")
     print("=" * 60)
     print("\n주요 엔드포인트:")
     print(f"  • 기본 검색:     POST http://{api_host}:{api_port}/search/vector")
@@ -0,0 +1,150 @@
+"""
+임베딩 추론 실행기 (이벤트 루프 밖에서 encode 실행)
+
+주요 기능:
+1. SentenceTransformer.encode를 제한된 크기의 스레드 풀 또는 프로세스 풀에서 실행
+2. 프로세스 풀 모드에서는 워커 프로세스마다 모델을 한 번만 로드 (initializer)
+3. SentenceTransformer와 같은 encode() 인터페이스 제공 → 기존 코드/캐시에 그대로 연결 가능
+   (백엔드는 torch / onnx / onnx-int8 중 선택, onnx_embedding.load_encoder 참고)
+4. 풀이 종료/손상되었거나 시간 초과시 InferenceUnavailableError 발생 (API에서는 HTTP 503으로 변환)
+
+모드 선택 기준:
+- thread : 모델 1개를 스레드들이 공유 (메모리 절약, torch가 연산 중 GIL을 놓으므로 병렬 처리 가능)
+- process: 워커마다 모델 복사본 (메모리 사용 증가, 대신 GIL/전처리 경합 없이 코어별로 완전 병렬)
+
+사용 예시:
+    executor = InferenceExecutor(MODEL_NAME, mode="process", max_workers=2)
+    executor.start()
+    vectors = executor.encode(["친환경 스마트홈"])   # numpy 배열 (1, 384)
+"""
+
+import logging
+import multiprocessing
+import time
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 워커(스레드 모드에서는 메인 프로세스)에 로드된 모델
+_worker_model = None
+
+
+class InferenceUnavailableError(RuntimeError):
+    """추론 실행기를 사용할 수 없을 때 발생 (API에서는 HTTP 503으로 변환)"""
+
+
+def _load_model(model_name, backend):
+    """모델 로드 (프로세스 풀 initializer 또는 스레드 모드 시작시 호출)"""
+    global _worker_model
+    from onnx_embedding import load_encoder
+    _worker_model = load_encoder(model_name, backend)
+
+
+def _encode_in_worker(texts, encode_kwargs):
+    """워커에서 실행되는 encode 함수 (프로세스 풀로 보낼 수 있도록 모듈 최상위에 정의)"""
+    return _worker_model.encode(texts, **encode_kwargs)
+
+
+def _warmup():
+    """워커 프로세스가 initializer(모델 로드)를 끝냈는지 확인하기 위한 빈 작업"""
+    return _worker_model is not None
+
+
+class InferenceExecutor:
+    """
+    encode()를 스레드 풀 / 프로세스 풀에서 실행하는 추론 실행기
+
+    Args:
+        model_name: SentenceTransformer 모델 이름
+        mode: "thread" 또는 "process"
+        backend: 임베딩 백엔드 ("torch", "onnx", "onnx-int8")
+        max_workers: 동시에 실행할 수 있는 encode 작업 수 (동시성 상한)
+        timeout: encode 한 번의 최대 대기 시간 (초)
+    """
+
+    def __init__(self, model_name, mode="thread", max_workers=2, timeout=30.0, backend="torch"):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"지원하지 않는 실행 모드입니다: {mode}")
+        self.model_name = model_name
+        self.mode = mode
+        self.backend = backend
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._pool = None
+
+        # 메트릭
+        self._total_calls = 0
+        self._total_texts = 0
+        self._total_time = 0.0
+
+    def start(self):
+        """풀 생성 및 모델 로드"""
+        if self.mode == "process":
+            # torch 상태가 fork로 복제되지 않도록 spawn 방식 사용
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_load_model,
+                initargs=(self.model_name, self.backend)
+            )
+            # 워커 프로세스를 미리 띄워서 첫 요청이 모델 로딩 시간을 기다리지 않도록 함
+            for future in [self._pool.submit(_warmup) for _ in range(self.max_workers)]:
+                future.result()
+        else:
+            _load_model(self.model_name, self.backend)
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        logger.info(f"추론 실행기 시작 - mode={self.mode}, backend={self.backend}, max_workers={self.max_workers}")
+
+    def shutdown(self):
+        """풀 종료"""
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            logger.info("추론 실행기 종료")
+
+    def encode(self, texts, **encode_kwargs):
+        """
+        SentenceTransformer.encode와 같은 방식으로 호출하는 encode (호출한 스레드는 결과를 기다림)
+
+        Returns:
+            numpy.ndarray: 임베딩 배열
+        """
+        if self._pool is None:
+            raise InferenceUnavailableError("추론 실행기가 시작되지 않았습니다.")
+
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        encode_kwargs.pop("show_progress_bar", None)
+
+        started = time.perf_counter()
+        try:
+            future = self._pool.submit(_encode_in_worker, batch, encode_kwargs)
+        except RuntimeError as e:
+            # 이미 종료되었거나 깨진 풀에 제출한 경우
+            raise InferenceUnavailableError(f"추론 실행기를 사용할 수 없습니다: {e}") from e
+        try:
+            result = future.result(timeout=self.timeout)
+        except BrokenExecutor as e:
+            # 워커 프로세스가 비정상 종료된 경우
+            raise InferenceUnavailableError(f"추론 워커가 비정상 종료되었습니다: {e}") from e
+        except FuturesTimeoutError as e:
+            future.cancel()
+            raise InferenceUnavailableError(f"추론 시간 초과 ({self.timeout}초)") from e
+
+        self._total_calls += 1
+        self._total_texts += len(batch)
+        self._total_time += time.perf_counter() - started
+        return result[0] if single else result
+
+    def get_metrics(self):
+        """실행 모드 및 encode 호출 통계 반환"""
+        return {
+            "mode": self.mode,
+            "backend": self.backend,
+            "max_workers": self.max_workers,
+            "running": self._pool is not None,
+            "total_calls": self._total_calls,
+            "total_texts": self._total_texts,
+            "avg_encode_ms": round(self._total_time / self._total_calls * 1000, 3) if self._total_calls else 0.0,
+        }
@@ -0,0 +1,272 @@
+"""
+동시 요청 마이크로 배칭(Micro-batching) 유틸리티
+
+주요 기능:
+1. 짧은 시간 창(max_wait_ms) 동안 들어온 동시 요청을 모아서 한 번에 처리
+2. 배치 크기(max_batch_size)에 도달하면 대기 없이 즉시 처리
+3. 배치 함수는 스레드 풀에서 실행 → 이벤트 루프가 블로킹되지 않음
+4. 각 호출자에게 자신의 결과만 돌려줌 (입력 순서 = 출력 순서)
+5. 처리량 / 큐 대기시간 / 배치 크기 메트릭 제공
+6. 큐 길이 상한(max_queue_size) 초과시 QueueFullError로 즉시 거절 (백프레셔)
+7. submit_many: 여러 건을 한 번에 넣거나 전부 거절 (일괄 작업이 큐의 일부만 쓰도록 상한 지정 가능)
+
+사용 예시:
+    batcher = MicroBatcher(lambda texts: model.encode(texts).tolist(),
+                           max_batch_size=32, max_wait_ms=5)
+    await batcher.start()
+    vector = await batcher.submit("친환경 스마트홈")
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """대기 큐가 가득 차서 요청을 받을 수 없을 때 발생 (API에서는 HTTP 429로 변환)"""
+
+
+def _percentile(values, pct):
+    """값 목록의 백분위수 (값이 없으면 0.0) - db_pool / async_db / vector_search 지표에서도 공용으로 사용"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class MicroBatcher:
+    """
+    동시 요청을 모아 배치 함수 한 번으로 처리하는 비동기 배처
+
+    Args:
+        batch_fn: 입력 리스트를 받아 같은 길이의 결과 리스트를 반환하는 동기 함수
+        max_batch_size: 한 번에 처리할 최대 요청 수
+        max_wait_ms: 첫 요청 이후 추가 요청을 기다리는 최대 시간 (밀리초)
+        executor: batch_fn을 실행할 executor (None이면 asyncio 기본 스레드 풀)
+        name: 로그/메트릭에 표시할 이름
+        max_queue_size: 대기 가능한 최대 요청 수 (0이면 무제한)
+        max_concurrent_batches: 동시에 실행할 수 있는 최대 배치 수
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_ms=5.0, executor=None, name="batcher",
+                 max_queue_size=0, max_concurrent_batches=1):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size는 1 이상이어야 합니다.")
+        if max_concurrent_batches < 1:
+            raise ValueError("max_concurrent_batches는 1 이상이어야 합니다.")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.executor = executor
+        self.name = name
+        self.max_queue_size = max_queue_size
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self._queue = None
+        self._worker = None
+        self._batch_tasks = set()
+
+        # 메트릭 (최근 1000건 기준 백분위 계산)
+        self._started_at = None
+        self._total_items = 0
+        self._total_batches = 0
+        self._total_errors = 0
+        self._total_rejected = 0
+        self._queue_waits_ms = deque(maxlen=1000)
+        self._batch_times_ms = deque(maxlen=1000)
+        self._batch_sizes = deque(maxlen=1000)
+
+    async def start(self):
+        """백그라운드 배치 워커 시작 (이벤트 루프 안에서 호출)"""
+        if self._worker is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._started_at = time.perf_counter()
+        self._worker = asyncio.create_task(self._run())
+        logger.info(
+            f"[{self.name}] 마이크로 배처 시작 - max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait_ms}, max_queue_size={self.max_queue_size}, "
+            f"max_concurrent_batches={self.max_concurrent_batches}"
+        )
+
+    async def stop(self):
+        """워커 종료 - 아직 처리되지 않은 요청은 취소 처리"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        for task in list(self._batch_tasks):
+            task.cancel()
+        if self._batch_tasks:
+            await asyncio.gather(*self._batch_tasks, return_exceptions=True)
+
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.cancel()
+        logger.info(f"[{self.name}] 마이크로 배처 종료")
+
+    async def submit(self, item):
+        """요청 하나를 큐에 넣고 해당 결과를 기다림 (큐가 가득 차면 QueueFullError)"""
+        if self._worker is None:
+            raise RuntimeError(f"[{self.name}] 배처가 시작되지 않았습니다.")
+        if self.max_queue_size and self._queue.qsize() >= self.max_queue_size:
+            self._total_rejected += 1
+            raise QueueFullError(f"[{self.name}] 대기 큐가 가득 찼습니다 (max_queue_size={self.max_queue_size}).")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def submit_many(self, items, queue_limit=None):
+        """
+        여러 건을 한 번에 큐에 넣고 입력 순서대로 결과를 기다림 (일괄 등록 등)
+
+        일부만 들어가는 일이 없도록 모두 들어갈 자리가 있을 때만 넣음
+
+        Args:
+            queue_limit: 이번 요청이 채울 수 있는 큐 길이 상한 (None이면 max_queue_size)
+                - max_queue_size보다 작게 주면 일괄 작업이 큐를 다 채우지 않아 단건 요청이 계속 들어올 수 있음
+                - 큐가 비어 있으면 상한보다 많아도 받음 (상한보다 큰 요청이 영원히 거절되지 않도록)
+        Raises:
+            QueueFullError: 자리가 부족함
+        """
+        if self._worker is None:
+            raise RuntimeError(f"[{self.name}] 배처가 시작되지 않았습니다.")
+        limit = self.max_queue_size if queue_limit is None else queue_limit
+        queued = self._queue.qsize()
+        if limit and queued and queued + len(items) > limit:
+            self._total_rejected += len(items)
+            raise QueueFullError(f"[{self.name}] 대기 큐에 {len(items)}건을 넣을 자리가 없습니다 "
+                                 f"(대기 {queued}건, 상한 {limit}).")
+        loop = asyncio.get_running_loop()
+        futures = []
+        for item in items:
+            future = loop.create_future()
+            self._queue.put_nowait((item, future, time.perf_counter()))
+            futures.append(future)
+        try:
+            return await asyncio.gather(*futures)
+        except BaseException:
+            # 하나가 실패하거나 호출자가 취소되면 나머지는 처리하지 않음 (취소된 요청은 배치에서 제외됨)
+            for future in futures:
+                future.cancel()
+            raise
+
+    async def _collect_batch(self):
+        """첫 요청을 기다린 뒤, 대기 시간 창 안에서 최대 배치 크기까지 요청 수집"""
+        batch = [await self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+
+        while len(batch) < self.max_batch_size:
+            # 이미 큐에 쌓여 있는 요청은 대기 없이 가져오기
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        """배치 워커 메인 루프 - 실행 슬롯이 비어야 다음 배치를 수집 (그동안 요청은 큐에 쌓여 배치가 커짐)"""
+        slots = asyncio.Semaphore(self.max_concurrent_batches)
+        while True:
+            await slots.acquire()
+            try:
+                batch = await self._collect_batch()
+            except BaseException:
+                slots.release()
+                raise
+
+            task = asyncio.create_task(self._process_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _process_batch(self, batch):
+        """수집된 배치 하나를 실행하고 각 호출자의 future에 결과 전달"""
+        loop = asyncio.get_running_loop()
+
+        # 대기 중 취소된 요청(클라이언트 연결 끊김 등)은 제외
+        batch = [entry for entry in batch if not entry[1].done()]
+        if not batch:
+            return
+
+        started = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            self._queue_waits_ms.append((started - enqueued_at) * 1000)
+
+        items = [entry[0] for entry in batch]
+        try:
+            # 배치 함수는 CPU 연산이므로 executor에서 실행
+            results = await loop.run_in_executor(self.executor, self.batch_fn, items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"배치 결과 개수 불일치: 입력 {len(items)}개, 결과 {len(results)}개"
+                )
+        except asyncio.CancelledError:
+            # stop()이 실행 중인 배치를 취소 - 기다리는 호출자가 영원히 멈추지 않도록 함께 취소
+            for _, future, _ in batch:
+                if not future.done():
+                    future.cancel()
+            raise
+        except Exception as e:
+            self._total_errors += len(batch)
+            logger.error(f"[{self.name}] 배치 처리 실패 ({len(batch)}건): {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self._batch_times_ms.append((time.perf_counter() - started) * 1000)
+        self._batch_sizes.append(len(batch))
+        self._total_items += len(batch)
+        self._total_batches += 1
+
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def get_metrics(self):
+        """처리량 및 큐 대기시간 메트릭 반환 (p99 예산 대비 배치 창 크기 조정용)"""
+        uptime = time.perf_counter() - self._started_at if self._started_at else 0.0
+        waits = list(self._queue_waits_ms)
+        batch_times = list(self._batch_times_ms)
+        sizes = list(self._batch_sizes)
+        return {
+            "name": self.name,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "max_queue_size": self.max_queue_size,
+            "max_concurrent_batches": self.max_concurrent_batches,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "total_items": self._total_items,
+            "total_batches": self._total_batches,
+            "total_errors": self._total_errors,
+            "total_rejected": self._total_rejected,
+            "in_flight_batches": len(self._batch_tasks),
+            "avg_batch_size": round(sum(sizes) / len(sizes), 2) if sizes else 0.0,
+            "throughput_items_per_sec": round(self._total_items / uptime, 2) if uptime else 0.0,
+            "queue_wait_ms": {
+                "p50": round(_percentile(waits, 50), 3),
+                "p95": round(_percentile(waits, 95), 3),
+                "p99": round(_percentile(waits, 99), 3),
+            },
+            "batch_time_ms": {
+                "p50": round(_percentile(batch_times, 50), 3),
+                "p99": round(_percentile(batch_times, 99), 3),
+            },
+        }
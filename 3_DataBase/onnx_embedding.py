@@ -0,0 +1,244 @@
+"""
+ONNX Runtime 기반 문장 임베딩 백엔드 (CPU 전용 노드용)
+
+주요 기능:
+1. SentenceTransformer 모델을 ONNX로 한 번만 export (.cache/onnx/ 아래에 저장 후 재사용)
+2. 선택적으로 동적 int8 양자화 적용 (onnxruntime.quantization.quantize_dynamic)
+3. 원본 모델과 같은 풀링(mean / cls / max)과 정규화(Normalize 모듈)를 그대로 재현
+4. SentenceTransformer.encode와 같은 인터페이스 → 캐시/추론 실행기에 그대로 연결 가능
+
+백엔드 이름 (EMBEDDING_BACKEND 환경변수):
+- torch    : 기존 PyTorch SentenceTransformer
+- onnx     : ONNX Runtime (float32)
+- onnx-int8: ONNX Runtime + 동적 int8 양자화
+
+설치 요구사항 (7_생성형 AI/skala_gai/requirements-onnx.txt 참고):
+pip install onnx onnxruntime transformers
+(최초 export 시에만 torch, sentence-transformers 필요)
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ONNX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "onnx")
+
+SUPPORTED_BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _model_dir(model_name, cache_dir):
+    """모델 이름별 export 디렉터리 (슬래시는 파일명에 쓸 수 없으므로 치환)"""
+    return os.path.join(cache_dir, model_name.replace("/", "__"))
+
+
+def _export_to(model_name, output_dir, opset):
+    """SentenceTransformer 모델 → output_dir에 ONNX 본체 + 토크나이저 + 풀링 설정 저장"""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0]
+    tokenizer = transformer.tokenizer
+
+    # 풀링/정규화 설정을 원본 모델 구성에서 읽어와 저장 (encode 결과를 동일하게 맞추기 위함)
+    pooling = st_model[1]
+    pooling_config = {
+        "pooling_mode": pooling.get_pooling_mode_str(),
+        "normalize": any(type(module).__name__ == "Normalize" for module in st_model),
+        "max_seq_length": st_model.max_seq_length,
+    }
+    with open(os.path.join(output_dir, "pooling_config.json"), "w", encoding="utf-8") as f:
+        json.dump(pooling_config, f, ensure_ascii=False, indent=2)
+    tokenizer.save_pretrained(output_dir)
+
+    hf_model = transformer.auto_model.eval()
+    dummy = tokenizer(["ONNX export용 예시 문장"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    with torch.no_grad():
+        torch.onnx.export(
+            hf_model,
+            tuple(dummy[name] for name in input_names),
+            os.path.join(output_dir, "model.onnx"),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            do_constant_folding=True,
+        )
+
+
+def export_onnx_model(model_name, cache_dir=None, quantize=False, opset=14):
+    """
+    SentenceTransformer 모델을 ONNX로 export (이미 있으면 건너뜀)
+
+    여러 워커 프로세스가 동시에 시작해도 반쯤 쓰인 파일을 읽지 않도록, 임시 경로에 모두 쓴 뒤
+    os.replace로 한 번에 교체 (먼저 끝난 프로세스의 결과를 쓰고 나머지는 자기 결과를 버림)
+
+    저장 파일:
+    - model.onnx / model.int8.onnx : 트랜스포머 본체 (last_hidden_state 출력)
+    - tokenizer 파일들             : AutoTokenizer.save_pretrained 결과
+    - pooling_config.json          : 풀링 방식, 정규화 여부, 최대 시퀀스 길이
+
+    Returns:
+        str: 사용할 ONNX 파일 경로
+    """
+    cache_dir = cache_dir or os.getenv("ONNX_MODEL_DIR", DEFAULT_ONNX_DIR)
+    output_dir = _model_dir(model_name, cache_dir)
+    fp32_path = os.path.join(output_dir, "model.onnx")
+    int8_path = os.path.join(output_dir, "model.int8.onnx")
+
+    if not os.path.exists(fp32_path):
+        logger.info(f"ONNX export 시작: {model_name}")
+        os.makedirs(cache_dir, exist_ok=True)
+        work_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(output_dir)}.", dir=cache_dir)
+        try:
+            _export_to(model_name, work_dir, opset)
+            os.chmod(work_dir, 0o755)  # mkdtemp는 0700으로 만듦
+            if os.path.isdir(output_dir) and not os.path.exists(fp32_path):
+                # 이전 버전이 중간에 멈추며 남긴 불완전한 디렉터리
+                shutil.rmtree(output_dir, ignore_errors=True)
+            try:
+                os.replace(work_dir, output_dir)
+                logger.info(f"ONNX export 완료: {fp32_path}")
+            except OSError:
+                # 다른 프로세스가 먼저 교체함 → 그 결과 사용
+                if not os.path.exists(fp32_path):
+                    raise
+                logger.info(f"다른 프로세스의 ONNX export 결과 사용: {fp32_path}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    if not quantize:
+        return fp32_path
+
+    if not os.path.exists(int8_path):
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info("동적 int8 양자화 적용 중...")
+        # 프로세스별 임시 파일에 양자화 후 교체 (파일 교체는 원자적이므로 동시에 실행돼도 완전한 파일만 보임)
+        tmp_path = os.path.join(output_dir, f"model.int8.{os.getpid()}.tmp.onnx")
+        try:
+            quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, int8_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        logger.info(f"int8 양자화 완료: {int8_path}")
+    return int8_path
+
+
+class OnnxSentenceEncoder:
+    """
+    ONNX Runtime으로 실행하는 SentenceTransformer 호환 인코더
+
+    Args:
+        model_name: SentenceTransformer 모델 이름
+        quantize: True이면 int8 양자화 모델 사용
+        cache_dir: export 파일 저장 경로 (None이면 ONNX_MODEL_DIR 또는 기본 경로)
+        intra_op_threads: ONNX Runtime 연산 스레드 수 (None이면 런타임 기본값)
+    """
+
+    def __init__(self, model_name, quantize=False, cache_dir=None, intra_op_threads=None):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        cache_dir = cache_dir or os.getenv("ONNX_MODEL_DIR", DEFAULT_ONNX_DIR)
+        model_path = export_onnx_model(model_name, cache_dir=cache_dir, quantize=quantize)
+        model_dir = os.path.dirname(model_path)
+
+        with open(os.path.join(model_dir, "pooling_config.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        self.pooling_mode = config["pooling_mode"]
+        self.normalize = config["normalize"]
+        self.max_seq_length = config["max_seq_length"]
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if intra_op_threads:
+            options.intra_op_num_threads = intra_op_threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+        self.model_name = model_name
+        self.quantize = quantize
+        logger.info(f"ONNX 인코더 로딩 완료 - {os.path.basename(model_path)}, pooling={self.pooling_mode}")
+
+    def _pool(self, hidden, attention_mask):
+        """SentenceTransformer Pooling 모듈과 같은 방식으로 토큰 임베딩을 문장 벡터로 변환"""
+        mask = attention_mask[..., None].astype(np.float32)
+        if self.pooling_mode == "cls":
+            return hidden[:, 0]
+        if self.pooling_mode == "max":
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        summed = (hidden * mask).sum(axis=1)
+        return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(self, sentences, batch_size=32, normalize_embeddings=False, show_progress_bar=False, **kwargs):
+        """
+        SentenceTransformer.encode와 같은 방식의 인코딩
+
+        - 길이순으로 정렬해 배치를 만들어 패딩 낭비를 줄이고, 결과는 원래 순서로 복원
+
+        Returns:
+            numpy.ndarray: (문장 수, 차원) float32 배열 (문자열 하나면 1차원 배열)
+        """
+        single = isinstance(sentences, str)
+        sentences = [sentences] if single else list(sentences)
+        if not sentences:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        order = np.argsort([-len(text) for text in sentences], kind="stable")
+        outputs = [None] * len(sentences)
+
+        for start in range(0, len(sentences), batch_size):
+            index = order[start:start + batch_size]
+            batch = [sentences[i] for i in index]
+            tokens = self.tokenizer(
+                batch, padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np"
+            )
+            feeds = {name: tokens[name].astype(np.int64) for name in self.input_names}
+            hidden = self.session.run(["last_hidden_state"], feeds)[0]
+            pooled = self._pool(hidden, tokens["attention_mask"])
+
+            # 모델 구성에 Normalize가 포함되어 있거나 호출자가 요청한 경우 L2 정규화
+            if self.normalize or normalize_embeddings:
+                pooled = pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+            for i, vector in zip(index, pooled):
+                outputs[i] = vector
+
+        embeddings = np.vstack(outputs).astype(np.float32)
+        return embeddings[0] if single else embeddings
+
+
+def load_encoder(model_name, backend="torch"):
+    """
+    백엔드 이름에 맞는 인코더 생성 (모두 encode() 인터페이스 제공)
+
+    Args:
+        model_name: SentenceTransformer 모델 이름
+        backend: "torch", "onnx", "onnx-int8" 중 하나
+    """
+    if backend not in SUPPORTED_BACKENDS:
+        raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {backend} (지원: {', '.join(SUPPORTED_BACKENDS)})")
+    if backend == "torch":
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(model_name)
+    return OnnxSentenceEncoder(model_name, quantize=(backend == "onnx-int8"))
+
+
+def cache_model_name(model_name, backend="torch"):
+    """임베딩 캐시 키에 사용할 모델 이름 (백엔드마다 벡터가 미세하게 다르므로 구분)"""
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
@@ -1,10 +1,27 @@
+import asyncio
+import json
+import time
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-import psycopg2
 from sentence_transformers import SentenceTransformer
 import os
+import sys
 from dotenv import load_dotenv
 import re
+import threading
+
+# 상위 폴더(3_DataBase)의 공용 모듈 사용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from db_pool import PooledDB, PoolTimeoutError
+from async_db import AsyncVectorDB, to_vector
+from exact_search import ExactSearchEngine
+from hybrid_search import LEXICAL_SEARCH_SQL, LEXICAL_SEARCH_SQL_ASYNC, ensure_fulltext_index, reciprocal_rank_fusion
+from filtered_search import ensure_filter_indexes, filtered_search
+from vector_search import build_similar_by_id_sql
+from issue_neighbors import RELATED_ISSUES_SQL, RELATED_ISSUES_SQL_ASYNC, ensure_tables as ensure_neighbor_tables
 
 # 환경변수 로드
 load_dotenv()
@@ -24,6 +41,17 @@ db_config = {
     'port': os.getenv('DB_PORT', '5432')
 }
 
+# 커넥션 풀 (앱 시작시 생성, 설정은 DB_POOL_* 환경변수)
+db_pool = PooledDB.from_env(db_config, name="issues")
+
+# 검색 쿼리 드라이버 (asyncpg: 이벤트 루프에서 직접 await, psycopg2: 스레드 풀에서 실행)
+DB_DRIVER = os.getenv('DB_DRIVER', 'asyncpg')
+async_db = AsyncVectorDB.from_env(db_config, name="issues") if DB_DRIVER == 'asyncpg' else None
+
+# 검색 엔진 (pgvector: DB에서 검색, memory: mmap 스냅샷 + 행렬곱 정확 검색 후 id로 본문만 DB 조회)
+SEARCH_ENGINE = os.getenv('SEARCH_ENGINE', 'pgvector')
+search_engine = ExactSearchEngine(db_pool, "issues", vector_column="embedding") if SEARCH_ENGINE == 'memory' else None
+
 # 요청/응답 모델
 class IssueSearchRequest(BaseModel):
     title: str
@@ -40,13 +68,139 @@ class IssueSearchResponse(BaseModel):
     query: str
     results: list[SimilarIssue]
 
+class SimilarByIdResponse(BaseModel):
+    issue_id: int
+    results: list[SimilarIssue]
+
+class RelatedIssuesResponse(BaseModel):
+    issue_id: int
+    source: str                    # graph: issue_neighbors 사전 계산 결과, vector: 그래프에 없어 벡터 검색
+    results: list[SimilarIssue]
+
+# 저장된 이슈 임베딩 기준 유사 이슈 (코사인 거리, 기준 이슈 제외 / 거리 상한 여부별 SQL)
+SIMILAR_BY_ID_SQL = {
+    (exclude_self, with_max): build_similar_by_id_sql(
+        "issues", "id", ["title", "description"], "embedding", "cosine",
+        exclude_self=exclude_self, with_max_distance=with_max
+    )
+    for exclude_self in (True, False) for with_max in (True, False)
+}
+SIMILAR_BY_ID_SQL_ASYNC = {
+    (exclude_self, with_max): build_similar_by_id_sql(
+        "issues", "id", ["title", "description"], "embedding", "cosine",
+        exclude_self=exclude_self, with_max_distance=with_max,
+        id_placeholder="$1", limit_placeholder="$2", max_distance_placeholder="$3"
+    )
+    for exclude_self in (True, False) for with_max in (True, False)
+}
+ISSUE_EXISTS_SQL = "SELECT EXISTS (SELECT 1 FROM issues WHERE id = %s AND embedding IS NOT NULL);"
+
+class HybridSearchRequest(BaseModel):
+    title: str
+    description: str = ""
+    top_k: int = 5
+    lexical_k: int = 50          # 전문 검색 후보 수
+    vector_k: int = 50           # 벡터 검색 후보 수
+    rrf_k: int = 60              # RRF 순위 완화 상수
+    lexical_weight: float = 1.0
+    vector_weight: float = 1.0
+
+class HybridIssue(BaseModel):
+    id: int
+    title: str
+    description: str
+    score: float                   # RRF 점수
+    lexical_rank: int = None       # 전문 검색 순위 (후보에 없으면 None)
+    vector_rank: int = None        # 벡터 검색 순위 (후보에 없으면 None)
+    similarity: float = None       # 코사인 유사도 (벡터 후보에 있을 때)
+
+class HybridSearchResponse(BaseModel):
+    query: str
+    results: list[HybridIssue]
+    candidates: dict               # 검색별 후보 수
+    timings_ms: dict               # 단계별 소요 시간
+
+MAX_CANDIDATE_K = int(os.getenv('MAX_CANDIDATE_K', 1000))   # 요청당 최대 후보 수
+
+class BatchSearchRequest(BaseModel):
+    queries: list[IssueSearchRequest]   # 쿼리별 title / description / top_k
+
+MAX_BATCH_QUERIES = int(os.getenv('MAX_BATCH_QUERIES', 5000))   # /search/batch 요청당 최대 쿼리 수
+BATCH_ENCODE_SIZE = int(os.getenv('BATCH_ENCODE_SIZE', 64))      # /search/batch encode 배치 크기
+
+# 쿼리 벡터 배열을 unnest하고 쿼리마다 LATERAL로 top-k 조회 - 모든 쿼리를 한 번의 왕복으로 처리
+# (쿼리 순서대로 LATERAL이 실행되므로 서버 측 커서로 읽으면 앞쪽 쿼리 결과부터 도착)
+BATCH_SEARCH_SQL = """
+    SELECT q.ord, i.id, i.title, i.description, 1 - i.distance AS similarity
+    FROM unnest(%s::vector[], %s::int[]) WITH ORDINALITY AS q(embedding, top_k, ord)
+    CROSS JOIN LATERAL (
+        SELECT id, title, description, issues.embedding <=> q.embedding AS distance
+        FROM issues
+        WHERE issues.embedding IS NOT NULL
+        ORDER BY distance
+        LIMIT q.top_k
+    ) i;
+"""
+BATCH_SEARCH_SQL_ASYNC = BATCH_SEARCH_SQL.replace("%s", "$1", 1).replace("%s", "$2", 1)
+
+class FilteredSearchRequest(BaseModel):
+    title: str
+    description: str = ""
+    top_k: int = 5
+    tags: list[str] = []           # 태그 조건 (대소문자 무시)
+    tags_mode: str = "all"         # all: 모두 포함, any: 하나 이상 포함
+    metadata: dict = {}            # JSONB 포함 조건 (metadata @> ...)
+    strategy: str = "auto"         # auto, prefilter, index
+
+class FilteredSearchResponse(BaseModel):
+    query: str
+    results: list[SimilarIssue]
+    search_info: dict              # 선택된 방식, 예상 행 수 / 선택도, 단계별 반환 수와 소요 시간
+
+@app.on_event("startup")
+async def startup_event():
+    """커넥션 풀 생성 + 전문 검색 컬럼/인덱스 확인 + 인메모리 검색 엔진 준비"""
+    db_pool.open()
+    await run_in_threadpool(setup_fulltext_search)
+    if async_db:
+        await async_db.open()
+    if search_engine:
+        await run_in_threadpool(search_engine.load)
+        await search_engine.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """커넥션 풀 종료"""
+    if search_engine:
+        await search_engine.stop()
+    if async_db:
+        await async_db.close()
+    db_pool.close()
+
 def connect_db():
-    """데이터베이스 연결"""
+    """커넥션 풀에서 연결 체크아웃 (반드시 release_db로 반납)"""
     try:
-        return psycopg2.connect(**db_config)
+        return db_pool.getconn()
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"DB 연결 대기 시간 초과: {e}", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"DB 연결 실패: {e}")
 
+def release_db(conn):
+    """연결을 커넥션 풀에 반납"""
+    db_pool.putconn(conn)
+
+def setup_fulltext_search():
+    """issues 테이블에 검색용 생성 컬럼(search_tsv, tag_list), metadata 컬럼과 GIN 인덱스,
+    관련 이슈 그래프 테이블(issue_neighbors)이 없으면 생성"""
+    conn = connect_db()
+    try:
+        ensure_fulltext_index(conn)
+        ensure_filter_indexes(conn)
+        ensure_neighbor_tables(conn)
+    finally:
+        release_db(conn)
+
 def clean_text(text):
     """텍스트 정제"""
     if not text:
@@ -55,6 +209,273 @@ def clean_text(text):
     text = re.sub(r'\s+', ' ', text)
     return text.strip()
 
+def search_issues_sync(embedding, top_k):
+    """psycopg2로 코사인 유사도 검색 (블로킹 함수 - 스레드 풀에서 호출)"""
+    conn = connect_db()
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        
+        # 임베딩을 문자열로 변환
+        embedding_str = '[' + ','.join(map(str, embedding.tolist())) + ']'
+        
+        # pgvector 코사인 유사도 검색
+        query = """
+            SELECT id, title, description, 
+                   1 - (embedding <=> %s::vector) as similarity
+            FROM issues
+            ORDER BY embedding <=> %s::vector
+            LIMIT %s;
+        """
+        
+        cursor.execute(query, (embedding_str, embedding_str, top_k))
+        return cursor.fetchall()
+    finally:
+        if cursor:
+            cursor.close()
+        release_db(conn)
+
+async def search_issues_async(embedding, top_k):
+    """asyncpg로 코사인 유사도 검색 (벡터는 pgvector 코덱으로 바로 전달)"""
+    return await async_db.fetch(
+        """
+            SELECT id, title, description, 
+                   1 - (embedding <=> $1) as similarity
+            FROM issues
+            ORDER BY embedding <=> $1
+            LIMIT $2;
+        """,
+        to_vector(embedding), top_k
+    )
+
+def fetch_issues_by_ids(ids):
+    """id 목록으로 이슈 제목/설명 조회 - 한 번의 왕복 (블로킹 함수 - 스레드 풀에서 호출)"""
+    conn = connect_db()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT id, title, description FROM issues WHERE id = ANY(%s);", (list(ids),))
+            return {row[0]: row for row in cursor.fetchall()}
+    finally:
+        release_db(conn)
+
+async def search_issues_memory(embedding, top_k):
+    """인메모리 정확 검색 후 본문만 DB에서 조회 → (id, title, description, similarity) 목록"""
+    hits = await search_engine.search(embedding, top_k, "cosine")
+    if not hits:
+        return []
+    ids = [hit[0] for hit in hits]
+    if async_db:
+        rows = {row[0]: tuple(row) for row in await async_db.fetch(
+            "SELECT id, title, description FROM issues WHERE id = ANY($1::int[]);", ids
+        )}
+    else:
+        rows = await run_in_threadpool(fetch_issues_by_ids, ids)
+    # 스냅샷 이후 삭제된 이슈는 제외
+    return [(issue_id, rows[issue_id][1], rows[issue_id][2], 1 - distance) for issue_id, distance in hits if issue_id in rows]
+
+def filtered_search_sync(embedding, request):
+    """조건부 벡터 검색 (블로킹 함수 - 스레드 풀에서 호출)"""
+    conn = connect_db()
+    try:
+        return filtered_search(
+            conn, embedding, request.top_k,
+            tags=request.tags, tags_mode=request.tags_mode,
+            metadata=request.metadata, strategy=request.strategy
+        )
+    finally:
+        release_db(conn)
+
+class BatchResultCollector:
+    """배치 검색 결과 행을 쿼리별로 모아, 쿼리 하나가 top_k개를 채우면 바로 NDJSON 한 줄로 내보냄"""
+    
+    def __init__(self, texts, limits):
+        self.texts = texts
+        self.limits = limits
+        self.pending = {}
+        self.sent = set()
+    
+    def _line(self, ord_):
+        results = [
+            {"id": row[0], "title": row[1], "description": row[2], "similarity": round(float(row[3]), 4)}
+            for row in self.pending.pop(ord_, [])
+        ]
+        self.sent.add(ord_)
+        return json.dumps({"index": ord_ - 1, "query": self.texts[ord_ - 1], "results": results}, ensure_ascii=False) + "\n"
+    
+    def add(self, row):
+        """결과 행 하나 추가 → 완성된 쿼리가 있으면 NDJSON 줄 반환 (없으면 None)"""
+        ord_ = int(row[0])
+        rows = self.pending.setdefault(ord_, [])
+        rows.append(tuple(row[1:]))
+        if len(rows) >= self.limits[ord_ - 1]:
+            return self._line(ord_)
+        return None
+    
+    def flush(self):
+        """아직 보내지 않은 쿼리 (테이블 행 수가 top_k보다 적거나 결과가 없는 경우) 내보내기"""
+        return [self._line(ord_) for ord_ in range(1, len(self.texts) + 1) if ord_ not in self.sent]
+
+class StreamConnectionLease:
+    """스트리밍 응답에 넘긴 풀 연결을 정확히 한 번 반납
+    
+    - 생성기가 시작되면 생성기의 finally에서 반납
+    - 생성기가 한 번도 돌지 않으면 (전송 전 클라이언트 끊김 등) finally가 실행되지 않으므로
+      응답 종료 후 BackgroundTask(release_if_idle)가 반납하고, 이후에는 생성기가 시작되지 않음
+    """
+    
+    def __init__(self, conn):
+        self.conn = conn
+        self._lock = threading.Lock()
+        self._state = "idle"  # idle → streaming → released
+    
+    def start(self):
+        """생성기 시작 - 이미 반납됐으면 False"""
+        with self._lock:
+            if self._state != "idle":
+                return False
+            self._state = "streaming"
+            return True
+    
+    def release(self):
+        with self._lock:
+            if self._state == "released":
+                return
+            self._state = "released"
+        release_db(self.conn)
+    
+    def release_if_idle(self):
+        """응답 종료 후 호출 - 생성기가 시작되지 않았을 때만 반납"""
+        with self._lock:
+            if self._state != "idle":
+                return
+            self._state = "released"
+        release_db(self.conn)
+
+def stream_batch_sync(lease, texts, embeddings, limits, summary):
+    """psycopg2 서버 측 커서로 배치 검색 결과를 읽으며 NDJSON 줄 생성 (스레드 풀에서 순회됨)"""
+    if not lease.start():
+        return
+    conn = lease.conn
+    collector = BatchResultCollector(texts, limits)
+    embedding_strs = ['[' + ','.join(map(str, embedding.tolist())) + ']' for embedding in embeddings]
+    started = time.perf_counter()
+    try:
+        with conn.cursor(name="issues_batch_search") as cursor:
+            cursor.itersize = 500
+            cursor.execute(BATCH_SEARCH_SQL, (embedding_strs, limits))
+            for row in cursor:
+                line = collector.add(row)
+                if line:
+                    yield line
+        conn.commit()
+        yield from collector.flush()
+        summary["search_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        yield json.dumps({"done": True, **summary}) + "\n"
+    except Exception as e:
+        conn.rollback()
+        yield json.dumps({"done": False, "error": f"검색 실패: {e}"}, ensure_ascii=False) + "\n"
+    finally:
+        lease.release()
+
+async def stream_batch_async(texts, embeddings, limits, summary):
+    """asyncpg 커서로 배치 검색 결과를 읽으며 NDJSON 줄 생성"""
+    collector = BatchResultCollector(texts, limits)
+    started = time.perf_counter()
+    try:
+        async with async_db.acquire() as conn:
+            async with conn.transaction():
+                async for row in conn.cursor(BATCH_SEARCH_SQL_ASYNC, [to_vector(e) for e in embeddings], limits, prefetch=500):
+                    line = collector.add(row)
+                    if line:
+                        yield line
+        for line in collector.flush():
+            yield line
+        summary["search_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        yield json.dumps({"done": True, **summary}) + "\n"
+    except Exception as e:
+        yield json.dumps({"done": False, "error": f"검색 실패: {e}"}, ensure_ascii=False) + "\n"
+
+def lexical_search_sync(query_text, limit):
+    """psycopg2로 전문 검색 후보 조회 (블로킹 함수 - 스레드 풀에서 호출)"""
+    conn = connect_db()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(LEXICAL_SEARCH_SQL, (query_text, limit))
+            return cursor.fetchall()
+    finally:
+        release_db(conn)
+
+async def lexical_search(query_text, limit):
+    """전문 검색 후보 (id, title, description, lexical_score) - ts_rank_cd 내림차순"""
+    if async_db:
+        return await async_db.fetch(LEXICAL_SEARCH_SQL_ASYNC, query_text, limit)
+    return await run_in_threadpool(lexical_search_sync, query_text, limit)
+
+async def vector_search(combined_text, limit):
+    """임베딩 생성 후 벡터 검색 후보 (id, title, description, similarity) - 유사도 내림차순
+    
+    Returns:
+        tuple: (후보 목록, 임베딩 생성 시간 ms)
+    """
+    embedding, embed_ms = await timed(run_in_threadpool(model.encode, [combined_text]))
+    embedding = embedding[0]
+    if search_engine:
+        return await search_issues_memory(embedding, limit), embed_ms
+    if async_db:
+        return await search_issues_async(embedding, limit), embed_ms
+    return await run_in_threadpool(search_issues_sync, embedding, limit), embed_ms
+
+async def timed(coro):
+    """코루틴 실행 결과와 소요 시간(ms)"""
+    started = time.perf_counter()
+    result = await coro
+    return result, round((time.perf_counter() - started) * 1000, 3)
+
+def similar_by_id_sync(issue_id, top_k, exclude_self, max_distance):
+    """저장된 이슈 임베딩으로 유사 이슈 검색 (블로킹 함수 - 스레드 풀에서 호출)
+    
+    Returns:
+        tuple: ((id, title, description, distance) 목록, 기준 이슈 존재 여부)
+    """
+    conn = connect_db()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                SIMILAR_BY_ID_SQL[(exclude_self, max_distance is not None)],
+                {"source_id": issue_id, "max_distance": max_distance, "limit": top_k}
+            )
+            rows = cursor.fetchall()
+            exists = True
+            if not rows:  # 결과가 없을 때만 기준 이슈 존재 여부 확인 (404와 빈 결과 구분)
+                cursor.execute(ISSUE_EXISTS_SQL, (issue_id,))
+                exists = cursor.fetchone()[0]
+        conn.commit()
+        return rows, exists
+    finally:
+        release_db(conn)
+
+async def similar_by_id_async(issue_id, top_k, exclude_self, max_distance):
+    """similar_by_id_sync의 asyncpg 버전"""
+    args = [issue_id, top_k] + ([max_distance] if max_distance is not None else [])
+    async with async_db.acquire() as conn:
+        rows = await conn.fetch(SIMILAR_BY_ID_SQL_ASYNC[(exclude_self, max_distance is not None)], *args)
+        exists = True
+        if not rows:
+            exists = await conn.fetchval(ISSUE_EXISTS_SQL.replace("%s", "$1"), issue_id)
+    return [tuple(row) for row in rows], exists
+
+def related_issues_sync(issue_id, top_k):
+    """사전 계산된 이웃 그래프에서 관련 이슈 조회 - 기본키 범위 읽기 (블로킹 함수 - 스레드 풀에서 호출)"""
+    conn = connect_db()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(RELATED_ISSUES_SQL, (issue_id, top_k))
+            rows = cursor.fetchall()
+        conn.commit()
+        return rows
+    finally:
+        release_db(conn)
+
 @app.get("/")
 async def root():
     """API 상태 확인"""
@@ -72,31 +493,20 @@ async def search_similar_issues(request: IssueSearchRequest):
     if not combined_text.strip():
         raise HTTPException(status_code=400, detail="제목 또는 설명을 입력해주세요")
     
-    # 2. 임베딩 생성
+    # 2. 임베딩 생성 (encode는 CPU 연산이므로 스레드 풀에서 실행)
     try:
-        embedding = model.encode([combined_text])[0]
+        embedding = (await run_in_threadpool(model.encode, [combined_text]))[0]
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"임베딩 생성 실패: {e}")
     
-    # 3. 유사도 검색
-    conn = connect_db()
+    # 3. 유사도 검색 (인메모리 엔진 또는 DB - asyncpg는 직접 await, psycopg2는 스레드 풀에서 실행)
     try:
-        cursor = conn.cursor()
-        
-        # 임베딩을 문자열로 변환
-        embedding_str = '[' + ','.join(map(str, embedding.tolist())) + ']'
-        
-        # pgvector 코사인 유사도 검색
-        query = """
-            SELECT id, title, description, 
-                   1 - (embedding <=> %s::vector) as similarity
-            FROM issues
-            ORDER BY embedding <=> %s::vector
-            LIMIT %s;
-        """
-        
-        cursor.execute(query, (embedding_str, embedding_str, request.top_k))
-        results = cursor.fetchall()
+        if search_engine:
+            results = await search_issues_memory(embedding, request.top_k)
+        elif async_db:
+            results = await search_issues_async(embedding, request.top_k)
+        else:
+            results = await run_in_threadpool(search_issues_sync, embedding, request.top_k)
         
         # 결과 변환
         similar_issues = [
@@ -114,28 +524,274 @@ async def search_similar_issues(request: IssueSearchRequest):
             results=similar_issues
         )
         
+    except HTTPException:
+        raise
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"DB 연결 대기 시간 초과: {e}", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"검색 실패: {e}")
+
+@app.get("/issues/{issue_id}/similar", response_model=SimilarByIdResponse)
+async def similar_issues_by_id(issue_id: int, top_k: int = 5, exclude_self: bool = True, max_distance: float = None):
+    """저장된 이슈와 비슷한 이슈 검색 API ("이것과 비슷한 이슈")
+    
+    저장된 임베딩을 SQL 안에서 그대로 사용 - model.encode 호출 없음, 벡터가 클라이언트로 오가지 않음
+    - exclude_self: 기준 이슈를 결과에서 제외
+    - max_distance: 코사인 거리 상한 (None이면 제한 없음)
+    """
+    if not 1 <= top_k <= MAX_CANDIDATE_K:
+        raise HTTPException(status_code=400, detail=f"top_k는 1~{MAX_CANDIDATE_K} 사이여야 합니다")
+    try:
+        if async_db:
+            rows, exists = await similar_by_id_async(issue_id, top_k, exclude_self, max_distance)
+        else:
+            rows, exists = await run_in_threadpool(similar_by_id_sync, issue_id, top_k, exclude_self, max_distance)
+    except HTTPException:
+        raise
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"DB 연결 대기 시간 초과: {e}", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"검색 실패: {e}")
+    if not exists:
+        raise HTTPException(status_code=404, detail=f"이슈 {issue_id}(임베딩)를 찾을 수 없습니다")
+    
+    return SimilarByIdResponse(
+        issue_id=issue_id,
+        results=[
+            SimilarIssue(id=row[0], title=row[1], description=row[2], similarity=round(1 - float(row[3]), 4))
+            for row in rows
+        ]
+    )
+
+@app.get("/issues/{issue_id}/related", response_model=RelatedIssuesResponse)
+async def related_issues(issue_id: int, top_k: int = 5):
+    """관련 이슈 API - issue_neighbors(사전 계산 k-최근접 이웃 그래프)에서 기본키로 조회
+    
+    그래프에 아직 없는 이슈(마지막 계산 이후 등록)는 저장된 임베딩 기준 벡터 검색으로 응답
+    저장된 이웃 수(ISSUE_NEIGHBORS_K)보다 큰 top_k는 그래프가 채울 수 없으므로 벡터 검색 사용
+    """
+    if not 1 <= top_k <= MAX_CANDIDATE_K:
+        raise HTTPException(status_code=400, detail=f"top_k는 1~{MAX_CANDIDATE_K} 사이여야 합니다")
+    try:
+        if async_db:
+            rows = [tuple(row) for row in await async_db.fetch(RELATED_ISSUES_SQL_ASYNC, issue_id, top_k)]
+        else:
+            rows = await run_in_threadpool(related_issues_sync, issue_id, top_k)
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"DB 연결 대기 시간 초과: {e}", headers={"Retry-After": "1"})
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"관련 이슈 조회 실패: {e}")
+    
+    if len(rows) >= top_k:
+        return RelatedIssuesResponse(
+            issue_id=issue_id,
+            source="graph",
+            results=[
+                SimilarIssue(id=row[0], title=row[1], description=row[2], similarity=round(float(row[3]), 4))
+                for row in rows
+            ]
+        )
+    
+    fallback = await similar_issues_by_id(issue_id, top_k=top_k, exclude_self=True, max_distance=None)
+    return RelatedIssuesResponse(issue_id=issue_id, source="vector", results=fallback.results)
+
+@app.post("/search/batch")
+async def search_batch(request: BatchSearchRequest):
+    """여러 이슈의 유사 이슈를 한 번에 검색 (NDJSON 스트리밍)
+    
+    1. 모든 쿼리를 model.encode 한 번(배치)으로 임베딩
+    2. unnest(쿼리 벡터) + LATERAL top-k로 모든 쿼리를 SQL 한 번에 처리
+    3. 쿼리 하나의 결과가 완성될 때마다 한 줄씩 전송: {"index", "query", "results"}
+    4. 마지막 줄: {"done": true, "queries", "encode_ms", "search_ms"} (실패시 {"done": false, "error"})
+    """
+    
+    # 1. 입력 검증 및 텍스트 정제
+    if not request.queries:
+        raise HTTPException(status_code=400, detail="queries가 비어 있습니다")
+    if len(request.queries) > MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=400, detail=f"쿼리는 최대 {MAX_BATCH_QUERIES}개까지 요청할 수 있습니다")
+    texts = [(clean_text(q.title) + ' ' + clean_text(q.description)).strip() for q in request.queries]
+    empty = [i for i, text in enumerate(texts) if not text]
+    if empty:
+        raise HTTPException(status_code=400, detail=f"제목 또는 설명이 비어 있는 쿼리: {empty[:20]}")
+    limits = [q.top_k for q in request.queries]
+    if not all(1 <= limit <= MAX_CANDIDATE_K for limit in limits):
+        raise HTTPException(status_code=400, detail=f"top_k는 1~{MAX_CANDIDATE_K} 사이여야 합니다")
+    
+    # 2. 모든 쿼리를 한 번의 encode 호출로 임베딩 (스레드 풀에서 실행)
+    started = time.perf_counter()
+    try:
+        embeddings = await run_in_threadpool(model.encode, texts, batch_size=BATCH_ENCODE_SIZE)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"임베딩 생성 실패: {e}")
+    summary = {"queries": len(texts), "encode_ms": round((time.perf_counter() - started) * 1000, 3)}
+    
+    # 3. 검색 결과 스트리밍 (psycopg2는 커넥션을 먼저 얻어 풀 대기 초과를 503으로 응답)
+    #    - 생성기가 한 번도 돌지 않아도 응답 종료 후 BackgroundTask가 연결을 반납
+    if async_db:
+        return StreamingResponse(stream_batch_async(texts, embeddings, limits, summary), media_type="application/x-ndjson")
+    lease = StreamConnectionLease(await run_in_threadpool(connect_db))
+    return StreamingResponse(
+        stream_batch_sync(lease, texts, embeddings, limits, summary),
+        media_type="application/x-ndjson",
+        background=BackgroundTask(lease.release_if_idle),
+    )
+
+@app.post("/search/filtered", response_model=FilteredSearchResponse)
+async def search_filtered_issues(request: FilteredSearchRequest):
+    """태그 / 메타데이터 조건부 유사 이슈 검색 API
+    
+    조건에 맞는 예상 행 수가 적으면 prefilter(GIN 후보 + 정확 거리), 많으면 벡터 인덱스 스캔을 사용하고
+    결과가 부족하면 probes / ef_search를 넓혀 재검색 → 조건에 맞는 이슈가 top_k개 이상이면 항상 top_k개 반환
+    """
+    
+    # 1. 텍스트 정제 및 입력 검증
+    title = clean_text(request.title)
+    description = clean_text(request.description)
+    combined_text = (title + ' ' + description).strip()
+    
+    if not combined_text:
+        raise HTTPException(status_code=400, detail="제목 또는 설명을 입력해주세요")
+    if not 1 <= request.top_k <= MAX_CANDIDATE_K:
+        raise HTTPException(status_code=400, detail=f"top_k는 1~{MAX_CANDIDATE_K} 사이여야 합니다")
+    
+    # 2. 임베딩 생성 (encode는 CPU 연산이므로 스레드 풀에서 실행)
+    try:
+        embedding = (await run_in_threadpool(model.encode, [combined_text]))[0]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"임베딩 생성 실패: {e}")
+    
+    # 3. 조건부 검색
+    try:
+        results, search_info = await run_in_threadpool(filtered_search_sync, embedding, request)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"DB 연결 대기 시간 초과: {e}", headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"검색 실패: {e}")
+    
+    return FilteredSearchResponse(
+        query=combined_text,
+        results=[
+            SimilarIssue(id=row[0], title=row[1], description=row[2], similarity=round(row[3], 4))
+            for row in results
+        ],
+        search_info=search_info
+    )
+
+@app.post("/search/hybrid", response_model=HybridSearchResponse)
+async def hybrid_search(request: HybridSearchRequest):
+    """하이브리드 이슈 검색 API (전문 검색 + 벡터 검색을 동시에 실행 후 RRF로 결합)"""
+    
+    # 1. 텍스트 정제 및 입력 검증
+    title = clean_text(request.title)
+    description = clean_text(request.description)
+    combined_text = (title + ' ' + description).strip()
+    
+    if not combined_text:
+        raise HTTPException(status_code=400, detail="제목 또는 설명을 입력해주세요")
+    for name in ('lexical_k', 'vector_k', 'top_k'):
+        if not 1 <= getattr(request, name) <= MAX_CANDIDATE_K:
+            raise HTTPException(status_code=400, detail=f"{name}은 1~{MAX_CANDIDATE_K} 사이여야 합니다")
+    
+    # 2. 전문 검색과 (임베딩 생성 → 벡터 검색)을 동시에 실행
+    started = time.perf_counter()
+    try:
+        (lexical_rows, lexical_ms), ((vector_rows, embed_ms), vector_ms) = await asyncio.gather(
+            timed(lexical_search(combined_text, request.lexical_k)),
+            timed(vector_search(combined_text, request.vector_k))
+        )
+    except HTTPException:
+        raise
+    except PoolTimeoutError as e:
+        raise HTTPException(status_code=503, detail=f"DB 연결 대기 시간 초과: {e}", headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"검색 실패: {e}")
+    candidates_ms = round((time.perf_counter() - started) * 1000, 3)
+    
+    # 3. RRF 결합
+    fusion_started = time.perf_counter()
+    rows = {}
+    lexical_ranks = {}
+    vector_ranks = {}
+    similarities = {}
+    for rank, row in enumerate(lexical_rows, 1):
+        rows.setdefault(row[0], row)
+        lexical_ranks[row[0]] = rank
+    for rank, row in enumerate(vector_rows, 1):
+        rows.setdefault(row[0], row)
+        vector_ranks[row[0]] = rank
+        similarities[row[0]] = round(float(row[3]), 4)
+    
+    fused = reciprocal_rank_fusion(
+        [[row[0] for row in lexical_rows], [row[0] for row in vector_rows]],
+        rrf_k=request.rrf_k,
+        weights=[request.lexical_weight, request.vector_weight]
+    )[:request.top_k]
+    results = [
+        HybridIssue(
+            id=issue_id,
+            title=rows[issue_id][1],
+            description=rows[issue_id][2],
+            score=round(score, 6),
+            lexical_rank=lexical_ranks.get(issue_id),
+            vector_rank=vector_ranks.get(issue_id),
+            similarity=similarities.get(issue_id)
+        )
+        for issue_id, score in fused
+    ]
+    fusion_ms = round((time.perf_counter() - fusion_started) * 1000, 3)
+    
+    return HybridSearchResponse(
+        query=combined_text,
+        results=results,
+        candidates={"lexical": len(lexical_rows), "vector": len(vector_rows)},
+        timings_ms={
+            "lexical": lexical_ms,               # 전문 검색
+            "embedding": embed_ms,               # 쿼리 임베딩 생성
+            "vector": round(vector_ms - embed_ms, 3),   # 벡터 검색
+            "candidates": candidates_ms,         # 두 검색 동시 실행 (벽시계 시간)
+            "fusion": fusion_ms,
+            "total": round((time.perf_counter() - started) * 1000, 3)
+        }
+    )
+
+@app.get("/metrics/db")
+async def db_metrics():
+    """커넥션 풀 메트릭 (대기 시간, 체크아웃 횟수, 교체/폐기 연결 수)"""
+    metrics = db_pool.get_metrics()
+    metrics["async"] = async_db.get_metrics() if async_db else None
+    metrics["search_engine"] = search_engine.get_metrics() if search_engine else None
+    return metrics
+
+def count_issues_sync():
+    """전체 이슈 수 조회 (블로킹 함수 - 스레드 풀에서 호출)"""
+    conn = connect_db()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM issues;")
+            return cursor.fetchone()[0]
     finally:
-        cursor.close()
-        conn.close()
+        release_db(conn)
 
 @app.get("/health")
 async def health_check():
-    """헬스 체크"""
+    """헬스 체크 (풀 대기와 COUNT 쿼리는 스레드 풀에서 실행 → 풀이 가득 차도 다른 요청을 막지 않음)"""
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM issues;")
-        count = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
-        
+        count = await run_in_threadpool(count_issues_sync)
         return {
             "status": "healthy",
             "database": "connected",
-            "total_issues": count
+            "total_issues": count,
+            "pool": db_pool.get_metrics()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"헬스 체크 실패: {e}")
 
@@ -4,15 +4,28 @@ import numpy as np
 from sentence_transformers import SentenceTransformer
 import re
 import os
+import sys
 from dotenv import load_dotenv
 
+# 상위 폴더(3_DataBase)의 공용 모듈 사용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from embedding_cache import EmbeddingCache
+from bulk_loader import BulkLoader
+from vector_index import build_vector_index, index_settings_from_env
+from hybrid_search import ensure_fulltext_index
+from filtered_search import ensure_filter_indexes
+
 # 환경변수 로드
 load_dotenv()
 
+MODEL_NAME = 'all-MiniLM-L6-v2'
+
 class IssueEmbeddingProcessor:
     def __init__(self):
         # 임베딩 모델 초기화 (384차원)
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = SentenceTransformer(MODEL_NAME)
+        # 영구 임베딩 캐시 (재실행시 같은 텍스트는 다시 임베딩하지 않음)
+        self.cache = EmbeddingCache(MODEL_NAME)
         
         # DB 연결 정보
         self.db_config = {
@@ -55,6 +68,7 @@ class IssueEmbeddingProcessor:
                     id SERIAL PRIMARY KEY,
                     title TEXT,
                     description TEXT,
+                    tags TEXT,
                     embedding vector(384)
                 );
             """)
@@ -105,9 +119,10 @@ class IssueEmbeddingProcessor:
             print(f"필수 컬럼이 없습니다: {missing_columns}")
             return None
         
-        # 텍스트 정제
+        # 텍스트 정제 (tags는 하이브리드 검색의 전문 검색 대상, 없으면 빈 문자열)
         df['title'] = df['title'].apply(self.clean_text)
         df['description'] = df['description'].apply(self.clean_text)
+        df['tags'] = df['tags'].apply(self.clean_text) if 'tags' in df.columns else ''
         
         # title과 description 결합
         df['combined_text'] = df['title'] + ' ' + df['description']
@@ -122,45 +137,67 @@ class IssueEmbeddingProcessor:
         """텍스트 임베딩 생성"""
         print("임베딩 생성 중...")
         try:
-            embeddings = self.model.encode(texts, show_progress_bar=True)
+            embeddings = self.cache.encode(self.model, texts, show_progress_bar=True)
             print(f"임베딩 생성 완료: {embeddings.shape}")
+            
+            stats = self.cache.stats()
+            print(f"임베딩 캐시 - 적중: {stats['memory_hits'] + stats['disk_hits']}, "
+                  f"미스: {stats['misses']}, 적중률: {stats['hit_ratio'] * 100:.1f}%")
             return embeddings
         except Exception as e:
             print(f"임베딩 생성 실패: {e}")
             return None
     
     def save_to_db(self, df, embeddings):
-        """데이터베이스에 저장"""
+        """데이터베이스에 저장 (바이너리 COPY로 청크 단위 적재)"""
         conn = self.connect_db()
         if not conn:
             return False
         
         try:
-            cursor = conn.cursor()
-            
             print("데이터베이스에 저장 중...")
-            for i, (_, row) in enumerate(df.iterrows()):
-                # 임베딩을 리스트로 변환
-                embedding_list = embeddings[i].tolist()
-                
-                cursor.execute(
-                    "INSERT INTO issues (title, description, embedding) VALUES (%s, %s, %s)",
-                    (row['title'], row['description'], embedding_list)
-                )
-                
-                if (i + 1) % 100 == 0:
-                    print(f"{i + 1}개 저장 완료...")
+            rows = zip(df['title'], df['description'], df['tags'], embeddings)
+            report = BulkLoader(conn, chunk_rows=5000).load("issues", rows, columns=["title", "description", "tags", "embedding"])
             
-            conn.commit()
-            print(f"총 {len(df)}개 이슈 저장 완료")
-            return True
+            for failure in report['failed_chunks']:
+                print(f"저장 실패 - 행 {failure['first_row']}~{failure['last_row']}: {failure['error']}")
+            print(f"총 {report['rows_loaded']}개 이슈 저장 완료 ({report['rows_per_sec']} rows/sec)")
+            return not report['failed_chunks']
             
         except Exception as e:
             print(f"저장 실패: {e}")
             conn.rollback()
             return False
         finally:
-            cursor.close()
+            conn.close()
+    
+    def build_index(self):
+        """적재 완료 후 벡터 인덱스 생성 (lists는 행 수로 계산, HNSW는 VECTOR_INDEX_METHOD=hnsw)"""
+        conn = self.connect_db()
+        if not conn:
+            return None
+        
+        try:
+            settings = index_settings_from_env()
+            result = build_vector_index(
+                conn, "issues", "embedding",
+                method=settings["method"],
+                m=settings["m"],
+                ef_construction=settings["ef_construction"],
+                maintenance_work_mem=settings["maintenance_work_mem"]
+            )
+            print(f"벡터 인덱스 생성 완료: {result['index_name']} {result['params']} "
+                  f"({result['build_seconds']}초, {result['size']})")
+            
+            # 하이브리드 / 조건부 검색용 생성 컬럼 + GIN 인덱스 (적재 후 한 번에 생성)
+            ensure_fulltext_index(conn)
+            ensure_filter_indexes(conn)
+            print("전문 검색 / 태그 / 메타데이터 인덱스 생성 완료")
+            return result
+        except Exception as e:
+            print(f"인덱스 생성 실패: {e}")
+            return None
+        finally:
             conn.close()
     
     def verify_data(self):
@@ -215,7 +252,10 @@ class IssueEmbeddingProcessor:
         success = self.save_to_db(df_cleaned, embeddings)
         
         if success:
-            # 6. 데이터 확인
+            # 6. 적재 완료 후 벡터 인덱스 생성
+            self.build_index()
+            
+            # 7. 데이터 확인
             self.verify_data()
             print("=== 1단계 처리 완료! ===")
         else:
@@ -0,0 +1,188 @@
+"""
+태그 / JSONB 메타데이터 조건을 적용한 GitHub 이슈 벡터 검색
+
+top-k를 먼저 구한 뒤 조건으로 거르면 조건이 까다로울수록 결과가 k개보다 적어집니다.
+조건을 검색 안으로 넣고, 조건의 선택도(selectivity)에 따라 두 가지 방식 중 하나를 고릅니다.
+
+1. prefilter: 조건에 맞는 행이 적을 때
+   - GIN 인덱스로 후보 집합을 먼저 구하고 (MATERIALIZED CTE) 후보 전체의 거리를 정확히 계산
+   - 후보가 적으므로 빠르고, 맞는 행이 있으면 항상 min(k, 맞는 행 수)개 반환
+2. index: 조건에 맞는 행이 많을 때
+   - 벡터 인덱스 스캔 + WHERE 조건, 결과가 k개보다 적으면 probes / ef_search를 늘려 다시 검색 (iterative widening)
+   - 마지막 단계까지 부족하면 prefilter로 전환 → k개 보장 (맞는 행이 k개 이상일 때)
+
+선택도는 EXPLAIN의 예상 행 수로 추정 (실제 스캔 없음)
+
+조건 컬럼 (ensure_filter_indexes가 없으면 생성):
+    tag_list  text[]  tags("auth,frontend")를 소문자 배열로 만든 생성 컬럼 + GIN 인덱스
+    metadata  jsonb   자유 형식 메타데이터 + GIN(jsonb_path_ops) 인덱스
+
+환경변수 (기본값):
+    FILTER_PREFILTER_MAX_ROWS   예상 행 수가 이 값 이하이면 prefilter (10000)
+"""
+
+import json
+import os
+import sys
+import time
+
+# 상위 폴더(3_DataBase)의 공용 모듈 사용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from vector_search import search_settings
+
+PREFILTER_MAX_ROWS = int(os.getenv("FILTER_PREFILTER_MAX_ROWS", 10000))
+
+# index 방식의 단계별 (ivfflat.probes, hnsw.ef_search) - 부족하면 다음 단계로 넓힘
+WIDENING_STEPS = [(10, 40), (40, 160), (160, 640)]
+
+
+def ensure_filter_indexes(conn):
+    """tag_list 생성 컬럼 / metadata 컬럼과 GIN 인덱스가 없으면 생성 (여러 번 실행해도 안전)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("ALTER TABLE issues ADD COLUMN IF NOT EXISTS tags TEXT;")
+        cursor.execute("""
+            ALTER TABLE issues ADD COLUMN IF NOT EXISTS tag_list text[]
+            GENERATED ALWAYS AS (string_to_array(lower(replace(coalesce(tags, ''), ' ', '')), ',')) STORED;
+        """)
+        cursor.execute("ALTER TABLE issues ADD COLUMN IF NOT EXISTS metadata JSONB NOT NULL DEFAULT '{}'::jsonb;")
+        cursor.execute("CREATE INDEX IF NOT EXISTS issues_tag_list_idx ON issues USING GIN (tag_list);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS issues_metadata_idx ON issues USING GIN (metadata jsonb_path_ops);")
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def normalize_tags(tags):
+    """요청 태그를 tag_list 생성 컬럼과 같은 방식으로 정규화 (공백 전부 제거 → 소문자, 쉼표로 분리, 빈 값 제외)"""
+    normalized = []
+    for tag in tags:
+        normalized.extend(part for part in tag.replace(" ", "").lower().split(",") if part)
+    return normalized
+
+
+def build_filter(tags=None, tags_mode="all", metadata=None):
+    """
+    조건 WHERE 절과 파라미터 생성
+
+    Args:
+        tags: 태그 목록 (대소문자 / 공백 무시, normalize_tags)
+        tags_mode: "all" (모두 포함, @>) 또는 "any" (하나 이상 포함, &&)
+        metadata: JSONB 포함 조건 (metadata @> ...)
+
+    Returns:
+        tuple: (WHERE 절 문자열, 파라미터 리스트) - 조건이 없으면 ("TRUE", [])
+    """
+    clauses, params = [], []
+    tags = normalize_tags(tags or [])
+    if tags:
+        if tags_mode not in ("all", "any"):
+            raise ValueError(f"tags_mode는 all 또는 any여야 합니다: {tags_mode}")
+        operator = "@>" if tags_mode == "all" else "&&"
+        clauses.append(f"tag_list {operator} %s::text[]")
+        params.append(tags)
+    if metadata:
+        clauses.append("metadata @> %s::jsonb")
+        params.append(json.dumps(metadata))
+    return (" AND ".join(clauses) or "TRUE"), params
+
+
+def estimate_rows(cursor, where_sql, params):
+    """플래너의 예상 행 수와 전체 행 수 (EXPLAIN만 실행, 실제 스캔 없음)"""
+    cursor.execute(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM issues WHERE {where_sql};", params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    estimated = int(plan[0]["Plan"]["Plan Rows"])
+    cursor.execute("SELECT GREATEST(reltuples, 0)::bigint FROM pg_class WHERE oid = 'issues'::regclass;")
+    total = cursor.fetchone()[0]
+    return estimated, total
+
+
+def prefilter_search(cursor, embedding_str, where_sql, params, top_k):
+    """조건에 맞는 후보 집합(GIN)을 먼저 구하고 후보 전체의 거리를 정확히 계산"""
+    cursor.execute(f"""
+        WITH candidates AS MATERIALIZED (
+            SELECT id, title, description, embedding
+            FROM issues
+            WHERE {where_sql} AND embedding IS NOT NULL
+        )
+        SELECT id, title, description, embedding <=> %s::vector AS distance
+        FROM candidates
+        ORDER BY distance
+        LIMIT %s;
+    """, params + [embedding_str, top_k])
+    return cursor.fetchall()
+
+
+def index_search(cursor, embedding_str, where_sql, params, top_k, probes, ef_search):
+    """벡터 인덱스 스캔 + 조건 (probes / ef_search는 이번 트랜잭션에만 적용)"""
+    for name, value in search_settings(probes, ef_search):
+        cursor.execute("SELECT set_config(%s, %s, true);", (name, value))
+    cursor.execute(f"""
+        SELECT id, title, description, embedding <=> %s::vector AS distance
+        FROM issues
+        WHERE {where_sql} AND embedding IS NOT NULL
+        ORDER BY distance
+        LIMIT %s;
+    """, [embedding_str] + params + [top_k])
+    return cursor.fetchall()
+
+
+def filtered_search(conn, embedding, top_k=5, tags=None, tags_mode="all", metadata=None, strategy="auto"):
+    """
+    조건부 벡터 검색 (블로킹 함수 - 스레드 풀에서 호출)
+
+    Args:
+        conn: psycopg2 연결
+        embedding: 쿼리 임베딩 (numpy 배열 또는 리스트)
+        strategy: "auto" (예상 행 수로 선택), "prefilter", "index"
+
+    Returns:
+        tuple: (결과 [(id, title, description, similarity)], 검색 정보 딕셔너리)
+    """
+    if strategy not in ("auto", "prefilter", "index"):
+        raise ValueError(f"strategy는 auto, prefilter, index 중 하나여야 합니다: {strategy}")
+    where_sql, params = build_filter(tags, tags_mode, metadata)
+    vector = embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
+    embedding_str = '[' + ','.join(map(str, vector)) + ']'
+    started = time.perf_counter()
+    info = {"requested": strategy, "filter": where_sql, "rounds": []}
+
+    cursor = conn.cursor()
+    try:
+        estimated, total = estimate_rows(cursor, where_sql, params)
+        info["estimated_rows"] = estimated
+        info["selectivity"] = round(estimated / total, 6) if total else None
+        if strategy == "auto":
+            strategy = "prefilter" if estimated <= PREFILTER_MAX_ROWS else "index"
+
+        rows = []
+        if strategy == "index":
+            for probes, ef_search in WIDENING_STEPS:
+                round_started = time.perf_counter()
+                rows = index_search(cursor, embedding_str, where_sql, params, top_k, probes, ef_search)
+                conn.commit()  # set_config(..., true)는 트랜잭션이 끝나면 원래대로
+                info["rounds"].append({
+                    "strategy": "index", "probes": probes, "ef_search": ef_search,
+                    "returned": len(rows), "ms": round((time.perf_counter() - round_started) * 1000, 3)
+                })
+                if len(rows) >= top_k:
+                    break
+
+        # prefilter 선택 또는 index 방식이 마지막 단계까지 k개를 못 채운 경우
+        if len(rows) < top_k:
+            round_started = time.perf_counter()
+            rows = prefilter_search(cursor, embedding_str, where_sql, params, top_k)
+            conn.commit()
+            info["rounds"].append({
+                "strategy": "prefilter", "returned": len(rows),
+                "ms": round((time.perf_counter() - round_started) * 1000, 3)
+            })
+        conn.commit()
+    finally:
+        cursor.close()
+
+    info["strategy"] = info["rounds"][-1]["strategy"] if info["rounds"] else strategy
+    info["total_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return [(row[0], row[1], row[2], 1 - float(row[3])) for row in rows], info
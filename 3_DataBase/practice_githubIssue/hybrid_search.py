@@ -0,0 +1,68 @@
+"""
+GitHub 이슈 하이브리드 검색 (전문 검색 + 벡터 검색, Reciprocal Rank Fusion)
+
+벡터 검색만으로는 에러 코드나 태그 이름("auth", "upload")처럼 정확한 토큰이 들어간 질의를 놓치는 경우가 많아
+tsvector 전문 검색 후보와 pgvector 후보를 각각 구한 뒤 순위 기반으로 합칩니다.
+
+구성:
+1. issues.search_tsv: title / tags(가중치 A) + description(가중치 B)로 만든 생성(GENERATED) tsvector 컬럼 + GIN 인덱스
+   - 'simple' 설정 사용: 어간 추출을 하지 않아 에러 코드 / 태그 토큰이 그대로 매칭됨
+2. 전문 검색 질의는 단어를 OR로 묶음 (plainto_tsquery는 AND라서 자연어 질의에 너무 엄격)
+3. reciprocal_rank_fusion: 점수 = Σ weight / (rrf_k + 순위) - 두 검색의 점수 척도가 달라도 순위만으로 결합
+"""
+
+# title / tags는 가중치 A, description은 B
+SEARCH_TSV_EXPRESSION = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(tags, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+# 질의어를 OR로 묶은 tsquery (단어 하나만 일치해도 후보, 많이 일치할수록 ts_rank_cd가 높음)
+OR_TSQUERY = "replace(plainto_tsquery('simple', %s)::text, ' & ', ' | ')::tsquery"
+
+LEXICAL_SEARCH_SQL = f"""
+    SELECT id, title, description, ts_rank_cd(search_tsv, query) AS lexical_score
+    FROM issues, {OR_TSQUERY} AS query
+    WHERE search_tsv @@ query
+    ORDER BY lexical_score DESC, id
+    LIMIT %s;
+"""
+
+# asyncpg용 ($n 파라미터)
+LEXICAL_SEARCH_SQL_ASYNC = LEXICAL_SEARCH_SQL.replace("%s", "$1", 1).replace("%s", "$2", 1)
+
+
+def ensure_fulltext_index(conn):
+    """tags / search_tsv 컬럼과 GIN 인덱스가 없으면 생성 (여러 번 실행해도 안전)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("ALTER TABLE issues ADD COLUMN IF NOT EXISTS tags TEXT;")
+        cursor.execute(f"""
+            ALTER TABLE issues ADD COLUMN IF NOT EXISTS search_tsv tsvector
+            GENERATED ALWAYS AS ({SEARCH_TSV_EXPRESSION}) STORED;
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS issues_search_tsv_idx ON issues USING GIN (search_tsv);")
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def reciprocal_rank_fusion(ranked_id_lists, rrf_k=60, weights=None):
+    """
+    여러 순위 목록을 RRF로 결합
+
+    Args:
+        ranked_id_lists: 검색별 id 목록 (앞쪽일수록 상위)
+        rrf_k: 순위 완화 상수 (클수록 하위 순위의 영향이 커짐)
+        weights: 검색별 가중치 (None이면 모두 1.0)
+
+    Returns:
+        list: (id, 점수) 목록 (점수 내림차순, 같으면 id 오름차순)
+    """
+    scores = {}
+    for position, ids in enumerate(ranked_id_lists):
+        weight = weights[position] if weights else 1.0
+        for rank, item_id in enumerate(ids, 1):
+            scores[item_id] = scores.get(item_id, 0.0) + weight / (rrf_k + rank)
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
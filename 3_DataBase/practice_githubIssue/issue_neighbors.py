@@ -0,0 +1,374 @@
+"""
+GitHub 이슈 k-최근접 이웃 그래프 사전 계산 ("관련 이슈" 패널용)
+
+관련 이슈 패널은 같은 이슈의 이웃을 반복해서 조회하므로, 전체 이슈 쌍의 top-k를 오프라인으로 계산해
+issue_neighbors 테이블에 저장하고 API는 기본키 범위 읽기 한 번으로 응답합니다.
+
+계산 방식:
+1. 임베딩을 float32 행렬로 읽어 L2 정규화 → 내적 = 코사인 유사도
+2. 행 블록(block_rows) × 열 블록(block_cols) 단위 행렬곱으로 유사도를 구하고
+   행별 top-k만 유지 → 메모리 사용량은 블록 크기에 비례 (N×N 행렬을 만들지 않음)
+3. 행 블록을 스레드 풀에서 병렬 처리 (numpy 행렬곱은 GIL을 풀어 여러 코어 사용)
+
+저장:
+- rebuild: 새 테이블(issue_neighbors_new)에 COPY로 적재 후 한 트랜잭션에서 이름 교체 → 조회는 항상 완성된 그래프
+- update: 마지막 계산 이후 추가된 이슈(id > last_issue_id)만 처리
+  - 새 이슈: 전체 이슈 중 top-k 계산 후 삽입
+  - 기존 이슈: 새 이슈가 현재 k번째 이웃보다 가까운 경우에만 이웃 목록을 다시 써서 영향받는 행만 수정
+- 삭제된 이슈는 조회시 issues와 조인하여 제외, 수정된 임베딩은 주기적인 rebuild로 반영
+
+실행:
+    python issue_neighbors.py --rebuild --k 20   # 전체 다시 계산
+    python issue_neighbors.py                    # 증분 갱신 (그래프가 없으면 rebuild)
+
+환경변수 (기본값):
+    ISSUE_NEIGHBORS_K            이슈당 저장할 이웃 수 (20)
+    ISSUE_NEIGHBORS_BLOCK_ROWS   행 블록 크기 (1024)
+    ISSUE_NEIGHBORS_BLOCK_COLS   열 블록 크기 (16384)
+    ISSUE_NEIGHBORS_WORKERS      병렬 처리 스레드 수 (CPU 코어 수)
+"""
+
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# 상위 폴더(3_DataBase)의 공용 모듈 사용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bulk_loader import encode_copy_chunk, swap_table
+
+logger = logging.getLogger(__name__)
+
+NEIGHBORS_K = int(os.getenv("ISSUE_NEIGHBORS_K", 20))
+BLOCK_ROWS = int(os.getenv("ISSUE_NEIGHBORS_BLOCK_ROWS", 1024))
+BLOCK_COLS = int(os.getenv("ISSUE_NEIGHBORS_BLOCK_COLS", 16384))
+WORKERS = int(os.getenv("ISSUE_NEIGHBORS_WORKERS", os.cpu_count() or 1))
+
+NEIGHBORS_TABLE = "issue_neighbors"
+STATE_TABLE = "issue_neighbors_state"
+COPY_COLUMNS = ["issue_id", "rank", "neighbor_id", "similarity"]
+COPY_TYPES = ["int4", "int4", "int4", "float4"]
+COPY_CHUNK_ROWS = 50000
+
+# 관련 이슈 조회 - (issue_id, rank) 기본키 범위 읽기, 삭제된 이웃은 조인으로 제외
+RELATED_ISSUES_SQL = f"""
+    SELECT n.neighbor_id, i.title, i.description, n.similarity
+    FROM {NEIGHBORS_TABLE} n
+    JOIN issues i ON i.id = n.neighbor_id
+    WHERE n.issue_id = %s
+    ORDER BY n.rank
+    LIMIT %s;
+"""
+RELATED_ISSUES_SQL_ASYNC = RELATED_ISSUES_SQL.replace("%s", "$1", 1).replace("%s", "$2", 1)
+
+
+def neighbors_table_sql(table):
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            issue_id INTEGER NOT NULL,
+            rank INTEGER NOT NULL,
+            neighbor_id INTEGER NOT NULL,
+            similarity REAL NOT NULL,
+            PRIMARY KEY (issue_id, rank)
+        );
+    """
+
+
+def ensure_tables(conn):
+    """이웃 테이블과 상태 테이블이 없으면 생성 (여러 번 실행해도 안전)"""
+    with conn.cursor() as cur:
+        cur.execute(neighbors_table_sql(NEIGHBORS_TABLE))
+        cur.execute(f"""
+            CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+                singleton BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (singleton),
+                k INTEGER NOT NULL,
+                last_issue_id BIGINT NOT NULL,
+                issue_count BIGINT NOT NULL,
+                built_at TIMESTAMPTZ NOT NULL,
+                updated_at TIMESTAMPTZ NOT NULL
+            );
+        """)
+    conn.commit()
+
+
+def read_state(conn):
+    """마지막 계산 상태 (k, last_issue_id) - 그래프가 없으면 None"""
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT k, last_issue_id FROM {STATE_TABLE};")
+        row = cur.fetchone()
+    conn.commit()
+    return row
+
+
+def fetch_embeddings(conn, after_id=None, fetch_size=5000):
+    """
+    이슈 임베딩을 id 순으로 읽어 (ids int64, 정규화된 float32 행렬) 반환
+
+    서버 측 커서로 fetch_size씩 읽어 블록 단위로 행렬에 모음
+    """
+    ids, blocks = [], []
+    with conn.cursor(name="issue_neighbors_fetch") as cur:
+        cur.itersize = fetch_size
+        cur.execute(
+            "SELECT id, embedding::real[] FROM issues "
+            "WHERE embedding IS NOT NULL AND id > %s ORDER BY id;",
+            (after_id if after_id is not None else -1,)
+        )
+        while True:
+            rows = cur.fetchmany(fetch_size)
+            if not rows:
+                break
+            ids.extend(row[0] for row in rows)
+            blocks.append(np.asarray([row[1] for row in rows], dtype=np.float32))
+    conn.commit()
+    if not ids:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 0), dtype=np.float32)
+    vectors = np.concatenate(blocks)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors /= np.maximum(norms, 1e-12)
+    return np.asarray(ids, dtype=np.int64), vectors
+
+
+def _merge_top_k(best_sims, best_ids, sims, ids, k):
+    """현재 top-k (b×k)와 새 후보 (b×c)를 합쳐 행별 top-k 유지 (정렬 안 됨)"""
+    all_sims = np.concatenate([best_sims, sims], axis=1)
+    all_ids = np.concatenate([best_ids, ids], axis=1)
+    if all_sims.shape[1] <= k:
+        return all_sims, all_ids
+    part = np.argpartition(-all_sims, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(all_sims, part, axis=1), np.take_along_axis(all_ids, part, axis=1)
+
+
+def _sort_desc(sims, ids):
+    order = np.argsort(-sims, axis=1, kind="stable")
+    return np.take_along_axis(sims, order, axis=1), np.take_along_axis(ids, order, axis=1)
+
+
+def _top_k_block(queries, query_ids, base, base_ids, k, block_cols):
+    """행 블록 하나의 top-k (열 블록 단위로 행렬곱 → 병합, 자기 자신 제외)"""
+    rows = queries.shape[0]
+    best_sims = np.full((rows, 0), -np.inf, dtype=np.float32)
+    best_ids = np.zeros((rows, 0), dtype=np.int64)
+    for start in range(0, base.shape[0], block_cols):
+        block_ids = base_ids[start:start + block_cols]
+        sims = queries @ base[start:start + block_cols].T
+        sims[query_ids[:, None] == block_ids[None, :]] = -np.inf
+        best_sims, best_ids = _merge_top_k(
+            best_sims, best_ids, sims, np.broadcast_to(block_ids, sims.shape), k
+        )
+    return _sort_desc(best_sims, best_ids)
+
+
+def top_k_neighbors(queries, query_ids, base, base_ids, k, block_rows=BLOCK_ROWS, block_cols=BLOCK_COLS, workers=WORKERS):
+    """
+    queries 각 행의 base 내 코사인 top-k (블록 행렬곱, 행 블록 병렬 처리)
+
+    Returns:
+        tuple: (유사도 n×k', 이웃 id n×k') - k' = min(k, base 행 수), 유사도 내림차순
+                자기 자신은 제외되며 후보가 부족한 자리는 유사도 -inf
+    """
+    k = min(k, base.shape[0])
+    starts = range(0, queries.shape[0], block_rows)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        parts = list(executor.map(
+            lambda s: _top_k_block(queries[s:s + block_rows], query_ids[s:s + block_rows], base, base_ids, k, block_cols),
+            starts
+        ))
+    if not parts:
+        return np.zeros((0, k), dtype=np.float32), np.zeros((0, k), dtype=np.int64)
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+
+def _edge_rows(issue_ids, sims, neighbor_ids):
+    """(issue_id, rank, neighbor_id, similarity) 행 생성 (-inf 자리는 제외)"""
+    for issue_id, row_sims, row_ids in zip(issue_ids, sims, neighbor_ids):
+        rank = 1
+        for sim, neighbor_id in zip(row_sims, row_ids):
+            if np.isfinite(sim):
+                yield int(issue_id), rank, int(neighbor_id), float(sim)
+                rank += 1
+
+
+def _copy_edges(cur, table, rows):
+    """간선 행을 바이너리 COPY로 적재 (청크 단위 인코딩, 커밋은 호출자가 담당)"""
+    chunk = []
+    written = 0
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= COPY_CHUNK_ROWS:
+            cur.copy_expert(f"COPY {table} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT binary)",
+                            encode_copy_chunk(chunk, COPY_TYPES))
+            written += len(chunk)
+            chunk = []
+    if chunk:
+        cur.copy_expert(f"COPY {table} ({', '.join(COPY_COLUMNS)}) FROM STDIN WITH (FORMAT binary)",
+                        encode_copy_chunk(chunk, COPY_TYPES))
+        written += len(chunk)
+    return written
+
+
+def _write_state(cur, k, last_issue_id, rebuilt):
+    cur.execute(f"SELECT COUNT(DISTINCT issue_id) FROM {NEIGHBORS_TABLE};")
+    issue_count = cur.fetchone()[0]
+    cur.execute(f"""
+        INSERT INTO {STATE_TABLE} (singleton, k, last_issue_id, issue_count, built_at, updated_at)
+        VALUES (TRUE, %s, %s, %s, now(), now())
+        ON CONFLICT (singleton) DO UPDATE SET
+            k = EXCLUDED.k, last_issue_id = EXCLUDED.last_issue_id, issue_count = EXCLUDED.issue_count,
+            built_at = CASE WHEN %s THEN now() ELSE {STATE_TABLE}.built_at END,
+            updated_at = now();
+    """, (k, last_issue_id, issue_count, rebuilt))
+
+
+def rebuild(conn, k=NEIGHBORS_K):
+    """
+    전체 이슈의 top-k 그래프를 다시 계산 (새 테이블에 적재 후 이름 교체)
+
+    Returns:
+        dict: issues, edges, compute_seconds, write_seconds
+    """
+    ensure_tables(conn)
+    started = time.perf_counter()
+    ids, vectors = fetch_embeddings(conn)
+    sims, neighbor_ids = top_k_neighbors(vectors, ids, vectors, ids, k)
+    compute_seconds = time.perf_counter() - started
+    logger.info(f"[{NEIGHBORS_TABLE}] {len(ids)}개 이슈 top-{k} 계산 완료 - {compute_seconds:.2f}초")
+
+    started = time.perf_counter()
+    staging = f"{NEIGHBORS_TABLE}_new"
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {staging};")
+            cur.execute(neighbors_table_sql(staging))
+            edges = _copy_edges(cur, staging, _edge_rows(ids, sims, neighbor_ids))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    swap_table(conn, NEIGHBORS_TABLE, staging)
+    # 상태 기록이 실패해도 다음 update가 같은 새 이슈를 다시 처리하므로 결과는 같음
+    with conn.cursor() as cur:
+        _write_state(cur, k, int(ids[-1]) if len(ids) else 0, True)
+    conn.commit()
+    write_seconds = time.perf_counter() - started
+    logger.info(f"[{NEIGHBORS_TABLE}] 간선 {edges}개 저장 - {write_seconds:.2f}초")
+    return {"mode": "rebuild", "issues": len(ids), "edges": edges,
+            "compute_seconds": round(compute_seconds, 3), "write_seconds": round(write_seconds, 3)}
+
+
+def _current_thresholds(cur, k):
+    """기존 이슈별 (k번째 이웃 유사도, 이웃 수) - 이웃이 k개 미만이면 임계값 -inf"""
+    cur.execute(f"SELECT issue_id, MIN(similarity), COUNT(*) FROM {NEIGHBORS_TABLE} GROUP BY issue_id;")
+    return {row[0]: (row[1] if row[2] >= k else -np.inf) for row in cur.fetchall()}
+
+
+def update(conn, k=None):
+    """
+    마지막 계산 이후 추가된 이슈만 반영 (그래프가 없거나 k가 바뀌면 rebuild)
+
+    Returns:
+        dict: new_issues, affected_issues (이웃 목록이 바뀐 기존 이슈 수), edges, seconds
+    """
+    ensure_tables(conn)
+    state = read_state(conn)
+    if state is None or (k is not None and k != state[0]):
+        return rebuild(conn, k or NEIGHBORS_K)
+    k, last_issue_id = state
+
+    started = time.perf_counter()
+    new_ids, new_vectors = fetch_embeddings(conn, after_id=last_issue_id)
+    if len(new_ids) == 0:
+        return {"mode": "update", "new_issues": 0, "affected_issues": 0, "edges": 0, "seconds": 0.0}
+    ids, vectors = fetch_embeddings(conn)
+
+    # 1. 새 이슈의 top-k (기존 + 새 이슈 전체 대상)
+    new_sims, new_neighbors = top_k_neighbors(new_vectors, new_ids, vectors, ids, k)
+
+    # 2. 기존 이슈별로 새 이슈 중 가장 가까운 top-k (새 이슈 → 기존 이슈 방향의 같은 블록 계산)
+    old_mask = ids <= last_issue_id
+    old_ids, old_vectors = ids[old_mask], vectors[old_mask]
+    cand_sims, cand_ids = top_k_neighbors(old_vectors, old_ids, new_vectors, new_ids, k)
+
+    try:
+        with conn.cursor() as cur:
+            # 3. 새 후보가 현재 k번째 이웃보다 가까운 기존 이슈만 영향받음
+            thresholds = _current_thresholds(cur, k)
+            limits = np.asarray([thresholds.get(int(i), -np.inf) for i in old_ids], dtype=np.float32)
+            affected = np.nonzero(cand_sims[:, 0] > limits)[0] if len(old_ids) else np.zeros(0, dtype=np.int64)
+            affected_ids = old_ids[affected]
+
+            # 4. 영향받은 이슈의 현재 이웃 + 새 후보를 합쳐 top-k 다시 계산
+            current = {}
+            if len(affected_ids):
+                cur.execute(
+                    f"SELECT issue_id, neighbor_id, similarity FROM {NEIGHBORS_TABLE} WHERE issue_id = ANY(%s);",
+                    (affected_ids.tolist(),)
+                )
+                for issue_id, neighbor_id, similarity in cur.fetchall():
+                    current.setdefault(issue_id, []).append((similarity, neighbor_id))
+            merged_sims = np.full((len(affected_ids), k), -np.inf, dtype=np.float32)
+            merged_ids = np.zeros((len(affected_ids), k), dtype=np.int64)
+            for row, issue_id in enumerate(affected_ids):
+                pairs = current.get(int(issue_id), [])
+                existing_sims = np.asarray([p[0] for p in pairs], dtype=np.float32).reshape(1, -1)
+                existing_ids = np.asarray([p[1] for p in pairs], dtype=np.int64).reshape(1, -1)
+                sims, neighbors = _merge_top_k(
+                    existing_sims, existing_ids, cand_sims[affected[row]:affected[row] + 1],
+                    cand_ids[affected[row]:affected[row] + 1], k
+                )
+                merged_sims[row, :sims.shape[1]] = sims[0]
+                merged_ids[row, :sims.shape[1]] = neighbors[0]
+            merged_sims, merged_ids = _sort_desc(merged_sims, merged_ids)
+
+            # 5. 바뀐 행만 삭제 후 다시 적재 (한 트랜잭션)
+            touched = np.concatenate([affected_ids, new_ids]).tolist()
+            cur.execute(f"DELETE FROM {NEIGHBORS_TABLE} WHERE issue_id = ANY(%s);", (touched,))
+            edges = _copy_edges(cur, NEIGHBORS_TABLE, _edge_rows(new_ids, new_sims, new_neighbors))
+            edges += _copy_edges(cur, NEIGHBORS_TABLE, _edge_rows(affected_ids, merged_sims, merged_ids))
+            _write_state(cur, k, int(new_ids[-1]), False)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    seconds = time.perf_counter() - started
+    logger.info(
+        f"[{NEIGHBORS_TABLE}] 증분 갱신 - 새 이슈 {len(new_ids)}개, 영향받은 기존 이슈 {len(affected_ids)}개, {seconds:.2f}초"
+    )
+    return {"mode": "update", "new_issues": len(new_ids), "affected_issues": len(affected_ids),
+            "edges": edges, "seconds": round(seconds, 3)}
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    import psycopg2
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="이슈 k-최근접 이웃 그래프 계산 (issue_neighbors)")
+    parser.add_argument("--rebuild", action="store_true", help="전체 그래프 다시 계산")
+    parser.add_argument("--k", type=int, default=None, help=f"이슈당 이웃 수 (기본값: {NEIGHBORS_K})")
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        database=os.getenv("DB_NAME", "postgres"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD", "password"),
+        port=os.getenv("DB_PORT", "5432"),
+    )
+    try:
+        if args.rebuild:
+            result = rebuild(connection, args.k or NEIGHBORS_K)
+        else:
+            result = update(connection, args.k)
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    finally:
+        connection.close()
@@ -8,9 +8,27 @@ CREATE TABLE issues (
     id SERIAL PRIMARY KEY,
     title TEXT,
     description TEXT,
-    embedding vector(384)
+    tags TEXT,
+    embedding vector(384),
+    -- 하이브리드 검색용 전문 검색 컬럼 (title / tags: 가중치 A, description: B)
+    search_tsv tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(tags, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(description, '')), 'B')
+    ) STORED
+);
+
+CREATE INDEX issues_search_tsv_idx ON issues USING GIN (search_tsv);
+
+-- 관련 이슈 그래프 (issue_neighbors.py가 계산, 이슈별 top-k 이웃)
+CREATE TABLE IF NOT EXISTS issue_neighbors (
+    issue_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    neighbor_id INTEGER NOT NULL,
+    similarity REAL NOT NULL,
+    PRIMARY KEY (issue_id, rank)
 );
 
 -- Example insert (without actual vector, for structure)
--- INSERT INTO issues (title, description, embedding) VALUES
--- ('Login failure on Safari', 'Users report login failing on Safari 14. Appears to be cookie-related.', '[0.1, 0.2, ...]');
+-- INSERT INTO issues (title, description, tags, embedding) VALUES
+-- ('Login failure on Safari', 'Users report login failing on Safari 14. Appears to be cookie-related.', 'auth,frontend,safari', '[0.1, 0.2, ...]');
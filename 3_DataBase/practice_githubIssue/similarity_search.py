@@ -58,40 +58,59 @@ class IssueSimilaritySearch:
         embedding = self.model.encode([combined_text])
         return embedding[0]
     
-    def find_similar_issues(self, query_embedding, top_k=5, similarity_threshold=0.3):
-        """유사한 이슈 검색 (수정된 버전)"""
+    def find_top_k(self, query_embedding, top_k=5):
+        """상위 top_k개를 한 번의 인덱스 스캔으로 조회 (거리는 한 번만 계산)
+        
+        Returns:
+            list: (id, title, description, similarity) 튜플 리스트 (유사도 내림차순)
+        """
         conn = self.connect_db()
         if not conn:
             return []
         
+        cursor = None
         try:
             cursor = conn.cursor()
             
             # 임베딩을 문자열로 변환하여 vector 타입으로 캐스팅
             embedding_str = '[' + ','.join(map(str, query_embedding.tolist())) + ']'
             
-            # pgvector의 코사인 유사도 검색 사용 (명시적 타입 캐스팅)
+            # 거리는 SELECT에서 한 번만 계산하고 ORDER BY는 별칭 사용 (인덱스 사용 가능한 <=> 정렬)
+            # 임계값은 WHERE가 아니라 결과에서 직접 적용 → 임계값 단계별 재검색 불필요
+            # 임베딩이 없는 이슈는 제외 (이전 임계값 WHERE 절과 같은 결과, 거리 NULL 방지)
             query = """
                 SELECT id, title, description, 
-                       1 - (embedding <=> %s::vector) as similarity
+                       embedding <=> %s::vector AS distance
                 FROM issues
-                WHERE 1 - (embedding <=> %s::vector) >= %s
-                ORDER BY embedding <=> %s::vector
+                WHERE embedding IS NOT NULL
+                ORDER BY distance
                 LIMIT %s;
             """
             
-            cursor.execute(query, (embedding_str, embedding_str, similarity_threshold, embedding_str, top_k))
-            results = cursor.fetchall()
-            
-            return results
+            cursor.execute(query, (embedding_str, top_k))
+            return [(issue_id, title, desc, 1 - distance) for issue_id, title, desc, distance in cursor.fetchall()]
             
         except Exception as e:
             print(f"유사도 검색 실패: {e}")
             return []
         finally:
-            cursor.close()
+            if cursor:
+                cursor.close()
             conn.close()
     
+    @staticmethod
+    def apply_threshold(candidates, similarity_threshold):
+        """유사도 임계값 이상인 결과만 선택
+        
+        candidates는 유사도 내림차순이므로 임계값 이상인 결과는 항상 앞부분에 모여 있음
+        → WHERE 절로 다시 검색한 top-k와 같은 결과
+        """
+        return [row for row in candidates if row[3] >= similarity_threshold]
+    
+    def find_similar_issues(self, query_embedding, top_k=5, similarity_threshold=0.3):
+        """유사한 이슈 검색 (임계값 적용)"""
+        return self.apply_threshold(self.find_top_k(query_embedding, top_k), similarity_threshold)
+    
     def search_similar_issues(self, title, description="", top_k=5, similarity_threshold=0.3):
         """전체 검색 과정 (유연한 검색)"""
         print("=== 유사 이슈 검색 시작 ===")
@@ -99,20 +118,23 @@ class IssueSimilaritySearch:
         # 1. 쿼리 임베딩 생성
         query_embedding = self.generate_query_embedding(title, description)
         
-        # 2. 유사한 이슈 검색 (임계값 적용)
-        similar_issues = self.find_similar_issues(query_embedding, top_k, similarity_threshold)
+        # 2. 상위 top_k개를 한 번만 조회 (이후 단계는 DB를 다시 조회하지 않음)
+        candidates = self.find_top_k(query_embedding, top_k)
+        
+        # 3. 임계값 적용
+        similar_issues = self.apply_threshold(candidates, similarity_threshold)
         
-        # 3. 결과가 없으면 임계값을 낮춰서 재검색
+        # 4. 결과가 없으면 임계값을 낮춰서 다시 선택
         if not similar_issues and similarity_threshold > 0.1:
             print(f"임계값 {similarity_threshold}에서 결과 없음. 임계값을 낮춰서 재검색...")
-            similar_issues = self.find_similar_issues(query_embedding, top_k, 0.1)
+            similar_issues = self.apply_threshold(candidates, 0.1)
         
-        # 4. 그래도 결과가 없으면 임계값 없이 검색
+        # 5. 그래도 결과가 없으면 임계값 없이 상위 결과 사용
         if not similar_issues:
             print("임계값 없이 상위 결과 검색...")
-            similar_issues = self.find_similar_issues_no_threshold(query_embedding, top_k)
+            similar_issues = candidates
         
-        # 5. 결과 출력
+        # 6. 결과 출력
         if similar_issues:
             print(f"\n상위 {len(similar_issues)}개 유사 이슈:")
             print("-" * 80)
@@ -129,36 +151,7 @@ class IssueSimilaritySearch:
     
     def find_similar_issues_no_threshold(self, query_embedding, top_k=5):
         """임계값 없이 상위 결과만 반환"""
-        conn = self.connect_db()
-        if not conn:
-            return []
-        
-        try:
-            cursor = conn.cursor()
-            
-            # 임베딩을 문자열로 변환
-            embedding_str = '[' + ','.join(map(str, query_embedding.tolist())) + ']'
-            
-            # 임계값 없이 상위 결과만
-            query = """
-                SELECT id, title, description, 
-                       1 - (embedding <=> %s::vector) as similarity
-                FROM issues
-                ORDER BY embedding <=> %s::vector
-                LIMIT %s;
-            """
-            
-            cursor.execute(query, (embedding_str, embedding_str, top_k))
-            results = cursor.fetchall()
-            
-            return results
-            
-        except Exception as e:
-            print(f"유사도 검색 실패: {e}")
-            return []
-        finally:
-            cursor.close()
-            conn.close()
+        return self.find_top_k(query_embedding, top_k)
     
     def interactive_search(self):
         """대화형 검색 (개선된 버전)"""
@@ -0,0 +1,275 @@
+"""
+pgvector 인덱스 설정별 재현율 / 지연시간 자동 벤치마크
+
+수동으로 EXPLAIN ANALYZE 결과를 CSV로 내보내던 비교 실습(noindex_limit5.csv, index_cosine_limit50.csv 등)을
+재현 가능한 스크립트로 정리한 것입니다.
+
+진행 순서 (규모별 반복):
+1. design_doc과 같은 구조의 벤치마크 테이블을 만들고 384차원 합성 벡터를 COPY로 적재
+   (클러스터 구조를 가진 가우시안 혼합 데이터 - 완전 무작위 벡터보다 실제 임베딩에 가까움)
+2. 인덱스 없이 정확(exact) 검색으로 쿼리별 정답 top-k 계산
+3. 인덱스 설정별로 생성 → 검색 파라미터별 측정 → 인덱스 제거
+   - none    : 인덱스 없음 (순차 스캔)
+   - ivfflat : lists 후보 × probes 후보
+   - hnsw    : m 후보 × ef_search 후보 (ef_construction 고정)
+4. 측정 항목: recall@k, 지연시간 p50/p95/p99, 고정 동시성 QPS, 인덱스 생성 시간, 인덱스 크기
+5. JSON 리포트 + 요약 표 출력
+
+실행 예시:
+python benchmark_index_configs.py --scales 1000 10000 --output index_benchmark.json
+python benchmark_index_configs.py --scales 1000000 --ivf-lists 500 1000 2000 --hnsw-m 16 32 --distance l2
+
+주의: 기본 테이블은 design_doc_bench (실제 design_doc 데이터를 덮어쓰지 않음)
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import psycopg2
+from dotenv import load_dotenv
+
+# 상위 폴더(3_DataBase)의 공용 모듈 사용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from bulk_loader import BulkLoader
+from db_pool import PooledDB
+from vector_index import build_vector_index, drop_vector_indexes, recommended_ivfflat_lists
+from vector_search import build_search_sql, search_settings, RecallTracker
+
+load_dotenv()
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", 5432)),
+    "dbname": os.getenv("DB_NAME", "postgres"),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD")
+}
+
+DIMENSION = 384
+
+# 인덱스 연산자 클래스 이름(vector_index) → 검색 거리 함수 이름(vector_search)
+SEARCH_DISTANCES = {"cosine": "cosine", "l2": "l2", "ip": "inner_product"}
+
+
+# ---------- 합성 데이터 ----------
+
+def make_centers(rng, n_rows):
+    """클러스터 중심 생성 (행 수의 제곱근 개, 최소 8개)"""
+    n_centers = max(8, int(np.sqrt(n_rows)))
+    centers = rng.standard_normal((n_centers, DIMENSION)).astype(np.float32)
+    return centers / np.linalg.norm(centers, axis=1, keepdims=True)
+
+
+def synthetic_vectors(rng, centers, count, noise=1.0):
+    """클러스터 중심 주변의 정규화된 벡터 count개 (noise: 중심 대비 잡음 크기)"""
+    labels = rng.integers(0, len(centers), size=count)
+    jitter = rng.standard_normal((count, DIMENSION)).astype(np.float32) / np.sqrt(DIMENSION)
+    vectors = centers[labels] + noise * jitter
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def synthetic_rows(rng, centers, n_rows, chunk=10000):
+    """적재용 행 제너레이터 (청크 단위로 생성해 메모리 사용량 일정)"""
+    for start in range(0, n_rows, chunk):
+        count = min(chunk, n_rows - start)
+        vectors = synthetic_vectors(rng, centers, count)
+        for offset, vector in enumerate(vectors):
+            number = start + offset + 1
+            yield (f"벤치마크 설계안 {number}", f"합성 벡터 {number}", vector)
+
+
+def seed_table(conn, table, n_rows, seed):
+    """벤치마크 테이블 재생성 후 합성 데이터 적재"""
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+        cur.execute(f"DROP TABLE IF EXISTS {table};")
+        cur.execute(f"""
+            CREATE TABLE {table} (
+                id SERIAL PRIMARY KEY,
+                title TEXT,
+                content TEXT,
+                embedding_vector vector({DIMENSION})
+            );
+        """)
+    conn.commit()
+
+    rng = np.random.default_rng(seed)
+    centers = make_centers(rng, n_rows)
+    columns = [("title", "text"), ("content", "text"), ("embedding_vector", "vector")]
+    report = BulkLoader(conn, chunk_rows=10000, stop_on_error=True).load(
+        table, synthetic_rows(rng, centers, n_rows), columns=columns
+    )
+    with conn.cursor() as cur:
+        cur.execute(f"ANALYZE {table};")
+    conn.commit()
+    return centers, report
+
+
+# ---------- 검색 측정 ----------
+
+def run_query(conn, sql, vector, k, probes=None, ef_search=None, exact=False):
+    """설정을 트랜잭션 범위로 적용한 뒤 검색 한 번 실행 → 결과 id 목록"""
+    with conn.cursor() as cur:
+        for name, value in search_settings(probes, ef_search, exact):
+            cur.execute("SELECT set_config(%s, %s, true);", (name, value))
+        cur.execute(sql, (vector, vector, k))
+        ids = [row[0] for row in cur.fetchall()]
+    conn.commit()
+    return ids
+
+
+def measure(conn, db_pool, sql, queries, ground_truth, k, concurrency, probes=None, ef_search=None):
+    """한 검색 설정의 recall@k, 순차 지연시간 백분위, 동시성 QPS 측정"""
+    # 1. 순차 실행: 지연시간과 재현율
+    latencies, recalls = [], []
+    for vector, truth in zip(queries, ground_truth):
+        started = time.perf_counter()
+        ids = run_query(conn, sql, vector, k, probes, ef_search)
+        latencies.append((time.perf_counter() - started) * 1000)
+        recalls.append(RecallTracker.recall_at_k(ids, truth))
+
+    # 2. 고정 동시성: 모든 쿼리를 concurrency개 스레드로 실행해 처리량 측정
+    def worker(vector):
+        with db_pool.connection() as pooled:
+            return run_query(pooled, sql, vector, k, probes, ef_search)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, queries))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "recall_at_k": round(float(np.mean(recalls)), 4),
+        "latency_p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "latency_p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "latency_p99_ms": round(float(np.percentile(latencies, 99)), 3),
+        "qps": round(len(queries) / elapsed, 1),
+    }
+
+
+def index_variants(args, n_rows):
+    """(방식, 생성 파라미터, 검색 파라미터 목록) 조합"""
+    variants = [("none", {}, [{}])]
+    lists_candidates = args.ivf_lists or [recommended_ivfflat_lists(n_rows)]
+    for lists in lists_candidates:
+        probes = [p for p in args.ivf_probes if p <= lists] or [lists]
+        variants.append(("ivfflat", {"lists": lists}, [{"probes": p} for p in probes]))
+    for m in args.hnsw_m:
+        variants.append((
+            "hnsw", {"m": m, "ef_construction": args.hnsw_ef_construction},
+            [{"ef_search": ef} for ef in args.hnsw_ef_search]
+        ))
+    return variants
+
+
+def benchmark_scale(args, n_rows):
+    """규모 하나에 대한 전체 벤치마크"""
+    print(f"\n▶ {n_rows:,}행 벤치마크 - 테이블 {args.table}")
+    conn = psycopg2.connect(**DB_CONFIG)
+    db_pool = PooledDB(DB_CONFIG, minconn=1, maxconn=args.concurrency, timeout=120, name="bench")
+    db_pool.open()
+    results = []
+    try:
+        centers, load_report = seed_table(conn, args.table, n_rows, args.seed)
+        print(f"  적재 완료: {load_report['rows_loaded']:,}행, {load_report['rows_per_sec']:,} rows/sec")
+
+        # 쿼리 벡터: 같은 분포에서 새로 뽑은 벡터 (테이블에 없는 벡터)
+        rng = np.random.default_rng(args.seed + 1)
+        queries = [v.tolist() for v in synthetic_vectors(rng, centers, args.queries)]
+        sql = build_search_sql(args.table, "id", [], "embedding_vector", SEARCH_DISTANCES[args.distance],
+                               placeholder="%s::vector")
+
+        # 정답: 인덱스 없이 정확 검색
+        ground_truth = [run_query(conn, sql, vector, args.k, exact=True) for vector in queries]
+
+        for method, build_params, search_params_list in index_variants(args, n_rows):
+            build = {"build_seconds": 0.0, "size_bytes": 0, "size": "0 bytes"}
+            if method != "none":
+                drop_vector_indexes(conn, args.table)
+                build = build_vector_index(
+                    conn, args.table, "embedding_vector", method=method, distance=args.distance,
+                    lists=build_params.get("lists"), m=build_params.get("m", 16),
+                    ef_construction=build_params.get("ef_construction", 64),
+                    maintenance_work_mem=args.maintenance_work_mem, concurrently=False
+                )
+            for search_params in search_params_list:
+                stats = measure(conn, db_pool, sql, queries, ground_truth, args.k, args.concurrency, **search_params)
+                row = {
+                    "rows": n_rows,
+                    "method": method,
+                    "build_params": build_params,
+                    "search_params": search_params,
+                    "build_seconds": build["build_seconds"],
+                    "index_size_bytes": build["size_bytes"],
+                    "index_size": build["size"],
+                    **stats,
+                }
+                results.append(row)
+                print(f"  {method:<8}{json.dumps(build_params):<34}{json.dumps(search_params):<20}"
+                      f"recall={stats['recall_at_k']:.3f}  p50={stats['latency_p50_ms']:.2f}ms  qps={stats['qps']:.0f}")
+        drop_vector_indexes(conn, args.table)
+    finally:
+        db_pool.close()
+        conn.close()
+    return results
+
+
+def print_summary(results, k):
+    """요약 표 출력"""
+    print("\n" + "=" * 128)
+    print(f"{'rows':>9} {'method':<8}{'build':<30}{'search':<18}{f'recall@{k}':>10}{'p50':>9}{'p95':>9}"
+          f"{'p99':>9}{'QPS':>9}{'build s':>9}{'size':>12}")
+    print("-" * 128)
+    for r in results:
+        build = ",".join(f"{key}={value}" for key, value in r["build_params"].items()) or "-"
+        search = ",".join(f"{key}={value}" for key, value in r["search_params"].items()) or "-"
+        print(f"{r['rows']:>9} {r['method']:<8}{build:<30}{search:<18}{r['recall_at_k']:>10.3f}"
+              f"{r['latency_p50_ms']:>9.2f}{r['latency_p95_ms']:>9.2f}{r['latency_p99_ms']:>9.2f}"
+              f"{r['qps']:>9.0f}{r['build_seconds']:>9.2f}{r['index_size']:>12}")
+    print("=" * 128)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pgvector 인덱스 설정별 재현율 / 지연시간 벤치마크")
+    parser.add_argument("--table", default="design_doc_bench", help="벤치마크 테이블 (매 규모마다 재생성)")
+    parser.add_argument("--scales", nargs="+", type=int, default=[1000, 10000], help="적재 행 수 (1k ~ 1M)")
+    parser.add_argument("--distance", choices=["cosine", "l2", "ip"], default="cosine")
+    parser.add_argument("--k", type=int, default=10, help="recall@k의 k (LIMIT)")
+    parser.add_argument("--queries", type=int, default=100, help="측정 쿼리 수")
+    parser.add_argument("--concurrency", type=int, default=8, help="QPS 측정 동시 클라이언트 수")
+    parser.add_argument("--ivf-lists", nargs="+", type=int, default=None, help="기본: 행 수 기반 권장값")
+    parser.add_argument("--ivf-probes", nargs="+", type=int, default=[1, 5, 10, 20])
+    parser.add_argument("--hnsw-m", nargs="+", type=int, default=[16, 32])
+    parser.add_argument("--hnsw-ef-construction", type=int, default=64)
+    parser.add_argument("--hnsw-ef-search", nargs="+", type=int, default=[40, 100, 200])
+    parser.add_argument("--maintenance-work-mem", default="512MB")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="index_benchmark.json", help="JSON 리포트 경로")
+    args = parser.parse_args()
+
+    results = []
+    for n_rows in args.scales:
+        results.extend(benchmark_scale(args, n_rows))
+
+    print_summary(results, args.k)
+    report = {
+        "table": args.table,
+        "distance": args.distance,
+        "k": args.k,
+        "queries": args.queries,
+        "concurrency": args.concurrency,
+        "dimension": DIMENSION,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"JSON 리포트 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+"""
+설계안 등록 write-behind 큐 (비동기 등록 모드)
+
+동기 등록은 요청 안에서 encode와 커밋을 모두 수행하므로, 대량 등록 클라이언트는 건마다 모델 지연을 기다립니다.
+비동기 모드는 원문(제목, 설명)만 작업 테이블에 저장하고 바로 작업 id를 돌려주며(HTTP 202),
+백그라운드 워커가 작업을 배치로 모아 처리합니다.
+
+처리 흐름:
+1. enqueue: {table}_register_jobs에 pending 작업 INSERT (모델 호출 없음)
+2. 워커: 대기 작업을 batch_size개씩 점유 (FOR UPDATE SKIP LOCKED → 여러 서버 프로세스가 같은 작업을 잡지 않음)
+3. 배치당 encode 한 번 → 대상 테이블에 바이너리 COPY 한 번
+4. 설계안 저장과 작업 완료 표시(design_id 기록)를 같은 트랜잭션에서 커밋 → 중복 저장 / 유실 없음
+5. 데이터 오류(DB 제약 / 값 형식 위반, 인코딩 불가 텍스트)로 배치가 실패하면 반으로 나눠 다시 처리
+   → 잘못된 작업(포이즌 작업)만 실패로 남고 나머지는 저장
+   - 한 건만 남아도 실패한 작업은 attempts를 늘려 다시 대기, max_attempts를 넘으면 failed (오류 메시지 기록)
+   - 그 밖의 오류(추론 실행기 장애, DB 연결 끊김 / 풀 대기 초과 등)는 일시적 장애로 보고 나누지 않음
+     → 배치 전체를 시도 횟수 차감 없이 다시 대기시키고 워커는 지수 백오프 후 재시도
+6. 점유 후 lease_seconds 안에 끝나지 않은 작업(프로세스 종료 등)은 다른 워커가 다시 점유
+   - 이미 max_attempts만큼 시도한 작업은 다시 점유하지 않고 failed
+   - 저장 / 실패 표시는 점유 시각(claimed_at)이 그대로인 작업만 → 점유를 빼앗긴 느린 워커는 아무것도 쓰지 않음
+
+작업 상태: pending → processing → done / failed
+
+환경변수 (기본값):
+    REGISTER_QUEUE_BATCH_SIZE      배치당 최대 작업 수 (64)
+    REGISTER_QUEUE_POLL_INTERVAL   새 작업 확인 주기 (초, 1.0 - 같은 프로세스의 등록은 즉시 깨움)
+    REGISTER_QUEUE_MAX_ATTEMPTS    작업당 최대 시도 횟수 (3)
+    REGISTER_QUEUE_LEASE_SECONDS   점유 후 재점유까지의 시간 (300)
+    REGISTER_QUEUE_MAX_BACKOFF     일시적 장애시 최대 대기 시간 (초, 30)
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+import psycopg2
+
+from bulk_loader import encode_copy_chunk
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv("REGISTER_QUEUE_BATCH_SIZE", 64))
+POLL_INTERVAL = float(os.getenv("REGISTER_QUEUE_POLL_INTERVAL", 1.0))
+MAX_ATTEMPTS = int(os.getenv("REGISTER_QUEUE_MAX_ATTEMPTS", 3))
+LEASE_SECONDS = int(os.getenv("REGISTER_QUEUE_LEASE_SECONDS", 300))
+MAX_BACKOFF = float(os.getenv("REGISTER_QUEUE_MAX_BACKOFF", 30))
+
+# 특정 작업의 데이터 때문에 나는 오류 - 배치를 나눠 원인 작업만 실패 처리
+# (ValueError: COPY 값 변환 실패, UnicodeError 등 - 그 밖의 오류는 일시적 장애로 보고 배치 전체를 다시 대기)
+DATA_ERRORS = (psycopg2.DataError, psycopg2.IntegrityError, ValueError)
+
+OWNED_JOBS_SQL = "(id, claimed_at) IN (SELECT * FROM unnest(%s::bigint[], %s::timestamptz[]))"
+
+
+class LeaseLostError(RuntimeError):
+    """저장 도중 작업 점유를 다른 워커에 빼앗김 - 트랜잭션 전체 롤백 (그 작업은 새 점유자가 처리)"""
+
+
+def _ownership(jobs):
+    """OWNED_JOBS_SQL 인자 (작업 id 배열, 점유 시각 배열)"""
+    return [job[0] for job in jobs], [job[3] for job in jobs]
+
+
+class RegistrationQueue:
+    """
+    설계안 비동기 등록 큐
+
+    Args:
+        db_pool: PooledDB (작업 테이블 / 대상 테이블 접근)
+        encode_fn: 텍스트 리스트 → 벡터 리스트 (블로킹 함수, 스레드 풀에서 실행)
+        table: 대상 테이블 (id SERIAL 기본키)
+        title_column / content_column / vector_column: 대상 테이블 컬럼
+        after_store: 배치 저장 후 호출할 함수 (저장된 id 리스트 인자, 예: 검색 캐시 무효화)
+    """
+
+    def __init__(self, db_pool, encode_fn, table="design_doc", title_column="title", content_column="content",
+                 vector_column="embedding_vector", batch_size=BATCH_SIZE, poll_interval=POLL_INTERVAL,
+                 max_attempts=MAX_ATTEMPTS, lease_seconds=LEASE_SECONDS, after_store=None):
+        self.db_pool = db_pool
+        self.encode_fn = encode_fn
+        self.table = table
+        self.jobs_table = f"{table}_register_jobs"
+        self.title_column = title_column
+        self.content_column = content_column
+        self.vector_column = vector_column
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.after_store = after_store
+
+        self._wakeup = None
+        self._task = None
+        self._stopping = False
+        self._batches = 0
+        self._stored = 0
+        self._failed_batches = 0
+        self._failed_jobs = 0
+        self._transient_failures = 0
+        self._backoff = 0.0
+        self._last_batch_ms = 0.0
+
+    # ---------- 작업 테이블 (블로킹 함수 - 스레드 풀에서 호출) ----------
+
+    def ensure_table(self):
+        """작업 테이블과 대기 작업 인덱스가 없으면 생성"""
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.jobs_table} (
+                        id BIGSERIAL PRIMARY KEY,
+                        title TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        status VARCHAR(12) NOT NULL DEFAULT 'pending',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        design_id INTEGER,
+                        error TEXT,
+                        claimed_at TIMESTAMPTZ,
+                        created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+                    );
+                """)
+                cur.execute(f"""
+                    CREATE INDEX IF NOT EXISTS {self.jobs_table}_open_idx
+                    ON {self.jobs_table} (id) WHERE status IN ('pending', 'processing');
+                """)
+            conn.commit()
+
+    def enqueue_many(self, items):
+        """
+        (title, content) 목록을 pending 작업으로 저장 (모델 호출 없음)
+
+        Returns:
+            list: 작업 id (입력 순서)
+        """
+        if not items:
+            return []
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    INSERT INTO {self.jobs_table} (title, content)
+                    SELECT title, content FROM unnest(%s::text[], %s::text[]) WITH ORDINALITY AS t(title, content, ord)
+                    ORDER BY ord
+                    RETURNING id;
+                """, ([item[0] for item in items], [item[1] for item in items]))
+                job_ids = sorted(row[0] for row in cur.fetchall())  # bigserial은 삽입 순서대로 증가
+            conn.commit()
+        return job_ids
+
+    def enqueue(self, title, content):
+        return self.enqueue_many([(title, content)])[0]
+
+    def get_job(self, job_id):
+        """작업 상태 조회 (없으면 None)"""
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT id, status, design_id, attempts, error, created_at, updated_at
+                    FROM {self.jobs_table} WHERE id = %s;
+                """, (job_id,))
+                row = cur.fetchone()
+            conn.commit()
+        if row is None:
+            return None
+        return {
+            "job_id": row[0], "status": row[1], "design_id": row[2], "attempts": row[3], "error": row[4],
+            "created_at": row[5].isoformat() if row[5] else None,
+            "updated_at": row[6].isoformat() if row[6] else None,
+        }
+
+    def _claim(self):
+        """대기 작업(또는 점유 시간이 지난 작업)을 batch_size개까지 점유 → [(job_id, title, content, claimed_at)]"""
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                # 시도 횟수를 다 쓴 채 점유 시간이 지난 작업은 다시 점유하지 않고 실패 처리
+                cur.execute(f"""
+                    UPDATE {self.jobs_table}
+                    SET status = 'failed', error = COALESCE(error, '처리 시간 초과 (최대 시도 횟수 도달)'),
+                        claimed_at = NULL, updated_at = now()
+                    WHERE status = 'processing' AND claimed_at < now() - make_interval(secs => %s)
+                      AND attempts >= %s;
+                """, (self.lease_seconds, self.max_attempts))
+                cur.execute(f"""
+                    UPDATE {self.jobs_table} j
+                    SET status = 'processing', attempts = j.attempts + 1, claimed_at = now(), updated_at = now()
+                    FROM (
+                        SELECT id FROM {self.jobs_table}
+                        WHERE status = 'pending'
+                           OR (status = 'processing' AND claimed_at < now() - make_interval(secs => %s)
+                               AND attempts < %s)
+                        ORDER BY id
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    ) picked
+                    WHERE j.id = picked.id
+                    RETURNING j.id, j.title, j.content, j.claimed_at;
+                """, (self.lease_seconds, self.max_attempts, self.batch_size))
+                jobs = sorted(cur.fetchall())
+            conn.commit()
+        return jobs
+
+    def _store(self, jobs, vectors):
+        """
+        설계안 COPY + 작업 완료 표시를 한 트랜잭션으로 처리 → 저장된 설계안 id 목록
+
+        점유가 아직 이 워커에 있는 작업만 저장 (점유 시간이 지나 다른 워커가 다시 점유한 작업은 건너뜀)
+
+        Raises:
+            LeaseLostError: 완료 표시된 작업 수가 저장한 행 수와 다름 → COPY까지 롤백
+        """
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                # 점유 중인 작업 행을 잠가 두면 커밋 전까지 다른 워커가 다시 점유할 수 없음
+                cur.execute(f"SELECT id FROM {self.jobs_table} WHERE status = 'processing' AND {OWNED_JOBS_SQL} "
+                            f"FOR UPDATE;", _ownership(jobs))
+                owned = {row[0] for row in cur.fetchall()}
+                if len(owned) < len(jobs):
+                    logger.warning(f"[register_queue] 점유를 잃은 작업 {len(jobs) - len(owned)}건은 저장하지 않음")
+                    pairs = [(job, vector) for job, vector in zip(jobs, vectors) if job[0] in owned]
+                    jobs, vectors = [pair[0] for pair in pairs], [pair[1] for pair in pairs]
+                    if not jobs:
+                        conn.commit()
+                        return []
+                # id를 먼저 받아 두면 COPY한 행과 작업을 순서에 의존하지 않고 연결할 수 있음
+                cur.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s);",
+                            (self.table, len(jobs)))
+                design_ids = [row[0] for row in cur.fetchall()]
+                rows = [(design_id, job[1], job[2], vector) for design_id, job, vector in zip(design_ids, jobs, vectors)]
+                columns = f"id, {self.title_column}, {self.content_column}, {self.vector_column}"
+                cur.copy_expert(
+                    f"COPY {self.table} ({columns}) FROM STDIN WITH (FORMAT binary)",
+                    encode_copy_chunk(rows, ["int4", "text", "text", "vector"])
+                )
+                cur.execute(f"""
+                    UPDATE {self.jobs_table} j
+                    SET status = 'done', design_id = m.design_id, error = NULL, updated_at = now()
+                    FROM unnest(%s::bigint[], %s::int[], %s::timestamptz[]) AS m(job_id, design_id, claimed_at)
+                    WHERE j.id = m.job_id AND j.status = 'processing' AND j.claimed_at = m.claimed_at;
+                """, ([job[0] for job in jobs], design_ids, [job[3] for job in jobs]))
+                if cur.rowcount != len(jobs):
+                    raise LeaseLostError(f"완료 표시 {cur.rowcount}건 / 저장 {len(jobs)}건 - 작업 점유를 잃어 롤백")
+            conn.commit()
+        return design_ids
+
+    def _fail(self, jobs, error):
+        """배치 실패 - 시도 횟수가 남은 작업은 다시 대기, 아니면 failed (점유를 잃은 작업은 그대로 둠)"""
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    UPDATE {self.jobs_table}
+                    SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                        error = %s, claimed_at = NULL, updated_at = now()
+                    WHERE status = 'processing' AND {OWNED_JOBS_SQL};
+                """, (self.max_attempts, error, *_ownership(jobs)))
+            conn.commit()
+
+    def _release(self, jobs, error):
+        """일시적 장애 - 시도 횟수를 되돌리고 다시 대기 (이미 저장 / 실패 처리된 작업은 점유가 풀려 그대로 둠)"""
+        with self.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"""
+                    UPDATE {self.jobs_table}
+                    SET status = 'pending', attempts = GREATEST(attempts - 1, 0),
+                        error = %s, claimed_at = NULL, updated_at = now()
+                    WHERE status = 'processing' AND {OWNED_JOBS_SQL};
+                """, (error, *_ownership(jobs)))
+            conn.commit()
+
+    # ---------- 워커 ----------
+
+    def notify(self):
+        """새 작업이 들어왔음을 워커에 알림 (대기 주기를 기다리지 않고 바로 처리)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.ensure_table)
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"[register_queue] 워커 시작 - {self.jobs_table}, 배치 {self.batch_size}개")
+
+    async def stop(self):
+        """워커 종료 (처리 중인 배치는 끝까지 처리, 남은 작업은 다음 시작시 처리)"""
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self._task:
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            try:
+                processed = await self._process_once(loop)
+                self._backoff = 0.0
+            except Exception as e:
+                # 일시적 장애 (DB / 추론 실행기) - 지수 백오프 후 재시도
+                self._transient_failures += 1
+                self._backoff = min(max(self._backoff * 2, self.poll_interval), MAX_BACKOFF)
+                logger.error(f"[register_queue] 작업 처리 실패 ({self._backoff:.1f}초 후 재시도): {e}")
+                await self._sleep(loop, self._backoff)
+                continue
+            if processed:
+                continue  # 밀린 작업이 더 있을 수 있으므로 바로 다음 배치
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _sleep(self, loop, seconds):
+        """seconds 동안 대기 (새 작업 알림으로는 깨지 않고, stop()이면 바로 종료)"""
+        deadline = loop.time() + seconds
+        while not self._stopping and loop.time() < deadline:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=deadline - loop.time())
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _process_jobs(self, loop, jobs, stored):
+        """
+        encode + 저장 - 데이터 오류(DATA_ERRORS)로 실패하면 반으로 나눠 다시 시도 (한 건씩 남을 때까지)
+
+        잘못된 작업 하나(DB 제약 위반, 인코딩 불가 텍스트 등) 때문에 같은 배치의 정상 작업까지
+        실패 / 재시도되지 않도록 실패 원인이 있는 작업만 골라냄
+
+        Args:
+            stored: 저장된 설계안 id를 추가할 리스트 (중간에 일시적 장애가 나도 그 전까지 저장된 id는 남음)
+        Raises:
+            Exception: 일시적 장애 (DATA_ERRORS 외의 오류) - 호출자가 남은 작업을 다시 대기시킴
+        """
+        try:
+            vectors = await loop.run_in_executor(None, self.encode_fn, [job[2] for job in jobs])
+            stored.extend(await loop.run_in_executor(None, self._store, jobs, vectors))
+            return
+        except LeaseLostError as e:
+            logger.warning(f"[register_queue] {e}")
+            return
+        except DATA_ERRORS as e:
+            if len(jobs) == 1:
+                self._failed_jobs += 1
+                logger.error(f"[register_queue] 작업 {jobs[0][0]} 처리 실패: {e}")
+                await loop.run_in_executor(None, self._fail, jobs, str(e).strip())
+                return
+            logger.warning(f"[register_queue] 배치 처리 실패 ({len(jobs)}건) - 나눠서 다시 처리: {e}")
+        middle = len(jobs) // 2
+        await self._process_jobs(loop, jobs[:middle], stored)
+        await self._process_jobs(loop, jobs[middle:], stored)
+
+    async def _process_once(self, loop):
+        jobs = await loop.run_in_executor(None, self._claim)
+        if not jobs:
+            return 0
+        started = time.perf_counter()
+        design_ids, transient = [], None
+        try:
+            await self._process_jobs(loop, jobs, design_ids)
+        except Exception as e:
+            transient = e
+            # 시도 횟수를 쓰지 않고 돌려놓음 (이미 저장 / 실패 처리된 작업은 점유가 풀려 영향 없음)
+            await loop.run_in_executor(None, self._release, jobs, f"일시적 오류 (재시도 예정): {str(e).strip()}")
+        if transient is None and len(design_ids) < len(jobs):
+            self._failed_batches += 1
+        if design_ids:
+            self._batches += 1
+            self._stored += len(design_ids)
+            self._last_batch_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"[register_queue] {len(design_ids)}건 등록 - {self._last_batch_ms:.1f}ms")
+            if self.after_store:
+                try:
+                    await loop.run_in_executor(None, self.after_store, design_ids)
+                except Exception as e:
+                    logger.error(f"[register_queue] 저장 후 처리 실패: {e}")
+        if transient is not None:
+            raise transient
+        return len(jobs)
+
+    def get_metrics(self):
+        return {
+            "jobs_table": self.jobs_table,
+            "batch_size": self.batch_size,
+            "batches": self._batches,
+            "stored": self._stored,
+            "failed_batches": self._failed_batches,
+            "failed_jobs": self._failed_jobs,
+            "transient_failures": self._transient_failures,
+            "backoff_seconds": self._backoff,
+            "avg_batch_size": round(self._stored / self._batches, 2) if self._batches else 0.0,
+            "last_batch_ms": round(self._last_batch_ms, 3),
+            "running": self._task is not None and not self._task.done(),
+        }
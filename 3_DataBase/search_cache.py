@@ -0,0 +1,233 @@
+"""
+설계안 검색 결과 캐시 (쓰기 세대 기반 무효화)
+
+UI가 같은 검색어("친환경 스마트홈", "도시 공원 설계")를 반복해서 보내므로 두 단계로 캐시합니다.
+
+1. 검색어 → 임베딩: 같은 검색어는 모델(배처 대기 포함)을 거치지 않음
+2. (임베딩 해시, limit, 임계값, 연산자/엔진, 쓰기 세대) → 결과 id와 거리 목록
+   - 본문은 id로 다시 조회 (기본키 조회 한 번) → 캐시에는 작은 값만 저장
+
+무효화:
+- 쓰기 세대(generation)는 단조 증가하는 정수이며 새 설계안이 검색에 반영될 때마다 bump() 호출
+  (pgvector 검색은 저장 커밋 직후, 인메모리 엔진은 엔진이 변경을 반영한 직후)
+- 결과 키에 세대가 들어가므로 bump() 한 번으로 이전 결과 전체가 더 이상 조회되지 않음
+  (이전 항목은 TTL / 크기 상한으로 자연히 삭제)
+- 검색 전에 읽은 세대로 저장하므로 검색 도중 저장이 일어나도 오래된 결과가 새 세대로 남지 않음
+
+저장소:
+- memory: 프로세스 내 LRU (TTL + 최대 항목 수), 세대도 프로세스 내 카운터
+- redis: Redis 호환 저장소 (SET EX로 TTL, 세대는 INCR) - 여러 워커/서버가 세대를 공유
+  크기 상한은 서버의 maxmemory-policy(allkeys-lru 권장)로 관리
+
+환경변수 (기본값):
+    SEARCH_CACHE               off, memory, redis (memory)
+    SEARCH_CACHE_TTL           항목 유효 시간 (초, 300)
+    SEARCH_CACHE_MAX_ENTRIES   memory 저장소 단계별 최대 항목 수 (10000)
+    SEARCH_CACHE_REDIS_URL     redis 주소 (redis://localhost:6379/0)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("SEARCH_CACHE", "memory")
+CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 300))
+CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 10000))
+CACHE_REDIS_URL = os.getenv("SEARCH_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+
+class _MemoryStore:
+    """TTL + 크기 상한 LRU (스레드 안전)"""
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._items = OrderedDict()   # key → (만료 시각, 값)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._items[key]
+                self.expirations += 1
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def generation(self):
+        return self._generation
+
+    def bump(self):
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+    def size(self):
+        return len(self._items)
+
+
+class _RedisStore:
+    """Redis 호환 저장소 (값은 bytes, TTL은 SET EX, 세대는 INCR)"""
+
+    def __init__(self, url, ttl, namespace):
+        import redis   # redis 백엔드를 쓸 때만 필요
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = f"search_cache:{namespace}:"
+        self.generation_key = self.prefix + "generation"
+        self.evictions = 0      # Redis 서버가 처리 (INFO stats의 evicted_keys)
+        self.expirations = 0
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, value, ex=max(1, int(self.ttl)))
+
+    def generation(self):
+        value = self.client.get(self.generation_key)
+        return int(value) if value is not None else 0
+
+    def bump(self):
+        return int(self.client.incr(self.generation_key))
+
+    def size(self):
+        return None
+
+
+class SearchCache:
+    """
+    검색어 → 임베딩, 검색 조건 → 결과 (id, 거리) 2단계 캐시
+
+    Args:
+        namespace: 캐시 구분 이름 (모델 / 테이블이 다르면 다르게 지정)
+        backend: "memory" 또는 "redis"
+        ttl: 항목 유효 시간 (초)
+        max_entries: memory 저장소 단계별 최대 항목 수
+        redis_url: redis 저장소 주소
+    """
+
+    def __init__(self, namespace, backend=CACHE_BACKEND, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES,
+                 redis_url=CACHE_REDIS_URL):
+        if backend not in ("memory", "redis"):
+            raise ValueError(f"지원하지 않는 검색 캐시 저장소입니다: {backend} (지원: memory, redis)")
+        self.namespace = namespace
+        self.backend = backend
+        if backend == "redis":
+            self._store = _RedisStore(redis_url, ttl, namespace)
+        else:
+            # 임베딩과 결과는 크기가 달라 상한을 따로 둠
+            self._embeddings = _MemoryStore(ttl, max_entries)
+            self._store = _MemoryStore(ttl, max_entries)
+        self._counters = {"embedding_hits": 0, "embedding_misses": 0, "result_hits": 0, "result_misses": 0}
+        self._counter_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._counter_lock:
+            self._counters[name] += 1
+
+    # ---------- 1단계: 검색어 → 임베딩 ----------
+
+    @staticmethod
+    def _text_key(text):
+        return "emb:" + hashlib.sha256(text.strip().encode("utf-8")).hexdigest()
+
+    def get_embedding(self, text):
+        """캐시된 검색어 임베딩 (없으면 None)"""
+        key = self._text_key(text)
+        if self.backend == "redis":
+            raw = self._store.get(key)
+            value = np.frombuffer(raw, dtype=np.float32).tolist() if raw is not None else None
+        else:
+            value = self._embeddings.get(key)
+        self._count("embedding_hits" if value is not None else "embedding_misses")
+        return value
+
+    def put_embedding(self, text, embedding):
+        key = self._text_key(text)
+        if self.backend == "redis":
+            self._store.set(key, np.asarray(embedding, dtype=np.float32).tobytes())
+        else:
+            self._embeddings.set(key, list(embedding))
+
+    # ---------- 2단계: 검색 조건 → 결과 ----------
+
+    def generation(self):
+        """현재 쓰기 세대 (검색 전에 읽어서 result_key에 사용)"""
+        return self._store.generation()
+
+    def bump(self):
+        """쓰기 세대 증가 - 설계안을 저장할 때마다 호출 (이전 결과 전체 무효화)"""
+        return self._store.bump()
+
+    @staticmethod
+    def result_key(embedding, limit, threshold, operator, generation):
+        """(임베딩 해시, limit, 임계값, 연산자/엔진, 세대) 결과 키"""
+        digest = hashlib.sha256(np.asarray(embedding, dtype=np.float32).tobytes()).hexdigest()
+        return f"res:{generation}:{operator}:{limit}:{threshold!r}:{digest}"
+
+    def get_results(self, key):
+        """캐시된 결과 [(id, 거리)] (없으면 None)"""
+        raw = self._store.get(key)
+        if raw is not None and self.backend == "redis":
+            raw = [tuple(item) for item in json.loads(raw)]
+        self._count("result_hits" if raw is not None else "result_misses")
+        return raw
+
+    def put_results(self, key, results):
+        """결과 [(id, 거리)] 저장"""
+        results = [(int(row_id), float(distance)) for row_id, distance in results]
+        self._store.set(key, json.dumps(results) if self.backend == "redis" else results)
+
+    # ---------- 메트릭 ----------
+
+    def get_metrics(self):
+        with self._counter_lock:
+            counters = dict(self._counters)
+        embedding_total = counters["embedding_hits"] + counters["embedding_misses"]
+        result_total = counters["result_hits"] + counters["result_misses"]
+        metrics = {
+            "backend": self.backend,
+            "generation": self.generation(),
+            **counters,
+            "embedding_hit_ratio": round(counters["embedding_hits"] / embedding_total, 4) if embedding_total else None,
+            "result_hit_ratio": round(counters["result_hits"] / result_total, 4) if result_total else None,
+        }
+        if self.backend == "memory":
+            metrics.update({
+                "embedding_entries": self._embeddings.size(),
+                "result_entries": self._store.size(),
+                "evictions": self._embeddings.evictions + self._store.evictions,
+                "expirations": self._embeddings.expirations + self._store.expirations,
+            })
+        return metrics
+
+    @classmethod
+    def from_env(cls, namespace):
+        """SEARCH_CACHE 환경변수로 생성 (off이면 None)"""
+        if CACHE_BACKEND == "off":
+            return None
+        return cls(namespace)
@@ -6,6 +6,7 @@ Streamlit 기반 설계안 등록 웹 UI
 2. FastAPI 서버와 연동하여 설계안 등록
 3. 실시간 등록 결과 확인
 4. 임베딩 정보 표시
+5. CSV 파일 일괄 등록 (/register_designs)
 
 실행 방법:
 streamlit run streamlit_client.py
@@ -96,6 +97,40 @@ def register_design_api(title: str, description: str):
             "data": {"detail": f"네트워크 오류: {str(e)}"}
         }
 
+def register_designs_csv_api(file_name: str, file_bytes: bytes):
+    """
+    CSV 파일을 /register_designs로 업로드하여 일괄 등록
+    - sample_designs_500.csv 형태 (title, description 컬럼 필수, embedding 컬럼은 무시)
+    - 서버가 배치 단위로 임베딩하고 그룹 트랜잭션으로 저장
+    
+    Args:
+        file_name: 업로드 파일 이름
+        file_bytes: CSV 파일 내용
+        
+    Returns:
+        dict: API 응답 데이터 - 저장/실패 건수와 행별 결과
+    """
+    try:
+        response = requests.post(
+            f"{API_BASE_URL}/register_designs",  # 일괄 등록 엔드포인트
+            files={"file": (file_name, file_bytes, "text/csv")},  # multipart/form-data 업로드
+            timeout=600  # 수천 건 임베딩을 고려한 타임아웃 (10분)
+        )
+        return {
+            "status_code": response.status_code,
+            "data": response.json()
+        }
+    except requests.exceptions.Timeout:
+        return {
+            "status_code": 408,
+            "data": {"detail": "요청 시간이 초과되었습니다. 파일을 나누어 업로드하세요."}
+        }
+    except requests.exceptions.RequestException as e:
+        return {
+            "status_code": 500,
+            "data": {"detail": f"네트워크 오류: {str(e)}"}
+        }
+
 def main():
     """메인 Streamlit 애플리케이션 - 전체 UI 구성 및 사용자 상호작용 처리"""
     
@@ -209,6 +244,46 @@ def main():
                 progress_bar.empty()  # 진행률 바 제거
                 status_text.empty()  # 상태 텍스트 제거
     
+        # CSV 일괄 등록 - 설계안을 한 건씩 보내지 않고 파일 하나로 등록
+        st.markdown("---")
+        st.header("📂 CSV 일괄 등록")
+        uploaded_file = st.file_uploader(
+            "설계안 CSV 파일",
+            type=["csv"],
+            help="title, description 컬럼이 있는 CSV (예: file/sample_designs_500.csv)"
+        )
+        if st.button("📤 CSV 일괄 등록", use_container_width=True, disabled=uploaded_file is None):
+            if not health_status:
+                st.error("❌ API 서버에 연결할 수 없습니다. 서버 상태를 확인하세요.")
+            else:
+                with st.spinner("AI 임베딩 생성 및 일괄 저장 중..."):
+                    result = register_designs_csv_api(uploaded_file.name, uploaded_file.getvalue())
+                
+                if result["status_code"] == 200:
+                    data = result["data"]
+                    metric_cols = st.columns(3)
+                    metric_cols[0].metric("전체", data.get("total", 0))
+                    metric_cols[1].metric("저장", data.get("inserted", 0))
+                    metric_cols[2].metric("실패", data.get("failed", 0))
+                    
+                    if data.get("failed"):
+                        st.warning(f"⚠️ {data['failed']}건은 등록되지 않았습니다. 아래 행별 결과를 확인하세요.")
+                    else:
+                        st.success("✅ 모든 설계안이 등록되었습니다!")
+                    
+                    # 행별 결과 - CSV 행 번호(헤더 다음 행이 1)와 설계안 ID 또는 오류
+                    with st.expander("📋 행별 결과", expanded=bool(data.get("failed"))):
+                        st.dataframe(
+                            [
+                                {"CSV 행": row["index"] + 1, "설계안 ID": row.get("design_id"), "오류": row.get("error") or ""}
+                                for row in data.get("results", [])
+                            ],
+                            use_container_width=True
+                        )
+                else:
+                    error_detail = result["data"].get("detail", "알 수 없는 오류")
+                    st.error(f"❌ 일괄 등록에 실패했습니다.\n\n**오류 내용:** {error_detail}")
+    
     with col2:  # 오른쪽 열 - 시스템 정보 및 사용법 안내
         st.header("ℹ️ 시스템 정보")  # 정보 섹션 제목
         
@@ -91,10 +91,10 @@ with col1:
     limit = st.slider("검색 결과 수", 1, 50, 10)
     distance_function = st.selectbox(
         "거리 함수", 
-        ["l2", "cosine"],
-        help="L2: 더 높은 정확도 (46%), Cosine: 빠른 속도 (18%)"
+        ["l2", "cosine", "inner_product"],
+        help="L2: <->, Cosine: <=>, Inner Product: <#>"
     )
-    accurate_mode = st.checkbox("정확도 우선 모드 (probes=3)", help="속도는 느리지만 더 정확한 결과")
+    accurate_mode = st.checkbox("정확도 우선 모드 (probes / ef_search 상향)", help="속도는 느리지만 더 정확한 결과")
     
     # 검색 실행
     search_button = st.button("🔍 벡터 검색 실행", type="primary")
@@ -121,13 +121,17 @@ with col2:
                 if results and "search_info" in results[0]:
                     info = results[0]["search_info"]
                     
-                    col_a, col_b, col_c = st.columns(3)
+                    col_a, col_b, col_c, col_d = st.columns(4)
                     with col_a:
                         st.metric("요청/반환", f"{info['requested_limit']}/{info['actual_returned']}")
                     with col_b:
                         st.metric("정확도", info['accuracy_rate'])
                     with col_c:
                         st.metric("거리 함수", info['distance_function'].upper())
+                    with col_d:
+                        st.metric("소요 시간", f"{info['elapsed_ms']:.1f} ms")
+                    if info.get("estimated_recall") is not None:
+                        st.caption(f"추정 재현율(recall@k): {info['estimated_recall'] * 100:.1f}%")
                 
                 # 결과 테이블
                 if results:
@@ -3,6 +3,7 @@ import psycopg2
 import pandas as pd
 import os
 from dotenv import load_dotenv
+from user_neighbors import recommend
 
 load_dotenv()
 st.set_page_config(page_title="사용자 추천 시스템", layout="wide")
@@ -15,6 +16,8 @@ DB_CONFIG = {
     'password': os.getenv('DB_PASSWORD')
 }
 
+RESULT_COLUMNS = ['user_id', 'similarity', 'age', 'income', 'gender', 'spending_score', 'visit_count']
+
 @st.cache_data
 def load_users():
     conn = psycopg2.connect(**DB_CONFIG)
@@ -30,35 +33,11 @@ def load_users():
         conn.close()
 
 def get_recommendations(user_id, method, limit):
+    # 사전 계산된 user_neighbors 조회 (없는 사용자만 실시간 검색)
     conn = psycopg2.connect(**DB_CONFIG)
     try:
-        if method == "euclidean":
-            query = """
-                SELECT ub.user_id, 
-                       1 / (1 + (ue1.embedding <-> ue2.embedding)) AS similarity,
-                       ub.age, ub.income, ub.gender, ub.spending_score, ub.visit_count
-                FROM user_embeddings ue1
-                CROSS JOIN user_embeddings ue2
-                JOIN user_behavior ub ON ue1.user_id = ub.user_id
-                WHERE ue2.user_id = %s AND ue1.user_id != %s
-                ORDER BY ue1.embedding <-> ue2.embedding
-                LIMIT %s;
-            """
-        else:
-            query = """
-                SELECT ub.user_id,
-                       1 - (ue1.embedding <=> ue2.embedding) AS similarity,
-                       ub.age, ub.income, ub.gender, ub.spending_score, ub.visit_count
-                FROM user_embeddings ue1
-                CROSS JOIN user_embeddings ue2
-                JOIN user_behavior ub ON ue1.user_id = ub.user_id
-                WHERE ue2.user_id = %s AND ue1.user_id != %s
-                ORDER BY ue1.embedding <=> ue2.embedding
-                LIMIT %s;
-            """
-        
-        df = pd.read_sql(query, conn, params=(user_id, user_id, limit))
-        return df
+        rows, _ = recommend(conn, user_id, method, limit)
+        return pd.DataFrame(rows, columns=RESULT_COLUMNS)
     except Exception as e:
         st.error(f"오류: {str(e)}")
         return pd.DataFrame()
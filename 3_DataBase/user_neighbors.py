@@ -0,0 +1,268 @@
+"""
+사용자 추천용 이웃 테이블 사전 계산 (user_neighbors)
+
+추천 API는 요청마다 user_embeddings 자기 조인 + user_behavior 조인을 실행했습니다.
+임베딩이 2차원(PCA)이므로 전체 쌍 거리를 numpy로 한 번에 계산해 사용자별 상위 N명을 저장하고,
+API는 (user_id, metric, rank) 기본키 범위 읽기로 응답합니다.
+
+구성:
+1. user_embeddings + user_behavior를 한 번 읽어 행 블록 단위로 전체 쌍 거리 계산
+   - euclidean: 유사도 1 / (1 + L2 거리)
+   - cosine: 유사도 = 코사인 유사도 (1 - 코사인 거리)
+   - 추천 후보는 user_behavior가 있는 사용자 (기존 쿼리의 JOIN과 동일), 자기 자신 제외
+2. 이웃의 행동 컬럼(age, income, gender, spending_score, visit_count)을 함께 저장 → 조회시 조인 없음
+3. user_neighbors_new에 COPY로 적재 후 한 트랜잭션에서 이름 교체 (조회는 항상 완성된 테이블)
+4. recommend(): 테이블에 없는 사용자(마지막 계산 이후 추가) 또는 저장된 N보다 많이 요청한 경우만 실시간 검색
+
+실행 (임베딩을 다시 계산한 뒤 실행, CSVtoSQL.py는 마지막 단계에서 자동 실행):
+    python user_neighbors.py --top-n 20
+
+환경변수 (기본값):
+    USER_NEIGHBORS_TOP_N        사용자별 저장할 이웃 수 (20)
+    USER_NEIGHBORS_BLOCK_ROWS   거리 계산 행 블록 크기 (2048)
+"""
+
+import logging
+import os
+import time
+
+import numpy as np
+
+from bulk_loader import BulkLoader, swap_table
+
+logger = logging.getLogger(__name__)
+
+TOP_N = int(os.getenv("USER_NEIGHBORS_TOP_N", 20))
+BLOCK_ROWS = int(os.getenv("USER_NEIGHBORS_BLOCK_ROWS", 2048))
+
+NEIGHBORS_TABLE = "user_neighbors"
+METRICS = ("euclidean", "cosine")
+BEHAVIOR_COLUMNS = ["age", "income", "gender", "spending_score", "visit_count"]
+COPY_COLUMNS = [
+    ("user_id", "text"), ("metric", "text"), ("rank", "int4"), ("neighbor_id", "text"), ("similarity", "float8"),
+    ("age", "int4"), ("income", "int4"), ("gender", "text"), ("spending_score", "int4"), ("visit_count", "int4"),
+]
+
+# 사전 계산된 이웃 조회 - 기본키 범위 읽기
+NEIGHBORS_SQL = f"""
+    SELECT neighbor_id, similarity, {', '.join(BEHAVIOR_COLUMNS)}
+    FROM {NEIGHBORS_TABLE}
+    WHERE user_id = %s AND metric = %s
+    ORDER BY rank
+    LIMIT %s;
+"""
+
+# 실시간 검색 (테이블에 없는 사용자용) - 기존 추천 쿼리와 같은 결과
+LIVE_SQL = {
+    "euclidean": """
+        SELECT u1.user_id,
+               1 / (1 + (u1.embedding <-> u2.embedding)) AS similarity,
+               ub.age, ub.income, ub.gender, ub.spending_score, ub.visit_count
+        FROM user_embeddings u1, user_embeddings u2
+        JOIN user_behavior ub ON u1.user_id = ub.user_id
+        WHERE u2.user_id = %s AND u1.user_id != %s
+        ORDER BY u1.embedding <-> u2.embedding
+        LIMIT %s;
+    """,
+    "cosine": """
+        SELECT u1.user_id,
+               1 - (u1.embedding <=> u2.embedding) AS similarity,
+               ub.age, ub.income, ub.gender, ub.spending_score, ub.visit_count
+        FROM user_embeddings u1, user_embeddings u2
+        JOIN user_behavior ub ON u1.user_id = ub.user_id
+        WHERE u2.user_id = %s AND u1.user_id != %s
+        ORDER BY u1.embedding <=> u2.embedding
+        LIMIT %s;
+    """,
+}
+
+
+def neighbors_table_sql(table):
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            user_id VARCHAR(10) NOT NULL,
+            metric VARCHAR(10) NOT NULL,
+            rank INTEGER NOT NULL,
+            neighbor_id VARCHAR(10) NOT NULL,
+            similarity DOUBLE PRECISION NOT NULL,
+            age INTEGER,
+            income INTEGER,
+            gender VARCHAR(1),
+            spending_score INTEGER,
+            visit_count INTEGER,
+            PRIMARY KEY (user_id, metric, rank)
+        );
+    """
+
+
+def ensure_table(conn):
+    """이웃 테이블이 없으면 빈 테이블 생성 (계산 전에도 API가 실시간 검색으로 동작하도록)"""
+    with conn.cursor() as cur:
+        cur.execute(neighbors_table_sql(NEIGHBORS_TABLE))
+    conn.commit()
+
+
+def load_users(conn):
+    """
+    전체 사용자 임베딩과 행동 데이터 조회
+
+    Returns:
+        tuple: (user_ids 배열, 임베딩 n×d float64, 후보 여부 bool 배열, user_id → 행동 튜플)
+    """
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            SELECT ue.user_id, ue.embedding::real[], ub.user_id IS NOT NULL,
+                   {', '.join('ub.' + c for c in BEHAVIOR_COLUMNS)}
+            FROM user_embeddings ue
+            LEFT JOIN user_behavior ub ON ub.user_id = ue.user_id
+            WHERE ue.embedding IS NOT NULL
+            ORDER BY ue.user_id;
+        """)
+        rows = cur.fetchall()
+    conn.commit()
+    user_ids = np.asarray([row[0] for row in rows], dtype=object)
+    embeddings = np.asarray([row[1] for row in rows], dtype=np.float64) if rows else np.zeros((0, 2))
+    is_candidate = np.asarray([row[2] for row in rows], dtype=bool)
+    behavior = {row[0]: tuple(row[3:]) for row in rows if row[2]}
+    return user_ids, embeddings, is_candidate, behavior
+
+
+def _similarities(block, candidates, candidate_sq_norms, candidate_unit, metric):
+    """행 블록 × 후보 전체 유사도 행렬 (pgvector 결과와 같은 척도)"""
+    if metric == "euclidean":
+        block_sq = np.einsum("ij,ij->i", block, block)[:, None]
+        sq_dist = np.maximum(block_sq + candidate_sq_norms[None, :] - 2.0 * block @ candidates.T, 0.0)
+        return 1.0 / (1.0 + np.sqrt(sq_dist))
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    # 영벡터는 pgvector와 마찬가지로 코사인 거리가 정의되지 않음 → 후보에서 제외
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sims = (block / norms) @ candidate_unit.T
+    return np.where(np.isfinite(sims), sims, -np.inf)
+
+
+def top_n_neighbors(user_ids, embeddings, is_candidate, metric, top_n=TOP_N, block_rows=BLOCK_ROWS):
+    """
+    사용자별 유사도 상위 top_n 후보 (행 블록 단위로 전체 쌍 계산)
+
+    Returns:
+        tuple: (이웃 인덱스 n×k - 후보 배열 기준, 유사도 n×k, 후보 user_id 배열), 유사도 내림차순
+    """
+    candidates = embeddings[is_candidate]
+    candidate_ids = user_ids[is_candidate]
+    k = min(top_n, len(candidate_ids))
+    candidate_sq_norms = np.einsum("ij,ij->i", candidates, candidates)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        candidate_unit = candidates / np.linalg.norm(candidates, axis=1, keepdims=True)
+    candidate_position = {user_id: i for i, user_id in enumerate(candidate_ids)}
+
+    indices = np.zeros((len(user_ids), k), dtype=np.int64)
+    sims = np.full((len(user_ids), k), -np.inf)
+    for start in range(0, len(user_ids), block_rows):
+        block_sims = _similarities(embeddings[start:start + block_rows], candidates,
+                                   candidate_sq_norms, candidate_unit, metric)
+        # 자기 자신 제외
+        for row, user_id in enumerate(user_ids[start:start + block_rows]):
+            if user_id in candidate_position:
+                block_sims[row, candidate_position[user_id]] = -np.inf
+        if k < block_sims.shape[1]:
+            part = np.argpartition(-block_sims, k - 1, axis=1)[:, :k]
+        else:
+            part = np.broadcast_to(np.arange(block_sims.shape[1]), block_sims.shape)
+        part_sims = np.take_along_axis(block_sims, part, axis=1)
+        order = np.argsort(-part_sims, axis=1, kind="stable")
+        indices[start:start + block_rows] = np.take_along_axis(part, order, axis=1)
+        sims[start:start + block_rows] = np.take_along_axis(part_sims, order, axis=1)
+    return indices, sims, candidate_ids
+
+
+def _neighbor_rows(user_ids, behavior, metric, indices, sims, candidate_ids):
+    """적재할 행 생성 (user_id, metric, rank, neighbor_id, similarity, 행동 컬럼...)"""
+    for user_id, row_indices, row_sims in zip(user_ids, indices, sims):
+        rank = 1
+        for index, similarity in zip(row_indices, row_sims):
+            if not np.isfinite(similarity):
+                continue
+            neighbor_id = candidate_ids[index]
+            yield (user_id, metric, rank, neighbor_id, float(similarity)) + behavior[neighbor_id]
+            rank += 1
+
+
+def refresh(conn, top_n=TOP_N):
+    """
+    두 거리 함수의 이웃 테이블을 다시 계산해 원자적으로 교체
+
+    Returns:
+        dict: users, rows, compute_seconds, write_seconds
+    """
+    started = time.perf_counter()
+    user_ids, embeddings, is_candidate, behavior = load_users(conn)
+    results = {metric: top_n_neighbors(user_ids, embeddings, is_candidate, metric, top_n) for metric in METRICS}
+    compute_seconds = time.perf_counter() - started
+    logger.info(f"[{NEIGHBORS_TABLE}] 사용자 {len(user_ids)}명 top-{top_n} 계산 완료 - {compute_seconds:.2f}초")
+
+    started = time.perf_counter()
+    staging = f"{NEIGHBORS_TABLE}_new"
+    with conn.cursor() as cur:
+        cur.execute(f"DROP TABLE IF EXISTS {staging};")
+        cur.execute(neighbors_table_sql(staging))
+    conn.commit()
+    loader = BulkLoader(conn, chunk_rows=50000, stop_on_error=True)
+    rows = 0
+    for metric, (indices, sims, candidate_ids) in results.items():
+        report = loader.load(staging, _neighbor_rows(user_ids, behavior, metric, indices, sims, candidate_ids),
+                             columns=COPY_COLUMNS)
+        rows += report["rows_loaded"]
+    swap_table(conn, NEIGHBORS_TABLE, staging)
+    write_seconds = time.perf_counter() - started
+    return {"users": len(user_ids), "rows": rows,
+            "compute_seconds": round(compute_seconds, 3), "write_seconds": round(write_seconds, 3)}
+
+
+def recommend(conn, user_id, metric, limit):
+    """
+    추천 사용자 조회 - 사전 계산 테이블 우선, 부족하면 실시간 검색
+
+    Returns:
+        tuple: ((user_id, similarity, age, income, gender, spending_score, visit_count) 목록,
+                "precomputed" 또는 "live")
+    """
+    if metric not in LIVE_SQL:
+        raise ValueError(f"지원하지 않는 거리 함수입니다: {metric} (지원: {', '.join(METRICS)})")
+    with conn.cursor() as cur:
+        cur.execute(NEIGHBORS_SQL, (user_id, metric, limit))
+        rows = cur.fetchall()
+        source = "precomputed"
+        if len(rows) < limit:
+            # 마지막 계산 이후 추가된 사용자 / 저장된 이웃 수보다 많이 요청한 경우
+            cur.execute(LIVE_SQL[metric], (user_id, user_id, limit))
+            rows = cur.fetchall()
+            source = "live"
+    conn.commit()
+    return rows, source
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    import psycopg2
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="사용자 추천 이웃 테이블 사전 계산 (user_neighbors)")
+    parser.add_argument("--top-n", type=int, default=TOP_N, help="사용자별 저장할 이웃 수")
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(
+        host=os.getenv("DB_HOST"),
+        port=os.getenv("DB_PORT"),
+        database=os.getenv("DB_NAME"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+    )
+    try:
+        print(json.dumps(refresh(connection, args.top_n), ensure_ascii=False, indent=2))
+    finally:
+        connection.close()
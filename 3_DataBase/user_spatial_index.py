@@ -0,0 +1,257 @@
+"""
+저차원 사용자 임베딩용 인프로세스 공간 인덱스 (KD-tree)
+
+user_embeddings는 PCA로 만든 2차원 벡터라 pgvector 인덱스(IVFFlat / HNSW)의 이점이 거의 없습니다.
+서버 시작시 전체 사용자를 메모리로 읽어 KD-tree를 만들고 /recommend/* 요청을 프로세스 안에서 처리합니다.
+
+구성:
+1. euclidean: 임베딩 그대로 KD-tree (L2 거리)
+2. cosine: 단위 벡터로 정규화한 임베딩의 KD-tree
+   - 단위 벡터 사이 L2 거리² = 2 × 코사인 거리 → L2 순서가 코사인 순서와 같음
+   - 영벡터는 코사인 거리가 정의되지 않으므로 (pgvector와 동일) 코사인 후보에서 제외
+3. 추천 후보는 user_behavior가 있는 사용자, 자기 자신 제외 (기존 추천 쿼리와 동일)
+4. 반경 검색 (거리 r 이내 사용자)과 전체 사용자 일괄 검색 지원
+5. 갱신: refresh_interval마다 user_embeddings 지문(행 수 + 해시 합)을 확인해 바뀌었으면
+   새 스냅샷(트리 + 행동 데이터)을 만든 뒤 참조 하나만 교체 → 조회는 항상 완성된 스냅샷 사용
+
+유사도 척도는 pgvector 쿼리와 같음: euclidean 1 / (1 + 거리), cosine 1 - 코사인 거리
+
+환경변수 (기본값):
+    USER_INDEX_REFRESH_INTERVAL   지문 확인 주기 (초, 30 - 0이면 자동 갱신 안 함)
+"""
+
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from sklearn.neighbors import KDTree
+
+from user_neighbors import METRICS, load_users
+
+logger = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = float(os.getenv("USER_INDEX_REFRESH_INTERVAL", 30))
+
+FINGERPRINT_SQL = """
+    SELECT (SELECT COUNT(*) FROM user_embeddings),
+           (SELECT COALESCE(SUM(hashtext(user_id || ':' || coalesce(embedding::text, ''))::bigint), 0) FROM user_embeddings),
+           (SELECT COUNT(*) FROM user_behavior);
+"""
+
+
+class UnknownUserError(KeyError):
+    """스냅샷에 없는 사용자 (마지막 갱신 이후 추가) - 호출자는 DB 검색으로 대체"""
+
+
+class _Snapshot:
+    """한 시점의 사용자 임베딩 / 행동 데이터 / 거리 함수별 KD-tree (생성 후 변경하지 않음)"""
+
+    def __init__(self, user_ids, embeddings, is_candidate, behavior, fingerprint):
+        self.fingerprint = fingerprint
+        self.built_at = time.time()
+        self.behavior = behavior
+        self.position = {user_id: i for i, user_id in enumerate(user_ids)}
+        self.user_ids = user_ids
+        self.embeddings = embeddings
+
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        self.has_direction = norms[:, 0] > 0
+        self.unit = np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+
+        # 거리 함수별 후보 (user_id 배열, 트리)
+        self.candidates = {}
+        for metric in METRICS:
+            mask = is_candidate if metric == "euclidean" else is_candidate & self.has_direction
+            points = embeddings[mask] if metric == "euclidean" else self.unit[mask]
+            tree = KDTree(points) if len(points) else None
+            self.candidates[metric] = (user_ids[mask], tree)
+
+    def point(self, user_id, metric):
+        if user_id not in self.position:
+            raise UnknownUserError(user_id)
+        index = self.position[user_id]
+        if metric == "cosine":
+            return self.unit[index] if self.has_direction[index] else None
+        return self.embeddings[index]
+
+
+def _to_similarity(metric, distances):
+    """트리 거리 → 유사도 (cosine 트리는 단위 벡터 L2 거리이므로 코사인 거리 = d² / 2)"""
+    if metric == "euclidean":
+        return 1.0 / (1.0 + distances)
+    return 1.0 - distances ** 2 / 2.0
+
+
+def _metric_radius(metric, radius):
+    """거리 함수 기준 반경 → 트리 L2 반경"""
+    if metric == "euclidean":
+        return radius
+    return float(np.sqrt(2.0 * max(radius, 0.0)))
+
+
+class UserSpatialIndex:
+    """
+    사용자 추천용 KD-tree 인덱스
+
+    Args:
+        db_pool: PooledDB (스냅샷 생성 / 지문 확인에 사용)
+        refresh_interval: 지문 확인 주기 (초, 0이면 자동 갱신 안 함)
+    """
+
+    def __init__(self, db_pool, refresh_interval=REFRESH_INTERVAL):
+        self.db_pool = db_pool
+        self.refresh_interval = refresh_interval
+        self._snapshot = None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._reloads = 0
+        self._queries = 0
+        self._last_build_ms = 0.0
+
+    # ---------- 적재 / 갱신 ----------
+
+    def _fingerprint(self, conn):
+        with conn.cursor() as cur:
+            cur.execute(FINGERPRINT_SQL)
+            row = cur.fetchone()
+        conn.commit()
+        return tuple(row)
+
+    def load(self):
+        """DB에서 새 스냅샷을 만들어 교체 (블로킹 - 서버 시작시 / 갱신 스레드에서 호출)"""
+        with self._reload_lock:
+            started = time.perf_counter()
+            with self.db_pool.connection() as conn:
+                fingerprint = self._fingerprint(conn)
+                user_ids, embeddings, is_candidate, behavior = load_users(conn)
+            snapshot = _Snapshot(user_ids, embeddings, is_candidate, behavior, fingerprint)
+            self._snapshot = snapshot  # 참조 교체 한 번 - 진행 중인 조회는 이전 스냅샷을 계속 사용
+            self._reloads += 1
+            self._last_build_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"[user_index] 사용자 {len(user_ids)}명 KD-tree 생성 - {self._last_build_ms:.1f}ms")
+
+    def refresh(self):
+        """지문이 바뀌었으면 다시 적재 (바뀌지 않았으면 False)"""
+        with self.db_pool.connection() as conn:
+            fingerprint = self._fingerprint(conn)
+        if self._snapshot is not None and fingerprint == self._snapshot.fingerprint:
+            return False
+        self.load()
+        return True
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                if self.refresh():
+                    logger.info("[user_index] user_embeddings 변경 감지 - 스냅샷 교체")
+            except Exception as e:
+                logger.warning(f"[user_index] 갱신 실패 (이전 스냅샷 유지): {e}")
+
+    def start(self):
+        """첫 스냅샷 적재 + 갱신 스레드 시작"""
+        self.load()
+        if self.refresh_interval > 0:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="user-index-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # ---------- 조회 ----------
+
+    def _current(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("사용자 인덱스가 아직 적재되지 않았습니다.")
+        return snapshot
+
+    def _rows(self, snapshot, metric, user_id, indices, distances, limit):
+        candidate_ids = snapshot.candidates[metric][0]
+        rows = []
+        for index, similarity in zip(indices, _to_similarity(metric, np.asarray(distances))):
+            neighbor_id = candidate_ids[index]
+            if neighbor_id == user_id:
+                continue
+            rows.append((neighbor_id, float(similarity)) + snapshot.behavior[neighbor_id])
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def recommend(self, user_id, metric, limit):
+        """
+        유사 사용자 top-limit
+
+        Returns:
+            list: (user_id, similarity, age, income, gender, spending_score, visit_count) - 유사도 내림차순
+        Raises:
+            UnknownUserError: 스냅샷에 없는 사용자
+        """
+        snapshot = self._current()
+        point = snapshot.point(user_id, metric)
+        candidate_ids, tree = snapshot.candidates[metric]
+        self._queries += 1
+        if point is None or tree is None or limit < 1:
+            return []
+        k = min(limit + 1, len(candidate_ids))  # 자기 자신이 포함될 수 있으므로 하나 더
+        distances, indices = tree.query(point.reshape(1, -1), k=k)
+        return self._rows(snapshot, metric, user_id, indices[0], distances[0], limit)
+
+    def within(self, user_id, metric, radius, limit=None):
+        """
+        거리 radius 이내 사용자 (euclidean: L2 거리, cosine: 코사인 거리), 가까운 순
+
+        Raises:
+            UnknownUserError: 스냅샷에 없는 사용자
+        """
+        snapshot = self._current()
+        point = snapshot.point(user_id, metric)
+        candidate_ids, tree = snapshot.candidates[metric]
+        self._queries += 1
+        if point is None or tree is None:
+            return []
+        indices, distances = tree.query_radius(
+            point.reshape(1, -1), r=_metric_radius(metric, radius), return_distance=True, sort_results=True
+        )
+        return self._rows(snapshot, metric, user_id, indices[0], distances[0], limit or len(candidate_ids))
+
+    def recommend_all(self, metric, limit):
+        """
+        전체 사용자의 top-limit 일괄 검색 (트리 질의 한 번)
+
+        Returns:
+            dict: user_id → recommend()와 같은 형태의 목록
+        """
+        snapshot = self._current()
+        candidate_ids, tree = snapshot.candidates[metric]
+        self._queries += 1
+        if tree is None or limit < 1:
+            return {user_id: [] for user_id in snapshot.user_ids}
+        points = snapshot.embeddings if metric == "euclidean" else snapshot.unit
+        k = min(limit + 1, len(candidate_ids))
+        distances, indices = tree.query(points, k=k)
+        results = {}
+        for row, user_id in enumerate(snapshot.user_ids):
+            if metric == "cosine" and not snapshot.has_direction[row]:
+                results[user_id] = []
+                continue
+            results[user_id] = self._rows(snapshot, metric, user_id, indices[row], distances[row], limit)
+        return results
+
+    def get_metrics(self):
+        snapshot = self._snapshot
+        return {
+            "users": len(snapshot.user_ids) if snapshot else 0,
+            "candidates": {metric: len(snapshot.candidates[metric][0]) for metric in METRICS} if snapshot else {},
+            "built_at": snapshot.built_at if snapshot else None,
+            "last_build_ms": round(self._last_build_ms, 3),
+            "reloads": self._reloads,
+            "queries": self._queries,
+            "refresh_interval": self.refresh_interval,
+        }
@@ -0,0 +1,241 @@
+"""
+pgvector 인덱스 생성 유틸리티 (적재 후 인덱스 생성: load-then-index)
+
+빈 테이블에 IVFFlat 인덱스를 먼저 만들면 클러스터 중심(centroid)이 데이터 없이 학습되어
+재현율과 검색 속도가 모두 나빠집니다. 이 모듈은 적재 중에는 벡터 인덱스를 제거(지연)하고,
+적재가 끝난 뒤 최종 행 수에 맞는 파라미터로 인덱스를 생성합니다.
+
+주요 기능:
+1. drop_vector_indexes: 적재 전 기존 벡터 인덱스(ivfflat/hnsw) 제거
+2. recommended_ivfflat_lists: 행 수 기반 lists 계산 (100만 행 이하: rows/1000, 초과: sqrt(rows))
+3. build_vector_index: IVFFlat(lists) 또는 HNSW(m, ef_construction) 생성
+   - maintenance_work_mem / 병렬 유지보수 워커 수 조정
+   - 서비스 중인 테이블은 CREATE INDEX CONCURRENTLY (쓰기 잠금 없음)
+   - 생성 시간과 인덱스 크기 로깅 후 ANALYZE
+
+환경변수 (기본값):
+    VECTOR_INDEX_METHOD          ivfflat 또는 hnsw (ivfflat)
+    HNSW_M                       HNSW 노드당 연결 수 (16)
+    HNSW_EF_CONSTRUCTION         HNSW 생성시 후보 목록 크기 (64)
+    INDEX_MAINTENANCE_WORK_MEM   인덱스 생성용 메모리 (512MB)
+
+실행 예시 (적재가 끝난 테이블에 인덱스 재생성):
+python vector_index.py --table issues --column embedding --method hnsw --concurrently
+"""
+
+import logging
+import math
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_METHODS = ("ivfflat", "hnsw")
+
+# 거리 함수별 연산자 클래스
+OPCLASSES = {
+    "cosine": "vector_cosine_ops",
+    "l2": "vector_l2_ops",
+    "ip": "vector_ip_ops",
+}
+
+
+def recommended_ivfflat_lists(row_count):
+    """pgvector 권장 lists 값 (100만 행 이하: rows / 1000, 초과: sqrt(rows), 최소 1)"""
+    if row_count <= 1_000_000:
+        return max(1, row_count // 1000)
+    return max(1, int(math.sqrt(row_count)))
+
+
+def recommended_ivfflat_probes(lists):
+    """검색시 권장 probes 값 (lists의 제곱근, 최소 1)"""
+    return max(1, int(math.sqrt(lists)))
+
+
+def index_settings_from_env():
+    """환경변수에서 인덱스 생성 설정 읽기"""
+    return {
+        "method": os.getenv("VECTOR_INDEX_METHOD", "ivfflat"),
+        "m": int(os.getenv("HNSW_M", 16)),
+        "ef_construction": int(os.getenv("HNSW_EF_CONSTRUCTION", 64)),
+        "maintenance_work_mem": os.getenv("INDEX_MAINTENANCE_WORK_MEM", "512MB"),
+    }
+
+
+def list_vector_indexes(conn, table, column=None):
+    """테이블의 ivfflat / hnsw 인덱스 목록 [(인덱스명, 인덱스 정의)]"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT indexname, indexdef
+            FROM pg_indexes
+            WHERE tablename = %s
+              AND (indexdef ILIKE '%%USING ivfflat%%' OR indexdef ILIKE '%%USING hnsw%%');
+        """, (table,))
+        indexes = cur.fetchall()
+    if column:
+        indexes = [(name, definition) for name, definition in indexes if f"({column} " in definition]
+    return indexes
+
+
+def drop_vector_indexes(conn, table, column=None):
+    """
+    적재 전 벡터 인덱스 제거 (적재 중 인덱스 갱신 비용 제거 + 빈 centroid 방지)
+
+    Returns:
+        list: 제거한 인덱스 정의 (필요하면 그대로 다시 실행 가능)
+    """
+    dropped = []
+    indexes = list_vector_indexes(conn, table, column)
+    with conn.cursor() as cur:
+        for name, definition in indexes:
+            cur.execute(f"DROP INDEX IF EXISTS {name};")
+            dropped.append(definition)
+            logger.info(f"[{table}] 벡터 인덱스 제거 (적재 후 재생성): {name}")
+    conn.commit()
+    return dropped
+
+
+def _is_live(conn, table):
+    """다른 세션이 테이블을 사용 중인지 확인 (사용 중이면 CONCURRENTLY로 생성)"""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COUNT(*)
+            FROM pg_stat_activity
+            WHERE pid <> pg_backend_pid()
+              AND datname = current_database()
+              AND state <> 'idle'
+              AND query ILIKE %s;
+        """, (f"%{table}%",))
+        return cur.fetchone()[0] > 0
+
+
+def build_vector_index(conn, table, column, method="ivfflat", distance="cosine", lists=None,
+                       m=16, ef_construction=64, maintenance_work_mem="512MB",
+                       parallel_workers=None, concurrently=None, index_name=None):
+    """
+    적재가 끝난 테이블에 벡터 인덱스 생성
+
+    Args:
+        conn: psycopg2 연결
+        table / column: 대상 테이블과 vector 컬럼
+        method: "ivfflat" 또는 "hnsw"
+        distance: "cosine", "l2", "ip"
+        lists: IVFFlat lists (None이면 행 수로 계산)
+        m / ef_construction: HNSW 파라미터
+        maintenance_work_mem: 인덱스 생성 세션의 maintenance_work_mem
+        parallel_workers: max_parallel_maintenance_workers (None이면 서버 기본값)
+        concurrently: True/False, None이면 테이블 사용 여부를 확인해 자동 결정
+        index_name: 인덱스 이름 (None이면 {table}_{column}_{method}_{distance}_idx)
+
+    Returns:
+        dict: index_name, method, row_count, params, concurrently, build_seconds, size_bytes, size
+    """
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"지원하지 않는 인덱스 방식입니다: {method} (지원: {', '.join(SUPPORTED_METHODS)})")
+    if distance not in OPCLASSES:
+        raise ValueError(f"지원하지 않는 거리 함수입니다: {distance} (지원: {', '.join(OPCLASSES)})")
+    index_name = index_name or f"{table}_{column}_{method}_{distance}_idx"
+
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {table} WHERE {column} IS NOT NULL;")
+        row_count = cur.fetchone()[0]
+    conn.commit()
+
+    if method == "ivfflat":
+        lists = lists or recommended_ivfflat_lists(row_count)
+        params = {"lists": lists}
+    else:
+        params = {"m": m, "ef_construction": ef_construction}
+    with_sql = ", ".join(f"{key} = {value}" for key, value in params.items())
+
+    if concurrently is None:
+        concurrently = _is_live(conn, table)
+
+    create_sql = (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {index_name} "
+        f"ON {table} USING {method} ({column} {OPCLASSES[distance]}) WITH ({with_sql});"
+    )
+
+    # CREATE INDEX CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없으므로 autocommit으로 실행
+    previous_autocommit = conn.autocommit
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SET maintenance_work_mem = %s;", (maintenance_work_mem,))
+            if parallel_workers is not None:
+                cur.execute("SET max_parallel_maintenance_workers = %s;", (int(parallel_workers),))
+
+            logger.info(f"[{table}] 벡터 인덱스 생성 시작 - {row_count}행, {method} {params}, "
+                        f"maintenance_work_mem={maintenance_work_mem}, concurrently={concurrently}")
+            started = time.perf_counter()
+            cur.execute(create_sql)
+            build_seconds = time.perf_counter() - started
+
+            # 플래너가 새 인덱스와 최신 통계를 사용하도록 ANALYZE
+            cur.execute(f"ANALYZE {table};")
+            cur.execute("SELECT pg_relation_size(%s::regclass), pg_size_pretty(pg_relation_size(%s::regclass));",
+                        (index_name, index_name))
+            size_bytes, size_pretty = cur.fetchone()
+            cur.execute("RESET maintenance_work_mem;")
+            if parallel_workers is not None:
+                cur.execute("RESET max_parallel_maintenance_workers;")
+    finally:
+        conn.autocommit = previous_autocommit
+
+    logger.info(f"[{table}] 벡터 인덱스 생성 완료 - {index_name}: {build_seconds:.2f}초, 크기 {size_pretty}")
+    return {
+        "index_name": index_name,
+        "method": method,
+        "distance": distance,
+        "row_count": row_count,
+        "params": params,
+        "concurrently": concurrently,
+        "build_seconds": round(build_seconds, 3),
+        "size_bytes": size_bytes,
+        "size": size_pretty,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    import psycopg2
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    defaults = index_settings_from_env()
+    parser = argparse.ArgumentParser(description="적재가 끝난 테이블에 벡터 인덱스 (재)생성")
+    parser.add_argument("--table", required=True)
+    parser.add_argument("--column", default="embedding")
+    parser.add_argument("--method", choices=SUPPORTED_METHODS, default=defaults["method"])
+    parser.add_argument("--distance", choices=list(OPCLASSES), default="cosine")
+    parser.add_argument("--lists", type=int, default=None, help="IVFFlat lists (기본: 행 수로 계산)")
+    parser.add_argument("--m", type=int, default=defaults["m"])
+    parser.add_argument("--ef-construction", type=int, default=defaults["ef_construction"])
+    parser.add_argument("--maintenance-work-mem", default=defaults["maintenance_work_mem"])
+    parser.add_argument("--parallel-workers", type=int, default=None)
+    parser.add_argument("--concurrently", action="store_true", help="CREATE INDEX CONCURRENTLY 사용")
+    parser.add_argument("--rebuild", action="store_true", help="기존 벡터 인덱스를 제거 후 생성")
+    args = parser.parse_args()
+
+    connection = psycopg2.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        port=int(os.getenv("DB_PORT", 5432)),
+        dbname=os.getenv("DB_NAME", "postgres"),
+        user=os.getenv("DB_USER", "postgres"),
+        password=os.getenv("DB_PASSWORD"),
+    )
+    try:
+        if args.rebuild:
+            drop_vector_indexes(connection, args.table, args.column)
+        result = build_vector_index(
+            connection, args.table, args.column, method=args.method, distance=args.distance,
+            lists=args.lists, m=args.m, ef_construction=args.ef_construction,
+            maintenance_work_mem=args.maintenance_work_mem, parallel_workers=args.parallel_workers,
+            concurrently=args.concurrently or None,
+        )
+        print(result)
+    finally:
+        connection.close()
@@ -0,0 +1,188 @@
+"""
+원시 벡터 검색 헬퍼 (거리 연산자 선택 + 요청별 인덱스 파라미터 + 재현율 추정)
+
+주요 기능:
+1. 거리 함수 이름 → pgvector 연산자 매핑 (l2: <->, cosine: <=>, inner_product: <#>)
+2. 요청별 ivfflat.probes / hnsw.ef_search 설정용 set_config 쿼리 (SET LOCAL과 동일, 트랜잭션 범위)
+3. 정확(exact) 검색용 설정 - 인덱스 스캔을 끄고 순차 스캔으로 실제 최근접 이웃 조회
+4. RecallTracker: 일부 요청을 표본으로 정확 검색과 비교해 설정별 재현율(recall@k)을 추정하고
+   거리 함수별 지연시간 / 반환 비율 통계를 누적
+5. 저장된 행 id 기준 유사 항목 검색 SQL (모델 추론 / 벡터 전송 없이 한 문장으로 처리)
+"""
+
+import random
+import threading
+from collections import deque
+
+from micro_batcher import _percentile
+
+# 거리 함수 → pgvector 연산자
+DISTANCE_OPERATORS = {
+    "l2": "<->",              # 유클리드 거리
+    "cosine": "<=>",          # 코사인 거리 (1 - 코사인 유사도)
+    "inner_product": "<#>",   # 음의 내적 (작을수록 유사)
+}
+
+# 정확 검색: 벡터 인덱스를 사용하지 않도록 트랜잭션 범위에서 인덱스 스캔 비활성화
+EXACT_SEARCH_SETTINGS = (("enable_indexscan", "off"), ("enable_bitmapscan", "off"))
+
+
+def distance_operator(distance_function):
+    """거리 함수 이름을 pgvector 연산자로 변환 (지원하지 않으면 ValueError)"""
+    try:
+        return DISTANCE_OPERATORS[distance_function]
+    except KeyError:
+        raise ValueError(
+            f"지원하지 않는 거리 함수입니다: {distance_function} (지원: {', '.join(DISTANCE_OPERATORS)})"
+        ) from None
+
+
+def search_settings(probes=None, ef_search=None, exact=False):
+    """
+    트랜잭션 범위(SET LOCAL)로 적용할 설정 목록 [(이름, 값)]
+
+    set_config(name, value, true)는 SET LOCAL과 같고 파라미터 바인딩이 가능하므로
+    psycopg2 / asyncpg 모두 같은 방식으로 사용
+    """
+    settings = []
+    if exact:
+        settings.extend(EXACT_SEARCH_SETTINGS)
+    if probes is not None:
+        settings.append(("ivfflat.probes", str(int(probes))))
+    if ef_search is not None:
+        settings.append(("hnsw.ef_search", str(int(ef_search))))
+    return settings
+
+
+def build_search_sql(table, id_column, columns, vector_column, distance_function, placeholder="%s", limit_placeholder="%s"):
+    """
+    최근접 이웃 검색 SQL 생성 (벡터가 NULL인 행 제외 - LIMIT이 행 수보다 커도 거리가 NULL인 결과 없음)
+
+    인덱스 검색과 재현율 측정용 정확 검색(exact=True 설정)이 같은 SQL을 사용
+
+    Args:
+        placeholder: 쿼리 벡터 자리 (psycopg2: "%s::vector", asyncpg: "$1")
+        limit_placeholder: LIMIT 자리 (psycopg2: "%s", asyncpg: "$2")
+    """
+    op = distance_operator(distance_function)
+    select_columns = ", ".join([id_column] + list(columns))
+    return (
+        f"SELECT {select_columns}, ({vector_column} {op} {placeholder}) AS distance "
+        f"FROM {table} WHERE {vector_column} IS NOT NULL "
+        f"ORDER BY {vector_column} {op} {placeholder} LIMIT {limit_placeholder};"
+    )
+
+
+def build_similar_by_id_sql(table, id_column, columns, vector_column, distance_function,
+                            exclude_self=True, with_max_distance=False,
+                            id_placeholder="%(source_id)s", max_distance_placeholder="%(max_distance)s",
+                            limit_placeholder="%(limit)s"):
+    """
+    저장된 행의 벡터로 최근접 이웃을 찾는 SQL 생성 ("이것과 비슷한 항목")
+
+    기준 벡터는 스칼라 서브쿼리(InitPlan)로 한 번만 읽혀 상수처럼 취급되므로
+    벡터 인덱스(ORDER BY 벡터 <op> 상수)를 그대로 사용하고, 벡터가 클라이언트로 오가지 않음
+    기준 행이 없거나 벡터가 NULL이면 결과가 비어 있음
+
+    Args:
+        exclude_self: 기준 행을 결과에서 제외
+        with_max_distance: 거리 상한 조건 추가 (max_distance_placeholder 자리)
+        id_placeholder: 기준 id 자리 - 여러 번 쓰이므로 이름 있는 자리 사용
+                        (psycopg2: "%(source_id)s", asyncpg: "$1")
+    """
+    op = distance_operator(distance_function)
+    source = f"(SELECT {vector_column} FROM {table} WHERE {id_column} = {id_placeholder})"
+    distance = f"({vector_column} {op} {source})"
+    select_columns = ", ".join([id_column] + list(columns))
+    conditions = [f"{source} IS NOT NULL", f"{vector_column} IS NOT NULL"]
+    if exclude_self:
+        conditions.append(f"{id_column} <> {id_placeholder}")
+    if with_max_distance:
+        conditions.append(f"{distance} <= {max_distance_placeholder}")
+    return (
+        f"SELECT {select_columns}, {distance} AS distance FROM {table} "
+        f"WHERE {' AND '.join(conditions)} "
+        f"ORDER BY {vector_column} {op} {source} LIMIT {limit_placeholder};"
+    )
+
+
+class RecallTracker:
+    """
+    설정(거리 함수, probes, ef_search)별 재현율 추정 + 거리 함수별 지연시간 통계
+
+    Args:
+        sample_rate: 정확 검색과 비교할 요청 비율 (0 ~ 1)
+        alpha: 재현율 지수이동평균 가중치 (클수록 최근 표본 반영이 큼)
+    """
+
+    def __init__(self, sample_rate=0.05, alpha=0.2):
+        self.sample_rate = sample_rate
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._recall = {}   # (distance, probes, ef_search) → {"recall": float, "samples": int}
+        self._stats = {}    # distance → {"requests", "latency_ms", "return_rate"}
+
+    @staticmethod
+    def key(distance_function, probes, ef_search):
+        return (distance_function, probes, ef_search)
+
+    def should_sample(self, force=False):
+        """이번 요청을 정확 검색과 비교할지 결정"""
+        return force or random.random() < self.sample_rate
+
+    @staticmethod
+    def recall_at_k(approx_ids, exact_ids):
+        """recall@k = 근사 결과 중 정확 top-k에 포함된 비율"""
+        if not exact_ids:
+            return 1.0
+        return len(set(approx_ids) & set(exact_ids)) / len(exact_ids)
+
+    def record_recall(self, key, recall):
+        """표본 재현율 반영 (지수이동평균)"""
+        with self._lock:
+            entry = self._recall.get(key)
+            if entry is None:
+                self._recall[key] = {"recall": recall, "samples": 1}
+            else:
+                entry["recall"] = (1 - self.alpha) * entry["recall"] + self.alpha * recall
+                entry["samples"] += 1
+
+    def estimated_recall(self, key):
+        """설정별 추정 재현율 (표본이 없으면 None)"""
+        entry = self._recall.get(key)
+        return round(entry["recall"], 4) if entry else None
+
+    def record_request(self, distance_function, elapsed_ms, requested, returned):
+        """요청 한 건의 지연시간과 반환 비율 기록"""
+        with self._lock:
+            stats = self._stats.setdefault(distance_function, {
+                "requests": 0,
+                "latency_ms": deque(maxlen=1000),
+                "return_rate": deque(maxlen=1000),
+            })
+            stats["requests"] += 1
+            stats["latency_ms"].append(elapsed_ms)
+            stats["return_rate"].append(returned / requested if requested else 1.0)
+
+    def summary(self, distance_function):
+        """거리 함수별 누적 통계 (요청 수, 지연시간 p50/p95/p99, 평균 반환 비율, 설정별 추정 재현율)"""
+        with self._lock:
+            stats = self._stats.get(distance_function)
+            latencies = list(stats["latency_ms"]) if stats else []
+            rates = list(stats["return_rate"]) if stats else []
+            recalls = {
+                f"probes={probes},ef_search={ef_search}": {"recall": round(v["recall"], 4), "samples": v["samples"]}
+                for (distance, probes, ef_search), v in self._recall.items()
+                if distance == distance_function
+            }
+        return {
+            "requests": stats["requests"] if stats else 0,
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 50), 3),
+                "p95": round(_percentile(latencies, 95), 3),
+                "p99": round(_percentile(latencies, 99), 3),
+            },
+            "avg_return_rate": round(sum(rates) / len(rates), 4) if rates else None,
+            "estimated_recall": recalls,
+        }
+